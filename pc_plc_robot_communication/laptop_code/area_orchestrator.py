@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Area Orchestrator
+=================
+
+Description: Per-area job queues for the two palletizing areas sharing one robot
+Purpose: Download one area's next layer while the other area executes
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- One FIFO job queue per area; a job is a layer (ordered coordinate sets)
+- Layers of both areas interleaved (alternating areas) or area by area
+- Jobs checked when queued: set limits, area reach, collision zones and
+  separation from the other area's workspace (DataValidator); the planned
+  motion path, including the moves between areas, checked before a run
+- While the robot moves, upcoming sets of either area are written into
+  their DB102 slots through the DB100 mailbox
+- PLC interlocks respected: one DB100 command at a time, one motion at a
+  time, and a DB102 slot is never rewritten while the robot executes it or
+  while an earlier queued execution of the same slot is still pending
+- Coordinates are captured when a job is queued, so a later layer can
+  reuse the slots of an earlier one with new values
+- Per-area utilization: motion, download (hidden under motion or exposed)
+  and robot idle time
+
+Usage:
+    orchestrator = AreaOrchestrator(coord_manager)
+    orchestrator.add_job(1, [1, 2, 3, 4], name="Pallet 1 layer 1")
+    orchestrator.add_job(2, [1, 2, 3, 4], name="Pallet 2 layer 1")
+    result = orchestrator.run()
+    print(result.get_summary())
+"""
+
+import time
+import logging
+from collections import deque
+from typing import Dict, Any, Deque, List, Optional, Tuple
+from dataclasses import dataclass, field
+
+from coordinate_manager import CoordinateManager, Coordinate
+from data_validator import DataValidator, ValidationResult
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+AREAS = (1, 2)
+
+@dataclass
+class AreaJob:
+    """
+    Layer of coordinate sets for one area
+    """
+    area: int  # Area number (1 or 2)
+    name: str  # Job name used in logs
+    steps: List[Tuple[int, Coordinate]]  # (set_number, coordinate) in execution order
+
+@dataclass
+class AreaUtilization:
+    """
+    Per-area timing of one orchestrator run
+    """
+    area: int
+    jobs: int = 0  # Jobs completed
+    sets: int = 0  # Sets executed
+    written: int = 0  # DB102 slots written
+    skipped: int = 0  # Slots already holding the coordinate
+    motion_time: float = 0.0  # Robot moving for this area (s)
+    download_time: float = 0.0  # Validation + DB102 writes for this area (s)
+    hidden_download_time: float = 0.0  # Part of download_time done during a motion (s)
+    idle_time: float = 0.0  # Robot idle before this area's motions (s)
+
+    @property
+    def exposed_download_time(self) -> float:
+        """Download time the robot had to wait for"""
+        return self.download_time - self.hidden_download_time
+
+    def utilization(self, elapsed: float) -> float:
+        """Fraction of the run the robot spent moving for this area"""
+        return self.motion_time / elapsed if elapsed > 0 else 0.0
+
+@dataclass
+class OrchestrationResult:
+    """
+    Area orchestrator run result data structure
+    """
+    areas: Dict[int, AreaUtilization] = field(default_factory=dict)
+    elapsed: float = 0.0
+    error: str = ""  # Set when the run stopped early
+
+    @property
+    def success(self) -> bool:
+        return not self.error
+
+    @property
+    def robot_utilization(self) -> float:
+        """Fraction of the run the robot spent moving"""
+        if self.elapsed <= 0:
+            return 0.0
+        return sum(area.motion_time for area in self.areas.values()) / self.elapsed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get result as plain dictionary (dashboards, JSON)"""
+        return {
+            'elapsed': self.elapsed,
+            'error': self.error,
+            'robot_utilization': self.robot_utilization,
+            'areas': {
+                area: {
+                    'jobs': stats.jobs,
+                    'sets': stats.sets,
+                    'written': stats.written,
+                    'skipped': stats.skipped,
+                    'motion_time': stats.motion_time,
+                    'download_time': stats.download_time,
+                    'hidden_download_time': stats.hidden_download_time,
+                    'idle_time': stats.idle_time,
+                    'utilization': stats.utilization(self.elapsed)
+                }
+                for area, stats in self.areas.items()
+            }
+        }
+
+    def get_summary(self) -> str:
+        """Get run summary string"""
+        lines = [f"{self.elapsed:.3f} s, robot utilization {self.robot_utilization:.0%}"]
+        for area, stats in sorted(self.areas.items()):
+            lines.append(f"Area {area}: {stats.jobs} job(s), {stats.sets} set(s), "
+                         f"utilization {stats.utilization(self.elapsed):.0%}, "
+                         f"motion {stats.motion_time:.3f} s, download {stats.download_time:.3f} s "
+                         f"({stats.hidden_download_time:.3f} s during motion), idle {stats.idle_time:.3f} s")
+        if self.error:
+            lines.append(f"Stopped: {self.error}")
+        return "\n".join(lines)
+
+class AreaOrchestrator:
+    """
+    Area Orchestrator Class
+
+    Runs queued layers of both areas on the shared robot. The PLC has one
+    DB100 mailbox and one robot, so the orchestrator works on one thread:
+    after each EXECUTE it uses the motion time to download upcoming sets
+    (next in execution order first) until the look-ahead is filled or the
+    robot reports the position reached. Run it through CommandScheduler
+    when other threads use the PLC client, so safety commands preempt it.
+    """
+
+    def __init__(self, coord_manager: CoordinateManager, lookahead: int = 10,
+                 alternate: bool = True, motion_timeout: Optional[float] = None,
+                 validator: Optional[DataValidator] = None):
+        """
+        Initialize area orchestrator
+
+        Args:
+            coord_manager: Coordinate manager holding the coordinate sets
+            lookahead: Maximum number of sets downloaded ahead of the robot
+            alternate: Alternate areas layer by layer (False: empty area 1's queue first)
+            motion_timeout: Maximum time per motion in seconds
+                (default: PLCClient.motion_timeout(), learned per move)
+            validator: Data validator providing area limits and collision zones
+                (default: DataValidator())
+        """
+        self.coord_manager = coord_manager
+        self.plc_client = coord_manager.plc_client
+        self.lookahead = max(1, lookahead)
+        self.alternate = alternate
+        self.motion_timeout = motion_timeout
+        self.validator = validator or DataValidator()
+        self.logger = logging.getLogger(__name__)
+        self.queues: Dict[int, Deque[AreaJob]] = {area: deque() for area in AREAS}
+        self.last_result: Optional[OrchestrationResult] = None
+
+    def add_job(self, area: int, set_numbers: List[int], name: str = "") -> bool:
+        """
+        Queue a layer for an area
+
+        The first coordinate of each set is captured now and validated:
+        set limits, reach of the area (limits and collision zones) and
+        separation from the other area's workspace.
+
+        Args:
+            area: Area number (1 or 2)
+            set_numbers: Set numbers in execution order
+            name: Optional job name
+
+        Returns:
+            bool: True if queued
+        """
+        if area not in self.queues:
+            self.logger.error(f"Area {area} must be 1 or 2")
+            return False
+        steps = []
+        for set_number in set_numbers:
+            coord_set = self.coord_manager.get_coordinate_set(area, set_number)
+            if not coord_set:
+                self.logger.error(f"Coordinate set {set_number} not found in area {area}")
+                return False
+            is_valid, error = coord_set.validate()
+            if is_valid:
+                error = self._check_reach(area, coord_set.coordinates[0])
+            if error:
+                self.logger.error(f"Coordinate set {set_number} in area {area} invalid: {error}")
+                return False
+            steps.append((set_number, coord_set.coordinates[0]))
+        if not steps:
+            self.logger.error("Job has no coordinate sets")
+            return False
+        self.queues[area].append(AreaJob(area, name or f"Area {area} job {len(self.queues[area]) + 1}", steps))
+        return True
+
+    @staticmethod
+    def _errors(*results: ValidationResult) -> str:
+        """Error messages of failed validation results"""
+        return "; ".join(error.message for result in results if not result.is_valid
+                         for error in result.errors)
+
+    def _check_reach(self, area: int, coord: Coordinate) -> str:
+        """Error message if the area cannot reach the coordinate, else empty"""
+        return self._errors(
+            self.validator.validate_coordinate(coord.x, coord.y, coord.z, coord.rx, coord.ry, coord.rz, area=area),
+            self.validator.validate_area_separation(coord.x, coord.y, coord.z, area)
+        )
+
+    def _check_paths(self, order: List[Tuple[int, int, int, Coordinate]]) -> str:
+        """Error message for the first move of the plan crossing a collision zone, else empty"""
+        for (_, from_area, from_set, start), (_, to_area, to_set, end) in zip(order, order[1:]):
+            error = self._errors(self.validator.validate_motion_path(vars(start), vars(end)))
+            if error:
+                return f"Move from set {from_set} of area {from_area} to set {to_set} of area {to_area}: {error}"
+        return ""
+
+    def clear(self, area: Optional[int] = None):
+        """
+        Remove queued jobs
+
+        Args:
+            area: Area to clear (None for both)
+        """
+        for number in ([area] if area else AREAS):
+            self.queues[number].clear()
+
+    def get_queue_status(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Get queued work per area
+
+        Returns:
+            dict: area -> jobs and sets queued
+        """
+        return {area: {'jobs': len(queue), 'sets': sum(len(job.steps) for job in queue)}
+                for area, queue in self.queues.items()}
+
+    def _plan(self) -> List[AreaJob]:
+        """Take all queued jobs in execution order"""
+        jobs = []
+        if self.alternate:
+            while any(self.queues.values()):
+                for area in AREAS:
+                    if self.queues[area]:
+                        jobs.append(self.queues[area].popleft())
+        else:
+            for area in AREAS:
+                jobs.extend(self.queues[area])
+                self.queues[area].clear()
+        return jobs
+
+    def run(self) -> OrchestrationResult:
+        """
+        Execute all queued jobs
+
+        Jobs are removed from the queues when the run starts; on failure
+        the unfinished jobs are not re-queued. The run stops before the
+        first motion if the PLC program cannot overlap downloads with
+        motions or a move of the plan crosses a collision zone.
+
+        Returns:
+            OrchestrationResult: Per-area utilization and error
+        """
+        started = time.perf_counter()
+        result = OrchestrationResult(areas={area: AreaUtilization(area) for area in AREAS})
+        self.last_result = result
+        jobs = self._plan()
+
+        # Flat execution order: (job index, area, set_number, coordinate)
+        order = [(index, job.area, set_number, coord)
+                 for index, job in enumerate(jobs) for set_number, coord in job.steps]
+        if not self.plc_client.supports('overlapped_execute'):
+            result.error = "PLC program does not support overlapped execution"
+        else:
+            result.error = self._check_paths(order)
+        if result.error:
+            self.logger.error(f"Area orchestration not started: {result.error}")
+            result.elapsed = time.perf_counter() - started
+            return result
+        staged = 0  # order[:staged] is in DB102
+        slots: Dict[Tuple[int, int], Coordinate] = {}  # DB102 content written in this run
+
+        def download(position: int, moving: bool) -> bool:
+            """Write order[position] unless its slot is pending or executing"""
+            _, area, set_number, coord = order[position]
+            slot = (area, set_number)
+            stats = result.areas[area]
+            if slots.get(slot) == coord:
+                stats.skipped += 1
+                return True
+            download_started = time.perf_counter()
+            ok = self.coord_manager.write_point(area, set_number, coord)
+            duration = time.perf_counter() - download_started
+            stats.download_time += duration
+            if moving:
+                stats.hidden_download_time += duration
+            if not ok:
+                slots.pop(slot, None)
+                result.error = f"Writing set {set_number} of area {area} failed"
+                return False
+            slots[slot] = coord
+            stats.written += 1
+            return True
+
+        def blocked(position: int, executing: int) -> bool:
+            """Slot still needed with other content by order[executing:position]"""
+            _, area, set_number, coord = order[position]
+            return any(order[i][1] == area and order[i][2] == set_number and order[i][3] != coord
+                       for i in range(executing, position))
+
+        idle_from = time.perf_counter()
+        for position, (job_index, area, set_number, _) in enumerate(order):
+            stats = result.areas[area]
+
+            # Robot is idle: the set to execute must be in DB102 now
+            if staged <= position:
+                if not download(position, False):
+                    break
+                staged = position + 1
+
+            ok, message = self.plc_client.start_execute(area, set_number)
+            motion_started = time.perf_counter()
+            stats.idle_time += motion_started - idle_from
+            if not ok:
+                result.error = f"Set {set_number} of area {area}: {message}"
+                break
+
+            # Download ahead while the robot moves
+            while (staged < len(order) and staged - position <= self.lookahead
+                   and not blocked(staged, position)):
+                feedback = self.plc_client.positions.get_feedback(max_age=0.0)
+                if not feedback or feedback['robot_status'] != 1:  # No longer MOVING
+                    break
+                if not download(staged, True):
+                    break
+                staged += 1
+            if result.error:
+                break
+
+            ok, message = self.plc_client.wait_for_motion(area, set_number, self.motion_timeout)
+            idle_from = time.perf_counter()
+            stats.motion_time += idle_from - motion_started
+            if not ok:
+                result.error = f"Set {set_number} of area {area}: {message}"
+                break
+            stats.sets += 1
+            if position + 1 == len(order) or order[position + 1][0] != job_index:
+                stats.jobs += 1
+                self.logger.info(f"{jobs[job_index].name} completed")
+
+        if result.error:
+            self.logger.error(f"Area orchestration stopped: {result.error}")
+        result.elapsed = time.perf_counter() - started
+        self.logger.info(f"Area orchestration: {result.get_summary()}")
+        return result
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Laptop Stack Benchmarks
+=======================
+
+Description: Standalone benchmark runner for the laptop-side Python stack
+Purpose: Catch performance regressions before they reach the floor
+Version: 1.0
+Date: 17/07/2025
+
+Benchmarks:
+- DB100/DB101 encode/decode (in-process loopback, no network)
+- DataValidator single-point and set validation
+- validate_motion_path at several distances
+- CoordinateManager load/save from 10 sets up to a full DB102 (20 sets of
+  20 points; set numbers stay in the valid 1-10 per area)
+- CSV import/export
+- Command round trips against plc_simulator.py over S7/TCP (FC300/FC301
+  as shipped: EXECUTE is timed until the robot moves, plus STOP_MOTION)
+
+Usage:
+    python benchmark.py --output results.json
+    python benchmark.py --save-baseline benchmark_baseline.json
+    python benchmark.py --compare benchmark_baseline.json --threshold 0.25
+
+Exit code is 1 when --compare finds a benchmark slower than the baseline
+by more than the threshold.
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+from plc_client import PLCClient
+from coordinate_manager import CoordinateManager, DB102_AREAS, DB102_SETS_PER_AREA
+from data_validator import DataValidator
+from plc_simulator import PLCSimulator, SimulatorConfig, LoopbackClient
+
+class BenchmarkRunner:
+    """
+    Benchmark Runner Class
+
+    Times callables with warm-up and repeated rounds, collects results
+    """
+
+    def __init__(self, min_time: float = 0.2, rounds: int = 5, only: Optional[List[str]] = None):
+        """
+        Initialize benchmark runner
+
+        Args:
+            min_time: Minimum measured time per round in seconds
+            rounds: Number of measured rounds
+            only: Optional list of name prefixes to run
+        """
+        self.min_time = min_time
+        self.rounds = rounds
+        self.only = only
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def selected(self, name: str) -> bool:
+        return not self.only or any(name.startswith(prefix) for prefix in self.only)
+
+    def run(self, name: str, func: Callable[[], Any], iterations: Optional[int] = None,
+            rounds: Optional[int] = None):
+        """
+        Benchmark a callable
+
+        Args:
+            name: Benchmark name
+            func: Callable without arguments
+            iterations: Calls per round (calibrated from min_time if None)
+            rounds: Measured rounds (defaults to runner setting)
+        """
+        if not self.selected(name):
+            return
+        rounds = rounds or self.rounds
+
+        # Warm up and calibrate
+        started = time.perf_counter()
+        func()
+        single = time.perf_counter() - started
+        if iterations is None:
+            iterations = max(1, int(self.min_time / single)) if single > 0 else 1000
+
+        samples = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            samples.append((time.perf_counter() - started) / iterations)
+
+        samples.sort()
+        result = {
+            'iterations': iterations,
+            'rounds': rounds,
+            'min_ms': samples[0] * 1000.0,
+            'median_ms': statistics.median(samples) * 1000.0,
+            'mean_ms': statistics.mean(samples) * 1000.0,
+            'max_ms': samples[-1] * 1000.0,
+            'ops_per_s': 1.0 / statistics.median(samples) if samples[0] > 0 else float('inf')
+        }
+        self.results[name] = result
+        print(f"{name:45s} {result['median_ms']:12.4f} ms  ({result['ops_per_s']:.1f} ops/s)")
+
+@contextmanager
+def working_directory(path: str):
+    """Temporarily change working directory (CoordinateManager uses cwd-relative files)"""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+def make_coordinate_sets(count: int, points_per_set: int = 1) -> Dict[str, Any]:
+    """Build coordinate_sets.json content with count sets (at most DB102 capacity)"""
+    if count > DB102_AREAS * DB102_SETS_PER_AREA:
+        raise ValueError(f"At most {DB102_AREAS * DB102_SETS_PER_AREA} coordinate sets fit DB102")
+    data = {}
+    for index in range(count):
+        area, set_number = index % DB102_AREAS + 1, index // DB102_AREAS + 1
+        coordinates = [{
+            'x': (index * 7 + p) % 1500, 'y': (index * 13 + p) % 1500, 'z': 300 + p,
+            'rx': 0, 'ry': 0, 'rz': 0, 'gripper': p % 2, 'speed': 50
+        } for p in range(points_per_set)]
+        data[str((area, set_number))] = {
+            'area': area, 'set_number': set_number, 'coordinates': coordinates,
+            'description': f"Benchmark set {index}", 'created_at': "2025-07-17 00:00:00"
+        }
+    return data
+
+def bench_db_codec(runner: BenchmarkRunner):
+    """DB100/DB101 encode/decode through PLCClient on a loopback client"""
+    plc = PLCClient("127.0.0.1")
+    plc.client = LoopbackClient(PLCSimulator(SimulatorConfig(seed=0)))
+    plc.connected = True
+    command = {'command_word': 1, 'area_selection': 1, 'coordinate_set': 3,
+               'x_coordinate': 1000, 'y_coordinate': -500, 'z_coordinate': 300, 'speed_override': 75}
+
+    runner.run('db.encode_db100', lambda: plc.write_db100(command))
+    runner.run('db.decode_db100', plc.read_db100)
+    runner.run('db.decode_db101', plc.read_db101)
+
+def bench_validator(runner: BenchmarkRunner, workdir: str):
+    """DataValidator single-point, set and motion path validation"""
+    with working_directory(workdir):
+        validator = DataValidator()
+
+    runner.run('validator.coordinate', lambda: validator.validate_coordinate(500, 500, 300, area=1))
+
+    points = [{'x': 100 + i * 40, 'y': 200 + i * 30, 'z': 300, 'rx': 0, 'ry': 0, 'rz': 0,
+               'gripper': i % 2, 'speed': 50} for i in range(20)]
+    runner.run('validator.set_20_points', lambda: validator.validate_coordinate_set(points, 1, 1))
+
+    start = {'x': 200, 'y': 200, 'z': 300}
+    for distance in (100, 1000, 3000):
+        end = {'x': 200 + distance, 'y': 200, 'z': 300}
+        runner.run(f'validator.motion_path_{distance}mm', lambda end=end: validator.validate_motion_path(start, end))
+
+def bench_manager_storage(runner: BenchmarkRunner, workdir: str, sizes: List[Tuple[int, int]]):
+    """CoordinateManager load/save at several library sizes (sets, points per set)"""
+    for sets, points in sizes:
+        directory = os.path.join(workdir, f"storage_{sets}x{points}")
+        os.makedirs(directory, exist_ok=True)
+        with working_directory(directory):
+            with open("coordinate_sets.json", 'w') as f:
+                json.dump(make_coordinate_sets(sets, points), f)
+            manager = CoordinateManager(None)
+            runner.run(f'manager.load_{sets}x{points}', manager.load_coordinate_sets)
+            runner.run(f'manager.save_{sets}x{points}', manager.save_coordinate_sets)
+
+# Library sizes (sets, points per set), up to a full DB102
+STORAGE_SIZES = [(10, 1), (20, 1), (20, 20)]
+
+# DB102 capacity: 2 areas x 10 sets x 20 coordinates
+CSV_MAX_ROWS = 400
+
+def bench_csv(runner: BenchmarkRunner, workdir: str, rows: int):
+    """CSV import/export through CoordinateManager"""
+    rows = min(rows, CSV_MAX_ROWS)
+    directory = os.path.join(workdir, "csv")
+    os.makedirs(directory, exist_ok=True)
+    with working_directory(directory):
+        csv_path = os.path.join(directory, "import.csv")
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['area', 'set_number', 'x', 'y', 'z', 'rx', 'ry', 'rz', 'gripper', 'speed', 'description'])
+            for index in range(rows):
+                # At most 20 rows per (area, set_number), so every row is importable
+                writer.writerow([index % 2 + 1, (index // 2) % 10 + 1, index % 1500, 200, 300, 0, 0, 0, 0, 50,
+                                 f"row {index}"])
+
+        manager = CoordinateManager(None)
+        logging.getLogger('coordinate_manager').setLevel(logging.WARNING)
+        result = manager.import_coordinates_streaming(csv_path)
+        if not result.success or result.errors or result.rows_imported != rows:
+            raise RuntimeError(f"CSV benchmark input rejected: {result.get_summary()}")
+        runner.run(f'csv.import_{rows}_rows', lambda: manager.import_coordinates_from_file(csv_path),
+                   iterations=1, rounds=3)
+        runner.run('csv.export', lambda: manager.export_coordinates_to_file(os.path.join(directory, "export.csv")))
+
+def execute_handover(plc: PLCClient, area: int, set_number: int, timeout: float = 5.0) -> bool:
+    """
+    EXECUTE until the robot moves to the set, then STOP_MOTION
+
+    FC300 as shipped never reports COMPLETED for EXECUTE: it answers BUSY
+    when FC301 starts the robot and ROBOT_NOT_READY while it moves. The
+    STOP_MOTION round trip makes the robot ready for the next EXECUTE.
+    """
+    if not plc.send_command('EXECUTE_COORDINATE', area=area, set_number=set_number):
+        return False
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        status = plc.read_db100()['status_word']
+        db101 = plc.read_db101()
+        if (status in (6, 7) and db101['robot_status'] == 1  # BUSY / ROBOT_NOT_READY, robot MOVING
+                and db101['current_area'] == area and db101['current_set'] == set_number):
+            return plc.send_command('STOP_MOTION') and plc.wait_for_completion()[0]
+        if status in (4, 9, 10):
+            return False
+        time.sleep(0.001)
+    return False
+
+def bench_round_trips(runner: BenchmarkRunner, port: int, iterations: int):
+    """Command round trips against the simulator (FC300/FC301 as shipped) over S7/TCP"""
+    simulator = PLCSimulator(SimulatorConfig(seed=0, motion_base_time=10.0))
+    simulator.start(port)
+    plc = PLCClient("127.0.0.1", port=port)
+    try:
+        if not plc.connect():
+            print("Round trip benchmarks skipped: cannot connect to simulator")
+            return
+        runner.run('roundtrip.db_read', plc.read_db100, iterations=iterations * 10)
+        runner.run('roundtrip.get_status', lambda: plc.send_command('GET_STATUS') and plc.wait_for_completion(),
+                   iterations=iterations)
+        runner.run('roundtrip.write_coordinate', lambda: plc.write_coordinate_set(1, 1, 500, 200, 300),
+                   iterations=iterations)
+        runner.run('roundtrip.execute_stop', lambda: execute_handover(plc, 1, 1),
+                   iterations=iterations)
+    finally:
+        plc.disconnect()
+        simulator.stop()
+
+def compare_results(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare results with baseline
+
+    Args:
+        results: Current results
+        baseline: Baseline document (as written by --save-baseline)
+        threshold: Allowed relative slowdown (0.25 = 25%)
+
+    Returns:
+        List of regression descriptions
+    """
+    regressions = []
+    print(f"\n{'benchmark':45s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, result in sorted(results.items()):
+        reference = baseline.get('results', {}).get(name)
+        if reference is None:
+            print(f"{name:45s} {'-':>12s} {result['median_ms']:12.4f}      new")
+            continue
+        change = result['median_ms'] / reference['median_ms'] - 1.0 if reference['median_ms'] > 0 else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{name:45s} {reference['median_ms']:12.4f} {result['median_ms']:12.4f} {change:+7.1%}{flag}")
+        if change > threshold:
+            regressions.append(f"{name}: {reference['median_ms']:.4f} ms -> {result['median_ms']:.4f} ms ({change:+.1%})")
+    return regressions
+
+def main():
+    """Run benchmarks from the command line"""
+    parser = argparse.ArgumentParser(description="Benchmark the laptop-side Python stack")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--save-baseline', help="Write results as the new baseline file")
+    parser.add_argument('--compare', help="Baseline file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed slowdown before failing (default 0.25)")
+    parser.add_argument('--only', nargs='*', help="Only run benchmarks with these name prefixes")
+    parser.add_argument('--csv-rows', type=int, default=CSV_MAX_ROWS,
+                        help=f"Rows for the CSV import benchmark (at most {CSV_MAX_ROWS})")
+    parser.add_argument('--no-plc', action='store_true', help="Skip round trips against the simulator")
+    parser.add_argument('--port', type=int, default=1102, help="Simulator TCP port")
+    parser.add_argument('--round-trips', type=int, default=20, help="Commands per round trip round")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    runner = BenchmarkRunner(only=args.only)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bench_db_codec(runner)
+        bench_validator(runner, workdir)
+        bench_manager_storage(runner, workdir, STORAGE_SIZES)
+        bench_csv(runner, workdir, args.csv_rows)
+    if not args.no_plc and runner.selected('roundtrip'):
+        bench_round_trips(runner, args.port, args.round_trips)
+
+    document = {
+        'created_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'machine': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'system': platform.system(),
+            'processor': platform.processor() or platform.machine()
+        },
+        'results': runner.results
+    }
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(document, f, indent=2)
+            print(f"Results written to {path}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_results(runner.results, baseline, args.threshold)
+        if regressions:
+            print("\nPerformance regressions:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Command Scheduler
+=================
+
+Description: Priority command queue with a single DB100 writer thread
+Purpose: Keep STOP/EMERGENCY_STOP from racing with (or waiting behind) running commands
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- One writer thread owns DB100; all commands go through a priority queue
+- EMERGENCY_STOP > STOP_MOTION > RESET_ERROR > everything else, FIFO within a level
+- Safety commands preempt the running wait (PLCClient.cancel_event) and
+  cancel queued motion/data commands
+- Callers get concurrent.futures.Future objects
+- Safety latency (submit -> DB100 written) and queue wait recorded in PLCMetrics
+
+Usage:
+    scheduler = CommandScheduler(plc_client)
+    scheduler.start()
+    future = scheduler.submit(plc_client.execute_coordinate_set, 1, 3)
+    scheduler.emergency_stop()          # Preempts the execute above
+    print(future.result())              # False
+    scheduler.stop()
+"""
+
+import heapq
+import itertools
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from plc_client import PLCClient
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Priority levels (lower runs first)
+PRIORITY_EMERGENCY = 0
+PRIORITY_STOP = 1
+PRIORITY_CONTROL = 2
+PRIORITY_NORMAL = 3
+
+COMMAND_PRIORITY = {
+    'EMERGENCY_STOP': PRIORITY_EMERGENCY,
+    'STOP_MOTION': PRIORITY_STOP,
+    'RESET_ERROR': PRIORITY_CONTROL,
+}
+
+class _Job:
+    """Queued call on the writer thread"""
+
+    def __init__(self, name: str, function: Callable, args: tuple, kwargs: Dict[str, Any], priority: int):
+        self.name = name
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.future: Future = Future()
+        self.submitted = time.perf_counter()
+        self.preempted_by: Optional[str] = None
+
+class CommandScheduler:
+    """
+    Command Scheduler Class
+
+    Serializes all PLC commands onto one writer thread. A safety command
+    (priority STOP or higher) is started as soon as the running call has
+    returned from its current DB access: the running wait is cancelled
+    through PLCClient.cancel_event and queued normal-priority calls are
+    cancelled, so the worst-case latency is one DB100/DB101 round trip
+    plus the DB100 write of the safety command.
+    """
+
+    def __init__(self, plc_client: PLCClient, safety_wait_timeout: float = 5.0):
+        """
+        Initialize command scheduler
+
+        Args:
+            plc_client: PLC client; must only be used through this scheduler while it runs
+            safety_wait_timeout: Completion wait for EMERGENCY_STOP/STOP_MOTION in seconds
+        """
+        self.plc_client = plc_client
+        self.safety_wait_timeout = safety_wait_timeout
+        self.logger = logging.getLogger(__name__)
+        self.condition = threading.Condition()
+        self.queue: List[Tuple[int, int, _Job]] = []
+        self.sequence = itertools.count()
+        self.current: Optional[_Job] = None
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self.stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'preempted': 0, 'cancelled': 0,
+                      'safety_latency_ms_last': 0.0, 'safety_latency_ms_max': 0.0}
+
+    def start(self):
+        """Start the writer thread"""
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._run, name="plc-command-writer", daemon=True)
+        self.thread.start()
+        self.logger.info("Command scheduler started")
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the writer thread
+
+        Queued calls are cancelled and a running wait is aborted.
+
+        Args:
+            timeout: Maximum time to wait for the writer thread in seconds
+        """
+        with self.condition:
+            self.running = False
+            self._cancel_queued(PRIORITY_EMERGENCY - 1)
+            self.plc_client.cancel_event.set()
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout=timeout)
+            self.thread = None
+        self.plc_client.cancel_event.clear()
+        self.logger.info("Command scheduler stopped")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _cancel_queued(self, priority: int) -> int:
+        """Cancel queued jobs with lower priority than `priority` (caller holds lock)"""
+        kept = []
+        cancelled = 0
+        for entry in self.queue:
+            if entry[0] > priority and entry[2].future.cancel():
+                cancelled += 1
+            else:
+                kept.append(entry)
+        if cancelled:
+            heapq.heapify(kept)
+            self.queue = kept
+            self.stats['cancelled'] += cancelled
+        return cancelled
+
+    def submit(self, function: Callable, *args, priority: int = PRIORITY_NORMAL,
+               name: Optional[str] = None, **kwargs) -> Future:
+        """
+        Queue a PLC client call for the writer thread
+
+        Args:
+            function: Callable, usually a PLCClient or CoordinateManager method
+            *args: Positional arguments
+            priority: PRIORITY_EMERGENCY, PRIORITY_STOP, PRIORITY_CONTROL or PRIORITY_NORMAL
+            name: Name used in logs (default: function name)
+            **kwargs: Keyword arguments
+
+        Returns:
+            Future: Resolves to the call's return value; cancelled if a
+                safety command removed it from the queue, RuntimeError if
+                the scheduler is not running
+        """
+        job = _Job(name or getattr(function, '__name__', 'call'), function, args, kwargs, priority)
+        with self.condition:
+            if not self.running:
+                self.logger.error(f"Command scheduler not running, {job.name} rejected")
+                job.future.set_exception(RuntimeError("Command scheduler not running"))
+                return job.future
+            self.stats['submitted'] += 1
+            if priority <= PRIORITY_STOP:
+                cancelled = self._cancel_queued(PRIORITY_CONTROL)
+                current = self.current
+                if current is not None and current.priority > priority:
+                    current.preempted_by = job.name
+                    self.plc_client.cancel_event.set()
+                    self.stats['preempted'] += 1
+                    self.logger.warning(f"{job.name} preempts {current.name}"
+                                        f"{f', {cancelled} queued command(s) cancelled' if cancelled else ''}")
+            heapq.heappush(self.queue, (priority, next(self.sequence), job))
+            self.condition.notify()
+        return job.future
+
+    def send(self, command: str, wait: bool = True, timeout: Optional[float] = None, **kwargs) -> Future:
+        """
+        Queue a raw DB100 command
+
+        Args:
+            command: Command name from PLCClient.COMMANDS
+            wait: Wait for the PLC to complete the command
+            timeout: Completion timeout in seconds (default: 30 s, motion timeout for EXECUTE)
+            **kwargs: Command parameters (area, set_number, x, ...)
+
+        Returns:
+            Future: Resolves to (success, status_message)
+        """
+        return self.submit(self._send_command, command, wait, timeout, kwargs,
+                           priority=COMMAND_PRIORITY.get(command, PRIORITY_NORMAL), name=command)
+
+    def emergency_stop(self) -> Future:
+        """
+        Send EMERGENCY_STOP ahead of everything else
+
+        The writer waits for the PLC to complete the stop before running
+        the next command, which would otherwise replace the unprocessed
+        stop in the DB100 mailbox.
+
+        Returns:
+            Future: Resolves to (success, status_message)
+        """
+        return self.send('EMERGENCY_STOP', timeout=self.safety_wait_timeout)
+
+    def stop_motion(self) -> Future:
+        """
+        Send STOP_MOTION ahead of queued commands
+
+        Returns:
+            Future: Resolves to (success, status_message)
+        """
+        return self.send('STOP_MOTION', timeout=self.safety_wait_timeout)
+
+    def _send_command(self, command: str, wait: bool, timeout: Optional[float],
+                      kwargs: Dict[str, Any]) -> Tuple[bool, str]:
+        """Write one command and optionally wait for it (writer thread)"""
+        if command in ('EMERGENCY_STOP', 'STOP_MOTION'):
+            self.plc_client.last_motion = None  # Robot stops somewhere along the path
+        if not self.plc_client.send_command(command, **kwargs):
+            return False, "Write to DB100 failed"
+        job = self.current
+        if job is not None and job.priority <= PRIORITY_STOP:
+            latency = time.perf_counter() - job.submitted
+            self.plc_client.metrics.record('safety_latency', latency)
+            with self.condition:
+                self.stats['safety_latency_ms_last'] = latency * 1000.0
+                self.stats['safety_latency_ms_max'] = max(self.stats['safety_latency_ms_max'], latency * 1000.0)
+            self.logger.info(f"{command} written {latency * 1000.0:.1f} ms after request")
+        if not wait:
+            return True, "Command sent"
+        if timeout is None:
+            timeout = self.plc_client.DEFAULT_MOTION_TIMEOUT if command == 'EXECUTE_COORDINATE' else 30.0
+        success, message = self.plc_client.wait_for_completion(timeout=timeout)
+        if not success and job is not None and job.preempted_by:
+            message = f"Preempted by {job.preempted_by}"
+        return success, message
+
+    def _run(self):
+        """Writer thread: run queued jobs by priority"""
+        while True:
+            with self.condition:
+                while self.running and not self.queue:
+                    self.condition.wait()
+                if not self.running:
+                    break
+                _, _, job = heapq.heappop(self.queue)
+                self.current = job
+                # A pending cancel was meant for the previous job
+                self.plc_client.cancel_event.clear()
+
+            if not job.future.set_running_or_notify_cancel():
+                with self.condition:
+                    self.current = None
+                continue
+
+            self.plc_client.metrics.record('scheduler_queue', time.perf_counter() - job.submitted)
+            try:
+                result = job.function(*job.args, **job.kwargs)
+            except Exception as e:
+                self.logger.error(f"{job.name} failed: {e}")
+                with self.condition:
+                    self.current = None
+                    self.stats['failed'] += 1
+                job.future.set_exception(e)
+                continue
+
+            with self.condition:
+                self.current = None
+                self.stats['completed'] += 1
+            if job.preempted_by:
+                self.logger.warning(f"{job.name} preempted by {job.preempted_by}")
+            job.future.set_result(result)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get scheduler statistics
+
+        Returns:
+            dict: Job counters, queue depth and safety latency
+        """
+        with self.condition:
+            return {**self.stats, 'queued': len(self.queue),
+                    'current': self.current.name if self.current else None}
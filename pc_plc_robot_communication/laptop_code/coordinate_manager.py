@@ -13,14 +13,27 @@ Features:
 - Data validation
 - Area management
 - Batch operations
+- Pipelined sequence execution (next set staged while the robot moves,
+  PLC programs with the overlapped_execute capability)
+- Streaming execution of all points of a set, next points pre-loaded into
+  reserved DB102 slots while the robot moves
+- Array-backed storage: all points in one int32 table, sets as views
+- Area and description-tag indexes, per-area aggregates, change listeners
 - Error handling
 """
 
+import csv
 import json
 import logging
+import re
+import struct
 import time
-from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from array import array
+from collections.abc import MutableMapping, MutableSequence
+from itertools import islice
+from numbers import Integral
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field, fields
 from pathlib import Path
 import threading
 from plc_client import PLCClient
@@ -52,6 +65,11 @@ class Coordinate:
         Returns:
             tuple: (is_valid, error_message)
         """
+        # Check types (stored as 32-bit integers)
+        for name, value in vars(self).items():
+            if not isinstance(value, Integral):
+                return False, f"{name} value {value!r} must be an integer"
+        
         # Check coordinate ranges (example limits)
         if not (-2000 <= self.x <= 2000):
             return False, f"X coordinate {self.x} out of range (-2000 to 2000)"
@@ -123,6 +141,360 @@ class CoordinateSet:
         
         return True, "Valid"
 
+# Point row layout of CoordinateStore (Coordinate field order)
+COORDINATE_FIELDS = tuple(f.name for f in fields(Coordinate))
+ROW_SIZE = len(COORDINATE_FIELDS)
+
+# DB102 record as addressed by FC301: X, Y, Z (DINT), RX, RY, RZ, Gripper,
+# Speed (INT), Valid (BOOL), Reserved (WORD); 10 sets per area
+DB102_RECORD_FORMAT = '>lllhhhhhBxH'
+DB102_RECORD_SIZE = struct.calcsize(DB102_RECORD_FORMAT)
+DB102_SETS_PER_AREA = 10
+DB102_AREAS = 2
+
+# Change listener: callback(event, (area, set_number)), event 'added', 'updated' or 'deleted'
+ChangeListener = Callable[[str, Tuple[int, int]], None]
+
+def description_tags(description: str) -> List[str]:
+    """Tags of a description: its lowercase words containing a letter"""
+    return sorted({word for word in re.findall(r'[a-z0-9_]+', description.lower())
+                   if re.search(r'[a-z]', word)})
+
+class CoordinateView(MutableSequence):
+    """
+    List of Coordinates backed by rows of a CoordinateStore table
+    
+    Coordinates are created on access, so changing a returned Coordinate
+    does not change the store. Assigning, inserting or deleting items
+    through the view (append, extend, pop, ...) writes the changed set back
+    to the store under its key, as if the set had been replaced; the caller
+    holds the lock and saves like for any other store change. Until then
+    the view keeps showing the rows it was taken from.
+    """
+    
+    __slots__ = ('_table', '_start', '_length', '_store', '_key')
+    
+    def __init__(self, table: array, start: int, length: int,
+                 store: Optional['CoordinateStore'] = None, key: Optional[Tuple[int, int]] = None):
+        self._table = table
+        self._start = start
+        self._length = length
+        self._store = store
+        self._key = key
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("coordinate index out of range")
+        base = (self._start + index) * ROW_SIZE
+        return Coordinate(*self._table[base:base + ROW_SIZE])
+    
+    def __setitem__(self, index, value):
+        coordinates = list(self)
+        coordinates[index] = value
+        self._write(coordinates)
+    
+    def __delitem__(self, index):
+        coordinates = list(self)
+        del coordinates[index]
+        self._write(coordinates)
+    
+    def insert(self, index: int, value: Coordinate):
+        coordinates = list(self)
+        coordinates.insert(index, value)
+        self._write(coordinates)
+    
+    def _write(self, coordinates: List[Coordinate]):
+        """Store the changed coordinates and show the new rows"""
+        if self._store is None:
+            raise TypeError("Coordinate view is not attached to a store")
+        self._store.set_coordinates(self._key, coordinates)
+        start, length = self._store.index[self._key][:2]
+        self._table, self._start, self._length = self._store.table, start, length
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CoordinateView):
+            return self.rows() == other.rows()
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return repr(list(self))
+    
+    def rows(self) -> array:
+        """Flat int32 copy of the rows (ROW_SIZE values per coordinate)"""
+        return self._table[self._start * ROW_SIZE:(self._start + self._length) * ROW_SIZE]
+
+class CoordinateStore(MutableMapping):
+    """
+    Coordinate Store Class
+    
+    Mapping (area, set_number) -> CoordinateSet holding every point in one
+    contiguous array('i') table of ROW_SIZE ints per point; the index keeps
+    (first row, row count, description, created_at) per set. Stored sets
+    are returned as CoordinateSets whose coordinates are CoordinateViews
+    (item changes through a view write the set back).
+    
+    Rows are only appended: replacing or deleting a set leaves its old rows
+    in place (views taken before stay valid) until compact() copies the live
+    rows into a new table, which happens automatically once dead rows
+    outnumber live ones. Not thread-safe; CoordinateManager.lock guards it.
+    
+    Secondary indexes (by area, by description tag) and per-area aggregates
+    (set count, point count, bounding box) are updated on every change (a
+    box that lost an edge set is rebuilt on the next area_summary()), and
+    listeners are called with the change while the caller holds the lock.
+    """
+    
+    def __init__(self, compact_min_rows: int = 4096):
+        """
+        Initialize coordinate store
+        
+        Args:
+            compact_min_rows: Dead rows tolerated before automatic compaction
+        """
+        self.table = array('i')
+        self.index: Dict[Tuple[int, int], Tuple[int, int, str, str]] = {}
+        self.dead_rows = 0
+        self.compact_min_rows = compact_min_rows
+        self.by_area: Dict[int, Dict[Tuple[int, int], None]] = {}  # Ordered key sets
+        self.by_tag: Dict[str, Dict[Tuple[int, int], None]] = {}
+        self.bounds: Dict[Tuple[int, int], Tuple[int, ...]] = {}  # x_min, x_max, y_min, y_max, z_min, z_max
+        self.area_aggregates: Dict[int, Dict[str, Any]] = {}
+        self.bounds_dirty = set()  # Areas whose box must be rebuilt from the per-set boxes
+        self.listeners: List[ChangeListener] = []
+        self.logger = logging.getLogger(__name__)
+    
+    def __getitem__(self, key: Tuple[int, int]) -> CoordinateSet:
+        start, length, description, created_at = self.index[key]
+        return CoordinateSet(
+            area=key[0],
+            set_number=key[1],
+            coordinates=CoordinateView(self.table, start, length, self, key),
+            description=description,
+            created_at=created_at
+        )
+    
+    def __setitem__(self, key: Tuple[int, int], coord_set: CoordinateSet):
+        coordinates = coord_set.coordinates
+        if isinstance(coordinates, CoordinateView):
+            rows = coordinates.rows()
+        else:
+            try:
+                rows = array('i', [value for coord in coordinates
+                                   for value in (coord.x, coord.y, coord.z, coord.rx, coord.ry, coord.rz,
+                                                 coord.gripper, coord.speed)])
+            except (OverflowError, TypeError) as e:
+                raise ValueError(f"Set {key}: coordinate values must be 32-bit integers ({e})") from None
+        start = len(self.table) // ROW_SIZE
+        self.table.extend(rows)
+        existed = key in self.index
+        if existed:
+            self.dead_rows += self.index[key][1]
+            self._unindex(key, keep_order=True)
+        self.index[key] = (start, len(coordinates), coord_set.description, coord_set.created_at)
+        self._index(key)
+        self._maybe_compact()
+        self._notify('updated' if existed else 'added', key)
+    
+    def set_coordinates(self, key: Tuple[int, int], coordinates: List[Coordinate]):
+        """
+        Replace the coordinates of a set, keeping description and created_at
+        
+        Args:
+            key: (area, set_number)
+            coordinates: New coordinates
+        """
+        _, _, description, created_at = self.index.get(key, (0, 0, "", ""))
+        self[key] = CoordinateSet(
+            area=key[0],
+            set_number=key[1],
+            coordinates=coordinates,
+            description=description,
+            created_at=created_at
+        )
+    
+    def __delitem__(self, key: Tuple[int, int]):
+        self._unindex(key)
+        self.dead_rows += self.index.pop(key)[1]
+        self._maybe_compact()
+        self._notify('deleted', key)
+    
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return iter(self.index)
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def __contains__(self, key) -> bool:
+        return key in self.index
+    
+    def point_count(self, key: Tuple[int, int]) -> int:
+        """Number of coordinates of a set"""
+        return self.index[key][1]
+    
+    def rows(self, key: Tuple[int, int]) -> array:
+        """Flat int32 copy of a set's rows (ROW_SIZE values per coordinate)"""
+        start, length = self.index[key][:2]
+        return self.table[start * ROW_SIZE:(start + length) * ROW_SIZE]
+    
+    def iter_rows(self, key: Tuple[int, int]) -> Iterator[Tuple[int, ...]]:
+        """Rows of a set as tuples in COORDINATE_FIELDS order"""
+        values = iter(self.rows(key))
+        return zip(*[values] * ROW_SIZE)
+    
+    def column(self, key: Tuple[int, int], name: str) -> array:
+        """One field (e.g. 'z') of all coordinates of a set"""
+        start, length = self.index[key][:2]
+        offset = COORDINATE_FIELDS.index(name)
+        return self.table[start * ROW_SIZE + offset:(start + length) * ROW_SIZE:ROW_SIZE]
+    
+    def _index(self, key: Tuple[int, int]):
+        """Add a stored set to the indexes and its area aggregate"""
+        area = key[0]
+        self.by_area.setdefault(area, {})[key] = None
+        for tag in description_tags(self.index[key][2]):
+            self.by_tag.setdefault(tag, {})[key] = None
+        aggregate = self.area_aggregates.setdefault(area, {'sets': 0, 'points': 0, 'bounds': None})
+        aggregate['sets'] += 1
+        aggregate['points'] += self.index[key][1]
+        if self.index[key][1]:
+            x, y, z = (self.column(key, name) for name in ('x', 'y', 'z'))
+            bounds = self.bounds[key] = (min(x), max(x), min(y), max(y), min(z), max(z))
+            if area not in self.bounds_dirty:
+                aggregate['bounds'] = self._union(aggregate['bounds'], bounds)
+    
+    def _unindex(self, key: Tuple[int, int], keep_order: bool = False):
+        """Remove a stored set from the indexes and its area aggregate"""
+        area = key[0]
+        if not keep_order:
+            del self.by_area[area][key]
+        for tag in description_tags(self.index[key][2]):
+            keys = self.by_tag[tag]
+            del keys[key]
+            if not keys:
+                del self.by_tag[tag]
+        aggregate = self.area_aggregates[area]
+        aggregate['sets'] -= 1
+        aggregate['points'] -= self.index[key][1]
+        bounds = self.bounds.pop(key, None)
+        if (bounds and area not in self.bounds_dirty
+                and any(value == limit for value, limit in zip(bounds, aggregate['bounds']))):
+            # Set was on the box edge: rebuild lazily, so bulk replaces stay O(1) per set
+            self.bounds_dirty.add(area)
+    
+    @staticmethod
+    def _union(a: Optional[Tuple[int, ...]], b: Tuple[int, ...]) -> Tuple[int, ...]:
+        if a is None:
+            return b
+        return (min(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]),
+                max(a[3], b[3]), min(a[4], b[4]), max(a[5], b[5]))
+    
+    def _notify(self, event: str, key: Tuple[int, int]):
+        for listener in list(self.listeners):
+            try:
+                listener(event, key)
+            except Exception as e:
+                self.logger.error(f"Coordinate change listener failed: {e}")
+    
+    def keys_in_area(self, area: int) -> List[Tuple[int, int]]:
+        """Keys of an area's sets in insertion order"""
+        return list(self.by_area.get(area, ()))
+    
+    def keys_with_tag(self, tag: str) -> List[Tuple[int, int]]:
+        """Keys of the sets whose description contains a tag (see description_tags), sorted"""
+        return sorted(self.by_tag.get(tag.lower(), ()))
+    
+    def area_summary(self, area: int) -> Dict[str, Any]:
+        """Set count, point count and bounding box (x_min, x_max, y_min, y_max, z_min, z_max or None)"""
+        if area in self.bounds_dirty:
+            self.bounds_dirty.discard(area)
+            bounds = None
+            for key in self.by_area.get(area, ()):
+                if key in self.bounds:
+                    bounds = self._union(bounds, self.bounds[key])
+            self.area_aggregates[area]['bounds'] = bounds
+        return dict(self.area_aggregates.get(area, {'sets': 0, 'points': 0, 'bounds': None}))
+    
+    def _maybe_compact(self):
+        live_rows = len(self.table) // ROW_SIZE - self.dead_rows
+        if self.dead_rows > max(self.compact_min_rows, live_rows):
+            self.compact()
+    
+    def compact(self):
+        """Copy the live rows into a new table (existing views keep the old one)"""
+        table = array('i')
+        for key, (start, length, description, created_at) in self.index.items():
+            self.index[key] = (len(table) // ROW_SIZE, length, description, created_at)
+            table.extend(self.table[start * ROW_SIZE:(start + length) * ROW_SIZE])
+        self.table = table
+        self.dead_rows = 0
+    
+    def pack_db102(self) -> bytearray:
+        """
+        Build a DB102 image of the stored sets
+        
+        The first coordinate of each set (what write_coordinate_set_to_plc
+        writes) in its record with the valid flag set; records of sets not
+        stored stay zero.
+        
+        Returns:
+            bytearray: DB102_AREAS * DB102_SETS_PER_AREA records
+        """
+        image = bytearray(DB102_RECORD_SIZE * DB102_SETS_PER_AREA * DB102_AREAS)
+        for (area, set_number), (start, length, _, _) in self.index.items():
+            if not (1 <= area <= DB102_AREAS and 1 <= set_number <= DB102_SETS_PER_AREA and length):
+                continue
+            offset = ((area - 1) * DB102_SETS_PER_AREA + (set_number - 1)) * DB102_RECORD_SIZE
+            struct.pack_into(DB102_RECORD_FORMAT, image, offset,
+                             *self.table[start * ROW_SIZE:(start + 1) * ROW_SIZE], 1, 0)
+        return image
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get storage statistics
+        
+        Returns:
+            dict: Set, live/dead row counts and table size in bytes
+        """
+        rows = len(self.table) // ROW_SIZE
+        return {'sets': len(self.index), 'rows': rows - self.dead_rows, 'dead_rows': self.dead_rows,
+                'table_bytes': self.table.buffer_info()[1] * self.table.itemsize}
+
+@dataclass
+class ImportResult:
+    """
+    CSV import result data structure
+    """
+    rows_read: int = 0
+    rows_imported: int = 0
+    sets_imported: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)  # (CSV row number, header = 1, message)
+    fatal_error: str = ""  # Set when the file could not be read at all
+    
+    @property
+    def success(self) -> bool:
+        """True if the file was read and at least one row was imported"""
+        return not self.fatal_error and self.rows_imported > 0
+    
+    def get_summary(self) -> str:
+        """Get import summary string"""
+        if self.fatal_error:
+            return f"Import failed: {self.fatal_error}"
+        if not self.rows_read:
+            return "Import failed: no rows in file"
+        summary = f"{self.rows_imported}/{self.rows_read} rows imported into {self.sets_imported} set(s)"
+        if self.errors:
+            summary += f", {len(self.errors)} row error(s)"
+        return summary
+
 class CoordinateManager:
     """
     Coordinate Manager Class
@@ -141,8 +513,10 @@ class CoordinateManager:
         self.plc_client = plc_client
         self.config_file = Path(config_file)
         self.logger = logging.getLogger(__name__)
-        self.coordinate_sets: Dict[Tuple[int, int], CoordinateSet] = {}
+        self.coordinate_sets = CoordinateStore()  # (area, set_number) -> CoordinateSet view
         self.lock = threading.Lock()
+        self.sequence_stats: Dict[str, Any] = {}  # Timing of last pipelined sequence
+        self.stream_stats: Dict[str, Any] = {}  # Timing of last streamed set
         
         # Load configuration
         self.config = self.load_config()
@@ -180,6 +554,11 @@ class CoordinateManager:
                 "speed": 50,
                 "gripper": 0,
                 "timeout": 30
+            },
+            "streaming": {
+                # DB102 set numbers (per area) reserved as streaming ring buffer,
+                # no coordinate set can be stored in them
+                "buffer_slots": []
             }
         }
         
@@ -226,7 +605,10 @@ class CoordinateManager:
                             description=set_data.get('description', ''),
                             created_at=set_data.get('created_at', '')
                         )
-                        self.coordinate_sets[(area, set_number)] = coord_set
+                        try:
+                            self.coordinate_sets[(area, set_number)] = coord_set
+                        except ValueError as e:
+                            self.logger.error(f"Skipping stored set {set_number} in area {area}: {e}")
                         
             except Exception as e:
                 self.logger.error(f"Error loading coordinate sets: {e}")
@@ -235,13 +617,14 @@ class CoordinateManager:
         """Save coordinate sets to file"""
         try:
             data = {}
-            for key, coord_set in self.coordinate_sets.items():
+            for key, (_, _, description, created_at) in self.coordinate_sets.index.items():
                 data[str(key)] = {
-                    'area': coord_set.area,
-                    'set_number': coord_set.set_number,
-                    'coordinates': [asdict(coord) for coord in coord_set.coordinates],
-                    'description': coord_set.description,
-                    'created_at': coord_set.created_at
+                    'area': key[0],
+                    'set_number': key[1],
+                    'coordinates': [dict(zip(COORDINATE_FIELDS, row))
+                                    for row in self.coordinate_sets.iter_rows(key)],
+                    'description': description,
+                    'created_at': created_at
                 }
             
             with open("coordinate_sets.json", 'w') as f:
@@ -250,6 +633,16 @@ class CoordinateManager:
         except Exception as e:
             self.logger.error(f"Error saving coordinate sets: {e}")
     
+    def buffer_slots(self) -> List[int]:
+        """
+        Get the DB102 set numbers reserved as streaming buffer
+        
+        Returns:
+            list: Set numbers from config streaming.buffer_slots, highest first
+        """
+        slots = self.config.get('streaming', {}).get('buffer_slots', [])
+        return sorted({int(slot) for slot in slots if 1 <= int(slot) <= 10}, reverse=True)
+    
     def add_coordinate_set(self, coord_set: CoordinateSet) -> bool:
         """
         Add coordinate set
@@ -265,6 +658,9 @@ class CoordinateManager:
         if not is_valid:
             self.logger.error(f"Invalid coordinate set: {error}")
             return False
+        if coord_set.set_number in self.buffer_slots():
+            self.logger.error(f"Set number {coord_set.set_number} is reserved as streaming buffer slot")
+            return False
         
         with self.lock:
             key = (coord_set.area, coord_set.set_number)
@@ -324,7 +720,48 @@ class CoordinateManager:
             if area is None:
                 return list(self.coordinate_sets.values())
             else:
-                return [coord_set for (a, _), coord_set in self.coordinate_sets.items() if a == area]
+                return [self.coordinate_sets[key] for key in self.coordinate_sets.keys_in_area(area)]
+    
+    def find_coordinate_sets(self, tag: str, area: Optional[int] = None) -> List[CoordinateSet]:
+        """
+        Find coordinate sets by description tag
+        
+        Args:
+            tag: Word of the description (case-insensitive)
+            area: Optional area filter
+            
+        Returns:
+            List of coordinate sets
+        """
+        with self.lock:
+            return [self.coordinate_sets[key] for key in self.coordinate_sets.keys_with_tag(tag)
+                    if area is None or key[0] == area]
+    
+    def add_change_listener(self, listener: ChangeListener):
+        """
+        Register a callback for coordinate set changes
+        
+        The callback gets (event, (area, set_number)) with event 'added',
+        'updated' or 'deleted'. It runs on the changing thread while the
+        manager lock is held, so it must not call back into the manager
+        (GUIs should hand the event to their own thread).
+        
+        Args:
+            listener: Callback
+        """
+        with self.lock:
+            self.coordinate_sets.listeners.append(listener)
+    
+    def remove_change_listener(self, listener: ChangeListener):
+        """
+        Unregister a change callback
+        
+        Args:
+            listener: Callback passed to add_change_listener
+        """
+        with self.lock:
+            if listener in self.coordinate_sets.listeners:
+                self.coordinate_sets.listeners.remove(listener)
     
     def write_coordinate_set_to_plc(self, area: int, set_number: int) -> bool:
         """
@@ -342,21 +779,9 @@ class CoordinateManager:
             self.logger.error(f"Coordinate set {set_number} not found in area {area}")
             return False
         
-        # Write first coordinate to PLC (for simplicity, could be extended for multiple coordinates)
+        # Write first coordinate to PLC (execute_coordinate_set_streaming runs all points)
         if coord_set.coordinates:
-            coord = coord_set.coordinates[0]
-            success = self.plc_client.write_coordinate_set(
-                area=area,
-                set_number=set_number,
-                x=coord.x,
-                y=coord.y,
-                z=coord.z,
-                rx=coord.rx,
-                ry=coord.ry,
-                rz=coord.rz,
-                gripper=coord.gripper,
-                speed=coord.speed
-            )
+            success = self.write_point(area, set_number, coord_set.coordinates[0])
             
             if success:
                 self.logger.info(f"Coordinate set {set_number} written to PLC for area {area}")
@@ -367,32 +792,177 @@ class CoordinateManager:
         
         return False
     
-    def execute_coordinate_set(self, area: int, set_number: int) -> bool:
+    def write_point(self, area: int, set_number: int, coord: Coordinate) -> bool:
+        """
+        Write one coordinate into a DB102 slot
+        
+        The coordinate is written as given; the stored set is not changed.
+        
+        Args:
+            area: Area number
+            set_number: Set number (DB102 slot)
+            coord: Coordinate to write
+            
+        Returns:
+            bool: True if successful
+        """
+        return self.plc_client.write_coordinate_set(
+            area=area,
+            set_number=set_number,
+            x=coord.x,
+            y=coord.y,
+            z=coord.z,
+            rx=coord.rx,
+            ry=coord.ry,
+            rz=coord.rz,
+            gripper=coord.gripper,
+            speed=coord.speed
+        )
+    
+    def execute_coordinate_set(self, area: int, set_number: int, streaming: bool = False) -> bool:
         """
         Execute coordinate set
         
         Args:
             area: Area number
             set_number: Set number
+            streaming: Execute all points of the set
+                (see execute_coordinate_set_streaming)
             
         Returns:
             bool: True if successful
         """
+        if streaming:
+            return self.execute_coordinate_set_streaming(area, set_number)
+        
         # First write to PLC, then execute
         if self.write_coordinate_set_to_plc(area, set_number):
             return self.plc_client.execute_coordinate_set(area, set_number)
         return False
     
-    def execute_sequence(self, sequences: List[Tuple[int, int]]) -> bool:
+    def _stream_slots(self, area: int, set_number: int, window: int) -> List[int]:
+        """
+        Pick the DB102 slots used as streaming ring buffer
+        
+        The set's own slot plus the reserved buffer slots (config
+        streaming.buffer_slots), reserved ones not holding a stored set. Other
+        slots are never borrowed: the PLC may hold sets in them that this
+        manager does not know about.
+        """
+        with self.lock:
+            free = [s for s in self.buffer_slots() if s != set_number and (area, s) not in self.coordinate_sets]
+        return [set_number] + free[:max(0, window - 1)]
+    
+    def execute_coordinate_set_streaming(self, area: int, set_number: int, window: int = 3) -> bool:
+        """
+        Execute all points of a coordinate set as a stream
+        
+        Points are queued through a ring of DB102 / coordinate_buffer slots:
+        the first `window` points are written up front, then every EXECUTE is
+        sent as soon as the previous point is reached and the slot of the
+        finished point is refilled with the next queued point while the
+        robot moves, so no DB102 write sits between two motions. The robot
+        still stops at every point: the PLC takes the next EXECUTE only once
+        the robot is idle, so motions are not blended.
+        
+        The ring is the set's own slot plus the reserved buffer slots (config
+        streaming.buffer_slots); a set of more than one point is refused
+        without at least one reserved slot. The own slot gets the set's
+        first point back when the stream ends, also on failure. Needs the
+        PLC capability 'overlapped_execute'. Timing is stored in
+        self.stream_stats.
+        
+        Args:
+            area: Area number
+            set_number: Set number
+            window: Number of points pre-loaded into DB102 (at least 2)
+            
+        Returns:
+            bool: True if successful
+        """
+        coord_set = self.get_coordinate_set(area, set_number)
+        if not coord_set or not coord_set.coordinates:
+            self.logger.error(f"Coordinate set {set_number} not found in area {area}")
+            return False
+        
+        if not self.plc_client.supports('overlapped_execute'):
+            self.logger.error("Streaming needs a PLC program with overlapped EXECUTE")
+            return False
+        
+        points = coord_set.coordinates
+        slots = self._stream_slots(area, set_number, min(window, len(points)))
+        size = len(slots)
+        if size < min(2, len(points)):
+            self.logger.error(f"Streaming set {set_number} in area {area} needs a reserved DB102 buffer slot "
+                              f"(config streaming.buffer_slots)")
+            return False
+        started = time.perf_counter()
+        stats = {'points': 0, 'writes': 0, 'slots': slots, 'motion_time': 0.0, 'idle_time': 0.0, 'elapsed': 0.0}
+        self.stream_stats = stats
+        
+        def load(index: int) -> bool:
+            stats['writes'] += 1
+            if self.write_point(area, slots[index % size], points[index]):
+                return True
+            self.logger.error(f"Failed to load point {index + 1} of set {set_number} in area {area}")
+            return False
+        
+        success = all(load(index) for index in range(size))
+        idle_from = time.perf_counter()
+        for index, coord in enumerate(points if success else []):
+            slot = slots[index % size]
+            ok, message = self.plc_client.start_execute(area, slot, speed=coord.speed, gripper=coord.gripper)
+            if not ok:
+                self.logger.error(f"Failed to execute point {index + 1} of set {set_number} in area {area}: {message}")
+                success = False
+                break
+            motion_started = time.perf_counter()
+            stats['idle_time'] += motion_started - idle_from
+            
+            # Refill the slot of the point just finished
+            refill = index + size - 1
+            loaded = index == 0 or refill >= len(points) or load(refill)
+            
+            ok, message = self.plc_client.wait_for_motion(area, slot)
+            idle_from = time.perf_counter()
+            stats['motion_time'] += idle_from - motion_started
+            if not ok:
+                self.logger.error(f"Point {index + 1} of set {set_number} in area {area} failed: {message}")
+                success = False
+                break
+            stats['points'] += 1
+            if not loaded:
+                success = False
+                break
+        
+        # Leave the own slot as write_coordinate_set_to_plc would (first refill goes to it)
+        if stats['writes'] > size:
+            stats['writes'] += 1
+            if not self.write_point(area, set_number, points[0]):
+                self.logger.error(f"Failed to restore slot of set {set_number} in area {area} after streaming")
+                success = False
+        
+        stats['elapsed'] = time.perf_counter() - started
+        self.logger.info(f"Streamed set {set_number} in area {area}: {stats['points']}/{len(points)} points "
+                         f"in {stats['elapsed']:.3f} s (motion {stats['motion_time']:.3f} s, "
+                         f"idle {stats['idle_time']:.3f} s, {size} slot(s))")
+        return success
+    
+    def execute_sequence(self, sequences: List[Tuple[int, int]], pipelined: bool = False) -> bool:
         """
         Execute sequence of coordinate sets
         
         Args:
             sequences: List of (area, set_number) tuples
+            pipelined: Stage the next set while the robot moves
+                (see execute_sequence_pipelined; needs an extended PLC program)
             
         Returns:
             bool: True if all successful
         """
+        if pipelined:
+            return self.execute_sequence_pipelined(sequences)
+        
         for area, set_number in sequences:
             success = self.execute_coordinate_set(area, set_number)
             if not success:
@@ -404,6 +974,84 @@ class CoordinateManager:
         
         return True
     
+    def execute_sequence_pipelined(self, sequences: List[Tuple[int, int]],
+                                   motion_timeout: Optional[float] = None) -> bool:
+        """
+        Execute sequence of coordinate sets with the next set staged during motion
+        
+        The first set is written, then for each set: EXECUTE is sent, the next
+        set is written to its DB102 / coordinate_buffer slot while the robot
+        moves, and the next EXECUTE is sent as soon as DB101 reports the
+        position reached. A slot already written with the same coordinate
+        earlier in the run is not written again. Timing, including the
+        DB101 execution_time of every set, is stored in self.sequence_stats.
+        
+        Staging during motion reuses the DB100 mailbox while the robot moves,
+        which FC300 as shipped does not allow: without the PLC capability
+        'overlapped_execute' the sequence runs serially (execute_sequence).
+        
+        Args:
+            sequences: List of (area, set_number) tuples
+            motion_timeout: Maximum time per motion in seconds
+                (default: PLCClient.motion_timeout(), learned per move)
+            
+        Returns:
+            bool: True if all successful
+        """
+        if not self.plc_client.supports('overlapped_execute'):
+            self.logger.warning("PLC program does not support overlapped EXECUTE, running the sequence serially")
+            return self.execute_sequence(sequences)
+        
+        started = time.perf_counter()
+        stats = {'sets': 0, 'staged': 0, 'skipped': 0, 'motion_time': 0.0, 'idle_time': 0.0, 'elapsed': 0.0,
+                 'execution_times': []}  # DB101 execution_time per set in ms
+        self.sequence_stats = stats
+        staged: Dict[Tuple[int, int], Coordinate] = {}
+        
+        def stage(area: int, set_number: int) -> bool:
+            coord_set = self.get_coordinate_set(area, set_number)
+            if coord_set and coord_set.coordinates and staged.get((area, set_number)) == coord_set.coordinates[0]:
+                stats['skipped'] += 1
+                return True
+            if not self.write_coordinate_set_to_plc(area, set_number):
+                return False
+            staged[(area, set_number)] = coord_set.coordinates[0]
+            stats['staged'] += 1
+            return True
+        
+        success = bool(sequences) and stage(*sequences[0])
+        idle_from = time.perf_counter()
+        for index, (area, set_number) in enumerate(sequences if success else []):
+            ok, message = self.plc_client.start_execute(area, set_number)
+            if not ok:
+                self.logger.error(f"Failed to execute coordinate set {set_number} in area {area}: {message}")
+                success = False
+                break
+            motion_started = time.perf_counter()
+            stats['idle_time'] += motion_started - idle_from
+            
+            # Stage next set while the robot is moving
+            staged_next = index + 1 >= len(sequences) or stage(*sequences[index + 1])
+            
+            ok, message = self.plc_client.wait_for_motion(area, set_number, motion_timeout)
+            idle_from = time.perf_counter()
+            stats['motion_time'] += idle_from - motion_started
+            if not ok:
+                self.logger.error(f"Coordinate set {set_number} in area {area} failed: {message}")
+                success = False
+                break
+            stats['sets'] += 1
+            stats['execution_times'].append(self.plc_client.last_motion['execution_time'])
+            if not staged_next:
+                success = False
+                break
+        
+        stats['elapsed'] = time.perf_counter() - started
+        self.logger.info(f"Pipelined sequence: {stats['sets']}/{len(sequences)} sets in {stats['elapsed']:.3f} s "
+                         f"(motion {stats['motion_time']:.3f} s, idle {stats['idle_time']:.3f} s, "
+                         f"{stats['staged']} written, {stats['skipped']} already staged)")
+        return success
+    
     def create_coordinate_from_current_position(self, area: int, set_number: int, 
                                               description: str = "") -> bool:
         """
@@ -417,7 +1065,7 @@ class CoordinateManager:
         Returns:
             bool: True if successful
         """
-        current_pos = self.plc_client.get_current_position()
+        current_pos = self.plc_client.positions.get_position()
         if not current_pos:
             self.logger.error("Failed to get current position")
             return False
@@ -450,39 +1098,152 @@ class CoordinateManager:
             file_path: Path to CSV file
             
         Returns:
-            bool: True if successful
+            bool: True if at least one row was imported
+        """
+        return self.import_coordinates_streaming(file_path).success
+    
+    @staticmethod
+    def _parse_csv_row(row: Dict[str, str]) -> Tuple[int, int, Coordinate]:
+        """
+        Parse one CSV row
+        
+        Args:
+            row: Row from csv.DictReader
+            
+        Returns:
+            tuple: (area, set_number, coordinate)
+        """
+        coord = Coordinate(
+            x=int(row['x']),
+            y=int(row['y']),
+            z=int(row['z']),
+            rx=int(row.get('rx') or 0),
+            ry=int(row.get('ry') or 0),
+            rz=int(row.get('rz') or 0),
+            gripper=int(row.get('gripper') or 0),
+            speed=int(row.get('speed') or 50)
+        )
+        return int(row['area']), int(row['set_number']), coord
+    
+    def import_coordinates_streaming(self, file_path: str, chunk_size: int = 1000) -> ImportResult:
+        """
+        Import coordinates from CSV file chunk by chunk
+        
+        Rows are parsed in chunks and grouped by (area, set_number) into
+        multi-point sets in file order. Invalid rows are reported and skipped,
+        and each chunk's sets are validated and committed under the lock
+        before the next chunk is read, so only one chunk is held in memory.
+        The first rows of a set in the file replace the stored set, rows in
+        later chunks extend it (the extension is validated together with the
+        rows already committed). Once a set is rejected, its later rows are
+        rejected too. The store is saved once at the end.
+        
+        Args:
+            file_path: Path to CSV file
+            chunk_size: Rows parsed per chunk
+            
+        Returns:
+            ImportResult: Row/set counts and per-row errors
         """
+        result = ImportResult()
+        committed: Dict[Tuple[int, int], bool] = {}  # Set -> accepted so far
+        reserved = self.buffer_slots()
+        
         try:
-            import csv
-            with open(file_path, 'r') as f:
+            with open(file_path, 'r', newline='') as f:
                 reader = csv.DictReader(f)
-                for row in reader:
-                    coord = Coordinate(
-                        x=int(row['x']),
-                        y=int(row['y']),
-                        z=int(row['z']),
-                        rx=int(row.get('rx', 0)),
-                        ry=int(row.get('ry', 0)),
-                        rz=int(row.get('rz', 0)),
-                        gripper=int(row.get('gripper', 0)),
-                        speed=int(row.get('speed', 50))
-                    )
+                while True:
+                    chunk = list(islice(reader, chunk_size))
+                    if not chunk:
+                        break
+                    # DictReader.line_num is the last physical line of the chunk,
+                    # rows are numbered from the header on instead
+                    first_line = result.rows_read + 2
+                    result.rows_read += len(chunk)
+                    groups: Dict[Tuple[int, int], Dict[str, Any]] = {}
                     
-                    coord_set = CoordinateSet(
-                        area=int(row['area']),
-                        set_number=int(row['set_number']),
-                        coordinates=[coord],
-                        description=row.get('description', '')
-                    )
+                    for offset, row in enumerate(chunk):
+                        line = first_line + offset
+                        try:
+                            area, set_number, coord = self._parse_csv_row(row)
+                        except (KeyError, TypeError, ValueError) as e:
+                            result.errors.append((line, f"Invalid row: {e}"))
+                            continue
+                        
+                        is_valid, error = coord.validate()
+                        if not is_valid:
+                            result.errors.append((line, error))
+                            continue
+                        
+                        group = groups.setdefault((area, set_number), {
+                            'coordinates': [], 'lines': [], 'description': ''
+                        })
+                        group['coordinates'].append(coord)
+                        group['lines'].append(line)
+                        if not group['description']:
+                            group['description'] = row.get('description') or ''
                     
-                    self.add_coordinate_set(coord_set)
-            
-            self.logger.info(f"Imported coordinates from {file_path}")
-            return True
-            
+                    self._commit_import_chunk(groups, committed, reserved, result)
         except Exception as e:
             self.logger.error(f"Error importing coordinates: {e}")
-            return False
+            result.fatal_error = str(e)
+        
+        result.sets_imported = sum(committed.values())
+        if result.sets_imported:
+            with self.lock:
+                self.save_coordinate_sets()
+        if result.fatal_error:
+            return result
+        result.errors.sort()
+        
+        for line, error in result.errors[:20]:
+            self.logger.warning(f"Import {file_path} row {line}: {error}")
+        self.logger.info(f"Imported coordinates from {file_path}: {result.get_summary()}")
+        return result
+    
+    def _commit_import_chunk(self, groups: Dict[Tuple[int, int], Dict[str, Any]],
+                             committed: Dict[Tuple[int, int], bool],
+                             reserved: List[int], result: ImportResult):
+        """
+        Validate and store the sets grouped from one import chunk
+        
+        Args:
+            groups: (area, set_number) -> coordinates, CSV lines and description
+            committed: Sets seen in earlier chunks -> accepted, updated in place
+            reserved: Set numbers reserved as streaming buffer slots
+            result: Import result to update
+        """
+        with self.lock:
+            for key, group in groups.items():
+                area, set_number = key
+                coordinates = group['coordinates']
+                description = group['description']
+                if committed.get(key):
+                    stored = self.coordinate_sets[key]
+                    coordinates = list(stored.coordinates) + coordinates
+                    description = stored.description
+                
+                coord_set = CoordinateSet(
+                    area=area,
+                    set_number=set_number,
+                    coordinates=coordinates,
+                    description=description
+                )
+                if committed.get(key) is False:
+                    is_valid, error = False, "rejected earlier in the file"
+                else:
+                    is_valid, error = coord_set.validate()
+                    if is_valid and set_number in reserved:
+                        is_valid, error = False, "Set number reserved as streaming buffer slot"
+                if not is_valid:
+                    for line in group['lines']:
+                        result.errors.append((line, f"Set {set_number} in area {area}: {error}"))
+                    committed.setdefault(key, False)
+                    continue
+                
+                self.coordinate_sets[key] = coord_set
+                committed[key] = True
+                result.rows_imported += len(group['lines'])
     
     def export_coordinates_to_file(self, file_path: str, area: Optional[int] = None) -> bool:
         """
@@ -496,30 +1257,20 @@ class CoordinateManager:
             bool: True if successful
         """
         try:
-            import csv
             with open(file_path, 'w', newline='') as f:
                 fieldnames = ['area', 'set_number', 'x', 'y', 'z', 'rx', 'ry', 'rz', 
                              'gripper', 'speed', 'description', 'created_at']
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
+                writer = csv.writer(f)
+                writer.writerow(fieldnames)
                 
-                coord_sets = self.list_coordinate_sets(area)
-                for coord_set in coord_sets:
-                    for coord in coord_set.coordinates:
-                        writer.writerow({
-                            'area': coord_set.area,
-                            'set_number': coord_set.set_number,
-                            'x': coord.x,
-                            'y': coord.y,
-                            'z': coord.z,
-                            'rx': coord.rx,
-                            'ry': coord.ry,
-                            'rz': coord.rz,
-                            'gripper': coord.gripper,
-                            'speed': coord.speed,
-                            'description': coord_set.description,
-                            'created_at': coord_set.created_at
-                        })
+                with self.lock:
+                    keys = list(self.coordinate_sets) if area is None else self.coordinate_sets.keys_in_area(area)
+                    sets = [(key, self.coordinate_sets.index[key][2:], self.coordinate_sets.rows(key))
+                            for key in keys]
+                for (set_area, set_number), (description, created_at), rows in sets:
+                    values = iter(rows)
+                    writer.writerows([set_area, set_number, *row, description, created_at]
+                                     for row in zip(*[values] * ROW_SIZE))
             
             self.logger.info(f"Exported coordinates to {file_path}")
             return True
@@ -538,14 +1289,17 @@ class CoordinateManager:
         Returns:
             dict: Statistics
         """
-        coord_sets = self.list_coordinate_sets(area)
-        total_coordinates = sum(len(cs.coordinates) for cs in coord_sets)
+        with self.lock:
+            keys = self.coordinate_sets.keys_in_area(area)
+            summary = self.coordinate_sets.area_summary(area)
+        bounds = summary['bounds']
         
         return {
             'area': area,
-            'total_sets': len(coord_sets),
-            'total_coordinates': total_coordinates,
-            'sets': [cs.set_number for cs in coord_sets],
+            'total_sets': summary['sets'],
+            'total_coordinates': summary['points'],
+            'sets': [set_number for _, set_number in keys],
+            'bounding_box': dict(zip(('x_min', 'x_max', 'y_min', 'y_max', 'z_min', 'z_max'), bounds)) if bounds else None,
             'area_name': self.config['areas'][str(area)]['name']
         }
 
@@ -11,9 +11,11 @@ Date: 17/07/2025
 Features:
 - Coordinate validation
 - Range checking
+- Area separation (no position inside another area's workspace)
 - System constraint validation
 - Error reporting
 - Configuration-based validation
+- Bulk validation of coordinate tables (NumPy when installed)
 """
 
 import json
@@ -23,6 +25,11 @@ from typing import Dict, Any, List, Optional, Tuple, Union
 from dataclasses import dataclass
 from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:  # Bulk validation falls back to plain Python
+    np = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -272,6 +279,40 @@ class DataValidator:
         
         return result
     
+    def validate_area_separation(self, x: int, y: int, z: int, area: int) -> ValidationResult:
+        """
+        Validate that a coordinate of an area stays out of the other areas
+        
+        A position inside a safe zone of another area and in none of the
+        area's own safe zones moves the robot into that area's workspace.
+        
+        Args:
+            x, y, z: Coordinates in mm
+            area: Area number the coordinate belongs to
+            
+        Returns:
+            ValidationResult: Validation result
+        """
+        result = ValidationResult(is_valid=True, errors=[], warnings=[])
+        
+        def inside(zone: Dict[str, List[int]]) -> bool:
+            return (zone["x"][0] <= x <= zone["x"][1] and
+                    zone["y"][0] <= y <= zone["y"][1] and
+                    zone["z"][0] <= z <= zone["z"][1])
+        
+        own_zones = self.config["area_limits"].get(str(area), {}).get("safe_zones", [])
+        if any(inside(zone) for zone in own_zones):
+            return result
+        
+        for other, area_config in self.config["area_limits"].items():
+            if other == str(area):
+                continue
+            if any(inside(zone) for zone in area_config.get("safe_zones", [])):
+                result.add_error("position", [x, y, z], "AREA_INTRUSION",
+                               f"Position [{x}, {y}, {z}] of area {area} is inside the workspace of area {other}")
+        
+        return result
+    
     def validate_safety_constraints(self, x: int, y: int, z: int) -> ValidationResult:
         """
         Validate safety constraints
@@ -440,6 +481,116 @@ class DataValidator:
         
         return result
     
+    def validate_coordinate_array(self, points, area: Optional[int] = None) -> ValidationResult:
+        """
+        Validate a table of coordinates in one pass
+        
+        Applies the rules of validate_coordinate(), validate_speed() and
+        validate_gripper() column-wise. Each violated rule is reported once
+        with the number of failing rows; the error value lists the first
+        failing row indices.
+        
+        Args:
+            points: (N, 8) rows of x, y, z, rx, ry, rz, gripper, speed
+                (NumPy array or sequence of sequences)
+            area: Optional area number for area-specific validation
+            
+        Returns:
+            ValidationResult: Validation result
+        """
+        result = ValidationResult(is_valid=True, errors=[], warnings=[])
+        if np is not None:
+            table = np.asarray(points).reshape(-1, 8)
+            columns = {name: table[:, i] for i, name in enumerate(('x', 'y', 'z', 'rx', 'ry', 'rz', 'gripper', 'speed'))}
+            def rows(mask):
+                return np.flatnonzero(mask).tolist()
+            def inside(name, low, high):
+                return (columns[name] >= low) & (columns[name] <= high)
+            def in_list(name, values):
+                return np.isin(columns[name], values)
+            def negate(mask):
+                return ~mask
+            def both(a, b):
+                return a & b
+            def either(a, b):
+                return a | b
+        else:
+            table = [tuple(point) for point in points]
+            columns = {name: [point[i] for point in table]
+                       for i, name in enumerate(('x', 'y', 'z', 'rx', 'ry', 'rz', 'gripper', 'speed'))}
+            def rows(mask):
+                return [i for i, flag in enumerate(mask) if flag]
+            def inside(name, low, high):
+                return [low <= value <= high for value in columns[name]]
+            def in_list(name, values):
+                return [value in values for value in columns[name]]
+            def negate(mask):
+                return [not flag for flag in mask]
+            def both(a, b):
+                return [x and y for x, y in zip(a, b)]
+            def either(a, b):
+                return [x or y for x, y in zip(a, b)]
+        
+        def report(failing: List[int], field: str, error_type: str, message: str, warning: bool = False):
+            if not failing:
+                return
+            text = f"{len(failing)} point(s): {message}, first at point {failing[0]}"
+            if warning:
+                result.add_warning(field, failing[:10], error_type, text)
+            else:
+                result.add_error(field, failing[:10], error_type, text)
+        
+        def check_range(name: str, low: int, high: int, error_type: str, label: str):
+            report(rows(negate(inside(name, low, high))), name, error_type,
+                   f"{label} out of range ({low} to {high})")
+        
+        coord_limits = self.config["coordinate_limits"]
+        for name in ('x', 'y', 'z'):
+            check_range(name, coord_limits[f"{name}_min"], coord_limits[f"{name}_max"],
+                        "RANGE_ERROR", f"{name.upper()} coordinate")
+        rot_limits = self.config["rotation_limits"]
+        for name in ('rx', 'ry', 'rz'):
+            check_range(name, rot_limits[f"{name}_min"], rot_limits[f"{name}_max"],
+                        "RANGE_ERROR", f"{name.upper()} rotation")
+        
+        if area is not None:
+            if str(area) not in self.config["area_limits"]:
+                result.add_error("area", area, "INVALID_AREA", f"Area {area} not configured")
+            else:
+                area_config = self.config["area_limits"][str(area)]
+                for name in ('x', 'y', 'z'):
+                    check_range(name, area_config[f"{name}_min"], area_config[f"{name}_max"],
+                                "AREA_RANGE_ERROR", f"{name.upper()} coordinate (area {area})")
+                if "safe_zones" in area_config:
+                    in_safe_zone = None
+                    for safe_zone in area_config["safe_zones"]:
+                        mask = both(both(inside('x', *safe_zone["x"]), inside('y', *safe_zone["y"])),
+                                    inside('z', *safe_zone["z"]))
+                        in_safe_zone = mask if in_safe_zone is None else either(in_safe_zone, mask)
+                    if in_safe_zone is not None:
+                        report(rows(negate(in_safe_zone)), "position", "OUTSIDE_SAFE_ZONE",
+                               f"outside safe zones for area {area}", warning=True)
+        
+        safety_config = self.config["safety_limits"]
+        report(rows(negate(inside('z', safety_config["min_z_clearance"], math.inf))), "z", "SAFETY_VIOLATION",
+               f"Z coordinate below minimum clearance {safety_config['min_z_clearance']}")
+        for collision_zone in safety_config["collision_zones"]:
+            mask = both(both(inside('x', *collision_zone["x"]), inside('y', *collision_zone["y"])),
+                        inside('z', *collision_zone["z"]))
+            report(rows(mask), "position", "COLLISION_ZONE", f"in collision zone: {collision_zone['description']}")
+        
+        speed_limits = self.config["speed_limits"]
+        check_range('speed', speed_limits["min"], speed_limits["max"], "RANGE_ERROR", "Speed")
+        report(rows(negate(inside('speed', speed_limits["recommended_min"], math.inf))), "speed", "LOW_SPEED",
+               f"Speed below recommended minimum {speed_limits['recommended_min']}", warning=True)
+        report(rows(negate(inside('speed', -math.inf, speed_limits["recommended_max"]))), "speed", "HIGH_SPEED",
+               f"Speed above recommended maximum {speed_limits['recommended_max']}", warning=True)
+        
+        report(rows(negate(in_list('gripper', self.config["gripper_commands"]))), "gripper", "INVALID_COMMAND",
+               f"Gripper command not in valid commands {self.config['gripper_commands']}")
+        
+        return result
+    
     def validate_motion_path(self, start_coord: Dict[str, Any], end_coord: Dict[str, Any]) -> ValidationResult:
         """
         Validate motion path between two coordinates
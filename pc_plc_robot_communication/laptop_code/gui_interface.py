@@ -26,8 +26,10 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 
 from plc_client import PLCClient
+from command_scheduler import CommandScheduler, PRIORITY_CONTROL
 from coordinate_manager import CoordinateManager, Coordinate, CoordinateSet
 from data_validator import DataValidator
+from pallet_pattern import PalletSpec, SCHEMES, generate_pattern
 
 class PLCRobotGUI:
     """
@@ -48,6 +50,7 @@ class PLCRobotGUI:
         # Initialize components
         self.plc_client = None
         self.coord_manager = None
+        self.scheduler = None  # Single DB100 writer; all commands go through it
         self.validator = DataValidator()
         self.connected = False
         self.monitoring = False
@@ -205,6 +208,7 @@ class PLCRobotGUI:
         ttk.Button(button_frame, text="Save Set", command=self.save_coordinate_set).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Load Set", command=self.load_coordinate_set).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Get Current", command=self.get_current_position).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Generate Pattern", command=self.generate_pattern_dialog).pack(side=tk.LEFT, padx=5)
         
         # Coordinate sets list
         list_frame = ttk.LabelFrame(frame, text="Coordinate Sets")
@@ -384,6 +388,10 @@ class PLCRobotGUI:
             self.plc_client = PLCClient(self.plc_ip.get(), self.plc_rack.get(), self.plc_slot.get())
             if self.plc_client.connect():
                 self.coord_manager = CoordinateManager(self.plc_client)
+                self.coord_manager.add_change_listener(self.on_coordinates_changed)
+                self.scheduler = CommandScheduler(self.plc_client)
+                self.scheduler.start()
+                self.plc_client.positions.start()
                 self.connected = True
                 self.status_text.set("Connected")
                 self.connect_button.config(state=tk.DISABLED)
@@ -399,6 +407,9 @@ class PLCRobotGUI:
     def disconnect_plc(self):
         """Disconnect from PLC"""
         if self.plc_client:
+            if self.scheduler:
+                self.scheduler.stop()
+                self.scheduler = None
             self.plc_client.disconnect()
             self.connected = False
             self.status_text.set("Disconnected")
@@ -459,7 +470,6 @@ class PLCRobotGUI:
             
             if self.coord_manager.add_coordinate_set(coord_set):
                 messagebox.showinfo("Success", "Coordinate set saved successfully")
-                self.refresh_coordinate_list()
                 self.log_message(f"Saved coordinate set {self.current_set.get()} for area {self.current_area.get()}")
             else:
                 messagebox.showerror("Error", "Failed to save coordinate set")
@@ -493,6 +503,99 @@ class PLCRobotGUI:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load coordinate set: {str(e)}")
     
+    def generate_pattern_dialog(self):
+        """Generate pallet pattern sets for the current area"""
+        if not self.coord_manager:
+            messagebox.showerror("Error", "Not connected to PLC")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Generate Pallet Pattern")
+        dialog.transient(self.root)
+        
+        fields = [
+            ('pallet_length', "Pallet length (mm):", 1200),
+            ('pallet_width', "Pallet width (mm):", 800),
+            ('box_length', "Box length (mm):", 300),
+            ('box_width', "Box width (mm):", 200),
+            ('box_height', "Box height (mm):", 150),
+            ('layers', "Layers:", 4),
+            ('gap', "Gap (mm):", 0),
+            ('origin_x', "Pallet corner X:", self.x_var.get()),
+            ('origin_y', "Pallet corner Y:", self.y_var.get()),
+            ('origin_z', "Pallet deck Z:", self.z_var.get()),
+            ('base_rz', "RZ (deg*100):", self.rz_var.get()),
+            ('speed', "Speed:", self.speed_var.get()),
+        ]
+        variables = {}
+        for row, (name, label, default) in enumerate(fields):
+            ttk.Label(dialog, text=label).grid(row=row, column=0, sticky=tk.W, padx=5, pady=2)
+            variables[name] = tk.IntVar(value=default)
+            ttk.Entry(dialog, textvariable=variables[name], width=10).grid(row=row, column=1, padx=5, pady=2)
+        
+        scheme_var = tk.StringVar(value="interlock")
+        ttk.Label(dialog, text="Scheme:").grid(row=len(fields), column=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Combobox(dialog, textvariable=scheme_var, values=list(SCHEMES), width=10,
+                     state="readonly").grid(row=len(fields), column=1, padx=5, pady=2)
+        
+        def generate():
+            try:
+                values = {name: var.get() for name, var in variables.items()}
+                spec = PalletSpec(
+                    values['pallet_length'], values['pallet_width'],
+                    values['box_length'], values['box_width'], values['box_height'],
+                    layers=values['layers'], scheme=scheme_var.get(), gap=values['gap'],
+                    origin=(values['origin_x'], values['origin_y'], values['origin_z']),
+                    base_rz=values['base_rz'], speed=values['speed']
+                )
+            except tk.TclError as e:
+                messagebox.showerror("Error", f"Invalid input: {str(e)}", parent=dialog)
+                return
+            is_valid, error = spec.validate()
+            if not is_valid:
+                messagebox.showerror("Error", error, parent=dialog)
+                return
+            
+            area = self.current_area.get()
+            pattern = generate_pattern(spec)
+            result = pattern.validate(self.validator, area)
+            if not result.is_valid:
+                messagebox.showerror("Validation Error", self.validator.get_validation_report(result), parent=dialog)
+                return
+            
+            batches = pattern.to_coordinate_sets(area)
+            message = (f"{pattern.get_summary()}\n\n{len(batches)} DB102 load(s). "
+                       f"Replace sets 1-{len(batches[0])} of area {area} with the first load?")
+            if not messagebox.askyesno("Generate Pattern", message, parent=dialog):
+                return
+            for coord_set in batches[0]:
+                self.coord_manager.add_coordinate_set(coord_set)
+            self.log_message(f"Generated {pattern.get_summary()} for area {area}")
+            dialog.destroy()
+        
+        button_frame = ttk.Frame(dialog)
+        button_frame.grid(row=len(fields) + 1, column=0, columnspan=2, pady=10)
+        ttk.Button(button_frame, text="Generate", command=generate).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+    
+    def run_command(self, future, on_done):
+        """
+        Call on_done(result) on the Tk thread when a scheduled command finishes
+        
+        Args:
+            future: Future from the command scheduler
+            on_done: Callback receiving the command result (None if cancelled)
+        """
+        def done(f):
+            if f.cancelled():
+                self.log_message("Command cancelled by safety command")
+                on_done(None)
+            elif f.exception() is not None:
+                messagebox.showerror("Error", f"Command failed: {f.exception()}")
+            else:
+                on_done(f.result())
+        future.add_done_callback(lambda f: self.root.after(0, done, f))
+    
     def write_to_plc(self):
         """Write current coordinate to PLC"""
         if not self.connected:
@@ -500,9 +603,11 @@ class PLCRobotGUI:
             return
         
         try:
-            success = self.plc_client.write_coordinate_set(
+            set_number = self.current_set.get()
+            future = self.scheduler.submit(
+                self.plc_client.write_coordinate_set,
                 area=self.current_area.get(),
-                set_number=self.current_set.get(),
+                set_number=set_number,
                 x=self.x_var.get(),
                 y=self.y_var.get(),
                 z=self.z_var.get(),
@@ -513,11 +618,13 @@ class PLCRobotGUI:
                 speed=self.speed_var.get()
             )
             
-            if success:
-                messagebox.showinfo("Success", "Coordinate written to PLC")
-                self.log_message(f"Written coordinate set {self.current_set.get()} to PLC")
-            else:
-                messagebox.showerror("Error", "Failed to write coordinate to PLC")
+            def done(success):
+                if success:
+                    messagebox.showinfo("Success", "Coordinate written to PLC")
+                    self.log_message(f"Written coordinate set {set_number} to PLC")
+                elif success is not None:
+                    messagebox.showerror("Error", "Failed to write coordinate to PLC")
+            self.run_command(future, done)
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to write to PLC: {str(e)}")
@@ -529,16 +636,21 @@ class PLCRobotGUI:
             return
         
         try:
-            success = self.plc_client.execute_coordinate_set(
+            set_number = self.current_set.get()
+            future = self.scheduler.submit(
+                self.plc_client.execute_coordinate_set,
                 area=self.current_area.get(),
-                set_number=self.current_set.get()
+                set_number=set_number
             )
+            self.log_message(f"Executing coordinate set {set_number}")
             
-            if success:
-                messagebox.showinfo("Success", "Coordinate set executed")
-                self.log_message(f"Executed coordinate set {self.current_set.get()}")
-            else:
-                messagebox.showerror("Error", "Failed to execute coordinate set")
+            def done(success):
+                if success:
+                    messagebox.showinfo("Success", "Coordinate set executed")
+                    self.log_message(f"Executed coordinate set {set_number}")
+                elif success is not None:
+                    messagebox.showerror("Error", "Failed to execute coordinate set")
+            self.run_command(future, done)
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to execute coordinate set: {str(e)}")
@@ -550,7 +662,14 @@ class PLCRobotGUI:
             return
         
         try:
-            position = self.plc_client.get_current_position()
+            # Served from the DB101 snapshot, no GET_POSITION handshake
+            self.show_current_position(self.plc_client.positions.get_position())
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to get current position: {str(e)}")
+    
+    def show_current_position(self, position: Optional[Dict[str, Any]]):
+        """Display position returned by get_current_position"""
+        try:
             if position:
                 # Update display
                 self.current_pos_text.config(state=tk.NORMAL)
@@ -578,12 +697,18 @@ class PLCRobotGUI:
             return
         
         try:
-            success = self.plc_client.emergency_stop()
-            if success:
-                messagebox.showwarning("Emergency Stop", "Emergency stop command sent")
-                self.log_message("EMERGENCY STOP command sent")
-            else:
-                messagebox.showerror("Error", "Failed to send emergency stop")
+            def done(result):
+                if result is None:  # Cancelled: scheduler stopped before the write
+                    messagebox.showerror("Error", "Emergency stop was cancelled before it was sent")
+                    return
+                success, message = result
+                if success:
+                    latency = self.scheduler.get_statistics()['safety_latency_ms_last']
+                    messagebox.showwarning("Emergency Stop", "Emergency stop command sent")
+                    self.log_message(f"EMERGENCY STOP command sent ({latency:.0f} ms)")
+                else:
+                    messagebox.showerror("Error", f"Failed to send emergency stop: {message}")
+            self.run_command(self.scheduler.emergency_stop(), done)
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to send emergency stop: {str(e)}")
@@ -595,12 +720,14 @@ class PLCRobotGUI:
             return
         
         try:
-            success = self.plc_client.reset_error()
-            if success:
-                messagebox.showinfo("Success", "Error reset successful")
-                self.log_message("Error reset successful")
-            else:
-                messagebox.showerror("Error", "Failed to reset error")
+            def done(success):
+                if success:
+                    messagebox.showinfo("Success", "Error reset successful")
+                    self.log_message("Error reset successful")
+                elif success is not None:
+                    messagebox.showerror("Error", "Failed to reset error")
+            self.run_command(self.scheduler.submit(self.plc_client.reset_error,
+                                                   priority=PRIORITY_CONTROL), done)
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to reset error: {str(e)}")
@@ -612,12 +739,17 @@ class PLCRobotGUI:
             return
         
         try:
-            success = self.plc_client.send_command('STOP_MOTION')
-            if success:
-                messagebox.showinfo("Success", "Motion stopped")
-                self.log_message("Motion stop command sent")
-            else:
-                messagebox.showerror("Error", "Failed to stop motion")
+            def done(result):
+                if result is None:  # Cancelled: scheduler stopped before the write
+                    messagebox.showerror("Error", "Stop motion was cancelled before it was sent")
+                    return
+                success, message = result
+                if success:
+                    messagebox.showinfo("Success", "Motion stopped")
+                    self.log_message("Motion stop command sent")
+                else:
+                    messagebox.showerror("Error", f"Failed to stop motion: {message}")
+            self.run_command(self.scheduler.stop_motion(), done)
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to stop motion: {str(e)}")
@@ -645,7 +777,9 @@ class PLCRobotGUI:
             try:
                 # Read data blocks
                 db100 = self.plc_client.read_db100()
-                db101 = self.plc_client.read_db101()
+                db101 = self.plc_client.positions.get_feedback(max_age=0.5)
+                if db101 is None:
+                    raise Exception("DB101 read failed")
                 
                 # Update displays
                 self.root.after(0, self.update_db_displays, db100, db101)
@@ -693,20 +827,46 @@ class PLCRobotGUI:
         # Add coordinate sets
         coord_sets = self.coord_manager.list_coordinate_sets()
         for coord_set in coord_sets:
-            if coord_set.coordinates:
-                coord = coord_set.coordinates[0]
-                self.coord_tree.insert('', 'end', values=(
-                    coord_set.area,
-                    coord_set.set_number,
-                    coord.x,
-                    coord.y,
-                    coord.z,
-                    coord_set.description
-                ))
+            self.update_coordinate_row(coord_set.area, coord_set.set_number, coord_set)
+    
+    @staticmethod
+    def coordinate_row_id(area: int, set_number: int) -> str:
+        """Treeview item id of a coordinate set"""
+        return f"{area}:{set_number}"
+    
+    def update_coordinate_row(self, area: int, set_number: int, coord_set: Optional[CoordinateSet]):
+        """Insert, update or remove the list row of one coordinate set"""
+        row_id = self.coordinate_row_id(area, set_number)
+        if not coord_set or not coord_set.coordinates:
+            if self.coord_tree.exists(row_id):
+                self.coord_tree.delete(row_id)
+            return
+        
+        coord = coord_set.coordinates[0]
+        values = (coord_set.area, coord_set.set_number, coord.x, coord.y, coord.z, coord_set.description)
+        if self.coord_tree.exists(row_id):
+            self.coord_tree.item(row_id, values=values)
+        else:
+            self.coord_tree.insert('', 'end', iid=row_id, values=values)
+    
+    def on_coordinates_changed(self, event: str, key):
+        """Coordinate manager change listener (any thread)"""
+        self.root.after(0, self.apply_coordinate_change, key)
+    
+    def apply_coordinate_change(self, key):
+        """Update the row of a changed coordinate set (Tk thread)"""
+        if self.coord_manager:
+            self.update_coordinate_row(key[0], key[1], self.coord_manager.get_coordinate_set(*key))
     
     def on_area_changed(self, event):
         """Handle area selection change"""
-        self.refresh_coordinate_list()
+        if not self.coord_manager:
+            return
+        coord_sets = self.coord_manager.list_coordinate_sets(self.current_area.get())
+        if coord_sets:
+            row_id = self.coordinate_row_id(coord_sets[0].area, coord_sets[0].set_number)
+            if self.coord_tree.exists(row_id):
+                self.coord_tree.see(row_id)
     
     def on_set_changed(self, event):
         """Handle set selection change"""
@@ -739,12 +899,17 @@ class PLCRobotGUI:
         
         if file_path:
             try:
-                success = self.coord_manager.import_coordinates_from_file(file_path)
-                if success:
-                    messagebox.showinfo("Success", "Coordinates imported successfully")
-                    self.refresh_coordinate_list()
+                result = self.coord_manager.import_coordinates_streaming(file_path)
+                report = result.get_summary()
+                if result.errors:
+                    report += "\n\n" + "\n".join(f"Row {row}: {error}" for row, error in result.errors[:10])
+                if not result.success:
+                    messagebox.showerror("Error", report)
+                elif result.errors:
+                    messagebox.showwarning("Import", report)
                 else:
-                    messagebox.showerror("Error", "Failed to import coordinates")
+                    messagebox.showinfo("Success", report)
+                self.log_message(result.get_summary())
             except Exception as e:
                 messagebox.showerror("Error", f"Import failed: {str(e)}")
     
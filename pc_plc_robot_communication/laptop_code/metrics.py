@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+PLC Communication Metrics
+=========================
+
+Description: Latency, throughput and error instrumentation for PLC round trips
+Purpose: Measure where time goes between laptop and PLC (CP 443-1 link sizing)
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- HDR-style latency histograms with bounded memory
+- Byte counters per operation
+- Error counters by PLC status code
+- Snapshot API and Prometheus text exporter over local HTTP
+"""
+
+import threading
+import time
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram (HDR-style)
+
+    Values are recorded in microseconds. Values below 2^sub_bucket_bits are
+    stored exactly, larger values keep sub_bucket_bits-1 significant bits
+    (about 1.5% relative error with the default of 7 bits). Memory is fixed
+    at construction time, values above max_value are clamped.
+    """
+
+    def __init__(self, max_value_us: int = 120_000_000, sub_bucket_bits: int = 7):
+        """
+        Initialize histogram
+
+        Args:
+            max_value_us: Largest trackable value in microseconds
+            sub_bucket_bits: Precision bits per power-of-two range
+        """
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.half_count = self.sub_bucket_count >> 1
+        self.max_value_us = max_value_us
+        self.counts = [0] * (self._index_of(max_value_us) + 1)
+        self.total_count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    def _index_of(self, value: int) -> int:
+        """Map a value to its bucket index"""
+        if value < self.sub_bucket_count:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        return self.sub_bucket_count + (shift - 1) * self.half_count + ((value >> shift) - self.half_count)
+
+    def _value_at(self, index: int) -> int:
+        """Map a bucket index back to the midpoint of its value range"""
+        if index < self.sub_bucket_count:
+            return index
+        offset = index - self.sub_bucket_count
+        shift = offset // self.half_count + 1
+        mantissa = offset % self.half_count + self.half_count
+        return (mantissa << shift) + (1 << (shift - 1))
+
+    def record(self, value_us: int):
+        """
+        Record one value
+
+        Args:
+            value_us: Value in microseconds
+        """
+        value_us = max(0, min(int(value_us), self.max_value_us))
+        self.counts[self._index_of(value_us)] += 1
+        self.total_count += 1
+        self.total_us += value_us
+        if self.min_us is None or value_us < self.min_us:
+            self.min_us = value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def percentile(self, percent: float) -> int:
+        """
+        Get value at percentile
+
+        Args:
+            percent: Percentile (0-100)
+
+        Returns:
+            int: Value in microseconds (0 if empty)
+        """
+        if self.total_count == 0:
+            return 0
+        target = max(1, int(round(self.total_count * percent / 100.0)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._value_at(index), self.max_us)
+        return self.max_us
+
+    def mean(self) -> float:
+        """Get mean value in microseconds"""
+        return self.total_us / self.total_count if self.total_count else 0.0
+
+    def buckets(self):
+        """
+        Iterate non-empty buckets
+
+        Yields:
+            tuple: (upper_bound_us, count)
+        """
+        for index, count in enumerate(self.counts):
+            if count:
+                yield self._value_at(index), count
+
+class PLCMetrics:
+    """
+    PLC Metrics Registry
+
+    Thread-safe collection of per-operation latency, byte and error counters
+    """
+
+    OPERATIONS = ('db_read', 'db_write', 'wait_for_completion')
+
+    # Quantiles reported in snapshots and Prometheus output
+    QUANTILES = (50.0, 90.0, 99.0, 99.9)
+
+    def __init__(self, status_names: Optional[Dict[int, str]] = None):
+        """
+        Initialize metrics registry
+
+        Args:
+            status_names: Mapping of PLC status codes to names (PLCClient.STATUS)
+        """
+        self.status_names = status_names or {}
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.bytes_moved: Dict[str, int] = {}
+        self.errors: Dict[str, Dict[int, int]] = {}
+        for operation in self.OPERATIONS:
+            self._ensure(operation)
+
+    def _ensure(self, operation: str):
+        """Create counters for operation if missing (caller holds lock or is __init__)"""
+        if operation not in self.histograms:
+            self.histograms[operation] = LatencyHistogram()
+            self.bytes_moved[operation] = 0
+            self.errors[operation] = {}
+
+    def record(self, operation: str, duration_s: float, nbytes: int = 0,
+               status_code: Optional[int] = None):
+        """
+        Record one operation
+
+        Args:
+            operation: Operation name
+            duration_s: Duration in seconds (time.perf_counter delta)
+            nbytes: Bytes transferred
+            status_code: PLC status code if the operation failed
+        """
+        with self.lock:
+            self._ensure(operation)
+            self.histograms[operation].record(duration_s * 1_000_000)
+            self.bytes_moved[operation] += nbytes
+            if status_code is not None:
+                errors = self.errors[operation]
+                errors[status_code] = errors.get(status_code, 0) + 1
+
+    def reset(self):
+        """Reset all counters"""
+        with self.lock:
+            self.histograms.clear()
+            self.bytes_moved.clear()
+            self.errors.clear()
+            self.started_at = time.time()
+            for operation in self.OPERATIONS:
+                self._ensure(operation)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get consistent snapshot of all metrics
+
+        Returns:
+            dict: Per-operation count, bytes, latency statistics (ms) and errors
+        """
+        with self.lock:
+            operations = {}
+            for operation, histogram in self.histograms.items():
+                operations[operation] = {
+                    'count': histogram.total_count,
+                    'bytes': self.bytes_moved[operation],
+                    'latency_ms': {
+                        'min': (histogram.min_us or 0) / 1000.0,
+                        'mean': histogram.mean() / 1000.0,
+                        'max': histogram.max_us / 1000.0,
+                        **{f"p{q:g}": histogram.percentile(q) / 1000.0 for q in self.QUANTILES}
+                    },
+                    'errors': {
+                        self.status_names.get(code, str(code)): count
+                        for code, count in sorted(self.errors[operation].items())
+                    }
+                }
+            return {
+                'uptime_s': time.time() - self.started_at,
+                'operations': operations
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Render metrics in Prometheus text exposition format
+
+        Returns:
+            str: Prometheus text
+        """
+        lines = [
+            "# HELP plc_operation_latency_seconds PLC operation latency",
+            "# TYPE plc_operation_latency_seconds summary",
+        ]
+        with self.lock:
+            for operation, histogram in self.histograms.items():
+                for q in self.QUANTILES:
+                    value = histogram.percentile(q) / 1_000_000.0
+                    lines.append(f'plc_operation_latency_seconds{{operation="{operation}",quantile="{q / 100:g}"}} {value:.6f}')
+                lines.append(f'plc_operation_latency_seconds_sum{{operation="{operation}"}} {histogram.total_us / 1_000_000.0:.6f}')
+                lines.append(f'plc_operation_latency_seconds_count{{operation="{operation}"}} {histogram.total_count}')
+
+            lines.append("# HELP plc_bytes_total Bytes moved per PLC operation")
+            lines.append("# TYPE plc_bytes_total counter")
+            for operation, nbytes in self.bytes_moved.items():
+                lines.append(f'plc_bytes_total{{operation="{operation}"}} {nbytes}')
+
+            lines.append("# HELP plc_errors_total PLC operation errors by status code")
+            lines.append("# TYPE plc_errors_total counter")
+            for operation, errors in self.errors.items():
+                for code, count in sorted(errors.items()):
+                    status = self.status_names.get(code, str(code))
+                    lines.append(f'plc_errors_total{{operation="{operation}",code="{code}",status="{status}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler serving /metrics in Prometheus text format"""
+
+    metrics: PLCMetrics = None
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.metrics.to_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep scrapes out of the application log
+        pass
+
+def start_metrics_server(metrics: PLCMetrics, host: str = "127.0.0.1", port: int = 9108) -> ThreadingHTTPServer:
+    """
+    Serve metrics over HTTP in a background thread
+
+    Args:
+        metrics: Metrics registry to expose
+        host: Bind address (local only by default)
+        port: TCP port
+
+    Returns:
+        ThreadingHTTPServer: Running server, call shutdown() to stop
+    """
+    handler = type('MetricsRequestHandler', (_MetricsRequestHandler,), {'metrics': metrics})
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    logging.getLogger(__name__).info(f"Metrics exporter listening on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Motion Time Model
+=================
+
+Description: Learns robot move durations from DB101 execution_time feedback
+Purpose: Realistic per-move estimates for sequencing, dashboards and timeouts
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- Samples (start, end, speed override, motion type, precision) -> execution_time
+- Per-area linear regression updated incrementally from sufficient
+  statistics (no sample storage), optional exponential forgetting
+- Pooled all-area model as fallback for areas with few samples
+- Batch predictions (NumPy when installed)
+- Timeout suggestion from prediction and residual spread
+- JSON save/load
+
+Requirements:
+- numpy (optional): pip install numpy
+"""
+
+import json
+import math
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Batch predictions fall back to plain Python
+    np = None
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+FEATURE_NAMES = ('overhead', 'distance', 'rotation', 'fine', 'joint', 'joint_distance')
+
+# One move: (start, end, speed override %, motion type, precision).
+# start/end are (x, y, z) in mm, optionally followed by (rx, ry, rz) in degrees*100.
+Move = Tuple[Sequence[int], Sequence[int], int, int, int]
+
+def motion_features(start: Sequence[int], end: Sequence[int], speed: int,
+                    motion_type: int = 1, precision: int = 1) -> List[float]:
+    """
+    Build the regression feature vector of one move
+
+    Distances are divided by the speed fraction, so the distance weights
+    are seconds per mm at 100% override.
+
+    Args:
+        start: Start position (x, y, z[, rx, ry, rz])
+        end: End position
+        speed: Speed override (10-100%)
+        motion_type: 1=linear, 2=joint
+        precision: 1=fine, 2=coarse
+
+    Returns:
+        list: Feature values in FEATURE_NAMES order
+    """
+    scale = 100.0 / max(1, speed)
+    distance = math.dist(start[:3], end[:3]) * scale
+    rotation = 0.0
+    if len(start) >= 6 and len(end) >= 6:
+        rotation = max(abs(b - a) for a, b in zip(start[3:6], end[3:6])) / 100.0 * scale
+    joint = 1.0 if motion_type == 2 else 0.0
+    return [1.0, distance, rotation, 1.0 if precision == 1 else 0.0, joint, joint * distance]
+
+class _Regression:
+    """
+    Ridge regression over accumulated sufficient statistics
+
+    Keeps X'X, X'y and y'y, so an update is O(k^2) and the fit is a
+    k x k solve done lazily on the next prediction.
+    """
+
+    def __init__(self, size: int, ridge: float):
+        self.size = size
+        self.ridge = ridge
+        self.xtx = [[0.0] * size for _ in range(size)]
+        self.xty = [0.0] * size
+        self.yty = 0.0
+        self.weight = 0.0  # Effective sample count (decayed)
+        self.count = 0  # Samples ever added
+        self._coefficients: Optional[List[float]] = None
+
+    def add(self, features: List[float], value: float, decay: float = 1.0):
+        if decay != 1.0:
+            for row in self.xtx:
+                for j in range(self.size):
+                    row[j] *= decay
+            self.xty = [v * decay for v in self.xty]
+            self.yty *= decay
+            self.weight *= decay
+        for i, fi in enumerate(features):
+            if fi:
+                row = self.xtx[i]
+                for j, fj in enumerate(features):
+                    row[j] += fi * fj
+                self.xty[i] += fi * value
+        self.yty += value * value
+        self.weight += 1.0
+        self.count += 1
+        self._coefficients = None
+
+    def coefficients(self) -> List[float]:
+        """Solve (X'X + ridge*I) b = X'y by Gaussian elimination (intercept not penalized)"""
+        if self._coefficients is not None:
+            return self._coefficients
+        n = self.size
+        matrix = [row[:] + [self.xty[i]] for i, row in enumerate(self.xtx)]
+        for i in range(1, n):
+            matrix[i][i] += self.ridge
+        for col in range(n):
+            pivot = max(range(col, n), key=lambda r: abs(matrix[r][col]))
+            if abs(matrix[pivot][col]) < 1e-12:
+                continue
+            matrix[col], matrix[pivot] = matrix[pivot], matrix[col]
+            for r in range(n):
+                if r != col and matrix[r][col]:
+                    factor = matrix[r][col] / matrix[col][col]
+                    for c in range(col, n + 1):
+                        matrix[r][c] -= factor * matrix[col][c]
+        self._coefficients = [matrix[i][n] / matrix[i][i] if abs(matrix[i][i]) >= 1e-12 else 0.0
+                              for i in range(n)]
+        return self._coefficients
+
+    def rmse(self) -> float:
+        """Root mean square residual of the fit"""
+        if self.weight <= 0:
+            return 0.0
+        b = self.coefficients()
+        sse = (self.yty - 2.0 * sum(bi * v for bi, v in zip(b, self.xty))
+               + sum(b[i] * sum(self.xtx[i][j] * b[j] for j in range(self.size)) for i in range(self.size)))
+        return math.sqrt(max(0.0, sse) / self.weight)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'xtx': self.xtx, 'xty': self.xty, 'yty': self.yty, 'weight': self.weight, 'count': self.count}
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.xtx = [[float(v) for v in row] for row in data['xtx']]
+        self.xty = [float(v) for v in data['xty']]
+        self.yty = float(data['yty'])
+        self.weight = float(data['weight'])
+        self.count = int(data['count'])
+        self._coefficients = None
+
+class MotionTimeModel:
+    """
+    Motion Time Model Class
+
+    Learns execution_time (seconds) of robot moves per area. Predictions use
+    the area model once it has min_samples samples, then the pooled model,
+    otherwise None (callers keep their fixed defaults).
+    """
+
+    def __init__(self, min_samples: int = 10, decay: float = 1.0, ridge: float = 1e-6,
+                 timeout_factor: float = 2.0, timeout_margin: float = 2.0):
+        """
+        Initialize motion time model
+
+        Args:
+            min_samples: Samples needed before a model is used
+            decay: Weight kept by old samples per new sample (1.0 = no forgetting)
+            ridge: Ridge regularization of the non-intercept weights
+            timeout_factor: Timeout = prediction * factor + margin + 4 * rmse
+            timeout_margin: Fixed timeout margin in seconds
+        """
+        self.min_samples = min_samples
+        self.decay = decay
+        self.ridge = ridge
+        self.timeout_factor = timeout_factor
+        self.timeout_margin = timeout_margin
+        self.logger = logging.getLogger(__name__)
+        self.lock = threading.Lock()
+        self.areas: Dict[int, _Regression] = {}
+        self.pooled = _Regression(len(FEATURE_NAMES), ridge)
+        self.version = 0  # Incremented on every sample
+
+    def observe(self, area: int, start: Sequence[int], end: Sequence[int], speed: int,
+                motion_type: int, precision: int, execution_time_ms: int):
+        """
+        Add one measured move
+
+        Args:
+            area: Area number
+            start: Start position (x, y, z[, rx, ry, rz])
+            end: End position
+            speed: Speed override (10-100%)
+            motion_type: 1=linear, 2=joint
+            precision: 1=fine, 2=coarse
+            execution_time_ms: DB101 execution_time
+        """
+        features = motion_features(start, end, speed, motion_type, precision)
+        value = execution_time_ms / 1000.0
+        with self.lock:
+            model = self.areas.get(area)
+            if model is None:
+                model = self.areas[area] = _Regression(len(FEATURE_NAMES), self.ridge)
+            model.add(features, value, self.decay)
+            self.pooled.add(features, value, self.decay)
+            self.version += 1
+
+    def _model(self, area: int) -> Optional[_Regression]:
+        model = self.areas.get(area)
+        if model is not None and model.count >= self.min_samples:
+            return model
+        if self.pooled.count >= self.min_samples:
+            return self.pooled
+        return None
+
+    def is_ready(self, area: int) -> bool:
+        """Check whether predictions are available for an area"""
+        with self.lock:
+            return self._model(area) is not None
+
+    def predict(self, area: int, start: Sequence[int], end: Sequence[int], speed: int,
+                motion_type: int = 1, precision: int = 1) -> Optional[float]:
+        """
+        Predict the duration of one move
+
+        Returns:
+            float: Seconds, or None if the model has too few samples
+        """
+        predictions = self.predict_batch(area, [(start, end, speed, motion_type, precision)])
+        return predictions[0] if predictions else None
+
+    def predict_batch(self, area: int, moves: List[Move]) -> Optional[List[float]]:
+        """
+        Predict the durations of many moves in one area
+
+        Args:
+            area: Area number
+            moves: List of (start, end, speed, motion_type, precision)
+
+        Returns:
+            list: Seconds per move, or None if the model has too few samples
+        """
+        with self.lock:
+            model = self._model(area)
+            if model is None:
+                return None
+            coefficients = model.coefficients()
+        if np is not None and len(moves) > 16:
+            features = np.array([motion_features(*move) for move in moves], dtype=float)
+            return np.maximum(features @ np.array(coefficients), 0.0).tolist()
+        return [max(0.0, sum(c * f for c, f in zip(coefficients, motion_features(*move))))
+                for move in moves]
+
+    def timeout(self, area: int, start: Sequence[int], end: Sequence[int], speed: int,
+                motion_type: int = 1, precision: int = 1, default: float = 60.0) -> float:
+        """
+        Suggest a wait timeout for one move
+
+        Args:
+            area: Area number
+            start, end, speed, motion_type, precision: Move as for predict()
+            default: Timeout used while the model has too few samples
+
+        Returns:
+            float: Timeout in seconds
+        """
+        predicted = self.predict(area, start, end, speed, motion_type, precision)
+        if predicted is None:
+            return default
+        with self.lock:
+            rmse = self._model(area).rmse()
+        return predicted * self.timeout_factor + self.timeout_margin + 4.0 * rmse
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get model statistics for dashboards
+
+        Returns:
+            dict: Per-area sample counts, fit error and coefficients
+        """
+        with self.lock:
+            models = [(str(area), model) for area, model in sorted(self.areas.items())]
+            models.append(('pooled', self.pooled))
+            return {
+                name: {
+                    'samples': model.count,
+                    'ready': model.count >= self.min_samples,
+                    'rmse_s': model.rmse() if model.count else 0.0,
+                    'coefficients': dict(zip(FEATURE_NAMES, model.coefficients())) if model.count else {}
+                }
+                for name, model in models
+            }
+
+    def save(self, file_path: str) -> bool:
+        """
+        Save learned statistics to JSON
+
+        Args:
+            file_path: Output file path
+
+        Returns:
+            bool: True if successful
+        """
+        try:
+            with self.lock:
+                data = {'features': list(FEATURE_NAMES),
+                        'areas': {str(area): model.to_dict() for area, model in self.areas.items()},
+                        'pooled': self.pooled.to_dict()}
+            with open(file_path, 'w') as f:
+                json.dump(data, f)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error saving motion model: {e}")
+            return False
+
+    def load(self, file_path: str) -> bool:
+        """
+        Load learned statistics from JSON
+
+        Args:
+            file_path: Input file path
+
+        Returns:
+            bool: True if successful
+        """
+        try:
+            with open(file_path, 'r') as f:
+                data = json.load(f)
+            if tuple(data.get('features', ())) != FEATURE_NAMES:
+                self.logger.error(f"Motion model {file_path} has different features, ignored")
+                return False
+            with self.lock:
+                self.areas = {}
+                for area, state in data['areas'].items():
+                    model = self.areas[int(area)] = _Regression(len(FEATURE_NAMES), self.ridge)
+                    model.load_dict(state)
+                self.pooled.load_dict(data['pooled'])
+                self.version += 1
+            return True
+        except Exception as e:
+            self.logger.error(f"Error loading motion model: {e}")
+            return False
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Pallet Pattern Generator
+========================
+
+Description: Generates complete palletizing layer stacks from pallet and box dimensions
+Purpose: Replace hand-typed placement coordinates with generated, validated coordinate sets
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- Column, interlock (alternate layers turned 90°) and brick (alternate
+  layers shifted half a box) stacking schemes
+- Box gap, pallet origin in area coordinates, tool rotation for the
+  unturned box orientation
+- Layer templates computed once per scheme and stacked as one int32
+  array (NumPy when installed)
+- Bulk validation with DataValidator.validate_coordinate_array()
+- CoordinateSets grouped per layer and batched to the DB102 capacity
+  (10 sets of 20 coordinates per area)
+- Deterministic output: same spec, same points; results cached per spec
+
+Requirements:
+- numpy (optional): pip install numpy
+
+Usage:
+    spec = PalletSpec(1200, 800, 300, 200, 150, layers=5, scheme="interlock", origin=(-600, 100, 120))
+    pattern = generate_pattern(spec)
+    result = pattern.validate(DataValidator(), area=1)
+    for coord_set in pattern.to_coordinate_sets(area=1)[0]:
+        coord_manager.add_coordinate_set(coord_set)
+"""
+
+import json
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, asdict
+
+from coordinate_manager import Coordinate, CoordinateSet
+from data_validator import DataValidator, ValidationResult
+
+try:
+    import numpy as np
+except ImportError:  # Points fall back to lists of tuples
+    np = None
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEMES = ('column', 'interlock', 'brick')
+
+# Point columns, in Coordinate field order
+COLUMNS = ('x', 'y', 'z', 'rx', 'ry', 'rz', 'gripper', 'speed')
+
+@dataclass(frozen=True)
+class PalletSpec:
+    """
+    Pallet pattern specification (all lengths in mm)
+    """
+    pallet_length: int  # Along area X
+    pallet_width: int  # Along area Y
+    box_length: int
+    box_width: int
+    box_height: int
+    layers: int
+    scheme: str = "interlock"  # column, interlock or brick
+    origin: Tuple[int, int, int] = (0, 0, 100)  # Pallet corner (min X, min Y) and deck height
+    gap: int = 0  # Space between boxes
+    base_rz: int = 0  # Tool RZ for a box lying along X (degrees*100)
+    rx: int = 0  # Tool RX (degrees*100)
+    ry: int = 0  # Tool RY (degrees*100)
+    gripper: int = 0  # Gripper command at the placement (0=open releases the box)
+    speed: int = 50  # Speed override (10-100%)
+
+    def validate(self) -> Tuple[bool, str]:
+        """
+        Validate specification
+
+        Returns:
+            tuple: (is_valid, error_message)
+        """
+        if self.scheme not in SCHEMES:
+            return False, f"Scheme {self.scheme} must be one of {', '.join(SCHEMES)}"
+        for name in ('pallet_length', 'pallet_width', 'box_length', 'box_width', 'box_height', 'layers'):
+            if getattr(self, name) <= 0:
+                return False, f"{name} must be positive"
+        if self.gap < 0:
+            return False, "gap cannot be negative"
+        if len(self.origin) != 3:
+            return False, "origin must be (x, y, z)"
+        if not _layer_template(self, 0):
+            return False, "Box does not fit on the pallet"
+        return True, "Valid"
+
+    def cache_key(self) -> str:
+        """Stable key of the specification (e.g. for on-disk pattern caches)"""
+        return hashlib.sha1(json.dumps(asdict(self), sort_keys=True).encode()).hexdigest()
+
+def _wrap_rotation(value: int) -> int:
+    """Wrap degrees*100 into -18000..18000"""
+    value = (value + 18000) % 36000 - 18000
+    return 18000 if value == -18000 else value
+
+def _layer_kind(spec: PalletSpec, layer: int) -> int:
+    """Template of a layer: 0 = base, 1 = alternate (turned or shifted)"""
+    return 0 if spec.scheme == 'column' else layer % 2
+
+def _layer_template(spec: PalletSpec, kind: int) -> List[Tuple[int, ...]]:
+    """
+    Box placements of one layer with z = 0, in serpentine row order
+
+    Args:
+        spec: Pallet specification
+        kind: 0 = base layer, 1 = alternate layer of the scheme
+
+    Returns:
+        list: (x, y, 0, rx, ry, rz, gripper, speed) per box
+    """
+    turned = spec.scheme == 'interlock' and kind == 1
+    length, width = (spec.box_width, spec.box_length) if turned else (spec.box_length, spec.box_width)
+    pitch_x = length + spec.gap
+    pitch_y = width + spec.gap
+    count_x = (spec.pallet_length + spec.gap) // pitch_x
+    count_y = (spec.pallet_width + spec.gap) // pitch_y
+    if spec.scheme == 'brick' and kind == 1:
+        count_x -= 1  # One box less per row, centred: shifted by half a box
+    if count_x <= 0 or count_y <= 0:
+        return []
+
+    # Grid centred on the pallet, coordinates are box centres
+    start_x = spec.origin[0] + (spec.pallet_length - (count_x * pitch_x - spec.gap)) / 2 + length / 2
+    start_y = spec.origin[1] + (spec.pallet_width - (count_y * pitch_y - spec.gap)) / 2 + width / 2
+    rz = _wrap_rotation(spec.base_rz + (9000 if turned else 0))
+    template = []
+    for row in range(count_y):
+        columns = range(count_x) if row % 2 == 0 else range(count_x - 1, -1, -1)
+        y = int(round(start_y + row * pitch_y))
+        for column in columns:
+            template.append((int(round(start_x + column * pitch_x)), y, 0,
+                             spec.rx, spec.ry, rz, spec.gripper, spec.speed))
+    return template
+
+class PalletPattern:
+    """
+    Pallet Pattern Class
+
+    Placement points of a full layer stack as an (N, 8) int32 table in
+    COLUMNS order, with layer_offsets[i]:layer_offsets[i + 1] the rows of
+    layer i. Rows are the placement targets: box centre, on top of the box.
+    """
+
+    def __init__(self, spec: PalletSpec):
+        """
+        Generate pattern (use generate_pattern() for cached results)
+
+        Args:
+            spec: Validated pallet specification
+        """
+        self.spec = spec
+        templates = [_layer_template(spec, kind) for kind in (0, 1)]
+        kinds = [_layer_kind(spec, layer) for layer in range(spec.layers)]
+        self.boxes_per_layer = [len(templates[kind]) for kind in kinds]
+        self.layer_offsets = [0]
+        for count in self.boxes_per_layer:
+            self.layer_offsets.append(self.layer_offsets[-1] + count)
+
+        # Placement height: top of the box just placed
+        heights = [spec.origin[2] + (layer + 1) * spec.box_height for layer in range(spec.layers)]
+        if np is not None:
+            blocks = [np.array(template, dtype=np.int32).reshape(-1, len(COLUMNS)) for template in templates]
+            points = np.concatenate([blocks[kind] for kind in kinds])
+            points[:, 2] = np.repeat(np.array(heights, dtype=np.int32), self.boxes_per_layer)
+            points.setflags(write=False)  # Shared through the pattern cache
+            self.points = points
+        else:
+            self.points = [(*point[:2], z, *point[3:])
+                           for kind, z in zip(kinds, heights) for point in templates[kind]]
+
+    def __len__(self) -> int:
+        return self.layer_offsets[-1]
+
+    @property
+    def layers(self) -> int:
+        return self.spec.layers
+
+    def layer(self, index: int):
+        """Rows of one layer (array view or list)"""
+        return self.points[self.layer_offsets[index]:self.layer_offsets[index + 1]]
+
+    def fill_ratio(self, layer: int = 0) -> float:
+        """Pallet area covered by the boxes of a layer"""
+        box_area = self.spec.box_length * self.spec.box_width
+        return self.boxes_per_layer[layer] * box_area / (self.spec.pallet_length * self.spec.pallet_width)
+
+    def coordinates(self, start: int = 0, stop: Optional[int] = None) -> List[Coordinate]:
+        """
+        Rows as Coordinate objects
+
+        Args:
+            start: First row
+            stop: End row (default: all)
+
+        Returns:
+            list: Coordinates
+        """
+        rows = self.points[start:stop]
+        if np is not None:
+            rows = rows.tolist()
+        return [Coordinate(*row) for row in rows]
+
+    def validate(self, validator: DataValidator, area: Optional[int] = None) -> ValidationResult:
+        """
+        Validate all placements in one pass
+
+        Args:
+            validator: Data validator providing limits
+            area: Optional area number for area-specific validation
+
+        Returns:
+            ValidationResult: One error/warning per violated rule with the failing row indices
+        """
+        return validator.validate_coordinate_array(self.points, area)
+
+    def to_coordinate_sets(self, area: int, points_per_set: int = 20, sets_per_batch: int = 10,
+                           description: str = "Pallet") -> List[List[CoordinateSet]]:
+        """
+        Split the stack into coordinate sets that fit DB102
+
+        A set never spans two layers. Each batch holds up to sets_per_batch
+        sets numbered from 1 and is one DB102 load of the area.
+
+        Args:
+            area: Area number (1 or 2)
+            points_per_set: Maximum coordinates per set
+            sets_per_batch: DB102 sets per area
+            description: Description prefix
+
+        Returns:
+            list: Batches of CoordinateSets in execution order
+        """
+        batches: List[List[CoordinateSet]] = []
+        for layer in range(self.layers):
+            for start in range(self.layer_offsets[layer], self.layer_offsets[layer + 1], points_per_set):
+                if not batches or len(batches[-1]) == sets_per_batch:
+                    batches.append([])
+                stop = min(start + points_per_set, self.layer_offsets[layer + 1])
+                batch = batches[-1]
+                batch.append(CoordinateSet(
+                    area=area,
+                    set_number=len(batch) + 1,
+                    coordinates=self.coordinates(start, stop),
+                    description=f"{description} layer {layer + 1} boxes "
+                                f"{start - self.layer_offsets[layer] + 1}-{stop - self.layer_offsets[layer]}"
+                ))
+        return batches
+
+    def get_summary(self) -> str:
+        """Get pattern summary string"""
+        per_layer = sorted(set(self.boxes_per_layer))
+        return (f"{self.spec.scheme} pattern: {len(self)} boxes in {self.layers} layer(s) "
+                f"({'/'.join(str(count) for count in per_layer)} per layer, "
+                f"fill {self.fill_ratio():.0%})")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get pattern as plain dictionary (JSON)"""
+        points = self.points.tolist() if np is not None else [list(point) for point in self.points]
+        return {'spec': asdict(self.spec), 'columns': list(COLUMNS),
+                'layer_offsets': self.layer_offsets, 'points': points}
+
+@lru_cache(maxsize=64)
+def generate_pattern(spec: PalletSpec) -> Optional[PalletPattern]:
+    """
+    Generate (or return the cached) pattern of a specification
+
+    Args:
+        spec: Pallet specification
+
+    Returns:
+        PalletPattern: Read-only pattern, None if the specification is invalid
+    """
+    is_valid, error = spec.validate()
+    if not is_valid:
+        logger.error(f"Invalid pallet specification: {error}")
+        return None
+    return PalletPattern(spec)
@@ -20,9 +20,15 @@ import struct
 import time
 import json
 import logging
+import threading
 from datetime import datetime
 from typing import Dict, Any, Optional, Tuple
 
+from metrics import PLCMetrics, start_metrics_server
+from motion_model import MotionTimeModel
+from position_service import PositionService
+from tracing import CommandTracer
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -36,7 +42,7 @@ class PLCClient:
     Handles communication with Siemens S7-400H PLC for coordinate exchange
     """
     
-    def __init__(self, plc_ip: str = "192.168.1.100", rack: int = 0, slot: int = 2):
+    def __init__(self, plc_ip: str = "192.168.1.100", rack: int = 0, slot: int = 2, port: int = 102):
         """
         Initialize PLC client
         
@@ -44,10 +50,12 @@ class PLCClient:
             plc_ip: PLC IP address
             rack: PLC rack number (usually 0)
             slot: PLC slot number (usually 2 for CPU)
+            port: S7 TCP port (102, other ports for plc_simulator.py)
         """
         self.plc_ip = plc_ip
         self.rack = rack
         self.slot = slot
+        self.port = port
         self.client = snap7.client.Client()
         self.connected = False
         self.logger = logging.getLogger(__name__)
@@ -87,6 +95,56 @@ class PLCClient:
             10: 'TIMEOUT'
         }
         
+        # Robot status codes (DB101.RobotStatus)
+        self.ROBOT_STATUS = {
+            0: 'IDLE',
+            1: 'MOVING',
+            2: 'POSITION_REACHED',
+            3: 'ERROR',
+            4: 'EMERGENCY_STOP',
+            9: 'WAITING'
+        }
+        
+        # Round-trip instrumentation
+        self.metrics = PLCMetrics(self.STATUS)
+        self.metrics_server = None
+        
+        # Per-command stage tracing, off by default: a traced wait costs a
+        # DB101 read per poll for these commands (tracer.enabled = True to record)
+        self.tracer = CommandTracer(enabled=False)
+        self.TRACE_FEEDBACK_COMMANDS = ('EXECUTE_COORDINATE',)
+        
+        # DB101 feedback of the last motion seen finishing
+        self.last_motion: Optional[Dict[str, Any]] = None
+        
+        # Learned move durations; fed from DB101 after each motion and used
+        # for motion timeouts. written_sets mirrors what this client stored
+        # in DB102: (area, set) -> (x, y, z, rx, ry, rz, speed)
+        self.motion_model = MotionTimeModel()
+        self.written_sets: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+        self._motion_start: Optional[Dict[str, Any]] = None
+        self.DEFAULT_MOTION_TIMEOUT = 60.0
+        
+        # Protocol extensions beyond FC300/FC301 as shipped in plc_code/.
+        # overlapped_execute: EXECUTE hands the set to the robot and DB100
+        # takes the next command while it moves (start_execute,
+        # wait_for_motion). FC300 as shipped keeps EXECUTE in DB100 and
+        # answers ROBOT_NOT_READY until the robot is idle again, so enable it
+        # only for a PLC program that implements it (plc_simulator.py --extended).
+        self.capabilities = {'overlapped_execute': False}
+        
+        # Set to abort the running wait (e.g. by CommandScheduler for safety commands)
+        self.cancel_event = threading.Event()
+        
+        # snap7 clients are not thread-safe; DB accesses from the command
+        # writer, position refresh and monitor threads are serialized
+        self.io_lock = threading.Lock()
+        
+        # Latest DB101 read (any caller) and the pose service built on it
+        self.last_db101: Optional[Dict[str, Any]] = None
+        self.last_db101_time = 0.0
+        self.positions = PositionService(self)
+        
     def connect(self) -> bool:
         """
         Connect to PLC
@@ -95,7 +153,7 @@ class PLCClient:
             bool: True if connected successfully
         """
         try:
-            self.client.connect(self.plc_ip, self.rack, self.slot)
+            self.client.connect(self.plc_ip, self.rack, self.slot, tcp_port=self.port)
             self.connected = True
             self.logger.info(f"Connected to PLC at {self.plc_ip}")
             return True
@@ -106,11 +164,74 @@ class PLCClient:
     
     def disconnect(self):
         """Disconnect from PLC"""
+        self.positions.stop()
         if self.connected:
             self.client.disconnect()
             self.connected = False
             self.logger.info("Disconnected from PLC")
     
+    def supports(self, capability: str) -> bool:
+        """
+        Check a PLC protocol extension
+        
+        Args:
+            capability: Key of self.capabilities
+            
+        Returns:
+            bool: True if the connected PLC program implements it
+        """
+        return bool(self.capabilities.get(capability, False))
+    
+    def start_metrics_server(self, host: str = "127.0.0.1", port: int = 9108):
+        """
+        Start Prometheus metrics exporter
+        
+        Args:
+            host: Bind address
+            port: TCP port
+        """
+        if self.metrics_server is None:
+            self.metrics_server = start_metrics_server(self.metrics, host, port)
+    
+    def stop_metrics_server(self):
+        """Stop Prometheus metrics exporter"""
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+            self.metrics_server.server_close()
+            self.metrics_server = None
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get snapshot of round-trip metrics
+        
+        Returns:
+            dict: Metrics snapshot
+        """
+        return self.metrics.snapshot()
+    
+    def _db_read(self, db_number: int, start: int, size: int) -> bytearray:
+        """Timed wrapper around client.db_read"""
+        started = time.perf_counter()
+        try:
+            with self.io_lock:
+                data = self.client.db_read(db_number, start, size)
+        except Exception:
+            self.metrics.record('db_read', time.perf_counter() - started, 0, 8)  # COMMUNICATION_ERROR
+            raise
+        self.metrics.record('db_read', time.perf_counter() - started, len(data))
+        return data
+    
+    def _db_write(self, db_number: int, start: int, data: bytearray):
+        """Timed wrapper around client.db_write"""
+        started = time.perf_counter()
+        try:
+            with self.io_lock:
+                self.client.db_write(db_number, start, data)
+        except Exception:
+            self.metrics.record('db_write', time.perf_counter() - started, 0, 8)  # COMMUNICATION_ERROR
+            raise
+        self.metrics.record('db_write', time.perf_counter() - started, len(data))
+    
     def read_db100(self) -> Dict[str, Any]:
         """
         Read DB100 - Laptop Interface
@@ -123,7 +244,7 @@ class PLCClient:
         
         try:
             # Read 100 bytes from DB100
-            data = self.client.db_read(self.DB100_NUMBER, 0, 100)
+            data = self._db_read(self.DB100_NUMBER, 0, 100)
             
             # Unpack data according to DB100 structure
             result = {
@@ -193,7 +314,7 @@ class PLCClient:
             struct.pack_into('>H', packed_data, 42, data.get('error_code', 0))
             
             # Write to PLC
-            self.client.db_write(self.DB100_NUMBER, 0, packed_data)
+            self._db_write(self.DB100_NUMBER, 0, packed_data)
             return True
             
         except Exception as e:
@@ -212,7 +333,7 @@ class PLCClient:
         
         try:
             # Read 100 bytes from DB101
-            data = self.client.db_read(self.DB101_NUMBER, 0, 100)
+            data = self._db_read(self.DB101_NUMBER, 0, 100)
             
             # Unpack data according to DB101 structure
             result = {
@@ -235,6 +356,8 @@ class PLCClient:
                 'feedback_timestamp': struct.unpack('>L', data[40:44])[0]
             }
             
+            self.last_db101 = result
+            self.last_db101_time = time.perf_counter()
             return result
             
         except Exception as e:
@@ -266,15 +389,39 @@ class PLCClient:
             'ry_rotation': kwargs.get('ry', 0),
             'rz_rotation': kwargs.get('rz', 0),
             'gripper_status': kwargs.get('gripper', 0),
-            'speed_override': kwargs.get('speed', 50)
+            'speed_override': kwargs.get('speed', 50),
+            'motion_type': kwargs.get('motion_type', 1),
+            'precision': kwargs.get('precision', 1)
         }
         
-        return self.write_db100(command_data)
+        if command == 'EXECUTE_COORDINATE':
+            # Start position for the motion model. Reading it can cost a DB101
+            # round trip, so that is only done when the end of the motion is
+            # observed too: start_execute/wait_for_motion, or traced waits.
+            observe = kwargs.get('observe_motion', self.tracer.enabled)
+            self._motion_start = {
+                'area': command_data['area_selection'],
+                'set_number': command_data['coordinate_set'],
+                'start': self._robot_position(read=observe),
+                'motion_type': command_data['motion_type'],
+                'precision': command_data['precision']
+            }
+        
+        self.tracer.start(command, area=command_data['area_selection'],
+                          set_number=command_data['coordinate_set'])
+        success = self.write_db100(command_data)
+        if success:
+            self.tracer.mark_written()
+        else:
+            self.tracer.finish(False, "Write to DB100 failed")
+        return success
     
     def wait_for_completion(self, timeout: float = 30.0) -> Tuple[bool, str]:
         """
         Wait for command completion
         
+        Returns (False, "Cancelled") as soon as cancel_event is set.
+        
         Args:
             timeout: Maximum wait time in seconds
             
@@ -282,30 +429,48 @@ class PLCClient:
             tuple: (success, status_message)
         """
         start_time = time.time()
+        started = time.perf_counter()
+        trace = self.tracer.active
+        sample_feedback = trace is not None and trace.command in self.TRACE_FEEDBACK_COMMANDS
+        
+        def finish(result: Tuple[bool, str], status_code: Optional[int]) -> Tuple[bool, str]:
+            self.metrics.record('wait_for_completion', time.perf_counter() - started, 0, status_code)
+            self.tracer.finish(*result)
+            return result
         
         while time.time() - start_time < timeout:
             try:
                 db100 = self.read_db100()
                 status = db100['status_word']
                 
+                feedback = None
+                if trace is not None:
+                    self.tracer.observe_status(self.STATUS.get(status, str(status)), db100['error_code'])
+                    if sample_feedback:
+                        feedback = self.read_db101()
+                        self.tracer.observe_feedback(feedback)
+                
                 if status == 3:  # COMPLETED
-                    return True, "Command completed successfully"
+                    if feedback is not None and feedback['robot_status'] == 2:  # POSITION_REACHED
+                        self._record_motion(feedback)
+                    return finish((True, "Command completed successfully"), None)
                 elif status == 4:  # ERROR
                     error_code = db100['error_code']
-                    return False, f"Command failed with error code: {error_code}"
+                    return finish((False, f"Command failed with error code: {error_code}"), status)
                 elif status == 9:  # VALIDATION_FAILED
                     error_code = db100['error_code']
-                    return False, f"Data validation failed: {error_code}"
+                    return finish((False, f"Data validation failed: {error_code}"), status)
                 elif status == 10:  # TIMEOUT
-                    return False, "Command timed out"
+                    return finish((False, "Command timed out"), status)
                 
-                time.sleep(0.1)  # Wait 100ms before next check
+                if self.cancel_event.wait(0.1):  # Wait 100ms before next check
+                    return finish((False, "Cancelled"), None)
                 
             except Exception as e:
                 self.logger.error(f"Error waiting for completion: {e}")
-                return False, f"Communication error: {e}"
+                return finish((False, f"Communication error: {e}"), 8)  # COMMUNICATION_ERROR
         
-        return False, "Wait timeout"
+        return finish((False, "Wait timeout"), 10)  # TIMEOUT
     
     def write_coordinate_set(self, area: int, set_number: int, x: int, y: int, z: int, 
                            rx: int = 0, ry: int = 0, rz: int = 0, 
@@ -332,19 +497,21 @@ class PLCClient:
         if success:
             success, message = self.wait_for_completion()
             if success:
+                self.written_sets[(area, set_number)] = (x, y, z, rx, ry, rz, speed)
                 self.logger.info(f"Coordinate set {set_number} written successfully to area {area}")
             else:
                 self.logger.error(f"Failed to write coordinate set: {message}")
         
         return success
     
-    def execute_coordinate_set(self, area: int, set_number: int) -> bool:
+    def execute_coordinate_set(self, area: int, set_number: int, timeout: Optional[float] = None) -> bool:
         """
         Execute coordinate set
         
         Args:
             area: Area number (1 or 2)
             set_number: Set number (1-10)
+            timeout: Motion timeout in seconds (default: motion_timeout())
             
         Returns:
             bool: True if successful
@@ -353,7 +520,9 @@ class PLCClient:
                                   area=area, set_number=set_number)
         
         if success:
-            success, message = self.wait_for_completion(timeout=60.0)  # Longer timeout for motion
+            if timeout is None:
+                timeout = self.motion_timeout(area, set_number, self._motion_start['start'])
+            success, message = self.wait_for_completion(timeout=timeout)
             if success:
                 self.logger.info(f"Coordinate set {set_number} executed successfully in area {area}")
             else:
@@ -361,9 +530,170 @@ class PLCClient:
         
         return success
     
+    def start_execute(self, area: int, set_number: int, timeout: float = 5.0,
+                      poll_interval: float = 0.01, **kwargs) -> Tuple[bool, str]:
+        """
+        Send EXECUTE_COORDINATE and return as soon as the robot has the motion
+        
+        Unlike execute_coordinate_set() this does not wait for the motion to
+        end; DB100 is free for the next command (e.g. staging the next set)
+        once this returns. Use wait_for_motion() to detect the end of motion.
+        Needs capabilities['overlapped_execute']: FC300 as shipped does not
+        free DB100 during a motion.
+        
+        Args:
+            area: Area number (1 or 2)
+            set_number: Set number (1-10)
+            timeout: Maximum wait for the robot to start in seconds
+            poll_interval: Poll period in seconds
+            **kwargs: Motion fields sent with the command (speed, gripper,
+                motion_type, precision)
+            
+        Returns:
+            tuple: (success, status_message)
+        """
+        if not self.supports('overlapped_execute'):
+            self.logger.error("PLC program does not support overlapped EXECUTE (capabilities['overlapped_execute'])")
+            return False, "Overlapped EXECUTE not supported by the PLC program"
+        if not self.send_command('EXECUTE_COORDINATE', area=area, set_number=set_number,
+                                 observe_motion=True, **kwargs):
+            return False, "Write to DB100 failed"
+        
+        started = time.perf_counter()
+        
+        def finish(result: Tuple[bool, str], status_code: Optional[int]) -> Tuple[bool, str]:
+            self.metrics.record('start_execute', time.perf_counter() - started, 0, status_code)
+            self.tracer.finish(*result)
+            if not result[0]:
+                self.logger.error(f"Failed to start coordinate set {set_number} in area {area}: {result[1]}")
+            return result
+        
+        while time.perf_counter() - started < timeout:
+            try:
+                db100 = self.read_db100()
+                db101 = self.read_db101()
+            except Exception as e:
+                return finish((False, f"Communication error: {e}"), 8)  # COMMUNICATION_ERROR
+            
+            status = db100['status_word']
+            self.tracer.observe_status(self.STATUS.get(status, str(status)), db100['error_code'])
+            self.tracer.observe_feedback(db101)
+            if status == 3:  # COMPLETED - motion shorter than one poll
+                return finish((True, "Motion completed"), None)
+            if status in (4, 7, 9, 10):  # ERROR, ROBOT_NOT_READY, VALIDATION_FAILED, TIMEOUT
+                return finish((False, f"{self.STATUS[status]} (error code {db100['error_code']})"), status)
+            if (db101['robot_status'] == 1 and db101['current_area'] == area
+                    and db101['current_set'] == set_number):  # MOVING to this set
+                return finish((True, "Motion started"), None)
+            if self.cancel_event.wait(poll_interval):
+                return finish((False, "Cancelled"), None)
+        
+        return finish((False, "Robot did not start motion"), 10)  # TIMEOUT
+    
+    def wait_for_motion(self, area: int, set_number: int, timeout: Optional[float] = None,
+                        poll_interval: float = 0.01) -> Tuple[bool, str]:
+        """
+        Wait until the robot reports the motion to a set as finished
+        
+        Watches DB101 only, so it also works after DB100 has been reused
+        for another command while the robot was moving. On success the
+        DB101 feedback (incl. execution_time) is kept in self.last_motion.
+        
+        Args:
+            area: Area number of the motion started with start_execute()
+            set_number: Set number of that motion
+            timeout: Maximum wait time in seconds (default: motion_timeout())
+            poll_interval: Poll period in seconds
+            
+        Returns:
+            tuple: (success, status_message)
+        """
+        if timeout is None:
+            start = self._motion_start['start'] if self._motion_start else None
+            timeout = self.motion_timeout(area, set_number, start)
+        started = time.perf_counter()
+        
+        def finish(result: Tuple[bool, str], status_code: Optional[int]) -> Tuple[bool, str]:
+            self.metrics.record('wait_for_motion', time.perf_counter() - started, 0, status_code)
+            return result
+        
+        while time.perf_counter() - started < timeout:
+            try:
+                db101 = self.read_db101()
+            except Exception as e:
+                return finish((False, f"Communication error: {e}"), 8)  # COMMUNICATION_ERROR
+            
+            robot_status = db101['robot_status']
+            if robot_status == 2:  # POSITION_REACHED
+                if db101['current_area'] == area and db101['current_set'] == set_number:
+                    self._record_motion(db101)
+                    return finish((True, f"Position reached in {db101['execution_time']} ms"), None)
+                return finish((False, f"Robot stopped at set {db101['current_set']} in area "
+                                      f"{db101['current_area']}"), 4)
+            if robot_status in (0, 3, 4):  # IDLE (stopped), ERROR, EMERGENCY_STOP
+                return finish((False, f"Robot {self.ROBOT_STATUS[robot_status]} "
+                                      f"(error code {db101['robot_error_code']})"), 4)
+            if self.cancel_event.wait(poll_interval):
+                return finish((False, "Cancelled"), None)
+        
+        return finish((False, "Motion timeout"), 10)  # TIMEOUT
+    
+    def _robot_position(self, read: bool = True) -> Optional[Tuple[int, ...]]:
+        """Robot position (x, y, z, rx, ry, rz) before a motion, None if unknown"""
+        # End of the last recorded motion, unless a later motion did not finish
+        feedback = self.last_motion if self._motion_start is None else None
+        if feedback is None:
+            if not read:
+                return None
+            try:
+                feedback = self.read_db101()
+            except Exception:
+                return None
+        return (feedback['current_x'], feedback['current_y'], feedback['current_z'],
+                feedback['current_rx'], feedback['current_ry'], feedback['current_rz'])
+    
+    def _record_motion(self, db101: Dict[str, Any]):
+        """Keep DB101 feedback of a finished motion and feed the motion model"""
+        self.last_motion = db101
+        motion = self._motion_start
+        self._motion_start = None
+        if (motion is None or motion['start'] is None or motion['area'] != db101['current_area']
+                or motion['set_number'] != db101['current_set']):
+            return
+        end = (db101['current_x'], db101['current_y'], db101['current_z'],
+               db101['current_rx'], db101['current_ry'], db101['current_rz'])
+        self.motion_model.observe(motion['area'], motion['start'], end, db101['current_speed'],
+                                  motion['motion_type'], motion['precision'], db101['execution_time'])
+    
+    def motion_timeout(self, area: int, set_number: int,
+                       start: Optional[Tuple[int, ...]] = None) -> float:
+        """
+        Get the wait timeout for a motion to a set
+        
+        Uses the learned motion model when the target was written by this
+        client and the model has enough samples, DEFAULT_MOTION_TIMEOUT
+        otherwise.
+        
+        Args:
+            area: Area number
+            set_number: Set number
+            start: Start position (x, y, z, rx, ry, rz), None if unknown
+            
+        Returns:
+            float: Timeout in seconds
+        """
+        target = self.written_sets.get((area, set_number))
+        if target is None or start is None:
+            return self.DEFAULT_MOTION_TIMEOUT
+        return self.motion_model.timeout(area, start, target[:6], target[6],
+                                         default=self.DEFAULT_MOTION_TIMEOUT)
+    
     def get_current_position(self) -> Optional[Dict[str, Any]]:
         """
-        Get current robot position
+        Get current robot position via GET_POSITION command handshake
+        
+        Position queries that can use recent DB101 feedback should use
+        self.positions.get_position() instead (no DB100 command).
         
         Returns:
             dict: Current position data or None if failed
@@ -395,6 +725,7 @@ class PLCClient:
         Returns:
             bool: True if command sent successfully
         """
+        self.last_motion = None  # Robot stops somewhere along the path
         return self.send_command('EMERGENCY_STOP')
     
     def reset_error(self) -> bool:
@@ -0,0 +1,693 @@
+#!/usr/bin/env python3
+"""
+Offline S7 PLC Simulator
+========================
+
+Description: Local S7 server hosting DB100/DB101/DB102 for load tests
+Purpose: Benchmark PLCClient / CoordinateManager without a real S7-400H
+Protocol: S7 protocol over TCP via snap7.server
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- DB100 (laptop), DB101 (robot) and DB102 (storage) areas
+- FC300/FC301 command state machine emulation (as shipped in plc_code/)
+- Optional protocol extensions, each off by default (SimulatorConfig)
+- Robot motion emulation with DB101 feedback
+- Configurable processing delays, jitter and fault injection
+- Deterministic runs with a fixed random seed
+
+Requirements:
+- python-snap7 library: pip install python-snap7
+
+Usage:
+    python plc_simulator.py --port 1102 --motion-time 0.5 --jitter 0.05
+
+    plc = PLCClient("127.0.0.1", port=1102)
+
+    # Extended PLC program (EXECUTE completes on motion end, commands 8-10)
+    python plc_simulator.py --port 1102 --extended
+"""
+
+import argparse
+import math
+import random
+import struct
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+import snap7
+
+try:
+    SRV_AREA_DB = snap7.types.srvAreaDB
+except AttributeError:  # python-snap7 >= 2.0
+    SRV_AREA_DB = snap7.type.SrvArea.DB
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Data block numbers and sizes (config/system_config.json)
+DB100_NUMBER = 100
+DB101_NUMBER = 101
+DB102_NUMBER = 102
+DB100_SIZE = 100
+DB101_SIZE = 100
+
+# DB102 coordinate records as addressed by FC301:
+# X, Y, Z (DINT), RX, RY, RZ, Gripper, Speed (INT), Valid (BOOL), Reserved (WORD)
+DB102_RECORD_SIZE = 26
+DB102_SETS_PER_AREA = 10
+DB102_AREAS = 2
+DB102_SIZE = DB102_RECORD_SIZE * DB102_SETS_PER_AREA * DB102_AREAS
+
+# DB100 field offsets (same layout as PLCClient.read_db100/write_db100)
+DB100_COMMAND = 0
+DB100_STATUS = 2
+DB100_AREA = 4
+DB100_SET = 6
+DB100_X = 8
+DB100_Y = 12
+DB100_Z = 16
+DB100_RX = 20
+DB100_RY = 22
+DB100_RZ = 24
+DB100_GRIPPER = 26
+DB100_SPEED = 28
+DB100_MOTION_TYPE = 30
+DB100_PRECISION = 32
+DB100_ERROR = 42
+
+# DB101 field offsets (same layout as PLCClient.read_db101)
+DB101_ROBOT_COMMAND = 0
+DB101_ROBOT_STATUS = 2
+DB101_AREA = 4
+DB101_SET = 6
+DB101_X = 8
+DB101_Y = 12
+DB101_Z = 16
+DB101_RX = 20
+DB101_RY = 22
+DB101_RZ = 24
+DB101_MOTION_STATUS = 26
+DB101_GRIPPER = 28
+DB101_SPEED = 30
+DB101_PROGRESS = 32
+DB101_EXECUTION_TIME = 34
+DB101_ERROR = 38
+DB101_TIMESTAMP = 40
+
+# Robot status codes (DB101.RobotStatus)
+ROBOT_IDLE = 0
+ROBOT_MOVING = 1
+ROBOT_POSITION_REACHED = 2
+ROBOT_ERROR = 3
+ROBOT_EMERGENCY_STOP = 4
+ROBOT_WAITING = 9
+
+# Coordinate limits (DB102.CoordinateLimits)
+LIMITS = {
+    'x': (-2000, 2000), 'y': (-2000, 2000), 'z': (100, 1500),
+    'rx': (-18000, 18000), 'ry': (-18000, 18000), 'rz': (-32000, 32000),
+    'speed': (10, 100)
+}
+
+@dataclass
+class SimulatorConfig:
+    """
+    Simulator configuration
+
+    Delays are in seconds. Fault rates are probabilities per command.
+    """
+    scan_time: float = 0.01  # OB1 cycle (system_config.json ob1 budget)
+    pickup_delay: float = 0.01  # DB100 write -> FC300 sees command
+    processing_delay: float = 0.02  # Non-motion command processing
+    motion_base_time: float = 0.2  # Fixed overhead per motion
+    motion_speed: float = 1000.0  # mm/s at 100% speed override
+    jitter: float = 0.0  # Uniform extra delay 0..jitter on every stage
+    error_rate: float = 0.0  # Command ends in ERROR (status 4)
+    timeout_rate: float = 0.0  # Command ends in TIMEOUT (status 10)
+    drop_rate: float = 0.0  # Command never leaves COMMAND_RECEIVED
+    fault_error_code: int = 2002  # Error code reported for injected errors
+    hold_terminal_status: bool = True  # Keep COMPLETED/ERROR until next command
+    seed: Optional[int] = None
+
+    # Protocol extensions beyond FC300/FC301 as shipped. All off: the
+    # simulator answers like the AWL sources, so benchmarks measure the
+    # real handshake. Enable them only to model an extended PLC program.
+    # EXECUTE stays PROCESSING until the motion ends, then COMPLETED; range
+    # and coordinate errors end it with ERROR/VALIDATION_FAILED. Off: FC300
+    # reports BUSY when FC301 hands the set to the robot, then
+    # ROBOT_NOT_READY (2001) every scan while the command word stays 3.
+    execute_completes_on_motion_end: bool = False
+    # Robot in POSITION_REACHED accepts the next EXECUTE. Off: only IDLE or
+    # WAITING (FC300 / FC301 RobotReady).
+    ready_on_position_reached: bool = False
+    # EMERGENCY_STOP (8), CLEAR_ALL (9), VALIDATE_COORDINATE (10). Off:
+    # error 1000 (FC300 ELSE branch).
+    extended_commands: bool = False
+
+    @classmethod
+    def extended(cls, **kwargs) -> 'SimulatorConfig':
+        """
+        Configuration with all protocol extensions enabled
+
+        Args:
+            **kwargs: Other configuration fields
+        """
+        return cls(execute_completes_on_motion_end=True, ready_on_position_reached=True,
+                   extended_commands=True, **kwargs)
+
+class PLCSimulator:
+    """
+    PLC Simulator Class
+
+    Emulates the FC300 laptop handler and FC301 robot handler on top of
+    byte-level DB images. scan() executes one PLC cycle and can be stepped
+    directly; start() hosts the DBs on a snap7 server and scans in a
+    background thread.
+    """
+
+    def __init__(self, config: Optional[SimulatorConfig] = None):
+        """
+        Initialize simulator
+
+        Args:
+            config: Simulator configuration
+        """
+        self.config = config or SimulatorConfig()
+        self.logger = logging.getLogger(__name__)
+        self.random = random.Random(self.config.seed)
+
+        # DB images shared with the snap7 server (python-snap7 3.x keeps a
+        # bytearray by reference but copies ctypes buffers)
+        self.db100 = bytearray(DB100_SIZE)
+        self.db101 = bytearray(DB101_SIZE)
+        self.db102 = bytearray(DB102_SIZE)
+
+        self.server = None
+        self.running = False
+        self.scan_thread = None
+        self.started_at = time.perf_counter()
+
+        # FC300 state
+        self.state = 'IDLE'  # IDLE, RECEIVED, PROCESSING, EXECUTING, DONE, DROPPED
+        self.active_command = 0
+        self.request: Dict[str, int] = {}
+        self.deadline = 0.0
+        self.fault: Optional[str] = None
+
+        # FC301 / robot state
+        self.motion: Optional[Dict[str, Any]] = None
+        self.last_area = 1
+        self.last_set = 0
+
+        self.stats = {
+            'scans': 0, 'commands': 0, 'completed': 0,
+            'errors': 0, 'timeouts': 0, 'dropped': 0, 'motions': 0
+        }
+
+        self._init_data_blocks()
+
+    def _init_data_blocks(self):
+        """Set DB start values (BEGIN sections of the AWL sources)"""
+        struct.pack_into('>H', self.db100, DB100_AREA, 1)
+        struct.pack_into('>H', self.db100, DB100_SET, 1)
+        struct.pack_into('>l', self.db100, DB100_Z, 500)
+        struct.pack_into('>H', self.db100, DB100_SPEED, 100)
+
+        struct.pack_into('>H', self.db101, DB101_ROBOT_STATUS, ROBOT_WAITING)
+        struct.pack_into('>H', self.db101, DB101_AREA, 1)
+        struct.pack_into('>H', self.db101, DB101_SET, 1)
+        struct.pack_into('>l', self.db101, DB101_Z, 500)
+        struct.pack_into('>H', self.db101, DB101_SPEED, 100)
+
+        for index in range(DB102_SETS_PER_AREA * DB102_AREAS):
+            offset = index * DB102_RECORD_SIZE
+            struct.pack_into('>l', self.db102, offset + 8, 500)
+            struct.pack_into('>h', self.db102, offset + 20, 100)
+
+    # ------------------------------------------------------------------
+    # Server hosting
+    # ------------------------------------------------------------------
+
+    def start(self, port: int = 102):
+        """
+        Host data blocks on a snap7 server and start scanning
+
+        Args:
+            port: TCP port (102 needs root privileges on Linux)
+        """
+        self.server = snap7.server.Server()
+        self.server.register_area(SRV_AREA_DB, DB100_NUMBER, self.db100)
+        self.server.register_area(SRV_AREA_DB, DB101_NUMBER, self.db101)
+        self.server.register_area(SRV_AREA_DB, DB102_NUMBER, self.db102)
+        self.server.start(tcp_port=port)
+
+        self.running = True
+        self.scan_thread = threading.Thread(target=self._scan_loop, daemon=True)
+        self.scan_thread.start()
+        self.logger.info(f"PLC simulator listening on port {port}")
+
+    def stop(self):
+        """Stop scanning and shut down the snap7 server"""
+        self.running = False
+        if self.scan_thread:
+            self.scan_thread.join(timeout=1.0)
+            self.scan_thread = None
+        if self.server:
+            self.server.stop()
+            self.server.destroy()
+            self.server = None
+            self.logger.info("PLC simulator stopped")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _scan_loop(self):
+        """Cyclic scan (OB1)"""
+        while self.running:
+            cycle_start = time.perf_counter()
+            self._lock_areas(True)
+            try:
+                self.scan(cycle_start)
+            finally:
+                self._lock_areas(False)
+            remaining = self.config.scan_time - (time.perf_counter() - cycle_start)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def _lock_areas(self, lock: bool):
+        """Lock DB areas against concurrent client access during a scan"""
+        if self.server is None:
+            return
+        for number in (DB100_NUMBER, DB101_NUMBER, DB102_NUMBER):
+            if lock:
+                self.server.lock_area(SRV_AREA_DB, number)
+            else:
+                self.server.unlock_area(SRV_AREA_DB, number)
+
+    # ------------------------------------------------------------------
+    # PLC cycle
+    # ------------------------------------------------------------------
+
+    def scan(self, now: Optional[float] = None):
+        """
+        Execute one PLC cycle
+
+        Args:
+            now: Cycle time (time.perf_counter()), defaults to current time
+        """
+        if now is None:
+            now = time.perf_counter()
+        self.stats['scans'] += 1
+
+        self._update_robot(now)
+        self._handle_laptop(now)
+
+    def _delay(self, base: float) -> float:
+        """Apply configured jitter to a delay"""
+        if self.config.jitter > 0:
+            return base + self.random.uniform(0.0, self.config.jitter)
+        return base
+
+    def _set_status(self, status: int, error_code: Optional[int] = None):
+        struct.pack_into('>H', self.db100, DB100_STATUS, status)
+        if error_code is not None:
+            struct.pack_into('>H', self.db100, DB100_ERROR, error_code)
+
+    def _handle_laptop(self, now: float):
+        """FC300 - laptop command state machine"""
+        command, status = struct.unpack_from('>HH', self.db100, DB100_COMMAND)
+
+        # A laptop write always clears the status word, so a non-zero command
+        # with status 0 is a new request even if the command code repeats.
+        # DB100 is a single mailbox: a new command replaces the active one,
+        # motion already handed to the robot keeps running unless stopped.
+        if command != 0 and (self.state in ('IDLE', 'DONE') or status == 0 or command != self.active_command):
+            self._latch(command, now)
+            return
+
+        if self.state == 'RECEIVED' and now >= self.deadline:
+            self._begin_processing(now)
+        elif self.state == 'EXECUTING':
+            self._execute_scan(now)  # FC300 re-runs EXECUTE while the command word stays 3
+        elif self.state == 'PROCESSING':
+            if self.active_command == 3 and self.motion is not None and self.fault is None:
+                return  # Completion is driven by the robot motion
+            if now >= self.deadline:
+                self._complete()
+        elif self.state == 'DONE' and not self.config.hold_terminal_status:
+            self.state = 'IDLE'
+            self._set_status(0)
+
+    def _latch(self, command: int, now: float):
+        """Latch a new laptop command from DB100"""
+        self.stats['commands'] += 1
+        self.active_command = command
+        self.request = {
+            'area': struct.unpack_from('>h', self.db100, DB100_AREA)[0],
+            'set_number': struct.unpack_from('>h', self.db100, DB100_SET)[0],
+            'x': struct.unpack_from('>l', self.db100, DB100_X)[0],
+            'y': struct.unpack_from('>l', self.db100, DB100_Y)[0],
+            'z': struct.unpack_from('>l', self.db100, DB100_Z)[0],
+            'rx': struct.unpack_from('>h', self.db100, DB100_RX)[0],
+            'ry': struct.unpack_from('>h', self.db100, DB100_RY)[0],
+            'rz': struct.unpack_from('>h', self.db100, DB100_RZ)[0],
+            'gripper': struct.unpack_from('>h', self.db100, DB100_GRIPPER)[0],
+            'speed': struct.unpack_from('>h', self.db100, DB100_SPEED)[0],
+            'motion_type': struct.unpack_from('>H', self.db100, DB100_MOTION_TYPE)[0],
+            'precision': struct.unpack_from('>H', self.db100, DB100_PRECISION)[0],
+        }
+
+        # Fault injection (safety commands are never faulted)
+        self.fault = None
+        if command not in self._immediate_commands():
+            roll = self.random.random()
+            if roll < self.config.drop_rate:
+                self.fault = 'drop'
+            elif roll < self.config.drop_rate + self.config.error_rate:
+                self.fault = 'error'
+            elif roll < self.config.drop_rate + self.config.error_rate + self.config.timeout_rate:
+                self.fault = 'timeout'
+
+        self.state = 'DROPPED' if self.fault == 'drop' else 'RECEIVED'
+        if self.fault == 'drop':
+            self.stats['dropped'] += 1
+        self.deadline = now + self._delay(self.config.pickup_delay)
+        self._set_status(1, 0)  # COMMAND_RECEIVED
+
+    def _immediate_commands(self) -> tuple:
+        """Safety commands: processed without delay, never faulted"""
+        return (5, 8) if self.config.extended_commands else (5,)
+
+    def _begin_processing(self, now: float):
+        """Start processing latched command"""
+        self.state = 'PROCESSING'
+        self._set_status(2)  # PROCESSING
+        delay = 0.0 if self.active_command in self._immediate_commands() else self.config.processing_delay
+        self.deadline = now + self._delay(delay)
+
+        if self.fault is not None:
+            return
+
+        command = self.active_command
+        request = self.request
+        # FC300 range-checks WRITE/READ only; EXECUTE leaves it to FC301 (3001)
+        checked = (1, 2, 3) if self.config.execute_completes_on_motion_end else (1, 2)
+        if command in checked and not self._valid_index(request['area'], request['set_number']):
+            self._finish(9, 1001)  # Invalid area/set number
+            return
+
+        if command == 3:
+            if self.config.execute_completes_on_motion_end:
+                self._start_motion(now)
+            else:
+                self.state = 'EXECUTING'
+                self._execute_scan(now)
+        elif command == 5 or (command == 8 and self.config.extended_commands):
+            self._abort_motion(ROBOT_EMERGENCY_STOP if command == 8 else ROBOT_IDLE)
+
+    def _execute_scan(self, now: float):
+        """FC300 command 3 as shipped: hand the set to FC301, never COMPLETED"""
+        if not self._robot_ready():
+            self._set_status(7, 2001)  # Robot not ready, command word stays 3
+            return
+        if self.motion is None:
+            self._start_motion(now)
+        self._set_status(6)  # BUSY: FC301 only succeeds in POSITION_REACHED, which is not ready
+
+    def _complete(self):
+        """Apply effect of processed command and report result"""
+        if self.fault == 'error':
+            self._finish(4, self.config.fault_error_code)
+            return
+        if self.fault == 'timeout':
+            self._finish(10, 10)
+            return
+
+        command = self.active_command
+        request = self.request
+
+        if command == 1:  # WRITE_COORDINATE
+            error_code = self._validate(request)
+            if error_code:
+                self._finish(9, error_code)
+                return
+            self._write_record(request['area'], request['set_number'], request)
+        elif command == 2:  # READ_COORDINATE
+            record = self._read_record(request['area'], request['set_number'])
+            struct.pack_into('>lll', self.db100, DB100_X, record['x'], record['y'], record['z'])
+            struct.pack_into('>hhhhh', self.db100, DB100_RX, record['rx'], record['ry'],
+                             record['rz'], record['gripper'], record['speed'])
+        elif command == 4:  # GET_POSITION
+            self.db100[DB100_X:DB100_RZ + 2] = self.db101[DB101_X:DB101_RZ + 2]
+            self.db100[DB100_GRIPPER:DB100_GRIPPER + 2] = self.db101[DB101_GRIPPER:DB101_GRIPPER + 2]
+        elif command == 6:  # RESET_ERROR
+            struct.pack_into('>H', self.db100, DB100_ERROR, 0)
+            struct.pack_into('>H', self.db101, DB101_ERROR, 0)
+            robot_status = struct.unpack_from('>H', self.db101, DB101_ROBOT_STATUS)[0]
+            if robot_status in (ROBOT_ERROR, ROBOT_EMERGENCY_STOP):
+                struct.pack_into('>H', self.db101, DB101_ROBOT_STATUS, ROBOT_WAITING)
+        elif command == 7:  # GET_STATUS
+            struct.pack_into('>HH', self.db100, DB100_AREA, self.last_area, self.last_set)
+            struct.pack_into('>H', self.db100, DB100_ERROR, self.stats['errors'] & 0xFFFF)
+        elif command == 9 and self.config.extended_commands:  # CLEAR_ALL
+            self.db102[:] = bytes(DB102_SIZE)
+        elif command == 10 and self.config.extended_commands:  # VALIDATE_COORDINATE
+            error_code = self._validate(request)
+            if error_code:
+                self._finish(9, error_code)
+                return
+        elif command not in (3,) + self._immediate_commands():
+            self._finish(4, 1000)  # Unknown command
+            return
+
+        self._finish(3, 0)
+
+    def _finish(self, status: int, error_code: int):
+        """Report terminal status and clear command word (FC300)"""
+        self.state = 'DONE'
+        self._set_status(status, error_code)
+        struct.pack_into('>H', self.db100, DB100_COMMAND, 0)
+        if status == 3:
+            self.stats['completed'] += 1
+        elif status == 10:
+            self.stats['timeouts'] += 1
+        else:
+            self.stats['errors'] += 1
+
+    # ------------------------------------------------------------------
+    # DB102 storage (FC302 / FC303)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _valid_index(area: int, set_number: int) -> bool:
+        return 1 <= area <= DB102_AREAS and 1 <= set_number <= DB102_SETS_PER_AREA
+
+    @staticmethod
+    def _validate(request: Dict[str, int]) -> int:
+        """FC303 range validation, returns error code (0 = valid)"""
+        for error_code, field in enumerate(('x', 'y', 'z', 'rx', 'ry', 'rz'), start=5002):
+            low, high = LIMITS[field]
+            if not low <= request[field] <= high:
+                return error_code
+        if not 0 <= request['gripper'] <= 2:
+            return 5008
+        low, high = LIMITS['speed']
+        if not low <= request['speed'] <= high:
+            return 5009
+        return 0
+
+    def _record_offset(self, area: int, set_number: int) -> int:
+        return ((area - 1) * DB102_SETS_PER_AREA + (set_number - 1)) * DB102_RECORD_SIZE
+
+    def _write_record(self, area: int, set_number: int, request: Dict[str, int]):
+        offset = self._record_offset(area, set_number)
+        struct.pack_into('>lllhhhhhBxH', self.db102, offset,
+                         request['x'], request['y'], request['z'],
+                         request['rx'], request['ry'], request['rz'],
+                         request['gripper'], request['speed'], 1, 0)
+        self.last_area, self.last_set = area, set_number
+
+    def _read_record(self, area: int, set_number: int) -> Dict[str, int]:
+        offset = self._record_offset(area, set_number)
+        x, y, z, rx, ry, rz, gripper, speed, valid, _ = struct.unpack_from('>lllhhhhhBxH', self.db102, offset)
+        self.last_area, self.last_set = area, set_number
+        return {'x': x, 'y': y, 'z': z, 'rx': rx, 'ry': ry, 'rz': rz,
+                'gripper': gripper, 'speed': speed, 'valid': valid & 1}
+
+    # ------------------------------------------------------------------
+    # Robot (FC301 / PLC_Interface.mod)
+    # ------------------------------------------------------------------
+
+    def _robot_position(self) -> Dict[str, int]:
+        x, y, z, rx, ry, rz = struct.unpack_from('>lllhhh', self.db101, DB101_X)
+        return {'x': x, 'y': y, 'z': z, 'rx': rx, 'ry': ry, 'rz': rz}
+
+    def _robot_ready(self) -> bool:
+        """FC301 RobotReady: IDLE or WAITING (POSITION_REACHED only as extension)"""
+        robot_status = struct.unpack_from('>H', self.db101, DB101_ROBOT_STATUS)[0]
+        ready = (ROBOT_IDLE, ROBOT_WAITING)
+        if self.config.ready_on_position_reached:
+            ready += (ROBOT_POSITION_REACHED,)
+        return robot_status in ready
+
+    def _start_motion(self, now: float):
+        """Hand the stored set to the robot (FC301 command 1)"""
+        extended = self.config.execute_completes_on_motion_end
+        if not self._robot_ready():
+            self._finish(7, 2001)  # Robot not ready
+            return
+
+        request = self.request
+        target = (self._read_record(request['area'], request['set_number'])
+                  if self._valid_index(request['area'], request['set_number']) else {'valid': 0})
+        if not target['valid']:
+            if extended:
+                self._finish(4, 3001)  # Invalid coordinate set
+            return  # FC301 error 3001, FC300 keeps reporting BUSY
+
+        start = self._robot_position()
+        distance = math.sqrt(sum((target[axis] - start[axis]) ** 2 for axis in ('x', 'y', 'z')))
+        speed = max(1, target['speed'])
+        duration = self._delay(self.config.motion_base_time + distance / (self.config.motion_speed * speed / 100.0))
+
+        self.motion = {'start': start, 'target': target, 't0': now, 'duration': duration,
+                       'area': request['area'], 'set_number': request['set_number']}
+        self.stats['motions'] += 1
+        struct.pack_into('>HHH', self.db101, DB101_ROBOT_STATUS, ROBOT_MOVING,
+                         request['area'], request['set_number'])
+        struct.pack_into('>H', self.db101, DB101_GRIPPER, target['gripper'])
+        struct.pack_into('>H', self.db101, DB101_SPEED, speed)
+        struct.pack_into('>H', self.db101, DB101_MOTION_STATUS, 1)
+        struct.pack_into('>H', self.db101, DB101_ROBOT_COMMAND, 1)
+
+    def _abort_motion(self, robot_status: int):
+        """Stop robot motion at current position"""
+        self.motion = None
+        struct.pack_into('>H', self.db101, DB101_ROBOT_STATUS, robot_status)
+        struct.pack_into('>H', self.db101, DB101_MOTION_STATUS, 0)
+        struct.pack_into('>H', self.db101, DB101_ROBOT_COMMAND, 0)
+
+    def _update_robot(self, now: float):
+        """Advance robot motion and refresh DB101 feedback"""
+        elapsed_ms = int((now - self.started_at) * 1000)
+        struct.pack_into('>L', self.db101, DB101_TIMESTAMP, elapsed_ms & 0xFFFFFFFF)
+
+        motion = self.motion
+        if motion is None:
+            return
+
+        progress = min(1.0, (now - motion['t0']) / motion['duration']) if motion['duration'] > 0 else 1.0
+        start, target = motion['start'], motion['target']
+        position = [int(round(start[axis] + (target[axis] - start[axis]) * progress))
+                    for axis in ('x', 'y', 'z', 'rx', 'ry', 'rz')]
+        struct.pack_into('>lllhhh', self.db101, DB101_X, *position)
+        struct.pack_into('>H', self.db101, DB101_PROGRESS, int(progress * 100))
+
+        if progress >= 1.0:
+            self.motion = None
+            struct.pack_into('>H', self.db101, DB101_ROBOT_STATUS, ROBOT_POSITION_REACHED)
+            struct.pack_into('>H', self.db101, DB101_MOTION_STATUS, 0)
+            struct.pack_into('>H', self.db101, DB101_ROBOT_COMMAND, 0)
+            struct.pack_into('>L', self.db101, DB101_EXECUTION_TIME, int((now - motion['t0']) * 1000))
+            if self.active_command == 3 and self.state == 'PROCESSING':
+                self._finish(3, 0)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get simulator statistics
+
+        Returns:
+            dict: Scan and command counters
+        """
+        return dict(self.stats, state=self.state, active_command=self.active_command)
+
+class LoopbackClient:
+    """
+    In-process client bound to a simulator
+
+    Implements the subset of snap7.client.Client used by PLCClient
+    (connect, disconnect, db_read, db_write) directly on the simulator's
+    DB images, for benchmarks that must exclude network time.
+    """
+
+    def __init__(self, simulator: PLCSimulator):
+        """
+        Initialize loopback client
+
+        Args:
+            simulator: Simulator whose data blocks are accessed
+        """
+        self.simulator = simulator
+        self.areas = {
+            DB100_NUMBER: simulator.db100,
+            DB101_NUMBER: simulator.db101,
+            DB102_NUMBER: simulator.db102
+        }
+
+    def connect(self, address: str, rack: int, slot: int, tcp_port: int = 102):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def db_read(self, db_number: int, start: int, size: int) -> bytearray:
+        area = self.areas[db_number]
+        return bytearray(memoryview(area).cast('B')[start:start + size])
+
+    def db_write(self, db_number: int, start: int, data: bytearray):
+        area = self.areas[db_number]
+        memoryview(area).cast('B')[start:start + len(data)] = data
+
+def main():
+    """Run simulator from the command line"""
+    parser = argparse.ArgumentParser(description="Offline S7 PLC simulator (DB100/DB101/DB102)")
+    parser.add_argument('--port', type=int, default=1102, help="TCP port (default 1102)")
+    parser.add_argument('--scan-time', type=float, default=0.01, help="PLC cycle time in seconds")
+    parser.add_argument('--processing-delay', type=float, default=0.02, help="Command processing delay in seconds")
+    parser.add_argument('--motion-time', type=float, default=0.2, help="Fixed motion overhead in seconds")
+    parser.add_argument('--motion-speed', type=float, default=1000.0, help="Robot speed in mm/s at 100%%")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Uniform jitter in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Probability of ERROR per command")
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help="Probability of TIMEOUT per command")
+    parser.add_argument('--drop-rate', type=float, default=0.0, help="Probability a command is never processed")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for repeatable runs")
+    parser.add_argument('--extended', action='store_true',
+                        help="Enable protocol extensions beyond FC300/FC301 as shipped (see SimulatorConfig)")
+    args = parser.parse_args()
+
+    config = (SimulatorConfig.extended if args.extended else SimulatorConfig)(
+        scan_time=args.scan_time,
+        processing_delay=args.processing_delay,
+        motion_base_time=args.motion_time,
+        motion_speed=args.motion_speed,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        drop_rate=args.drop_rate,
+        seed=args.seed
+    )
+
+    simulator = PLCSimulator(config)
+    simulator.start(args.port)
+    try:
+        while True:
+            time.sleep(10)
+            logging.getLogger(__name__).info(f"Simulator statistics: {simulator.get_statistics()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+
+if __name__ == "__main__":
+    main()
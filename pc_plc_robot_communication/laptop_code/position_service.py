@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Position Service
+================
+
+Description: Robot pose from a continuously refreshed DB101 snapshot
+Purpose: Serve position queries from memory instead of GET_POSITION command handshakes
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- DB101 current_* snapshot with a configurable maximum age
+- Concurrent callers coalesced into one in-flight DB101 read
+- DB101 reads made by the PLC client itself (motion polling) refresh the
+  snapshot at no extra cost
+- Optional background refresh thread
+- Hit/read/coalesce counters
+
+Usage:
+    positions = plc_client.positions
+    positions.start(interval=0.1)
+    pose = positions.get_position()             # Memory read if younger than max_age
+    pose = positions.get_position(max_age=0.0)  # Force a DB101 read
+"""
+
+import threading
+import time
+import logging
+from typing import Dict, Any, Optional
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class PositionService:
+    """
+    Position Service Class
+
+    Keeps the latest DB101 feedback of a PLCClient. A query younger than
+    max_age is answered from memory; otherwise one caller reads DB101 while
+    concurrent callers wait for that read instead of issuing their own.
+    """
+
+    def __init__(self, plc_client, max_age: float = 0.2):
+        """
+        Initialize position service
+
+        Args:
+            plc_client: PLCClient providing read_db101() and last_db101
+            max_age: Default maximum snapshot age in seconds
+        """
+        self.plc_client = plc_client
+        self.max_age = max_age
+        self.logger = logging.getLogger(__name__)
+        self.condition = threading.Condition()
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.snapshot_time = 0.0  # time.perf_counter() of the read
+        self.in_flight = False
+        self.last_read_ok = False
+        self.running = False
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.stats = {'requests': 0, 'memory_hits': 0, 'reads': 0, 'coalesced': 0, 'errors': 0}
+
+    def _adopt_client_read(self):
+        """Take over a newer DB101 read made by the client (caller holds lock)"""
+        client_time = self.plc_client.last_db101_time
+        if client_time > self.snapshot_time and self.plc_client.last_db101 is not None:
+            self.snapshot = self.plc_client.last_db101
+            self.snapshot_time = client_time
+
+    def get_feedback(self, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get DB101 feedback no older than max_age
+
+        Args:
+            max_age: Maximum age in seconds (default: self.max_age)
+
+        Returns:
+            dict: DB101 data structure (copy), None if the read failed
+        """
+        if max_age is None:
+            max_age = self.max_age
+        with self.condition:
+            self.stats['requests'] += 1
+            self._adopt_client_read()
+            if self.snapshot is not None and time.perf_counter() - self.snapshot_time <= max_age:
+                self.stats['memory_hits'] += 1
+                return dict(self.snapshot)
+            if self.in_flight:
+                # Coalesce into the running read
+                self.stats['coalesced'] += 1
+                while self.in_flight:
+                    self.condition.wait()
+                return dict(self.snapshot) if self.last_read_ok else None
+            self.in_flight = True
+
+        data = None
+        try:
+            data = self.plc_client.read_db101()
+        except Exception as e:
+            self.logger.error(f"Error refreshing robot position: {e}")
+
+        with self.condition:
+            self.in_flight = False
+            self.last_read_ok = data is not None
+            if data is not None:
+                self._adopt_client_read()
+                self.stats['reads'] += 1
+            else:
+                self.stats['errors'] += 1
+            self.condition.notify_all()
+        return dict(data) if data is not None else None
+
+    def get_position(self, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get robot pose no older than max_age
+
+        Args:
+            max_age: Maximum age in seconds (default: self.max_age)
+
+        Returns:
+            dict: x, y, z, rx, ry, rz, gripper (as PLCClient.get_current_position)
+                plus age_s, or None if the read failed
+        """
+        feedback = self.get_feedback(max_age)
+        if feedback is None:
+            return None
+        with self.condition:
+            snapshot_time = self.snapshot_time
+        return {
+            'x': feedback['current_x'],
+            'y': feedback['current_y'],
+            'z': feedback['current_z'],
+            'rx': feedback['current_rx'],
+            'ry': feedback['current_ry'],
+            'rz': feedback['current_rz'],
+            'gripper': feedback['gripper_feedback'],
+            'age_s': max(0.0, time.perf_counter() - snapshot_time)
+        }
+
+    def start(self, interval: float = 0.1):
+        """
+        Start background refresh
+
+        Args:
+            interval: Refresh period in seconds
+        """
+        if self.running:
+            return
+        self.running = True
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._refresh_loop, args=(interval,),
+                                       name="plc-position-refresh", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop background refresh"""
+        self.running = False
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+
+    def _refresh_loop(self, interval: float):
+        """Keep the snapshot younger than interval"""
+        while self.running and not self.stop_event.is_set():
+            if self.plc_client.connected:
+                self.get_feedback(max_age=interval)
+            self.stop_event.wait(interval)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get service statistics
+
+        Returns:
+            dict: Counters, memory hit ratio and snapshot age
+        """
+        with self.condition:
+            requests = self.stats['requests']
+            return {**self.stats,
+                    'hit_ratio': self.stats['memory_hits'] / requests if requests else 0.0,
+                    'age_s': time.perf_counter() - self.snapshot_time if self.snapshot else None}
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Sequence Optimizer
+==================
+
+Description: Reorders coordinate set sequences to shorten robot cycle time
+Purpose: Remove avoidable travel from operator-entered palletizing sequences
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- Ordering constraints: sets never move across an area change or a gripper
+  change (close-before-open and per-area grouping of the original are kept)
+- Nearest-neighbour construction + 2-opt improvement per segment
+- Travel distance or estimated motion time as objective
+- Distance matrix cached per recipe (set positions and speeds)
+- Move times from the learned MotionTimeModel once it has enough samples,
+  otherwise from a fixed overhead + speed estimate
+- Predicted and measured (DB101 execution_time) cycle-time savings
+
+Usage:
+    optimizer = SequenceOptimizer(coord_manager)
+    result = optimizer.optimize([(1, 3), (1, 1), (1, 2)])
+    print(result.get_summary())
+    result = optimizer.execute([(1, 3), (1, 1), (1, 2)], compare=True)
+"""
+
+import math
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass
+
+from coordinate_manager import CoordinateManager
+from motion_model import MotionTimeModel
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+SetKey = Tuple[int, int]  # (area, set_number)
+
+@dataclass
+class OptimizationResult:
+    """
+    Sequence optimization result data structure
+
+    Times are in seconds. Measured times are the sum of DB101 execution_time
+    over the sequence, None until that order has been executed.
+    """
+    original: List[SetKey]
+    optimized: List[SetKey]
+    predicted_original: float = 0.0
+    predicted_optimized: float = 0.0
+    distance_original: float = 0.0  # Travel in mm
+    distance_optimized: float = 0.0
+    measured_original: Optional[float] = None
+    measured_optimized: Optional[float] = None
+    error: str = ""
+
+    @property
+    def success(self) -> bool:
+        return not self.error
+
+    @property
+    def predicted_saving(self) -> float:
+        return self.predicted_original - self.predicted_optimized
+
+    @property
+    def measured_saving(self) -> Optional[float]:
+        if self.measured_original is None or self.measured_optimized is None:
+            return None
+        return self.measured_original - self.measured_optimized
+
+    def get_summary(self) -> str:
+        """Get optimization summary string"""
+        if self.error:
+            return f"Optimization failed: {self.error}"
+        summary = (f"{len(self.original)} sets: travel {self.distance_original:.0f} -> "
+                   f"{self.distance_optimized:.0f} mm, predicted {self.predicted_original:.2f} -> "
+                   f"{self.predicted_optimized:.2f} s (saving {self.predicted_saving:.2f} s)")
+        if self.measured_optimized is not None:
+            summary += ", measured "
+            if self.measured_original is not None:
+                summary += f"{self.measured_original:.2f} -> "
+            summary += f"{self.measured_optimized:.2f} s"
+            if self.measured_saving is not None:
+                summary += f" (saving {self.measured_saving:.2f} s)"
+        return summary
+
+class SequenceOptimizer:
+    """
+    Sequence Optimizer Class
+
+    Splits a sequence into segments of consecutive sets with the same area
+    and gripper command, then reorders the sets inside each segment. The
+    segment order is the operator's, so every pick (close) still comes
+    before the place (open) that follows it and areas are not interleaved.
+    """
+
+    def __init__(self, coord_manager: CoordinateManager, metric: str = "time",
+                 base_time: float = 0.2, max_speed: float = 1000.0, max_passes: int = 50,
+                 motion_model: Optional[MotionTimeModel] = None):
+        """
+        Initialize sequence optimizer
+
+        Args:
+            coord_manager: Coordinate manager holding the sets
+            metric: Objective, "time" (estimated motion time) or "distance"
+            base_time: Fixed overhead per motion in seconds (until the model is ready)
+            max_speed: TCP speed at 100% speed override in mm/s (until the model is ready)
+            max_passes: Maximum 2-opt passes per segment
+            motion_model: Learned move times (default: the PLC client's model)
+        """
+        self.coord_manager = coord_manager
+        self.motion_model = motion_model or coord_manager.plc_client.motion_model
+        self.metric = metric
+        self.base_time = base_time
+        self.max_speed = max_speed
+        self.max_passes = max_passes
+        self.logger = logging.getLogger(__name__)
+
+        # Recipe -> (key index, positions, distance matrix)
+        self._matrices: Dict[tuple, Tuple[Dict[SetKey, int], List[Tuple[int, ...]], List[List[float]]]] = {}
+        # Recipe -> (motion model version, time matrix)
+        self._time_matrices: Dict[tuple, Tuple[int, List[List[float]]]] = {}
+        # (recipe, order) -> measured cycle time in seconds
+        self.history: Dict[Tuple[tuple, Tuple[SetKey, ...]], float] = {}
+        self.stats = {'cache_hits': 0, 'cache_misses': 0}
+
+    def _recipe(self, sequence: List[SetKey]) -> Optional[Tuple[tuple, Dict[SetKey, Tuple[int, ...]]]]:
+        """
+        Get recipe key and set positions of a sequence
+
+        Args:
+            sequence: List of (area, set_number) tuples
+
+        Returns:
+            tuple: (recipe key, {set key: (x, y, z, rx, ry, rz, speed, gripper)}),
+                None if a set is missing
+        """
+        points = {}
+        for key in dict.fromkeys(sequence):
+            coord_set = self.coord_manager.get_coordinate_set(*key)
+            if not coord_set or not coord_set.coordinates:
+                self.logger.error(f"Coordinate set {key[1]} not found in area {key[0]}")
+                return None
+            # Same coordinate as write_coordinate_set_to_plc() sends
+            coord = coord_set.coordinates[0]
+            points[key] = (coord.x, coord.y, coord.z, coord.rx, coord.ry, coord.rz, coord.speed, coord.gripper)
+        return tuple(sorted(points.items())), points
+
+    def _matrix(self, recipe: tuple) -> Tuple[Dict[SetKey, int], List[Tuple[int, ...]],
+                                             List[List[float]], List[List[float]]]:
+        """Get cached distance matrix and current time matrix of a recipe"""
+        cached = self._matrices.get(recipe)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+        else:
+            self.stats['cache_misses'] += 1
+            index = {key: i for i, (key, _) in enumerate(recipe)}
+            positions = [point[:7] for _, point in recipe]
+            distance = [[math.dist(a[:3], b[:3]) for b in positions] for a in positions]
+            cached = self._matrices[recipe] = (index, positions, distance)
+        index, positions, distance = cached
+
+        # Time matrix follows the motion model as it learns
+        version = self.motion_model.version if self.motion_model else 0
+        timed = self._time_matrices.get(recipe)
+        if timed is None or timed[0] != version:
+            keys = [key for key, _ in recipe]
+            timed = self._time_matrices[recipe] = (
+                version, self._move_times([p[:6] for p in positions], keys, positions, distance))
+        return index, positions, distance, timed[1]
+
+    def _move_times(self, starts: List[Tuple[int, ...]], keys: List[SetKey],
+                    positions: List[Tuple[int, ...]], distances: List[List[float]]) -> List[List[float]]:
+        """
+        Estimate move times from start positions to every set
+
+        Args:
+            starts: Start positions (x, y, z, rx, ry, rz)
+            keys: Set keys of the targets
+            positions: Target (x, y, z, rx, ry, rz, speed)
+            distances: Distance from each start to each target in mm
+
+        Returns:
+            list: Rows of move times in seconds
+        """
+        rows = [[self._motion_time(d, positions[j][6]) for j, d in enumerate(row)] for row in distances]
+        if self.motion_model is None:
+            return rows
+        for area in sorted({key[0] for key in keys}):
+            columns = [j for j, key in enumerate(keys) if key[0] == area]
+            moves = [(start, positions[j][:6], positions[j][6], 1, 1) for start in starts for j in columns]
+            predicted = self.motion_model.predict_batch(area, moves)
+            if predicted is None:
+                continue
+            for n, value in enumerate(predicted):
+                rows[n // len(columns)][columns[n % len(columns)]] = value
+        return rows
+
+    def _motion_time(self, distance: float, speed: int) -> float:
+        """Estimate motion time in seconds for a distance at a speed override"""
+        return self.base_time + distance / (self.max_speed * max(1, speed) / 100.0)
+
+    def _cost(self, route: List[int], matrix: List[List[float]], first_cost) -> float:
+        """Cost of a route starting with the move to route[0]"""
+        if not route:
+            return 0.0
+        return first_cost(route[0]) + sum(matrix[a][b] for a, b in zip(route, route[1:]))
+
+    def _two_opt(self, route: List[int], matrix: List[List[float]], first_cost) -> List[int]:
+        """
+        Improve a route by segment reversal (asymmetric costs)
+
+        Forward/backward prefix sums give the cost of a reversed span in
+        O(1), so one pass is O(n^2) plus O(n) per accepted move.
+
+        Args:
+            route: Matrix indices in visiting order (open end)
+            matrix: Move cost matrix
+            first_cost: Cost of moving from the segment start to an index
+
+        Returns:
+            list: Improved route
+        """
+        n = len(route)
+
+        def prefix_sums():
+            forward, backward = [0.0], [0.0]
+            for a, b in zip(route, route[1:]):
+                forward.append(forward[-1] + matrix[a][b])
+                backward.append(backward[-1] + matrix[b][a])
+            return forward, backward
+
+        for _ in range(self.max_passes):
+            forward, backward = prefix_sums()
+            improved = False
+            for i in range(n - 1):
+                for j in range(i + 1, n):
+                    entry_old = first_cost(route[i]) if i == 0 else matrix[route[i - 1]][route[i]]
+                    entry_new = first_cost(route[j]) if i == 0 else matrix[route[i - 1]][route[j]]
+                    exit_old = matrix[route[j]][route[j + 1]] if j + 1 < n else 0.0
+                    exit_new = matrix[route[i]][route[j + 1]] if j + 1 < n else 0.0
+                    delta = (entry_new + backward[j] - backward[i] + exit_new
+                             - entry_old - forward[j] + forward[i] - exit_old)
+                    if delta < -1e-9:
+                        route[i:j + 1] = reversed(route[i:j + 1])
+                        forward, backward = prefix_sums()
+                        improved = True
+            if not improved:
+                break
+        return route
+
+    def _order_segment(self, items: List[int], matrix: List[List[float]], first_cost) -> List[int]:
+        """Nearest-neighbour construction followed by 2-opt"""
+        remaining = list(items)
+        route: List[int] = []
+        while remaining:
+            if route:
+                last = route[-1]
+                best = min(range(len(remaining)), key=lambda k: matrix[last][remaining[k]])
+            else:
+                best = min(range(len(remaining)), key=lambda k: first_cost(remaining[k]))
+            route.append(remaining.pop(best))
+        return self._two_opt(route, matrix, first_cost)
+
+    def optimize(self, sequence: List[SetKey],
+                 start_position: Optional[Dict[str, Any]] = None) -> OptimizationResult:
+        """
+        Reorder a sequence within its ordering constraints
+
+        Args:
+            sequence: List of (area, set_number) tuples
+            start_position: Robot position before the first move ({'x', 'y', 'z'[, 'rx', 'ry', 'rz']});
+                if None the first set of the sequence stays first
+
+        Returns:
+            OptimizationResult: Original/optimized order with predictions
+        """
+        sequence = [tuple(key) for key in sequence]
+        result = OptimizationResult(original=list(sequence), optimized=list(sequence))
+        if not sequence:
+            return result
+        recipe_points = self._recipe(sequence)
+        if recipe_points is None:
+            result.error = "Unknown coordinate set in sequence"
+            return result
+        recipe, points = recipe_points
+        index, positions, distance, time_matrix = self._matrix(recipe)
+        matrix = time_matrix if self.metric == "time" else distance
+
+        def start_costs(position: Optional[Tuple[int, ...]]):
+            """Cost functions (objective, distance, time) of the first move"""
+            if position is None:
+                return (lambda j: 0.0,) * 3
+            start_distance = [math.dist(position[:3], p[:3]) for p in positions]
+            start_time = self._move_times([position], [key for key, _ in recipe], positions, [start_distance])[0]
+            objective = start_time if self.metric == "time" else start_distance
+            return objective.__getitem__, start_distance.__getitem__, start_time.__getitem__
+
+        # Segments of consecutive sets with the same area and gripper command
+        segments: List[List[int]] = []
+        previous = None
+        for key in sequence:
+            group = (key[0], points[key][7])
+            if group != previous:
+                segments.append([])
+                previous = group
+            segments[-1].append(index[key])
+
+        start = None
+        if start_position is not None:
+            start = (start_position['x'], start_position['y'], start_position['z'],
+                     start_position.get('rx', 0), start_position.get('ry', 0), start_position.get('rz', 0))
+        route: List[int] = []
+        if start is None:
+            # Keep the first set, optimize from its position
+            route.append(segments[0].pop(0))
+        for items in segments:
+            if route:
+                first_cost = lambda j, last=route[-1]: matrix[last][j]
+            else:
+                first_cost = start_costs(start)[0]
+            route.extend(self._order_segment(items, matrix, first_cost))
+
+        keys = [key for key, _ in recipe]
+        original = [index[key] for key in sequence]
+        _, first_distance, first_time = start_costs(start)
+        result.optimized = [keys[i] for i in route]
+        result.distance_original = self._cost(original, distance, first_distance)
+        result.distance_optimized = self._cost(route, distance, first_distance)
+        result.predicted_original = self._cost(original, time_matrix, first_time)
+        result.predicted_optimized = self._cost(route, time_matrix, first_time)
+        if start is None:
+            # First move is not known, count it as a fixed overhead
+            result.predicted_original += self.base_time
+            result.predicted_optimized += self.base_time
+        result.measured_original = self.history.get((recipe, tuple(result.original)))
+        result.measured_optimized = self.history.get((recipe, tuple(result.optimized)))
+        return result
+
+    def record_run(self, sequence: List[SetKey], execution_times: List[int]) -> Optional[float]:
+        """
+        Record the measured cycle time of an executed order
+
+        Args:
+            sequence: Executed order
+            execution_times: DB101 execution_time per set in ms
+
+        Returns:
+            float: Measured cycle time in seconds, None if the run was incomplete
+        """
+        recipe_points = self._recipe(sequence)
+        if recipe_points is None or len(execution_times) != len(sequence):
+            return None
+        measured = sum(execution_times) / 1000.0
+        self.history[(recipe_points[0], tuple(tuple(key) for key in sequence))] = measured
+        return measured
+
+    def _run(self, sequence: List[SetKey]) -> bool:
+        """Execute an order pipelined and record its measured cycle time"""
+        success = self.coord_manager.execute_sequence_pipelined(sequence)
+        if success:
+            self.record_run(sequence, self.coord_manager.sequence_stats['execution_times'])
+        return success
+
+    def execute(self, sequence: List[SetKey], compare: bool = False) -> OptimizationResult:
+        """
+        Optimize and execute a sequence
+
+        Args:
+            sequence: List of (area, set_number) tuples
+            compare: Execute the original order first to measure the saving
+
+        Returns:
+            OptimizationResult: Including measured cycle times
+        """
+        positions = self.coord_manager.plc_client.positions
+        result = self.optimize(sequence, positions.get_position())
+        if not result.success:
+            self.logger.error(result.get_summary())
+            return result
+
+        if compare:
+            if not self._run(result.original):
+                result.error = "Original sequence failed"
+                return result
+            # The robot now stands at the end of the original order
+            measured_original = self.history.get((self._recipe(sequence)[0], tuple(result.original)))
+            result = self.optimize(sequence, positions.get_position())
+            result.measured_original = measured_original
+
+        if not self._run(result.optimized):
+            result.error = "Optimized sequence failed"
+            return result
+        result.measured_optimized = self.history.get((self._recipe(sequence)[0], tuple(result.optimized)))
+        self.logger.info(f"Sequence optimization: {result.get_summary()}")
+        return result
+
+# Example usage
+if __name__ == "__main__":
+    from plc_client import PLCClient
+
+    plc_client = PLCClient("192.168.1.100")
+    coord_manager = CoordinateManager(plc_client)
+    optimizer = SequenceOptimizer(coord_manager)
+
+    sequence = [(area, set_number) for area, set_number in coord_manager.coordinate_sets]
+    print(optimizer.optimize(sequence).get_summary())
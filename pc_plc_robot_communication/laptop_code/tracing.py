@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Command Tracing
+===============
+
+Description: End-to-end latency tracing for Laptop -> PLC -> Robot commands
+Purpose: Break down each command's wall time by stage (FC300, FC301, RAPID)
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- One trace per command with stage spans
+- Status word transitions (COMMAND_RECEIVED -> PROCESSING -> COMPLETED)
+- Correlation with DB101 feedback_timestamp / motion_status
+- Per-stage summary and JSON export for offline analysis
+"""
+
+import json
+import itertools
+import threading
+import time
+import logging
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Stage names in pipeline order
+STAGES = ('laptop_write', 'plc_pickup', 'plc_processing', 'robot_motion', 'completion_detect')
+
+@dataclass
+class TraceSpan:
+    """Trace span data structure (times in ms relative to trace start)"""
+    name: str
+    start_ms: float
+    end_ms: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.end_ms - self.start_ms
+
+@dataclass
+class CommandTrace:
+    """
+    Command trace data structure
+
+    Collects observations while a command is in flight; spans are derived
+    from them in finish().
+    """
+    trace_id: int
+    command: str
+    params: Dict[str, Any]
+    started_at: float  # wall clock (time.time())
+    t0: float  # time.perf_counter() at trace start
+    write_done_ms: Optional[float] = None
+    transitions: List[Dict[str, Any]] = field(default_factory=list)
+    feedback: List[Dict[str, Any]] = field(default_factory=list)
+    spans: List[TraceSpan] = field(default_factory=list)
+    success: Optional[bool] = None
+    message: str = ""
+    total_ms: float = 0.0
+
+    def elapsed_ms(self) -> float:
+        """Get milliseconds since trace start"""
+        return (time.perf_counter() - self.t0) * 1000.0
+
+    def first_transition(self, *statuses: str) -> Optional[float]:
+        """Get time of first observed transition into one of the statuses"""
+        for transition in self.transitions:
+            if transition['status'] in statuses:
+                return transition['t_ms']
+        return None
+
+    def stage_durations(self) -> Dict[str, float]:
+        """
+        Get duration per stage
+
+        Returns:
+            dict: Stage name -> duration in ms
+        """
+        return {span.name: span.duration_ms for span in self.spans}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert trace to JSON-serializable dictionary"""
+        data = asdict(self)
+        del data['t0']
+        data['stages'] = self.stage_durations()
+        return data
+
+class CommandTracer:
+    """
+    Command Tracer Class
+
+    Keeps a bounded history of finished command traces
+    """
+
+    TERMINAL_STATUSES = ('COMPLETED', 'ERROR', 'VALIDATION_FAILED', 'TIMEOUT')
+
+    def __init__(self, max_traces: int = 1000, enabled: bool = True):
+        """
+        Initialize command tracer
+
+        Args:
+            max_traces: Number of finished traces to keep
+            enabled: Record traces
+        """
+        self.enabled = enabled
+        self.traces: deque = deque(maxlen=max_traces)
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+
+    @property
+    def active(self) -> Optional[CommandTrace]:
+        """Trace in flight on the calling thread"""
+        return getattr(self._local, 'trace', None)
+
+    def start(self, command: str, **params) -> Optional[CommandTrace]:
+        """
+        Start trace for a command issued on the calling thread
+
+        Args:
+            command: Command name
+            **params: Command parameters (area, set_number, ...)
+
+        Returns:
+            CommandTrace or None if tracing disabled
+        """
+        if not self.enabled:
+            return None
+        # An unfinished previous trace (send without wait) is closed as-is
+        if self.active is not None:
+            self.finish(None, "Superseded by next command")
+        trace = CommandTrace(
+            trace_id=next(self._ids),
+            command=command,
+            params=params,
+            started_at=time.time(),
+            t0=time.perf_counter()
+        )
+        self._local.trace = trace
+        return trace
+
+    def mark_written(self):
+        """Mark end of the laptop -> DB100 write"""
+        trace = self.active
+        if trace is not None:
+            trace.write_done_ms = trace.elapsed_ms()
+
+    def observe_status(self, status: str, error_code: int = 0):
+        """
+        Record polled DB100 status word (only transitions are kept)
+
+        Args:
+            status: Status name
+            error_code: DB100 error code
+        """
+        trace = self.active
+        if trace is None:
+            return
+        if not trace.transitions or trace.transitions[-1]['status'] != status:
+            trace.transitions.append({'t_ms': trace.elapsed_ms(), 'status': status, 'error_code': error_code})
+
+    def observe_feedback(self, db101: Dict[str, Any]):
+        """
+        Record polled DB101 robot feedback (only changes are kept)
+
+        Args:
+            db101: DB101 data as returned by PLCClient.read_db101()
+        """
+        trace = self.active
+        if trace is None:
+            return
+        sample = {
+            'robot_status': db101.get('robot_status'),
+            'motion_status': db101.get('motion_status'),
+            'feedback_timestamp': db101.get('feedback_timestamp'),
+            'execution_time': db101.get('execution_time')
+        }
+        if trace.feedback:
+            last = trace.feedback[-1]
+            if all(last[key] == value for key, value in sample.items()):
+                return
+        sample['t_ms'] = trace.elapsed_ms()
+        trace.feedback.append(sample)
+
+    def finish(self, success: Optional[bool], message: str = "") -> Optional[CommandTrace]:
+        """
+        Finish active trace and derive stage spans
+
+        Args:
+            success: Command outcome (None if unknown)
+            message: Outcome message
+
+        Returns:
+            CommandTrace or None if no trace active
+        """
+        trace = self.active
+        if trace is None:
+            return None
+        self._local.trace = None
+
+        trace.total_ms = trace.elapsed_ms()
+        trace.success = success
+        trace.message = message
+        self._build_spans(trace)
+
+        with self.lock:
+            self.traces.append(trace)
+        return trace
+
+    def _build_spans(self, trace: CommandTrace):
+        """Derive stage spans from recorded observations"""
+        written = trace.write_done_ms if trace.write_done_ms is not None else 0.0
+        trace.spans.append(TraceSpan('laptop_write', 0.0, written))
+
+        if not trace.transitions:
+            return
+
+        picked_up = trace.first_transition('COMMAND_RECEIVED', 'PROCESSING', 'BUSY')
+        if picked_up is None:
+            picked_up = written
+        terminal = trace.first_transition(*self.TERMINAL_STATUSES)
+        end = terminal if terminal is not None else trace.total_ms
+
+        # FC300 has picked the command from DB100
+        trace.spans.append(TraceSpan('plc_pickup', written, picked_up))
+        trace.spans.append(TraceSpan('plc_processing', picked_up, end, {
+            'transitions': [t['status'] for t in trace.transitions]
+        }))
+
+        # Robot stage from DB101 motion_status (1 = motion in progress)
+        moving = [s for s in trace.feedback if s['motion_status'] == 1]
+        if moving:
+            motion_start = moving[0]['t_ms']
+            after = [s for s in trace.feedback if s['t_ms'] > moving[-1]['t_ms']]
+            motion_end = after[0]['t_ms'] if after else end
+            attributes = {}
+            stamps = [s['feedback_timestamp'] for s in trace.feedback if s['feedback_timestamp'] is not None]
+            if len(stamps) >= 2:
+                attributes['robot_clock_ms'] = stamps[-1] - stamps[0]
+            if trace.feedback[-1]['execution_time'] is not None:
+                attributes['execution_time'] = trace.feedback[-1]['execution_time']
+            trace.spans.append(TraceSpan('robot_motion', motion_start, motion_end, attributes))
+
+        # Time between terminal status and the laptop returning
+        if terminal is not None:
+            trace.spans.append(TraceSpan('completion_detect', terminal, trace.total_ms))
+
+    def get_traces(self, command: Optional[str] = None) -> List[CommandTrace]:
+        """
+        Get finished traces
+
+        Args:
+            command: Optional command name filter
+
+        Returns:
+            List of command traces
+        """
+        with self.lock:
+            traces = list(self.traces)
+        if command is not None:
+            traces = [t for t in traces if t.command == command]
+        return traces
+
+    def stage_summary(self, command: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize stage latency over finished traces
+
+        Args:
+            command: Optional command name filter
+
+        Returns:
+            dict: Stage -> {count, mean_ms, p95_ms, max_ms}
+        """
+        per_stage: Dict[str, List[float]] = {}
+        for trace in self.get_traces(command):
+            for name, duration in trace.stage_durations().items():
+                per_stage.setdefault(name, []).append(duration)
+            per_stage.setdefault('total', []).append(trace.total_ms)
+
+        summary = {}
+        for name in list(STAGES) + ['total']:
+            values = sorted(per_stage.get(name, []))
+            if not values:
+                continue
+            summary[name] = {
+                'count': len(values),
+                'mean_ms': sum(values) / len(values),
+                'p95_ms': values[min(len(values) - 1, int(len(values) * 0.95))],
+                'max_ms': values[-1]
+            }
+        return summary
+
+    def export_json(self, file_path: str, command: Optional[str] = None) -> bool:
+        """
+        Export finished traces to JSON file
+
+        Args:
+            file_path: Output file path
+            command: Optional command name filter
+
+        Returns:
+            bool: True if successful
+        """
+        try:
+            data = {
+                'exported_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+                'summary': self.stage_summary(command),
+                'traces': [trace.to_dict() for trace in self.get_traces(command)]
+            }
+            with open(file_path, 'w') as f:
+                json.dump(data, f, indent=2)
+            self.logger.info(f"Exported {len(data['traces'])} traces to {file_path}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error exporting traces: {e}")
+            return False
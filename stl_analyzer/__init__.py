@@ -0,0 +1,52 @@
+"""
+STL Analyzer
+============
+
+Description: Static analysis toolkit for the S7-400H STL/AWL program
+Purpose: Replace hand tracing of STL_Program.txt with parsed, indexed data
+Version: 1.0
+Date: 17/07/2025
+
+Modules:
+- nodes: AST data structures
+- parser: Streaming STL/AWL parser
+- xref: Operand cross-reference index with binary persistence
+- callgraph: Block call graph with cycle detection
+- cost: Static scan-cycle cost model per OB
+- cache: Incremental re-analysis with a per-block content-hash cache
+- project: Parallel multi-file analysis into a SQLite project database
+- layout: S7 data layout (DB, instance DB, TEMP and parameter offsets) and constants
+- iomap: plc_io.txt I/O list reader
+- dbimage: Data block initial images with typed, zero-copy views
+- signalflow: Incremental signal-flow report generator
+- query: Transitive dataflow queries over CSR adjacency arrays
+- interpreter: Offline STL execution of OB1/OB35 against recorded inputs
+- compiler: Network-to-Python compilation with an on-disk code cache
+"""
+
+from .nodes import Address, Block, CallInfo, Instruction, Network, Program, Variable
+from .cache import AnalysisResult, IncrementalAnalyzer
+from .callgraph import CallGraph, CallSite
+from .cost import BlockCost, CostModel
+from .compiler import CompiledInterpreter
+from .dbimage import DBImage, db_image, load_db_images
+from .interpreter import STLInterpreter, SimulationResult, load_recording
+from .iomap import IOMap, IOPoint, load_io_map
+from .layout import Field, Layout, compute_layout, db_layout, parse_constant
+from .signalflow import SignalFlowReport
+from .query import QueryEngine
+from .project import ProjectAnalyzer, ProjectDatabase, discover_sources
+from .xref import CrossReference, Reference, load_or_build
+from .parser import STLParser, iter_blocks, iter_file_blocks, normalize_operand, parse_file, parse_text
+
+__all__ = [
+    'Address', 'Block', 'CallInfo', 'Instruction', 'Network', 'Program', 'Variable',
+    'AnalysisResult', 'IncrementalAnalyzer',
+    'CallGraph', 'CallSite', 'BlockCost', 'CostModel',
+    'CompiledInterpreter', 'STLInterpreter', 'SimulationResult', 'load_recording',
+    'IOMap', 'IOPoint', 'load_io_map', 'DBImage', 'db_image', 'load_db_images',
+    'Field', 'Layout', 'compute_layout', 'db_layout', 'parse_constant',
+    'SignalFlowReport', 'QueryEngine', 'ProjectAnalyzer', 'ProjectDatabase', 'discover_sources',
+    'CrossReference', 'Reference', 'load_or_build',
+    'STLParser', 'iter_blocks', 'iter_file_blocks', 'normalize_operand', 'parse_file', 'parse_text'
+]
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+STL Analyzer Command Line
+=========================
+
+Description: Command line entry point for the stl_analyzer package
+Purpose: Parse STL/AWL sources and print block statistics
+Version: 1.0
+Date: 17/07/2025
+
+Usage:
+    python -m stl_analyzer parse STL_Program.txt
+    python -m stl_analyzer parse STL_Program.txt --blocks
+    python -m stl_analyzer xref STL_Program.txt "DB10.DBW 100" --writers
+    python -m stl_analyzer calls STL_Program.txt --tree OB1
+    python -m stl_analyzer analyze STL_Program.txt --watch
+    python -m stl_analyzer project plant_exports/ --db project.db --lookup "M 12.0"
+    python -m stl_analyzer simulate STL_Program.txt --inputs recording.csv --scans 1000
+    python -m stl_analyzer simulate STL_Program.txt --compiled --benchmark
+    python -m stl_analyzer db STL_Program.txt DB1 --view INT:0:16 --hex
+    python -m stl_analyzer flow STL_Program.txt -o signal_flow.txt --watch
+    python -m stl_analyzer query STL_Program.txt influenced "I 0.1" Q
+    python -m stl_analyzer query STL_Program.txt        (interactive prompt)
+    python -m stl_analyzer cost STL_Program.txt \
+        --extra pc_plc_robot_communication/plc_code/*.awl --append OB1=SNIPPET1:1
+"""
+
+import argparse
+import os
+import shlex
+import sys
+import time
+import logging
+
+from .cache import IncrementalAnalyzer
+from .callgraph import CallGraph
+from .cost import CostModel, budget_report, load_cycle_budgets
+from .compiler import CompiledInterpreter, benchmark
+from .dbimage import load_db_images
+from .interpreter import STLInterpreter, load_recording
+from .iomap import load_io_map
+from .nodes import Block, Program
+from .parser import iter_file_blocks, normalize_operand, parse_file
+from .query import QueryEngine
+from .signalflow import SignalFlowReport
+from .project import ProjectAnalyzer, ProjectDatabase, discover_sources
+from .xref import load_or_build
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def cmd_parse(args) -> int:
+    """Parse files and print statistics"""
+    for file_path in args.files:
+        started = time.perf_counter()
+        blocks = networks = instructions = lines = 0
+        for block in iter_file_blocks(file_path):
+            blocks += 1
+            networks += len(block.networks)
+            instructions += block.instruction_count()
+            lines = block.end_line
+            if args.blocks:
+                print(f"  {block.name:12s} {block.kind:8s} lines {block.start_line:6d}-{block.end_line:<6d} "
+                      f"{len(block.networks):4d} networks {block.instruction_count():6d} instructions")
+        elapsed = time.perf_counter() - started
+        print(f"{file_path}: {blocks} blocks, {networks} networks, {instructions} instructions, "
+              f"{lines} lines in {elapsed * 1000:.1f} ms")
+    return 0
+
+def cmd_xref(args) -> int:
+    """Look up operands in the persisted cross-reference index"""
+    started = time.perf_counter()
+    index = load_or_build(args.source, args.index)
+    if not args.operands:
+        for key, value in index.statistics().items():
+            print(f"{key:20s} {value}")
+    for operand in args.operands:
+        if args.overlap:
+            found = index.overlapping(operand)
+        else:
+            found = {normalize_operand(operand)[0]: index.lookup(operand)}
+        for key, references in found.items():
+            if args.writers:
+                references = [r for r in references if r.access != 'R']
+            elif args.readers:
+                references = [r for r in references if r.access != 'W']
+            print(f"{key}: {len(references)} references")
+            for reference in references:
+                param = f" ({reference.param})" if reference.param else ""
+                print(f"  {reference.access:2s} {reference.block:10s} NW{reference.network:<4d} "
+                      f"line {reference.line:6d}  {reference.op}{param}")
+    print(f"Query time {(time.perf_counter() - started) * 1000:.1f} ms")
+    return 0
+
+def cmd_calls(args) -> int:
+    """Print call graph information"""
+    graph = CallGraph.build(iter_file_blocks(args.source))
+    for key, value in graph.statistics().items():
+        print(f"{key:20s} {value}")
+    cycles = graph.cycles()
+    for cycle in cycles:
+        print(f"CYCLE: {' -> '.join(cycle)}")
+    if args.external:
+        for target, count in graph.external().items():
+            print(f"  external {target:12s} {count} call sites")
+    for name in args.callers or []:
+        print(f"{name} called by: " + ", ".join(f"{caller} x{count}" for caller, count in sorted(graph.callers(name).items())))
+    for root in args.tree or []:
+        print("\n".join(graph.format_tree(root, args.depth)))
+    return 1 if cycles else 0
+
+def _network_slice(block: Block, indexes: list) -> Block:
+    """Copy of a block restricted to some networks"""
+    part = Block(block.kind, block.number, f"{block.name}:{','.join(map(str, indexes))}")
+    part.networks = [network for network in block.networks if network.index in indexes]
+    return part
+
+def _load_program(source: str, extras) -> Program:
+    """Parse the main source plus additional sources (blocks already present are kept)"""
+    program = parse_file(source)
+    for extra in extras or []:
+        for block in iter_file_blocks(extra):
+            if program.get(block.name) is None:
+                program.add(block)
+            else:
+                logging.getLogger(__name__).info(f"{block.name} from {extra} already in program, skipped")
+    return program
+
+def cmd_cost(args) -> int:
+    """Print per-OB cost estimates and budget utilization"""
+    program = _load_program(args.source, args.extra)
+    model = CostModel(program, loop_bound=args.loop_bound, scale=args.scale)
+    budgets = load_cycle_budgets(args.config)
+    print(f"{'OB':8s} {'instr':>7s} {'expanded':>9s} {'worst instr':>12s} {'worst ms':>9s} {'budget':>7s} {'util':>7s}  loops")
+    for row in budget_report(model.ob_costs(), budgets):
+        budget = f"{row['budget_ms']:.0f}" if row['budget_ms'] else "-"
+        utilization = f"{row['utilization']:.1%}" if row['utilization'] is not None else "-"
+        print(f"{row['ob']:8s} {row['instructions']:7d} {row['expanded_instructions']:9d} "
+              f"{row['worst_path_instructions']:12d} {row['worst_path_ms']:9.3f} {budget:>7s} {utilization:>7s}  "
+              f"{row['loops']} ({row['unbounded_loops']} assumed x{args.loop_bound})"
+              + (f"  not costed: {', '.join(row['uncosted_blocks'])}" if row['uncosted_blocks'] else ""))
+
+    exit_code = 0
+    for spec in args.append or []:
+        ob, _, target = spec.partition('=')
+        name, _, networks = target.partition(':')
+        block = program.get(name)
+        if block is None:
+            print(f"Unknown block {name} in --append {spec}")
+            return 2
+        if networks:
+            block = _network_slice(block, [int(n) for n in networks.split(',')])
+            program.add(block)
+        before = model.block_cost(ob)
+        after = model.with_appended(ob, [block.name])
+        budget = budgets.get(ob.upper())
+        print(f"\n{ob} + {target}:")
+        if model.block_cost(block.name).scl:
+            print(f"  {block.name} is SCL source: not costed")
+            continue
+        print(f"  worst path {before.worst_path_ms:.3f} ms -> {after.worst_path_ms:.3f} ms "
+              f"(+{after.worst_path_ms - before.worst_path_ms:.3f} ms, "
+              f"+{after.worst_path_instructions - before.worst_path_instructions} instructions)")
+        for callee in sorted(CallGraph.build([block]).callees(block.name)):
+            cost = model.block_cost(callee)
+            if cost.scl:
+                print(f"  {callee:8s} SCL source, not costed")
+            else:
+                print(f"  {callee:8s} {cost.instructions:5d} instructions, worst path {cost.worst_path_ms:.3f} ms")
+        uncosted = [name for name in after.uncosted_blocks if name not in before.uncosted_blocks]
+        if uncosted:
+            print(f"  excludes SCL blocks (not costed): {', '.join(uncosted)}")
+        if budget:
+            print(f"  budget {budget:.0f} ms: {before.worst_path_ms / budget:.1%} -> {after.worst_path_ms / budget:.1%}")
+            if after.worst_path_ms > budget * args.warn:
+                print(f"  WARNING: above {args.warn:.0%} of the {ob} budget")
+                exit_code = 1
+    return exit_code
+
+def cmd_analyze(args) -> int:
+    """Run incremental analysis once or on every change of the source"""
+    analyzer = IncrementalAnalyzer(args.source, args.cache)
+    last_mtime = None
+    while True:
+        mtime = os.path.getmtime(args.source)
+        if mtime != last_mtime:
+            last_mtime = mtime
+            result = analyzer.analyze()
+            print(f"{time.strftime('%H:%M:%S')} {len(result.program)} blocks, "
+                  f"{len(result.xref.references)} operands in {result.elapsed_ms:.1f} ms - "
+                  f"parsed {', '.join(result.parsed) or 'none'}; {len(result.relocated)} relocated, "
+                  f"{result.reused} reused" + (f"; removed {', '.join(result.removed)}" if result.removed else ""))
+            if result.affected and result.parsed != [block.name for block in result.program]:
+                print(f"  affected: {', '.join(result.affected)}")
+        if not args.watch:
+            return 0
+        time.sleep(args.interval)
+
+def cmd_project(args) -> int:
+    """Analyze many sources in parallel into a project database and query it"""
+    paths = discover_sources(args.paths, args.pattern) if args.pattern else discover_sources(args.paths)
+    database = ProjectDatabase(args.db)
+    try:
+        if paths:
+            summary = ProjectAnalyzer(database, args.workers).run(paths, progress=not args.quiet, force=args.force)
+            print(f"{summary['files']} files, {summary['analyzed']} analyzed, {summary['skipped']} unchanged, "
+                  f"{summary['removed']} removed: {summary['lines']:,} lines in {summary['elapsed_s']:.2f} s "
+                  f"({summary['lines_per_s']:,.0f} lines/s)")
+        stats = database.statistics()
+        print(f"Project DB {args.db}: {stats['files']} files, {stats['blocks']} blocks, "
+              f"{stats['operands']} operands, {stats['refs']} references, {stats['calls']} call edges")
+        for operand in args.lookup or []:
+            print(f"\n{normalize_operand(operand)[0]}:")
+            for ref in database.lookup(operand):
+                print(f"  {ref['access']:<2} {os.path.basename(ref['file'])}:{ref['line']} "
+                      f"{ref['block']} NW{ref['network']} {ref['op']}" + (f" ({ref['param']})" if ref['param'] else ""))
+        for name in args.block or []:
+            print(f"\n{name.upper()}:")
+            for block in database.find_block(name):
+                print(f"  {os.path.basename(block['file'])}:{block['start_line']}-{block['end_line']} "
+                      f"{block['networks']} networks, {block['instructions']} instructions")
+            for caller in database.callers(name):
+                print(f"  called by {caller['caller']} x{caller['count']} in {os.path.basename(caller['file'])}")
+    finally:
+        database.close()
+    return 1 if stats['errors'] else 0
+
+def cmd_simulate(args) -> int:
+    """Run OB100 and N scans of OB1/OB35 offline and print output changes"""
+    program = _load_program(args.source, args.extra)
+    io_map = load_io_map(args.io)
+    budgets = load_cycle_budgets(args.config)
+    scan_time = args.scan_time or budgets.get('OB1', 10.0)
+    cyclic = {name: period for name, period in budgets.items() if name != 'OB1' and program.get(name) is not None}
+    recording = load_recording(args.inputs) if args.inputs else {}
+    for spec in args.set or []:
+        signal, _, value = spec.partition('=')
+        recording.setdefault(0, []).append((signal, int(value or 1, 0)))
+
+    if args.benchmark:
+        report = benchmark(program, io_map, args.scans, scan_time, cyclic, recording, args.cache_dir)
+        stats = report['compile']
+        print(f"interpreter {report['interpreter_scans_per_s']:,.0f} scans/s, compiled "
+              f"{report['compiled_scans_per_s']:,.0f} scans/s ({report['speedup']:.2f}x) over {args.scans} scans")
+        print(f"compile: {stats['compiled']} blocks compiled, {stats['cached']} from cache, "
+              f"{stats['fallbacks']} interpreter fallbacks, {stats['compile_ms']:.0f} ms")
+        print("outputs identical" if report['identical'] else "WARNING: backends disagree")
+        return 0 if report['identical'] else 1
+
+    if args.compiled:
+        simulator = CompiledInterpreter(program, io_map, scan_time_ms=scan_time, cyclic=cyclic,
+                                        cache_dir=args.cache_dir)
+        stats = simulator.compile_all()
+        print(f"compiled {stats['compiled']} blocks, {stats['cached']} from cache in {stats['compile_ms']:.0f} ms")
+    else:
+        simulator = STLInterpreter(program, io_map, scan_time_ms=scan_time, cyclic=cyclic)
+    result = simulator.run(args.scans, recording)
+
+    print(f"{result.scans} scans ({scan_time:g} ms, cyclic {', '.join(f'{k} {v:g} ms' for k, v in cyclic.items()) or 'none'}) "
+          f"in {result.elapsed_s:.2f} s: {result.scans_per_s:,.0f} scans/s, {result.faults} faults")
+    for scan, address, value in result.output_changes[:args.limit]:
+        point = io_map.get(address)
+        label = f"{point.tag} {point.description}" if point else ""
+        print(f"  scan {scan:6d} t={scan * scan_time / 1000.0:8.2f} s  {address:8s} -> {value}  {label}".rstrip())
+    if len(result.output_changes) > args.limit:
+        print(f"  ... {len(result.output_changes) - args.limit} more output changes")
+    for fault in simulator.faults[:10]:
+        print(f"  fault: {fault}")
+    if result.external_calls:
+        print("External calls (not simulated): " +
+              ", ".join(f"{name} x{count}" for name, count in sorted(result.external_calls.items())))
+    if result.unsupported:
+        print("Unsupported: " + ", ".join(f"{op} x{count}" for op, count in sorted(result.unsupported.items())))
+    if args.coverage:
+        for name, gaps in sorted(simulator.coverage().items()):
+            print(f"  {name}: " + ", ".join(f"{op} x{count}" for op, count in sorted(gaps.items())))
+    return 1 if result.faults else 0
+
+def cmd_db(args) -> int:
+    """Print initial images of data blocks as typed values"""
+    images = load_db_images(args.source, args.blocks)
+    if not images:
+        return 1
+    for name, image in images.items():
+        print(f"{name}: {len(image)} bytes, {len(image.layout.fields)} fields")
+        if args.hex:
+            for line in image.hexdump():
+                print(f"  {line}")
+        for spec in args.view or []:
+            type_name, _, rest = spec.partition(':')
+            offset, _, count = rest.partition(':')
+            try:
+                values = image.view(type_name, int(offset or 0), int(count) if count else None)
+            except (KeyError, ValueError) as e:
+                print(f"  {spec}: {e}")
+                continue
+            print(f"  {type_name.upper()} @ {int(offset or 0)}: {values.tolist()}")
+        for path in args.field or []:
+            value = image.field(path)
+            # NumPy arrays/scalars and TypedView print as plain Python values
+            print(f"  {path} = {value.tolist() if hasattr(value, 'tolist') else value}")
+    return 0
+
+def cmd_flow(args) -> int:
+    """Generate the signal-flow report once or on every change of the source"""
+    report = SignalFlowReport(args.source, args.io, args.output, load_cycle_budgets(args.config))
+    last_mtime = None
+    while True:
+        mtime = (os.path.getmtime(args.source), os.path.getmtime(args.io) if os.path.exists(args.io) else 0)
+        if mtime != last_mtime:
+            last_mtime = mtime
+            summary = report.render()
+            print(f"{time.strftime('%H:%M:%S')} {summary['output']}: {len(summary['rendered'])}/{summary['sections']} "
+                  f"sections rendered in {summary['elapsed_ms']:.1f} ms"
+                  + (f" (changed {', '.join(summary['changed_blocks'])})"
+                     if summary['changed_blocks'] and len(summary['changed_blocks']) <= 10 else ""))
+        if not args.watch:
+            return 0
+        time.sleep(args.interval)
+
+def cmd_query(args) -> int:
+    """Run dataflow queries once or at an interactive prompt"""
+    engine = QueryEngine.from_source(args.source, persist=not args.no_cache)
+    stats = engine.statistics()
+    print(f"{args.source}: {stats['nodes']} nodes, {stats['edges']} edges, built in {stats['build_ms']} ms")
+    if args.query:
+        print("\n".join(engine.execute(' '.join(shlex.quote(word) for word in args.query))))
+        return 0
+    print("Type 'help' for the query forms, 'quit' to exit")
+    while True:
+        try:
+            text = input("query> ").strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            return 0
+        if text.lower() in ('quit', 'exit', 'q'):
+            return 0
+        if text:
+            print("\n".join(engine.execute(text)))
+
+def main(argv=None) -> int:
+    """Run the command line interface"""
+    parser = argparse.ArgumentParser(prog="python -m stl_analyzer", description="S7 STL/AWL static analysis")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parse = commands.add_parser('parse', help="Parse sources and print block statistics")
+    parse.add_argument('files', nargs='+', help="STL/AWL source files")
+    parse.add_argument('--blocks', action='store_true', help="List every block")
+    parse.set_defaults(func=cmd_parse)
+
+    xref = commands.add_parser('xref', help="Query the operand cross-reference index")
+    xref.add_argument('source', help="STL/AWL source file")
+    xref.add_argument('operands', nargs='*', help="Operands to look up ('DB10.DBW 100', 'M 12.0')")
+    xref.add_argument('--index', help="Index file (default <source>.xref)")
+    access = xref.add_mutually_exclusive_group()
+    access.add_argument('--writers', action='store_true', help="Only show writes")
+    access.add_argument('--readers', action='store_true', help="Only show reads")
+    xref.add_argument('--overlap', action='store_true', help="Include operands sharing a byte (MB 12 for M 12.0)")
+    xref.set_defaults(func=cmd_xref)
+
+    calls = commands.add_parser('calls', help="Call graph, cycles and external calls")
+    calls.add_argument('source', help="STL/AWL source file")
+    calls.add_argument('--tree', nargs='*', help="Print call tree below these blocks")
+    calls.add_argument('--depth', type=int, help="Call tree depth limit")
+    calls.add_argument('--callers', nargs='*', help="Print callers of these blocks")
+    calls.add_argument('--external', action='store_true', help="List calls to blocks not in the source")
+    calls.set_defaults(func=cmd_calls)
+
+    cost = commands.add_parser('cost', help="Static scan-cycle cost per OB")
+    cost.add_argument('source', help="STL/AWL source file")
+    cost.add_argument('--extra', nargs='*', help="Additional sources (e.g. plc_code/*.awl)")
+    cost.add_argument('--append', action='append',
+                      help="OB=BLOCK[:networks] - estimate OB with the block's networks appended")
+    cost.add_argument('--config', default="pc_plc_robot_communication/config/network_config.json",
+                      help="network_config.json with plc_configuration.cycle_time budgets")
+    cost.add_argument('--loop-bound', type=int, default=10, help="Iterations assumed for unbounded loops")
+    cost.add_argument('--scale', type=float, default=1.0, help="Calibration factor for all weights")
+    cost.add_argument('--warn', type=float, default=0.5, help="Warn above this fraction of the budget")
+    cost.set_defaults(func=cmd_cost)
+
+    analyze = commands.add_parser('analyze', help="Incremental analysis with the per-block cache")
+    analyze.add_argument('source', help="STL/AWL source file")
+    analyze.add_argument('--cache', help="Cache file (default <source>.stlcache)")
+    analyze.add_argument('--watch', action='store_true', help="Re-analyze whenever the source changes")
+    analyze.add_argument('--interval', type=float, default=0.5, help="Watch poll interval in seconds")
+    analyze.set_defaults(func=cmd_analyze)
+
+    project = commands.add_parser('project', help="Parallel analysis of many sources into a project database")
+    project.add_argument('paths', nargs='*', help="Source files and/or directories")
+    project.add_argument('--db', default="stl_project.db", help="SQLite project database")
+    project.add_argument('--pattern', action='append', help="Glob used inside directories (default *.awl, *.stl)")
+    project.add_argument('--workers', type=int, help="Worker processes (default CPU count)")
+    project.add_argument('--force', action='store_true', help="Re-analyze unchanged files")
+    project.add_argument('--quiet', action='store_true', help="No progress bar")
+    project.add_argument('--lookup', nargs='*', help="Operands to look up across all files")
+    project.add_argument('--block', nargs='*', help="Blocks to locate, with their callers")
+    project.set_defaults(func=cmd_project)
+
+    simulate = commands.add_parser('simulate', help="Execute OB1/OB35 offline against recorded inputs")
+    simulate.add_argument('source', help="STL/AWL source file")
+    simulate.add_argument('--extra', nargs='*', help="Additional sources (e.g. plc_code/*.awl)")
+    simulate.add_argument('--io', default="plc_io.txt", help="I/O list used for device tags")
+    simulate.add_argument('--inputs', help="CSV recording with scan,signal,value columns")
+    simulate.add_argument('--set', action='append', help="SIGNAL=VALUE applied before the first scan ('-KA1=1')")
+    simulate.add_argument('--scans', type=int, default=1000, help="Number of OB1 scans")
+    simulate.add_argument('--scan-time', type=float, help="Simulated OB1 cycle in ms (default from --config)")
+    simulate.add_argument('--config', default="pc_plc_robot_communication/config/network_config.json",
+                          help="network_config.json with plc_configuration.cycle_time (OB1 and cyclic OBs)")
+    simulate.add_argument('--limit', type=int, default=50, help="Output changes to print")
+    simulate.add_argument('--coverage', action='store_true', help="List unsupported instructions per block")
+    simulate.add_argument('--compiled', action='store_true', help="Run networks as generated Python functions")
+    simulate.add_argument('--benchmark', action='store_true', help="Compare interpreter and compiled scans/s")
+    simulate.add_argument('--cache-dir', default=".stl_code", help="Compiled code cache directory")
+    simulate.set_defaults(func=cmd_simulate)
+
+    db = commands.add_parser('db', help="Decode data block initial values into typed views")
+    db.add_argument('source', help="STL/AWL source file")
+    db.add_argument('blocks', nargs='*', help="Data blocks (default all)")
+    db.add_argument('--view', action='append', help="TYPE[:offset[:count]] - e.g. INT:0:16, REAL:40:4")
+    db.add_argument('--field', action='append', help="Declared variable path ('STAT0[-32767]')")
+    db.add_argument('--hex', action='store_true', help="Hex dump of the image")
+    db.set_defaults(func=cmd_db)
+
+    flow = commands.add_parser('flow', help="Generate the signal-flow report from the analysis index")
+    flow.add_argument('source', help="STL/AWL source file")
+    flow.add_argument('-o', '--output', help="Report file (default <source>.signal_flow.txt)")
+    flow.add_argument('--io', default="plc_io.txt", help="I/O list used for device tags")
+    flow.add_argument('--config', default="pc_plc_robot_communication/config/network_config.json",
+                      help="network_config.json with plc_configuration.cycle_time")
+    flow.add_argument('--watch', action='store_true', help="Regenerate whenever the source or I/O list changes")
+    flow.add_argument('--interval', type=float, default=0.5, help="Watch poll interval in seconds")
+    flow.set_defaults(func=cmd_flow)
+
+    query = commands.add_parser('query', help="Transitive dataflow queries (influence, paths, dead markers)")
+    query.add_argument('source', help="STL/AWL source file")
+    query.add_argument('query', nargs='*',
+                       help="influenced OPERAND [AREA] | influencing OPERAND [AREA] | between A B | path A B | "
+                            "dead [bits] | stats (interactive prompt when omitted)")
+    query.add_argument('--no-cache', action='store_true', help="Do not read/write the per-block analysis cache")
+    query.set_defaults(func=cmd_query)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
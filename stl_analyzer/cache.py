@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+STL Incremental Analysis Cache
+==============================
+
+Description: Per-block content-hash cache for parse, xref and call graph results
+Purpose: Re-analyze only the blocks that changed after an edit
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- Source split into chunks at block headers, one digest per chunk
+- Cached AST, references and call sites reused for unchanged chunks
+  (line numbers shifted when earlier blocks grew or shrank)
+- Only changed/removed blocks are re-merged into the cross-reference
+  index and call graph; callers are re-merged when a block's parameter
+  interface changes
+- Cache persisted next to the source (pickle) for the next session
+"""
+
+import hashlib
+import os
+import pickle
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from .callgraph import CallGraph, CallSite, block_call_sites
+from .nodes import Block, Network, Program
+from .parser import HEADER_KEYWORDS, HEADER_RE, STLParser
+from .xref import CrossReference, Reference, block_interface, block_references
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+class BlockFragment(NamedTuple):
+    """
+    Per-block analysis result
+
+    block: Parsed block
+    references: (address key, Reference) pairs with unresolved parameter directions
+    indirect: Unresolved indirect access count
+    interface: Parameter name -> VAR section
+    call_sites: Outgoing calls
+    """
+    block: Block
+    references: List[Tuple[str, Reference]]
+    indirect: int
+    interface: Dict[str, str]
+    call_sites: List[CallSite]
+
+class ChunkEntry(NamedTuple):
+    """Cached chunk: first line number and the fragments parsed from it"""
+    start_line: int
+    fragments: List[BlockFragment]
+
+@dataclass
+class AnalysisResult:
+    """Incremental analysis result data structure"""
+    program: Program
+    xref: CrossReference
+    callgraph: CallGraph
+    parsed: List[str] = field(default_factory=list)  # Blocks (re)parsed this run
+    relocated: List[str] = field(default_factory=list)  # Reused blocks whose line numbers moved
+    removed: List[str] = field(default_factory=list)
+    remerged: List[str] = field(default_factory=list)  # Blocks re-merged into xref/call graph
+    affected: List[str] = field(default_factory=list)  # Parsed/removed blocks plus transitive callers
+    reused: int = 0
+    elapsed_ms: float = 0.0
+
+def make_fragment(block: Block) -> BlockFragment:
+    """
+    Analyze one block
+
+    Args:
+        block: Parsed block
+
+    Returns:
+        BlockFragment: Block with its references, interface and call sites
+    """
+    references, indirect = block_references(block)
+    return BlockFragment(block, references, indirect, block_interface(block), block_call_sites(block))
+
+def relocate(fragment: BlockFragment, delta: int) -> BlockFragment:
+    """
+    Shift all line numbers of a fragment
+
+    Args:
+        fragment: Cached fragment
+        delta: Line offset
+
+    Returns:
+        BlockFragment: Relocated copy
+    """
+    source = fragment.block
+    block = Block(source.kind, source.number, source.name, source.symbol)
+    for slot in Block.__slots__:
+        setattr(block, slot, getattr(source, slot))
+    block.start_line += delta
+    block.end_line += delta
+    block.networks = []
+    for network in source.networks:
+        moved = Network(network.index, network.title, network.line + delta)
+        moved.instructions = [instruction._replace(line=instruction.line + delta)
+                              for instruction in network.instructions]
+        block.networks.append(moved)
+    block.assignments = [(target, value, line + delta) for target, value, line in source.assignments]
+    references = [(key, reference._replace(line=reference.line + delta)) for key, reference in fragment.references]
+    call_sites = [site._replace(line=site.line + delta) for site in fragment.call_sites]
+    return BlockFragment(block, references, fragment.indirect, fragment.interface, call_sites)
+
+def split_chunks(lines: List[str]) -> List[Tuple[int, int]]:
+    """
+    Split source lines at block headers
+
+    Args:
+        lines: Source lines
+
+    Returns:
+        List of (start index, end index) half-open ranges
+    """
+    starts = [0]
+    for index, line in enumerate(lines):
+        if index and line.lstrip().startswith(HEADER_KEYWORDS):
+            text = line.split('//', 1)[0].strip()
+            if HEADER_RE.match(text):
+                starts.append(index)
+    bounds = starts + [len(lines)]
+    return [(bounds[i], bounds[i + 1]) for i in range(len(starts)) if bounds[i] < bounds[i + 1]]
+
+class IncrementalAnalyzer:
+    """
+    Incremental Analyzer Class
+
+    Holds the merged program/xref/call graph of one source file and
+    updates them from the per-chunk cache on each analyze() call
+    """
+
+    def __init__(self, source_path: str, cache_path: Optional[str] = None, persist: bool = True):
+        """
+        Initialize analyzer
+
+        Args:
+            source_path: STL/AWL source file
+            cache_path: Cache file (default <source>.stlcache)
+            persist: Load and save the cache file
+        """
+        self.source_path = source_path
+        self.cache_path = cache_path or source_path + '.stlcache'
+        self.persist = persist
+        self.cache: Dict[str, ChunkEntry] = {}
+        self.fragments: Dict[str, BlockFragment] = {}
+        self.program = Program()
+        self.xref = CrossReference()
+        self.callgraph = CallGraph()
+        self.logger = logging.getLogger(__name__)
+        if persist:
+            self.load_cache()
+
+    def load_cache(self) -> bool:
+        """
+        Load chunk cache from disk
+
+        Returns:
+            bool: True if a compatible cache was loaded
+        """
+        try:
+            with open(self.cache_path, 'rb') as f:
+                data = pickle.load(f)
+            if data.get('version') != CACHE_VERSION:
+                return False
+            self.cache = data['chunks']
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable analysis cache {self.cache_path}: {e}")
+            return False
+
+    def save_cache(self) -> bool:
+        """
+        Save chunk cache to disk
+
+        Returns:
+            bool: True if successful
+        """
+        try:
+            temp_path = self.cache_path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                pickle.dump({'version': CACHE_VERSION, 'chunks': self.cache}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.cache_path)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error saving analysis cache: {e}")
+            return False
+
+    def _chunk_fragments(self, lines: List[str], start: int, end: int, snippets_before: int,
+                         result: AnalysisResult) -> List[BlockFragment]:
+        """Get fragments of one chunk from the cache or by parsing it"""
+        chunk = lines[start:end]
+        digest = hashlib.blake2b(''.join(chunk).encode('utf-8', 'replace'), digest_size=16).hexdigest()
+        entry = self.cache.pop(digest, None)
+        if entry is not None:
+            # Snippet names are numbered per file, a new snippet above shifts them
+            expected = snippets_before
+            valid = True
+            for fragment in entry.fragments:
+                if fragment.block.kind == 'SNIPPET':
+                    expected += 1
+                    valid = valid and fragment.block.number == expected
+            if valid:
+                delta = start + 1 - entry.start_line
+                if delta:
+                    entry = ChunkEntry(start + 1, [relocate(fragment, delta) for fragment in entry.fragments])
+                    result.relocated.extend(fragment.block.name for fragment in entry.fragments)
+                else:
+                    result.reused += len(entry.fragments)
+                self.cache[digest] = entry
+                return entry.fragments
+
+        parser = STLParser(self.source_path)
+        parser.snippet_count = snippets_before
+        fragments = [make_fragment(block) for block in parser.parse_lines(chunk, start + 1)]
+        result.parsed.extend(fragment.block.name for fragment in fragments)
+        self.cache[digest] = ChunkEntry(start + 1, fragments)
+        return fragments
+
+    def analyze(self) -> AnalysisResult:
+        """
+        Bring program, xref and call graph up to date with the source
+
+        Returns:
+            AnalysisResult: Merged results and what was recomputed
+        """
+        started = time.perf_counter()
+        with open(self.source_path, 'r', encoding='latin-1', errors='replace') as f:
+            lines = f.readlines()
+
+        result = AnalysisResult(self.program, self.xref, self.callgraph)
+        previous_cache_size = len(self.cache)
+        fragments: Dict[str, BlockFragment] = {}
+        snippets = 0
+        for start, end in split_chunks(lines):
+            for fragment in self._chunk_fragments(lines, start, end, snippets, result):
+                if fragment.block.kind == 'SNIPPET':
+                    snippets += 1
+                fragments[fragment.block.name] = fragment
+
+        # Blocks whose fragment object changed need re-merging
+        old = self.fragments
+        removed = [name for name in old if name not in fragments]
+        changed = [name for name, fragment in fragments.items() if old.get(name) is not fragment]
+        remerge: Set[str] = set(removed) | set(changed)
+        for name in changed:
+            if name in old and old[name].interface != fragments[name].interface:
+                # Parameter directions of every caller depend on this interface
+                remerge.update(caller for caller in self.callgraph.callers(name) if caller in fragments)
+
+        touched: Set[str] = set()
+        for name in remerge:
+            if name in old:
+                touched |= self.xref.remove_block(name, {key for key, _ in old[name].references})
+                self.callgraph.remove_block(name)
+        for name in remerge:
+            fragment = fragments.get(name)
+            if fragment is None:
+                continue
+            touched |= self.xref.add_fragment(name, fragment.references, fragment.indirect, fragment.interface)
+            self.callgraph.kinds[name] = fragment.block.kind
+            self.callgraph.add_call_sites(name, fragment.call_sites)
+        self.xref.finalize(touched)
+        for key in touched:
+            bucket = self.xref.references.get(key)
+            if bucket:
+                bucket.sort(key=lambda reference: reference.line)
+
+        self.fragments = fragments
+        self.program.blocks = [fragment.block for fragment in fragments.values()]
+        self.program.by_name = {fragment.block.name: fragment.block for fragment in fragments.values()}
+
+        # Keep entries of this run plus a window of older ones (undo of an edit)
+        limit = max(2 * len(fragments), 64)
+        while len(self.cache) > limit:
+            self.cache.pop(next(iter(self.cache)))
+
+        result.removed = removed
+        result.remerged = sorted(remerge)
+        result.affected = sorted(self.callgraph.callers_closure(set(result.parsed) | set(removed)))
+        result.elapsed_ms = (time.perf_counter() - started) * 1000.0
+        if self.persist and (result.parsed or result.relocated or len(self.cache) != previous_cache_size):
+            self.save_cache()
+        self.logger.debug(f"Analyzed {self.source_path}: {len(result.parsed)} parsed, "
+                          f"{len(result.relocated)} relocated, {result.reused} reused in {result.elapsed_ms:.1f} ms")
+        return result
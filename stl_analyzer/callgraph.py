@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+STL Call Graph
+==============
+
+Description: Block call graph built from CALL/UC/CC instructions
+Purpose: Show how OB1/OB35 fan out through FC50..65, FB450..453, FC125 ...
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- Per-edge call counts and call sites (network, line, instance DB)
+- Callers/callees, transitive reachability from each OB
+- Cycle detection (Tarjan strongly connected components)
+- Calls to blocks not in the program (SFCs, missing FCs) reported as external
+- Indented call tree rendering
+"""
+
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from .nodes import Block
+
+logger = logging.getLogger(__name__)
+
+class CallSite(NamedTuple):
+    """
+    Call site data structure
+
+    caller/callee: Block names
+    network: 1-based network number in the caller
+    line: Source line
+    op: 'CALL', 'UC' or 'CC'
+    instance: Instance DB for FB calls ('' otherwise)
+    """
+    caller: str
+    callee: str
+    network: int
+    line: int
+    op: str
+    instance: str = ""
+
+def block_call_sites(block: Block) -> List[CallSite]:
+    """
+    Collect call sites of one block
+
+    Args:
+        block: Parsed block
+
+    Returns:
+        List of call sites in source order
+    """
+    return [CallSite(block.name, instruction.call.target, network.index, instruction.line,
+                     instruction.op, instruction.call.instance)
+            for network, instruction in block.instructions() if instruction.call is not None]
+
+class CallGraph:
+    """
+    Call Graph Class
+
+    Adjacency maps caller -> callee -> call sites, plus the reverse map
+    """
+
+    def __init__(self):
+        """Initialize empty graph"""
+        self.kinds: Dict[str, str] = {}  # Defined block name -> kind
+        self.edges: Dict[str, Dict[str, List[CallSite]]] = {}
+        self.reverse: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def build(cls, blocks: Iterable[Block]) -> 'CallGraph':
+        """
+        Build graph from parsed blocks
+
+        Args:
+            blocks: Program or any iterable of blocks
+
+        Returns:
+            CallGraph: Graph
+        """
+        graph = cls()
+        for block in blocks:
+            graph.add_block(block)
+        return graph
+
+    def add_block(self, block: Block):
+        """
+        Add or replace a block's outgoing edges
+
+        Args:
+            block: Parsed block
+        """
+        if block.name in self.edges:
+            self.remove_block(block.name)
+        self.kinds[block.name] = block.kind
+        self.add_call_sites(block.name, block_call_sites(block))
+
+    def add_call_sites(self, caller: str, sites: List[CallSite]):
+        """Add outgoing edges of caller from a list of call sites"""
+        edges = self.edges.setdefault(caller, {})
+        for site in sites:
+            edges.setdefault(site.callee, []).append(site)
+            reverse = self.reverse.setdefault(site.callee, {})
+            reverse[caller] = reverse.get(caller, 0) + 1
+
+    def remove_block(self, name: str):
+        """
+        Remove a block and its outgoing edges (incoming edges stay)
+
+        Args:
+            name: Block name
+        """
+        for callee, sites in self.edges.pop(name, {}).items():
+            reverse = self.reverse.get(callee, {})
+            reverse.pop(name, None)
+            if not reverse:
+                self.reverse.pop(callee, None)
+        self.kinds.pop(name, None)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def callees(self, name: str) -> Dict[str, int]:
+        """
+        Get direct callees with call counts
+
+        Args:
+            name: Caller block name
+
+        Returns:
+            dict: Callee -> number of call sites
+        """
+        return {callee: len(sites) for callee, sites in self.edges.get(name, {}).items()}
+
+    def callers(self, name: str) -> Dict[str, int]:
+        """
+        Get direct callers with call counts
+
+        Args:
+            name: Callee block name
+
+        Returns:
+            dict: Caller -> number of call sites
+        """
+        return dict(self.reverse.get(name, {}))
+
+    def call_sites(self, caller: str, callee: str) -> List[CallSite]:
+        """Get call sites of one edge"""
+        return list(self.edges.get(caller, {}).get(callee, []))
+
+    def reachable(self, root: str) -> Set[str]:
+        """
+        Get all blocks reachable from root (including root)
+
+        Args:
+            root: Block name
+
+        Returns:
+            set: Block names
+        """
+        seen = {root}
+        stack = [root]
+        while stack:
+            for callee in self.edges.get(stack.pop(), {}):
+                if callee not in seen:
+                    seen.add(callee)
+                    stack.append(callee)
+        return seen
+
+    def callers_closure(self, names: Iterable[str]) -> Set[str]:
+        """
+        Get blocks plus everything that calls them directly or indirectly
+
+        Args:
+            names: Block names
+
+        Returns:
+            set: Block names whose cost/flow depends on the given blocks
+        """
+        seen = set(names)
+        stack = list(seen)
+        while stack:
+            for caller in self.reverse.get(stack.pop(), {}):
+                if caller not in seen:
+                    seen.add(caller)
+                    stack.append(caller)
+        return seen
+
+    def roots(self) -> List[str]:
+        """
+        Get entry points: OBs, plus code blocks that nobody calls
+
+        Returns:
+            Sorted list of block names
+        """
+        return sorted(name for name, kind in self.kinds.items()
+                      if kind == 'OB' or (kind != 'DB' and name not in self.reverse))
+
+    def external(self) -> Dict[str, int]:
+        """
+        Get call targets that are not defined in the program
+
+        Returns:
+            dict: Target -> number of call sites
+        """
+        result: Dict[str, int] = {}
+        for edges in self.edges.values():
+            for callee, sites in edges.items():
+                if callee not in self.kinds:
+                    result[callee] = result.get(callee, 0) + len(sites)
+        return dict(sorted(result.items()))
+
+    def cycles(self) -> List[List[str]]:
+        """
+        Detect call cycles (recursion is not allowed on S7, so any hit is a bug)
+
+        Returns:
+            List of cycles, each a sorted list of block names
+        """
+        index_of: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        result: List[List[str]] = []
+        counter = [0]
+
+        def visit(root: str):
+            # Iterative Tarjan to stay clear of the recursion limit
+            work = [(root, iter(self.edges.get(root, {})))]
+            index_of[root] = lowlink[root] = counter[0]
+            counter[0] += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in index_of:
+                        index_of[child] = lowlink[child] = counter[0]
+                        counter[0] += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.edges.get(child, {}))))
+                        advanced = True
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[child])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.edges.get(node, {}):
+                        result.append(sorted(component))
+
+        for name in list(self.edges):
+            if name not in index_of:
+                visit(name)
+        return result
+
+    def format_tree(self, root: str, max_depth: Optional[int] = None) -> List[str]:
+        """
+        Render the call tree below root
+
+        Args:
+            root: Block name
+            max_depth: Optional depth limit
+
+        Returns:
+            List of indented lines ('FC50 x2 [DB20]')
+        """
+        lines = [root]
+
+        def walk(node: str, depth: int, path: Set[str]):
+            if max_depth is not None and depth > max_depth:
+                return
+            for callee, sites in self.edges.get(node, {}).items():
+                count = f" x{len(sites)}" if len(sites) > 1 else ""
+                instances = sorted({site.instance for site in sites if site.instance})
+                instance = f" [{', '.join(instances)}]" if instances else ""
+                external = "" if callee in self.kinds else " (external)"
+                recursive = " (cycle)" if callee in path else ""
+                lines.append(f"{'  ' * depth}{callee}{count}{instance}{external}{recursive}")
+                if callee not in path:
+                    walk(callee, depth + 1, path | {callee})
+
+        walk(root, 1, {root})
+        return lines
+
+    def statistics(self) -> Dict[str, int]:
+        """
+        Get graph statistics
+
+        Returns:
+            dict: Node, edge, call site, external and cycle counts
+        """
+        return {
+            'blocks': len(self.kinds),
+            'edges': sum(len(edges) for edges in self.edges.values()),
+            'call_sites': sum(len(sites) for edges in self.edges.values() for sites in edges.values()),
+            'external_targets': len(self.external()),
+            'cycles': len(self.cycles())
+        }
@@ -0,0 +1,883 @@
+#!/usr/bin/env python3
+"""
+STL Network Compiler
+====================
+
+Description: Compiles decoded STL networks to generated Python functions
+Purpose: Simulate long shifts faster than the per-instruction interpreter loop
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- One generated function per network; labels become segments of a
+  'while True' state machine, jumps to other networks return to the
+  block driver
+- Addresses constant-folded into direct bytearray indexing
+  (img[1234] >> 3 & 1, lb + 12 for TEMP data)
+- Registers (RLO/OR/FC bits, ACCU1/2) kept in Python locals, /FC and OR
+  state tracked at compile time to drop dead branches
+- Rare instructions fall back to the interpreter handlers, so results
+  match STLInterpreter exactly
+- Code objects cached on disk (marshal), keyed by block content hash,
+  memory map and Python version
+"""
+
+import hashlib
+import importlib.util
+import marshal
+import os
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from .interpreter import (ABS, ARITHMETIC, COMPARE, CONDITION_JUMPS, DB, DI, LOC, RETURN, WIDTH_SIZE, WORD_LOGIC,
+                          DecodedBlock, STLInterpreter, _DWORD, _real)
+from .nodes import Program
+
+logger = logging.getLogger(__name__)
+
+COMPILER_VERSION = 1
+CACHE_SUFFIX = '.stlc'
+
+ARITHMETIC_NAMES = {function: op for op, (function, _) in ARITHMETIC.items()}
+COMPARE_NAMES = {function: op for op, function in COMPARE.items()}
+CONDITION_NAMES = {function: op for op, function in CONDITION_JUMPS.items()}
+WORD_LOGIC_OPERATORS = {'AW': '&', 'AD': '&', 'OW': '|', 'OD': '|', 'XOW': '^', 'XOD': '^'}
+INLINE_ARITHMETIC = {'+I': '+', '-I': '-', '*I': '*', '+D': '+', '-D': '-', '*D': '*'}
+CONDITION_TESTS = {'JZ': 'cc == 0', 'JN': 'cc != 0', 'JP': 'cc > 0', 'JM': 'cc < 0',
+                   'JPZ': 'cc >= 0', 'JMZ': 'cc <= 0'}
+JUMP_HANDLERS = frozenset(('_jump', '_jump_rlo', '_jump_condition', '_loop', '_jump_list'))
+REGISTERS = ('orb', 'term', 'fc', 'a1', 'a2')
+SPACE_BASES = {DB: ('dbb', 'dbs'), DI: ('dib', 'dis')}
+SHIFTS = {
+    'SLW': lambda n: f"a1 = a1 & 0xFFFF0000 | (a1 & 0xFFFF) << {n} & 0xFFFF" if n < 16 else "a1 &= 0xFFFF0000",
+    'SRW': lambda n: f"a1 = a1 & 0xFFFF0000 | (a1 & 0xFFFF) >> {n}" if n < 16 else "a1 &= 0xFFFF0000",
+    'SLD': lambda n: f"a1 = a1 << {n} & 0xFFFFFFFF" if n < 32 else "a1 = 0",
+    'SRD': lambda n: f"a1 >>= {n}" if n < 32 else "a1 = 0",
+}
+CONVERSIONS = {
+    'ITD': "a1 = ((a1 & 0xFFFF ^ 0x8000) - 0x8000) & 0xFFFFFFFF",
+    'INVI': "a1 ^= 0xFFFF",
+    'INVD': "a1 ^= 0xFFFFFFFF",
+}
+
+# Handlers whose fallback leaves a known bit-logic state (/FC, OR known zero)
+FALLBACK_STATES = {
+    '_call': (0, True), '_timer_start': (0, True), '_timer_reset': (0, True), '_count': (0, True),
+    '_counter_set': (0, True), '_counter_reset': (0, True), '_logic_status': (1, False),
+}
+
+GENERATED_GLOBALS = {
+    'UNPACK': _DWORD.unpack_from,
+    'PACK': _DWORD.pack_into,
+    'REAL': _real,
+    'RETURN': RETURN,
+}
+
+def _s16(expression: str) -> str:
+    return f"(({expression} & 0xFFFF ^ 0x8000) - 0x8000)"
+
+def _s32(expression: str) -> str:
+    return f"(({expression} & 0xFFFFFFFF ^ 0x80000000) - 0x80000000)"
+
+class NetworkWriter:
+    """
+    Source writer for one network function
+
+    Tracks which registers and base pointers the body uses so the
+    prologue loads, and the sync points store, only those
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lines: List[str] = []
+        self.indent = 2
+        self.registers = set()
+        self.bases = set()
+        # Compile-time knowledge: /FC value (None if unknown), OR bit known zero
+        self.fc: Optional[int] = None
+        self.orb0 = False
+
+    def emit(self, text: str):
+        self.lines.append('    ' * self.indent + text)
+
+    def use(self, *names: str):
+        for name in names:
+            if name in REGISTERS:
+                self.registers.add(name)
+            else:
+                self.bases.add(name)
+
+    def forget(self):
+        self.fc = None
+        self.orb0 = False
+
+    def sync(self):
+        self.emit('@SYNC@')
+
+    def reload(self, bases: bool = False):
+        self.emit('@LOAD@')
+        if bases:
+            self.emit('@BASES@')
+
+    def render(self, segmented: bool) -> List[str]:
+        """Get function source with prologue and sync points filled in"""
+        registers = [name for name in REGISTERS if name in self.registers]
+        bases = [name for name in ('img', 'lb', 'dbb', 'dbs', 'dib', 'dis', 'nest') if name in self.bases]
+        sources = {'img': 'm.image', 'lb': 'm.lbase', 'dbb': 'm.db_base', 'dbs': 'm.db_size',
+                   'dib': 'm.di_base', 'dis': 'm.di_size', 'nest': 'm.nesting'}
+        load = store = None
+        if registers:
+            targets = ', '.join(registers)
+            values = ', '.join(f"m.{name}" for name in registers)
+            load = f"{targets} = {values}"
+            store = f"{values} = {targets}"
+        reload_bases = [name for name in bases if name in ('dbb', 'dbs', 'dib', 'dis')]
+        base_load = (f"{', '.join(reload_bases)} = {', '.join(sources[name] for name in reload_bases)}"
+                     if reload_bases else None)
+
+        out = [f"    def {self.name}(m, seg):"]
+        for name in bases:
+            out.append(f"        {name} = {sources[name]}")
+        if load:
+            out.append(f"        {load}")
+        if segmented:
+            out.append("        while True:")
+        for line in self.lines:
+            stripped = line.strip()
+            prefix = line[:len(line) - len(line.lstrip())]
+            if stripped == '@SYNC@':
+                # 'pass' keeps an if-branch that only jumps away valid
+                out.append(prefix + (store or 'pass'))
+            elif stripped == '@LOAD@':
+                if load:
+                    out.append(prefix + load)
+            elif stripped == '@BASES@':
+                if base_load:
+                    out.append(prefix + base_load)
+            else:
+                out.append(prefix + stripped)
+        return out
+
+class BlockCompiler:
+    """
+    Block Compiler Class
+
+    Generates the module source for one decoded block: a make(K) factory
+    returning one function per network. K is the decoded instruction
+    list, used for fallbacks and guarded accesses.
+    """
+
+    def __init__(self, ctx: DecodedBlock, network_sizes: List[int]):
+        self.ctx = ctx
+        self.code = ctx.code
+        self.network_sizes = network_sizes
+        self.entries: Dict[int, Tuple[int, int]] = {}  # Jump target pc -> (network function, segment)
+        self.fallbacks = 0
+
+    # Operand access ------------------------------------------------------
+
+    def _index(self, writer: NetworkWriter, ref: tuple, delta: int = 0) -> str:
+        writer.use('img')
+        if ref[0] == ABS:
+            return str(ref[1] + delta)
+        if ref[0] == LOC:
+            writer.use('lb')
+            return f"lb + {ref[1] + delta}"
+        base = SPACE_BASES[ref[0]][0]
+        writer.use(base)
+        return f"{base} + {ref[1] + delta}"
+
+    def _fetch(self, writer: NetworkWriter, ref: tuple, index: str, second: str) -> str:
+        width = ref[4]
+        if width == 'X':
+            return f"(img[{index}] >> {ref[2]} & 1)"
+        if width == 'B':
+            return f"img[{index}]"
+        if width == 'W':
+            return f"(img[{index}] << 8 | img[{second}])"
+        return f"UNPACK(img, {index})[0]"
+
+    def read(self, writer: NetworkWriter, ref: tuple, pc: int, slot: int) -> str:
+        """Get expression reading a reference (guarded for DB/DI, interpreter call for AR-indirect)"""
+        if ref[0] not in (ABS, LOC, DB, DI):
+            return f"m._read(K[{pc}][{slot}])"
+        expression = self._fetch(writer, ref, self._index(writer, ref), self._index(writer, ref, 1))
+        if ref[0] in SPACE_BASES:
+            limit = SPACE_BASES[ref[0]][1]
+            writer.use(limit)
+            return f"({expression} if {limit} >= {ref[1] + WIDTH_SIZE[ref[4]]} else m._read(K[{pc}][{slot}]))"
+        return expression
+
+    def write(self, writer: NetworkWriter, ref: tuple, value: str, pc: int, slot: int):
+        """Emit statements writing a value expression (or '0'/'1' constant for bits)"""
+        if ref[0] not in (ABS, LOC, DB, DI):
+            writer.emit(f"m._write(K[{pc}][{slot}], {value})")
+            return
+        guarded = ref[0] in SPACE_BASES
+        if guarded:
+            limit = SPACE_BASES[ref[0]][1]
+            writer.use(limit)
+            writer.emit(f"if {limit} >= {ref[1] + WIDTH_SIZE[ref[4]]}:")
+            writer.indent += 1
+        index = self._index(writer, ref)
+        width = ref[4]
+        if width == 'X':
+            mask = 1 << ref[2]
+            if value == '1':
+                writer.emit(f"img[{index}] |= {mask}")
+            elif value == '0':
+                writer.emit(f"img[{index}] &= {0xFF ^ mask}")
+            else:
+                writer.emit(f"img[{index}] = img[{index}] | {mask} if {value} else img[{index}] & {0xFF ^ mask}")
+        elif width == 'B':
+            writer.emit(f"img[{index}] = {value} & 0xFF")
+        elif width == 'W':
+            writer.emit(f"img[{index}] = {value} >> 8 & 0xFF")
+            writer.emit(f"img[{self._index(writer, ref, 1)}] = {value} & 0xFF")
+        else:
+            writer.emit(f"PACK(img, {index}, {value} & 0xFFFFFFFF)")
+        if guarded:
+            writer.indent -= 1
+            writer.emit("else:")
+            writer.emit(f"    m._write(K[{pc}][{slot}], {value})")
+
+    # Bit logic -----------------------------------------------------------
+
+    def logic(self, writer: NetworkWriter, kind: int, value: str):
+        """Emit A/O/X combination of a value expression with the RLO"""
+        writer.use('term', 'fc')
+        if kind:
+            writer.use('orb')
+        if writer.fc == 0:
+            writer.emit(f"term = {value}")
+            writer.emit("fc = 1")
+        elif writer.fc == 1:
+            if kind == 0:
+                writer.emit(f"term &= {value}")
+            elif kind == 1:
+                writer.emit("orb |= term")
+                writer.emit(f"term = {value}")
+                writer.orb0 = False
+            else:
+                writer.emit(f"term = (orb | term) ^ {value}")
+                writer.emit("orb = 0")
+                writer.orb0 = True
+        else:
+            writer.emit(f"v = {value}")
+            if kind == 1:
+                writer.emit("if fc:")
+                writer.emit("    orb |= term")
+                writer.emit("else:")
+                writer.emit("    fc = 1")
+                writer.emit("term = v")
+                writer.orb0 = False
+            else:
+                writer.emit("if fc:")
+                writer.emit("    term &= v" if kind == 0 else "    term = (orb | term) ^ v")
+                if kind == 2:
+                    writer.emit("    orb = 0")
+                writer.emit("else:")
+                writer.emit("    term = v")
+                writer.emit("    fc = 1")
+        writer.fc = 1
+
+    def fold_rlo(self, writer: NetworkWriter):
+        """Fold the OR bit into 'term' so that term holds the RLO"""
+        writer.use('term', 'orb')
+        if not writer.orb0:
+            writer.emit("term |= orb")
+            writer.emit("orb = 0")
+            writer.orb0 = True
+
+    def first_check(self, writer: NetworkWriter):
+        writer.use('fc')
+        if writer.fc != 0:
+            writer.emit("fc = 0")
+            writer.fc = 0
+
+    # Generation ----------------------------------------------------------
+
+    def _brackets(self, start: int, end: int) -> Dict[int, int]:
+        """Pair '(' with ')' inside one segment when no jump lies between them"""
+        pairs: Dict[int, int] = {}
+        stack: List[int] = []
+        for pc in range(start, end):
+            name = self.code[pc][0].__name__
+            if name == '_nest':
+                stack.append(pc)
+            elif name == '_unnest':
+                if stack:
+                    pairs[stack.pop()] = pc
+            elif name in JUMP_HANDLERS or name in ('_return', '_return_conditional'):
+                stack = []
+        return pairs
+
+    def generate(self) -> Tuple[str, Dict[int, Tuple[int, int]]]:
+        """
+        Generate module source
+
+        Returns:
+            tuple: (source defining make(K), jump target pc -> (network function, segment))
+        """
+        targets = set()
+        for pc, ins in enumerate(self.code):
+            name = ins[0].__name__
+            if name in JUMP_HANDLERS:
+                targets.add(ins[1])
+            if name == '_jump_list':
+                targets.update(range(pc + 1, pc + 1 + ins[2]))
+
+        ranges = []
+        start = 0
+        for size in self.network_sizes:
+            if size:
+                ranges.append((start, start + size))
+            start += size
+
+        segments: List[List[int]] = []
+        for function, (first, last) in enumerate(ranges):
+            starts = [first] + sorted(pc for pc in targets if first < pc < last)
+            segments.append(starts)
+            for segment, pc in enumerate(starts):
+                self.entries[pc] = (function, segment)
+
+        source = ["def make(K):"]
+        names = []
+        for function, ((first, last), starts) in enumerate(zip(ranges, segments)):
+            name = f"nw{function}"
+            names.append(name)
+            source.extend(self._network(name, function, first, last, starts, targets))
+        source.append(f"    return ({', '.join(names)}{',' if len(names) == 1 else ''})")
+        return '\n'.join(source) + '\n', self.entries
+
+    def _network(self, name: str, function: int, first: int, last: int, starts: List[int],
+                 targets: set) -> List[str]:
+        writer = NetworkWriter(name)
+        segmented = len(starts) > 1 or first in targets
+        body = 3 if segmented else 2
+        bounds = starts + [last]
+        for segment in range(len(starts)):
+            writer.indent = body
+            if segmented:
+                writer.emit(f"if seg <= {segment}:")
+                writer.indent = body + 1
+            writer.forget()
+            seg_start, seg_end = bounds[segment], bounds[segment + 1]
+            pairs = self._brackets(seg_start, seg_end)
+            open_pairs: Dict[int, tuple] = {}
+            emitted = len(writer.lines)
+            for pc in range(seg_start, seg_end):
+                self._instruction(writer, pc, function, pairs, open_pairs)
+            if segmented and len(writer.lines) == emitted:
+                writer.emit("pass")
+        writer.indent = body
+        writer.sync()
+        writer.emit("return -1")
+        return writer.render(segmented)
+
+    def _goto(self, writer: NetworkWriter, target: int, function: int, pc: int):
+        if target <= pc:
+            writer.emit("m._backward()")
+        location = self.entries.get(target)
+        if location is not None and location[0] == function:
+            writer.emit(f"seg = {location[1]}")
+            writer.emit("continue")
+        else:
+            writer.sync()
+            writer.emit(f"return {target}")
+
+    def _fallback(self, writer: NetworkWriter, pc: int, name: str):
+        self.fallbacks += 1
+        writer.sync()
+        writer.emit(f"K[{pc}][0](K[{pc}], {pc})")
+        writer.reload(bases=name in ('_open', '_call'))
+        state = FALLBACK_STATES.get(name)
+        if state is None:
+            writer.forget()
+        else:
+            writer.fc, writer.orb0 = state
+
+    def _instruction(self, writer: NetworkWriter, pc: int, function: int, pairs: Dict[int, int],
+                     open_pairs: Dict[int, tuple]):
+        ins = self.code[pc]
+        name = ins[0].__name__
+        emit = writer.emit
+
+        if name in ('_and_abs', '_or_abs'):
+            value = f"(img[{ins[1]}] >> {ins[2]} & 1)"
+            writer.use('img')
+            self.logic(writer, 0 if name == '_and_abs' else 1, f"{value} ^ 1" if ins[3] else value)
+        elif name == '_logic_ref':
+            value = self.read(writer, ins[2], pc, 2)
+            self.logic(writer, ins[1], f"{value} ^ 1" if ins[3] else value)
+        elif name == '_logic_timer':
+            self.logic(writer, ins[1], f"m._timer_output({ins[2]})" + (" ^ 1" if ins[3] else ""))
+        elif name == '_logic_counter':
+            self.logic(writer, ins[1], f"(1 if m.counters[{ins[2]}][0] else 0)" + (" ^ 1" if ins[3] else ""))
+        elif name == '_logic_status':
+            status = ins[2]
+            if status == 'BR':
+                value = "m.br"
+            elif status in ('OV', 'OS', 'UO'):
+                value = "0"
+            else:
+                value = f"(1 if m.cc {status[:-1]} 0 else 0)".replace('<>', '!=')
+            self.logic(writer, ins[1], f"{value} ^ 1" if ins[3] else value)
+        elif name == '_or_bare':
+            writer.use('orb', 'term', 'fc')
+            emit("orb |= term")
+            emit("fc = 0")
+            writer.fc, writer.orb0 = 0, False
+        elif name == '_nest':
+            writer.use('orb', 'term', 'fc')
+            if pc in pairs:
+                depth = len(open_pairs)
+                emit(f"s{depth}o, s{depth}t, s{depth}f = orb, term, fc")
+                open_pairs[pairs[pc]] = (depth, ins[1], ins[2], writer.fc, writer.orb0)
+            else:
+                writer.use('nest')
+                emit(f"nest.append(({ins[1]}, {ins[2]}, orb, term, fc))")
+            emit("orb = term = fc = 0")
+            writer.fc, writer.orb0 = 0, True
+        elif name == '_unnest':
+            writer.use('orb', 'term', 'fc')
+            paired = open_pairs.pop(pc, None)
+            if paired is not None:
+                depth, kind, negate, fc, orb0 = paired
+                rlo = 'term' if writer.orb0 else '(orb | term)'
+                emit(f"v{depth} = {rlo} ^ 1" if negate else f"v{depth} = {rlo}")
+                emit(f"orb, term, fc = s{depth}o, s{depth}t, s{depth}f")
+                writer.fc, writer.orb0 = fc, orb0
+                self.logic(writer, kind, f"v{depth}")
+            else:
+                writer.use('nest')
+                emit("if nest:")
+                emit("    k, n, o, t, f = nest.pop()")
+                emit("    v = (orb | term) ^ n")
+                emit("    orb, term, fc = o, t, f")
+                emit("    if not fc:")
+                emit("        term = v")
+                emit("        fc = 1")
+                emit("    elif k == 0:")
+                emit("        term &= v")
+                emit("    elif k == 1:")
+                emit("        orb |= term")
+                emit("        term = v")
+                emit("    else:")
+                emit("        term = (orb | term) ^ v")
+                emit("        orb = 0")
+                emit("else:")
+                emit("    m._fault(\"')' without open bracket\")")
+                writer.forget()
+        elif name == '_assign_abs':
+            self.fold_rlo(writer)
+            writer.use('img')
+            offset, mask, inverse, mode = ins[1], ins[2], ins[3], ins[4]
+            if mode == 0:
+                emit(f"img[{offset}] = img[{offset}] | {mask} if term else img[{offset}] & {inverse}")
+            else:
+                emit("if term:")
+                emit(f"    img[{offset}] |= {mask}" if mode == 1 else f"    img[{offset}] &= {inverse}")
+            self.first_check(writer)
+        elif name == '_assign_ref':
+            self.fold_rlo(writer)
+            mode = ins[2]
+            if mode == 0:
+                self.write(writer, ins[1], 'term', pc, 1)
+            else:
+                emit("if term:")
+                writer.indent += 1
+                self.write(writer, ins[1], '1' if mode == 1 else '0', pc, 1)
+                writer.indent -= 1
+            self.first_check(writer)
+        elif name == '_edge':
+            self.fold_rlo(writer)
+            emit(f"mem = {self.read(writer, ins[1], pc, 1)}")
+            self.write(writer, ins[1], 'term', pc, 1)
+            emit("term = 1 if term and not mem else 0" if ins[2] else "term = 1 if mem and not term else 0")
+            writer.use('fc')
+            emit("fc = 1")
+            writer.fc = 1
+        elif name == '_set_rlo':
+            writer.use('orb', 'term', 'fc')
+            emit(f"term = {ins[1]}")
+            if not writer.orb0:
+                emit("orb = 0")
+            self.first_check(writer)
+            writer.orb0 = True
+        elif name == '_not':
+            writer.use('orb', 'term')
+            if writer.orb0:
+                emit("term = 1 - term")
+            else:
+                emit("term = 1 - (orb | term)")
+                emit("orb = 0")
+                writer.orb0 = True
+        elif name == '_save':
+            writer.use('orb', 'term')
+            emit("m.br = orb | term")
+
+        elif name in ('_load_constant', '_load_b_abs', '_load_w_abs', '_load_d_abs', '_load_ref'):
+            writer.use('a1', 'a2')
+            if name == '_load_constant':
+                value = str(ins[1])
+            elif name == '_load_ref':
+                value = self.read(writer, ins[1], pc, 1)
+            else:
+                width = {'_load_b_abs': 'B', '_load_w_abs': 'W', '_load_d_abs': 'D'}[name]
+                value = self.read(writer, (ABS, ins[1], 0, 0, width), pc, 1)
+            emit("a2 = a1")
+            emit(f"a1 = {value}")
+        elif name in ('_transfer_b_abs', '_transfer_w_abs', '_transfer_d_abs'):
+            writer.use('a1')
+            width = {'_transfer_b_abs': 'B', '_transfer_w_abs': 'W', '_transfer_d_abs': 'D'}[name]
+            self.write(writer, (ABS, ins[1], 0, 0, width), 'a1', pc, 1)
+        elif name == '_transfer_ref':
+            writer.use('a1')
+            self.write(writer, ins[1], 'a1', pc, 1)
+
+        elif name == '_arithmetic' and ARITHMETIC_NAMES.get(ins[1]) in INLINE_ARITHMETIC:
+            writer.use('a1', 'a2')
+            op = ARITHMETIC_NAMES[ins[1]]
+            operator = INLINE_ARITHMETIC[op]
+            if ins[2]:
+                emit(f"r = {_s16('a2')} {operator} {_s16('a1')}")
+                if ins[3]:
+                    emit("a1 = r & 0xFFFFFFFF")
+                else:
+                    emit("a1 = a1 & 0xFFFF0000 | r & 0xFFFF")
+                    emit(f"r = {_s16('r')}")
+            else:
+                expression = f"({_s32('a2')} {operator} {_s32('a1')})"
+                emit(f"r = {_s32(expression)}")
+                emit("a1 = r & 0xFFFFFFFF")
+            emit("m.cc = (r > 0) - (r < 0)")
+            emit("a2 = m.a3")
+            emit("m.a3 = m.a4")
+        elif name == '_compare':
+            writer.use('a1', 'a2')
+            kind = ins[2]
+            convert = _s16 if kind == 'I' else _s32 if kind == 'D' else (lambda text: f"REAL({text})")
+            emit(f"x = {convert('a2')}")
+            emit(f"y = {convert('a1')}")
+            emit("m.cc = (x > y) - (x < y)")
+            operator = {"<>": "!="}.get(COMPARE_NAMES[ins[1]], COMPARE_NAMES[ins[1]])
+            self.logic(writer, 0, f"(1 if x {operator} y else 0)")
+        elif name == '_word_logic':
+            writer.use('a1', 'a2')
+            op = next(key for key, (function, _) in WORD_LOGIC.items() if function is ins[1])
+            mask = ins[2]
+            other = 'a2' if ins[3] is None else str(ins[3])
+            emit(f"r = (a1 {WORD_LOGIC_OPERATORS[op]} {other}) & {mask}")
+            emit(f"a1 = a1 & {0xFFFFFFFF ^ mask} | r")
+            emit("m.cc = 1 if r else 0")
+        elif name == '_add_constant':
+            writer.use('a1')
+            if ins[2]:
+                emit(f"a1 = (a1 + {ins[1]}) & 0xFFFFFFFF")
+                emit(f"r = {_s32('a1')}")
+            else:
+                emit(f"r = {_s16(f'(a1 + {ins[1]})')}")
+                emit("a1 = a1 & 0xFFFF0000 | r & 0xFFFF")
+            emit("m.cc = (r > 0) - (r < 0)")
+        elif name == '_increment':
+            writer.use('a1')
+            emit(f"a1 = a1 & 0xFFFFFF00 | (a1 + {ins[1]}) & 0xFF")
+        elif name == '_shift' and ins[2] is not None and ins[1] in SHIFTS:
+            writer.use('a1')
+            emit(SHIFTS[ins[1]](ins[2]))
+            emit("m.cc = 1 if a1 else 0")
+        elif name == '_convert' and ins[1] in CONVERSIONS:
+            writer.use('a1')
+            emit(CONVERSIONS[ins[1]])
+        elif name == '_accumulators' and ins[1] == 'TAK':
+            writer.use('a1', 'a2')
+            emit("a1, a2 = a2, a1")
+
+        elif name == '_load_ar':
+            register, pointer, source = ins[1], ins[2], ins[3]
+            if pointer is not None:
+                value = str(pointer)
+            elif source is not None:
+                value = f"m.ar{source}"
+            else:
+                writer.use('a1')
+                value = 'a1'
+            emit(f"m.ar{register} = {value}")
+        elif name == '_add_ar':
+            register = ins[1]
+            if ins[2] is None:
+                writer.use('a1')
+                delta = _s16('a1')
+            else:
+                delta = str(ins[2] & 0x7FFFF)
+            emit(f"r = m.ar{register}")
+            emit(f"m.ar{register} = r & 0xFFF80000 | ((r & 0x7FFFF) + {delta}) & 0x7FFFF")
+        elif name == '_transfer_ar':
+            writer.use('a1', 'a2')
+            emit("a2 = a1")
+            emit(f"a1 = m.ar{ins[1]}")
+
+        elif name == '_jump':
+            self._goto(writer, ins[1], function, pc)
+        elif name == '_jump_rlo':
+            op = ins[2]
+            if op in ('JBI', 'JNBI'):
+                emit("if m.br:" if op == 'JBI' else "if not m.br:")
+                writer.indent += 1
+                self._goto(writer, ins[1], function, pc)
+                writer.indent -= 1
+            else:
+                self.fold_rlo(writer)
+                writer.use('fc')
+                if op in ('JNB', 'JCB'):
+                    emit("m.br = term")
+                emit("if term:" if op in ('JC', 'JCB') else "if not term:")
+                writer.indent += 1
+                emit("term = 1")
+                emit("fc = 0")
+                self._goto(writer, ins[1], function, pc)
+                writer.indent -= 1
+                emit("term = 1")
+                emit("fc = 0")
+                writer.fc = 0
+        elif name == '_jump_condition':
+            test = CONDITION_TESTS.get(CONDITION_NAMES.get(ins[2]))
+            if test is not None:
+                emit("cc = m.cc")
+                emit(f"if {test}:")
+                writer.indent += 1
+                self._goto(writer, ins[1], function, pc)
+                writer.indent -= 1
+        elif name == '_loop':
+            writer.use('a1')
+            emit("r = (a1 & 0xFFFF) - 1 & 0xFFFF")
+            emit("a1 = a1 & 0xFFFF0000 | r")
+            emit("if r:")
+            writer.indent += 1
+            emit("m._backward()")
+            self._goto(writer, ins[1], function, -1)
+            writer.indent -= 1
+        elif name == '_jump_list':
+            writer.use('a1')
+            count = ins[2]
+            emit("r = a1 & 0xFF")
+            emit(f"if r < {count}:")
+            first = self.entries.get(pc + 1) if count else None
+            if first is not None and first[0] == function and \
+                    all(self.entries.get(pc + 1 + i) == (function, first[1] + i) for i in range(count)):
+                emit(f"    seg = {first[1]} + r")
+                emit("    continue")
+            else:
+                writer.indent += 1
+                writer.sync()
+                writer.indent -= 1
+                emit(f"    return {pc + 1} + r")
+            self._goto(writer, ins[1], function, pc)
+        elif name == '_return':
+            writer.sync()
+            emit("return RETURN")
+        elif name == '_return_conditional':
+            self.fold_rlo(writer)
+            emit("if term:")
+            writer.indent += 1
+            writer.sync()
+            emit("return RETURN")
+            writer.indent -= 1
+            writer.use('fc')
+            emit("term = 1")
+            emit("fc = 0")
+            writer.fc = 0
+        elif name == '_nop':
+            pass
+        else:
+            self._fallback(writer, pc, name)
+
+class CompiledBlock:
+    """Compiled block data structure: network functions and jump entry points"""
+    __slots__ = ('name', 'networks', 'entries', 'key', 'cached')
+
+    def __init__(self, name: str, networks: tuple, entries: Dict[int, Tuple[int, int]], key: str, cached: bool):
+        self.name = name
+        self.networks = networks
+        self.entries = entries
+        self.key = key
+        self.cached = cached
+
+class CompiledInterpreter(STLInterpreter):
+    """
+    Compiled Interpreter Class
+
+    STLInterpreter that executes blocks through generated network
+    functions instead of the per-instruction dispatch loop
+    """
+
+    def __init__(self, program: Program, io_map=None, scan_time_ms: float = 10.0,
+                 cyclic: Optional[Dict[str, float]] = None, cache_dir: Optional[str] = ".stl_code"):
+        """
+        Initialize compiled interpreter
+
+        Args:
+            program: Parsed program (OBs, FCs, FBs, DBs)
+            io_map: plc_io.txt points, used for tag lookup and output naming
+            scan_time_ms: Simulated OB1 cycle time
+            cyclic: Cyclic interrupt OBs and their period in ms
+            cache_dir: Directory for cached code objects (None: no disk cache)
+        """
+        super().__init__(program, io_map, scan_time_ms, cyclic)
+        self.cache_dir = cache_dir
+        self.compiled: Dict[str, CompiledBlock] = {}
+        self.compile_stats = {'compiled': 0, 'cached': 0, 'fallbacks': 0, 'compile_ms': 0.0}
+        # Decode everything up front so the memory map (and with it every folded address) is fixed
+        for block in self.program:
+            if block.is_code:
+                self.decode(block.name)
+        regions = repr(sorted(self.regions.items())).encode('utf-8')
+        self.memory_digest = hashlib.blake2b(regions, digest_size=16).hexdigest()
+
+    def _cache_key(self, name: str) -> str:
+        block = self.program.get(name)
+        text = f"{COMPILER_VERSION}|{importlib.util.MAGIC_NUMBER.hex()}|{block.content_hash}|{self.memory_digest}"
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _cache_path(self, name: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}-{key}{CACHE_SUFFIX}")
+
+    def _load_cached(self, name: str, key: str) -> Optional[tuple]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(name, key), 'rb') as f:
+                data = marshal.load(f)
+            if data[0] != COMPILER_VERSION:
+                return None
+            return data[1], data[2]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable compiled block {name}: {e}")
+            return None
+
+    def _save_cached(self, name: str, key: str, code, entries: Dict[int, Tuple[int, int]]):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            prefix = f"{name}-"
+            for entry in os.listdir(self.cache_dir):
+                if entry.startswith(prefix) and entry.endswith(CACHE_SUFFIX):
+                    os.remove(os.path.join(self.cache_dir, entry))
+            path = self._cache_path(name, key)
+            with open(path + '.tmp', 'wb') as f:
+                marshal.dump((COMPILER_VERSION, code, entries), f)
+            os.replace(path + '.tmp', path)
+        except Exception as e:
+            self.logger.error(f"Error caching compiled block {name}: {e}")
+
+    def compile_block(self, name: str) -> Optional[CompiledBlock]:
+        """
+        Get compiled form of a block (from the disk cache when the block is unchanged)
+
+        Args:
+            name: Block name
+
+        Returns:
+            CompiledBlock: Network functions, None if not a code block of the program
+        """
+        compiled = self.compiled.get(name)
+        if compiled is not None:
+            return compiled
+        ctx = self.decode(name)
+        if ctx is None:
+            return None
+        started = time.perf_counter()
+        key = self._cache_key(name)
+        cached = self._load_cached(name, key)
+        if cached is not None:
+            code, entries = cached
+            self.compile_stats['cached'] += 1
+        else:
+            block = self.program.get(name)
+            compiler = BlockCompiler(ctx, [len(network.instructions) for network in block.networks])
+            source, entries = compiler.generate()
+            code = compile(source, f"<stl {name}>", 'exec')
+            self.compile_stats['compiled'] += 1
+            self.compile_stats['fallbacks'] += compiler.fallbacks
+            self._save_cached(name, key, code, entries)
+        namespace = dict(GENERATED_GLOBALS)
+        exec(code, namespace)
+        compiled = CompiledBlock(name, namespace['make'](tuple(ctx.code)), entries, key, cached is not None)
+        self.compiled[name] = compiled
+        self.compile_stats['compile_ms'] += (time.perf_counter() - started) * 1000.0
+        return compiled
+
+    def compile_all(self) -> Dict[str, int]:
+        """
+        Compile every code block ahead of the first scan
+
+        Returns:
+            dict: Compile statistics (compiled, cached, fallbacks, compile_ms)
+        """
+        for block in self.program:
+            if block.is_code:
+                self.compile_block(block.name)
+        return dict(self.compile_stats)
+
+    def _execute(self, ctx: DecodedBlock):
+        compiled = self.compiled.get(ctx.name) or self.compile_block(ctx.name)
+        networks = compiled.networks
+        target = -1
+        for function in networks:
+            target = function(self, 0)
+            if target >= 0:
+                break
+        # Jumps into other networks: resume at the target segment, then fall through
+        count = len(networks)
+        while 0 <= target < RETURN:
+            index, segment = compiled.entries[target]
+            target = networks[index](self, segment)
+            while target < 0:
+                index += 1
+                if index >= count:
+                    return
+                target = networks[index](self, 0)
+
+def benchmark(program: Program, io_map=None, scans: int = 1000, scan_time_ms: float = 10.0,
+              cyclic: Optional[Dict[str, float]] = None, recording=None,
+              cache_dir: Optional[str] = ".stl_code") -> Dict[str, object]:
+    """
+    Run the same scans through the interpreter and the compiled backend
+
+    Args:
+        program: Parsed program
+        io_map: plc_io.txt points
+        scans: OB1 cycles per backend
+        scan_time_ms: Simulated OB1 cycle time
+        cyclic: Cyclic interrupt OBs and their period in ms
+        recording: Scan number -> [(signal, value)] input changes
+        cache_dir: Code cache directory of the compiled backend
+
+    Returns:
+        dict: scans/s of both backends, speedup, compile statistics and
+              whether both produced the same output changes
+    """
+    interpreter = STLInterpreter(program, io_map, scan_time_ms, cyclic)
+    reference = interpreter.run(scans, recording)
+    started = time.perf_counter()
+    compiled = CompiledInterpreter(program, io_map, scan_time_ms, cyclic, cache_dir)
+    stats = compiled.compile_all()
+    setup_ms = (time.perf_counter() - started) * 1000.0
+    result = compiled.run(scans, recording)
+    return {
+        'scans': scans,
+        'interpreter_scans_per_s': reference.scans_per_s,
+        'compiled_scans_per_s': result.scans_per_s,
+        'speedup': result.scans_per_s / reference.scans_per_s if reference.scans_per_s else 0.0,
+        'setup_ms': setup_ms,
+        'compile': stats,
+        'identical': (reference.output_changes == result.output_changes and
+                      interpreter.image == compiled.image and reference.faults == result.faults),
+        'interpreter': reference,
+        'compiled': result,
+    }
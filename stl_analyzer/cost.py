@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+STL Scan-Cycle Cost Model
+=========================
+
+Description: Static instruction count and worst-case path estimate per OB
+Purpose: Check whether added blocks (FC300/FC301) put the OB1 cycle budget at risk
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- Per-opcode weights (execution time in microseconds)
+- Worst-case path through each block's jump graph, calls expanded
+- LOOP bounds taken from the 'L n / label: T counter' idiom when present
+- Per-OB totals compared against the cycle_time budget in network_config.json
+- SCL-source blocks (FC300-FC303) are reported as not costed: the parser
+  keeps SCL statements opaque, so their line counts say nothing about time
+
+Default weights follow the CPU 412-3H datasheet figures (75 ns per bit,
+word and fixed-point instruction, 225 ns floating point). Call, timer,
+and indirect-access weights are estimates; scale them with the measured
+OB1 cycle time (OB1_PREV_CYCLE) before trusting absolutes.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional, Tuple
+
+from .nodes import Block, Instruction, Program
+from .parser import LABEL_OPS
+
+logger = logging.getLogger(__name__)
+
+BASE_WEIGHT_US = 0.075
+
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    # Floating point
+    **{op: 0.225 for op in ('+R', '-R', '*R', '/R', 'ABS', 'SQR', 'SQRT', 'EXP', 'LN', 'SIN', 'COS',
+                            'TAN', 'ASIN', 'ACOS', 'ATAN', 'RND', 'RND+', 'RND-', 'TRUNC', 'DTR', 'NEGR')},
+    # Timers and counters
+    **{op: 0.3 for op in ('SD', 'SE', 'SP', 'SS', 'SF', 'FR', 'CU', 'CD', 'LC')},
+    'OPN': 0.15,
+    'CALL': 3.0,
+    'UC': 1.0,
+    'CC': 1.0,
+}
+CALL_PARAMETER_US = 0.15
+INDIRECT_EXTRA_US = 0.075
+EXTERNAL_CALL_US = 5.0  # SFC/missing block bodies are unknown
+DEFAULT_LOOP_BOUND = 10
+
+# Instructions that never fall through to the next one
+NO_FALLTHROUGH = frozenset(('JU', 'BEU', 'BE'))
+
+@dataclass
+class BlockCost:
+    """Block cost data structure (callees included unless noted)"""
+    name: str
+    instructions: int = 0  # Own static instruction count
+    expanded_instructions: int = 0  # Every instruction on every call path
+    worst_path_instructions: int = 0
+    worst_path_us: float = 0.0
+    loops: int = 0
+    unbounded_loops: int = 0  # Loops costed with the default bound
+    calls: int = 0
+    external_calls: List[str] = field(default_factory=list)
+    scl: bool = False  # SCL source: not costed, all counts 0
+    uncosted_blocks: List[str] = field(default_factory=list)  # SCL blocks on the call paths (self included)
+
+    @property
+    def worst_path_ms(self) -> float:
+        return self.worst_path_us / 1000.0
+
+def is_scl_block(block: Block) -> bool:
+    """
+    Check whether a block is SCL source
+
+    Args:
+        block: Parsed block
+
+    Returns:
+        bool: True if the parser kept any of its statements as opaque SCL
+    """
+    return any(instruction.op == 'SCL' for _, instruction in block.instructions())
+
+class CostModel:
+    """
+    Cost Model Class
+
+    Computes per-block costs on demand with memoization
+    """
+
+    def __init__(self, program: Program, weights: Optional[Dict[str, float]] = None,
+                 loop_bound: int = DEFAULT_LOOP_BOUND, scale: float = 1.0):
+        """
+        Initialize cost model
+
+        Args:
+            program: Parsed program
+            weights: Opcode -> microseconds overrides
+            loop_bound: Iterations assumed for loops without a visible bound
+            scale: Factor applied to all times (calibration against a measured cycle)
+        """
+        self.program = program
+        self.weights = dict(DEFAULT_WEIGHTS)
+        self.weights.update(weights or {})
+        self.loop_bound = loop_bound
+        self.scale = scale
+        self._costs: Dict[str, BlockCost] = {}
+        self._in_progress: set = set()
+
+    def invalidate(self, names: Optional[List[str]] = None):
+        """
+        Drop memoized costs
+
+        Args:
+            names: Blocks whose cost changed (None = all); callers are not
+                   tracked here, so pass every affected caller as well
+        """
+        if names is None:
+            self._costs.clear()
+        else:
+            for name in names:
+                self._costs.pop(name, None)
+
+    def weight(self, instruction: Instruction) -> float:
+        """
+        Get own execution time of one instruction
+
+        Args:
+            instruction: Parsed instruction
+
+        Returns:
+            float: Microseconds (callee bodies not included)
+        """
+        cost = self.weights.get(instruction.op, BASE_WEIGHT_US)
+        if instruction.call is not None:
+            cost += CALL_PARAMETER_US * len(instruction.call.params)
+        elif '[' in instruction.operand:
+            cost += INDIRECT_EXTRA_US
+        return cost * self.scale
+
+    def block_cost(self, name: str) -> BlockCost:
+        """
+        Get cost of a block including its callees
+
+        Args:
+            name: Block name
+
+        Returns:
+            BlockCost: Cost (empty cost for unknown blocks)
+        """
+        cached = self._costs.get(name)
+        if cached is not None:
+            return cached
+        block = self.program.get(name)
+        if block is None or name in self._in_progress:
+            if name in self._in_progress:
+                logger.warning(f"Call cycle through {name}, cost counted once")
+            return BlockCost(name)
+        self._in_progress.add(name)
+        try:
+            cost = self._compute(block)
+        finally:
+            self._in_progress.discard(name)
+        self._costs[name] = cost
+        return cost
+
+    def _compute(self, block: Block) -> BlockCost:
+        """Compute block cost by longest-path over the jump graph"""
+        instructions = [instruction for _, instruction in block.instructions()]
+        if is_scl_block(block):
+            return BlockCost(block.name, scl=True, uncosted_blocks=[block.name])
+        count = len(instructions)
+        result = BlockCost(block.name, instructions=count)
+
+        labels: Dict[str, int] = {}
+        for position, instruction in enumerate(instructions):
+            if instruction.label and instruction.label not in labels:
+                labels[instruction.label] = position
+
+        # Own cost per instruction: (instructions, microseconds)
+        own: List[Tuple[int, float]] = []
+        expanded = count
+        for instruction in instructions:
+            steps, micros = 1, self.weight(instruction)
+            if instruction.call is not None:
+                result.calls += 1
+                target = instruction.call.target
+                if self.program.get(target) is not None:
+                    callee = self.block_cost(target)
+                    steps += callee.worst_path_instructions
+                    micros += callee.worst_path_us
+                    expanded += callee.expanded_instructions
+                    result.loops += callee.loops
+                    result.unbounded_loops += callee.unbounded_loops
+                    result.external_calls.extend(c for c in callee.external_calls if c not in result.external_calls)
+                    result.uncosted_blocks.extend(c for c in callee.uncosted_blocks
+                                                  if c not in result.uncosted_blocks)
+                else:
+                    micros += EXTERNAL_CALL_US * self.scale
+                    if target not in result.external_calls:
+                        result.external_calls.append(target)
+            own.append((steps, micros))
+        result.expanded_instructions = expanded
+
+        # Back edges (jumps to an earlier instruction) are loops: charge the
+        # extra iterations of the loop body to the jumping instruction
+        extra: Dict[int, Tuple[int, float]] = {}
+        for position, instruction in enumerate(instructions):
+            target = labels.get(instruction.operand) if instruction.op in LABEL_OPS else None
+            if target is None or target > position:
+                continue
+            result.loops += 1
+            bound = self._loop_bound(instructions, target) if instruction.op == 'LOOP' else None
+            if bound is None:
+                bound = self.loop_bound
+                result.unbounded_loops += 1
+            body_steps = sum(steps for steps, _ in own[target:position + 1])
+            body_micros = sum(micros for _, micros in own[target:position + 1])
+            extra[position] = ((bound - 1) * body_steps, (bound - 1) * body_micros)
+
+        # Longest path from each instruction to the block end, forward edges only
+        best_steps = [0] * (count + 1)
+        best_micros = [0.0] * (count + 1)
+        for position in range(count - 1, -1, -1):
+            instruction = instructions[position]
+            op = instruction.op
+            successors = []
+            if op not in NO_FALLTHROUGH:
+                successors.append(position + 1)
+            target = labels.get(instruction.operand) if op in LABEL_OPS else None
+            if target is not None and target > position:
+                successors.append(target)
+            steps, micros = own[position]
+            if position in extra:
+                steps += extra[position][0]
+                micros += extra[position][1]
+            if op == 'BEC':
+                successors.append(count)
+            if successors:
+                follow = max(successors, key=lambda s: (best_micros[s], best_steps[s]))
+                steps += best_steps[follow]
+                micros += best_micros[follow]
+            best_steps[position] = steps
+            best_micros[position] = micros
+
+        result.worst_path_instructions = best_steps[0] if count else 0
+        result.worst_path_us = best_micros[0] if count else 0.0
+        return result
+
+    @staticmethod
+    def _loop_bound(instructions: List[Instruction], target: int) -> Optional[int]:
+        """Find 'L n' right before a 'label: T counter' loop head"""
+        if target > 0 and instructions[target].op == 'T' and instructions[target - 1].op == 'L':
+            operand = instructions[target - 1].operand
+            if operand.isdigit():
+                return max(1, int(operand))
+        return None
+
+    def ob_costs(self) -> Dict[str, BlockCost]:
+        """
+        Get cost of every OB
+
+        Returns:
+            dict: OB name -> BlockCost
+        """
+        return {block.name: self.block_cost(block.name) for block in self.program if block.kind == 'OB'}
+
+    def with_appended(self, ob: str, extra_blocks: List[str]) -> BlockCost:
+        """
+        Estimate an OB after appending calls to extra blocks
+
+        Args:
+            ob: OB name
+            extra_blocks: Blocks whose worst-case path is added to the OB
+                          (e.g. an OB_Integration.awl snippet)
+
+        Returns:
+            BlockCost: Combined cost
+        """
+        base = self.block_cost(ob)
+        combined = BlockCost(ob, **{k: v for k, v in asdict(base).items() if k != 'name'})
+        combined.external_calls = list(base.external_calls)
+        combined.uncosted_blocks = list(base.uncosted_blocks)
+        for name in extra_blocks:
+            added = self.block_cost(name)
+            combined.instructions += added.instructions
+            combined.expanded_instructions += added.expanded_instructions
+            combined.worst_path_instructions += added.worst_path_instructions
+            combined.worst_path_us += added.worst_path_us
+            combined.loops += added.loops
+            combined.unbounded_loops += added.unbounded_loops
+            combined.calls += added.calls
+            combined.external_calls.extend(c for c in added.external_calls if c not in combined.external_calls)
+            combined.uncosted_blocks.extend(c for c in added.uncosted_blocks if c not in combined.uncosted_blocks)
+        return combined
+
+def load_cycle_budgets(config_file: str) -> Dict[str, float]:
+    """
+    Load OB cycle budgets from network_config.json
+
+    Args:
+        config_file: Path to network_config.json
+
+    Returns:
+        dict: 'OB1' -> budget in ms (empty if not configured)
+    """
+    try:
+        with open(config_file, 'r') as f:
+            config = json.load(f)
+        budgets = config.get('plc_configuration', {}).get('cycle_time')
+        if budgets is None:
+            # Search the document, the key has moved between config revisions
+            stack = [config]
+            while stack and budgets is None:
+                node = stack.pop()
+                if isinstance(node, dict):
+                    budgets = node.get('cycle_time')
+                    stack.extend(node.values())
+        return {name.upper(): float(value) for name, value in (budgets or {}).items()}
+    except Exception as e:
+        logger.error(f"Error loading cycle budgets from {config_file}: {e}")
+        return {}
+
+def budget_report(costs: Dict[str, BlockCost], budgets: Dict[str, float]) -> List[Dict[str, Any]]:
+    """
+    Compare OB costs with cycle budgets
+
+    Args:
+        costs: OB name -> BlockCost
+        budgets: OB name -> budget in ms
+
+    Returns:
+        List of report rows (ob, worst_path_ms, budget_ms, utilization)
+    """
+    rows = []
+    for name, cost in costs.items():
+        budget = budgets.get(name)
+        rows.append({
+            'ob': name,
+            'instructions': cost.instructions,
+            'expanded_instructions': cost.expanded_instructions,
+            'worst_path_instructions': cost.worst_path_instructions,
+            'worst_path_ms': cost.worst_path_ms,
+            'budget_ms': budget,
+            'utilization': cost.worst_path_ms / budget if budget else None,
+            'loops': cost.loops,
+            'unbounded_loops': cost.unbounded_loops,
+            'external_calls': cost.external_calls,
+            'uncosted_blocks': cost.uncosted_blocks
+        })
+    return rows
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+DB Image Loader
+===============
+
+Description: Builds the initial byte image of data blocks from their declarations and BEGIN sections
+Purpose: Inspect recipe/parameter tables (DB1, DB2 byte arrays ...) without hand decoding
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- One pass over declared initial values and BEGIN assignments into a
+  single bytes object per DB (instance DBs use their FB's layout)
+- Fast path for 1-D arrays (STAT0[-32768] := B#16#4): index arithmetic
+  and split-based parsing, no regular expressions per line
+- Zero-copy typed views at any byte offset: BYTE/CHAR/WORD/INT/DWORD/DINT/REAL,
+  as NumPy big-endian arrays when NumPy is installed, otherwise as
+  memoryview-backed sequences
+- Symbolic field access through the DB layout
+
+Requirements:
+- numpy (optional): pip install numpy
+"""
+
+import struct
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .layout import TYPE_SIZES, Layout, db_layout, encode_initial, parse_constant
+from .nodes import Block, Program
+from .parser import parse_file
+
+try:
+    import numpy as np
+except ImportError:  # Typed views fall back to struct over memoryview
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Element type -> (struct format, NumPy dtype)
+VIEW_TYPES = {
+    'BYTE': ('B', 'u1'), 'CHAR': ('B', 'u1'), 'WORD': ('>H', '>u2'), 'INT': ('>h', '>i2'),
+    'DWORD': ('>I', '>u4'), 'DINT': ('>i', '>i4'), 'REAL': ('>f', '>f4'),
+    'S5TIME': ('>H', '>u2'), 'DATE': ('>H', '>u2'), 'TIME': ('>i', '>i4'), 'TIME_OF_DAY': ('>I', '>u4'),
+}
+
+class TypedView(Sequence):
+    """
+    Typed view over a memoryview (used when NumPy is not installed)
+
+    Elements are decoded on access with struct.unpack_from; the
+    underlying buffer is never copied
+    """
+
+    def __init__(self, buffer: memoryview, fmt: str, offset: int, count: int):
+        self.buffer = buffer
+        self.format = struct.Struct(fmt)
+        self.offset = offset
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("view index out of range")
+        return self.format.unpack_from(self.buffer, self.offset + index * self.format.size)[0]
+
+    def tolist(self) -> list:
+        return [values[0] for values in self.format.iter_unpack(
+            self.buffer[self.offset:self.offset + self.count * self.format.size])]
+
+    def __repr__(self) -> str:
+        return f"TypedView({self.tolist()!r})"
+
+class DBImage:
+    """
+    DB Image Class
+
+    Initial contents of one data block with typed, zero-copy accessors
+    """
+
+    def __init__(self, name: str, data: bytes, layout: Optional[Layout] = None):
+        self.name = name
+        self.data = data
+        self.layout = layout or Layout()
+        self.memory = memoryview(data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def value(self, type_name: str, offset: int) -> Union[int, float]:
+        """
+        Read one value
+
+        Args:
+            type_name: 'BYTE', 'WORD', 'INT', 'DWORD', 'DINT', 'REAL' ...
+            offset: Byte offset
+
+        Returns:
+            Decoded value
+        """
+        return struct.unpack_from(VIEW_TYPES[type_name.upper()][0], self.memory, offset)[0]
+
+    def bit(self, offset: int, bit: int) -> int:
+        return (self.data[offset] >> bit) & 1
+
+    def view(self, type_name: str, offset: int = 0, count: Optional[int] = None):
+        """
+        Get a zero-copy typed view
+
+        Args:
+            type_name: Element type ('INT', 'REAL', 'WORD' ...)
+            offset: Byte offset of the first element
+            count: Number of elements (default: up to the end of the DB)
+
+        Returns:
+            numpy.ndarray (read-only, big-endian dtype) or TypedView
+        """
+        fmt, dtype = VIEW_TYPES[type_name.upper()]
+        size = struct.calcsize(fmt)
+        if count is None:
+            count = max(0, (len(self.data) - offset) // size)
+        if offset < 0 or offset + count * size > len(self.data):
+            raise ValueError(f"{self.name}: {count} x {type_name} at {offset} exceeds {len(self.data)} bytes")
+        if np is not None:
+            return np.frombuffer(self.data, dtype=dtype, count=count, offset=offset)
+        return TypedView(self.memory, fmt, offset, count)
+
+    def field(self, path: str):
+        """
+        Read a declared variable ('STAT0', 'Recipe.Speed', 'Table[3]')
+
+        Args:
+            path: Member path, optionally with array index
+
+        Returns:
+            Value, typed view for arrays, or None if unknown/not decodable
+        """
+        name, _, index = path.replace(' ', '').partition('[')
+        item = self.layout.get(name)
+        if item is None:
+            return None
+        if index:
+            location = item.element_address(int(part) for part in index.rstrip(']').split(','))
+            if location is None:
+                return None
+            offset, bit, _ = location
+            type_name = item.element
+        else:
+            offset, bit, type_name = item.offset, item.bit, item.type
+            if item.element:
+                if len(item.bounds) != 1 or item.element.upper() not in VIEW_TYPES:
+                    return None
+                lower, upper = item.bounds[0]
+                return self.view(item.element, item.offset, upper - lower + 1)
+        if bit >= 0:
+            return self.bit(offset, bit)
+        type_name = type_name.upper()
+        return self.value(type_name, offset) if type_name in VIEW_TYPES else None
+
+    def hexdump(self, offset: int = 0, length: Optional[int] = None, width: int = 16) -> List[str]:
+        """Get hex dump lines ('0010: 00 04 00 40 ...')"""
+        end = len(self.data) if length is None else min(len(self.data), offset + length)
+        return [f"{start:04X}: " + ' '.join(f"{byte:02X}" for byte in self.data[start:min(start + width, end)])
+                for start in range(offset, end, width)]
+
+def _byte_value(text: str) -> Optional[int]:
+    """Parse a BEGIN value, with a shortcut for the B#16#xx form of byte tables"""
+    text = text.rstrip('; \t')
+    if text[:5].upper() == 'B#16#':
+        try:
+            return int(text[5:], 16)
+        except ValueError:
+            return None
+    return parse_constant(text)
+
+def db_image(block: Block, program: Optional[Program] = None) -> DBImage:
+    """
+    Build the initial image of a data block
+
+    Declared initial values are written first, then the BEGIN section
+    (actual values), matching what a download of the DB would contain.
+
+    Args:
+        block: DATA_BLOCK
+        program: Program holding the FB of an instance DB / UDTs
+
+    Returns:
+        DBImage: Image sized to the DB layout
+    """
+    layout = db_layout(block, program)
+    buffer = bytearray(layout.size)
+    values: Iterable[Tuple[str, str]]
+    if block.instance_of and program is not None:
+        fb = program.get(block.instance_of)
+        declared = [(variable.name, variable.initial) for variable in (fb.variables if fb else [])
+                    if variable.initial and variable.section != 'VAR_TEMP']
+    else:
+        declared = [(variable.name, variable.initial) for variable in block.variables if variable.initial]
+    values = declared + [(target, value) for target, value, _ in block.assignments]
+
+    size = len(buffer)
+    # 1-D array fast path: name -> (offset, lower bound, element size)
+    arrays: Dict[str, Tuple[int, int, int]] = {}
+    for target, text in values:
+        name, _, index = target.replace(' ', '').partition('[')
+        item = layout.get(name)
+        if item is None:
+            continue
+        if index:
+            fast = arrays.get(name)
+            if fast is None and len(item.bounds) == 1 and TYPE_SIZES.get(item.element.upper(), 0) == 1:
+                fast = arrays[name] = (item.offset, item.bounds[0][0], 1)
+            if fast is not None and ',' not in index:
+                try:
+                    offset = fast[0] + int(index.rstrip(']')) - fast[1]
+                except ValueError:
+                    continue
+                value = _byte_value(text)
+                if value is not None and 0 <= offset < size:
+                    buffer[offset] = value & 0xFF
+                continue
+            try:
+                location = item.element_address(int(part) for part in index.rstrip(']').split(','))
+            except ValueError:
+                continue
+            if location is None:
+                continue
+            offset, bit, _ = location
+            encoded = encode_initial(item, text, True)
+        else:
+            offset, bit = item.offset, item.bit
+            encoded = encode_initial(item, text)
+        if encoded is None or offset + len(encoded) > size:
+            continue
+        if bit >= 0:
+            mask = 1 << bit
+            buffer[offset] = (buffer[offset] | mask) if encoded[0] else (buffer[offset] & (0xFF ^ mask))
+        else:
+            buffer[offset:offset + len(encoded)] = encoded
+    return DBImage(block.name, bytes(buffer), layout)
+
+def load_db_images(file_path: str, names: Optional[Iterable[str]] = None) -> Dict[str, DBImage]:
+    """
+    Load data block images from a source file
+
+    Args:
+        file_path: STL/AWL source
+        names: DB names to build ('DB1', 'DB 2'); all DBs if None
+
+    Returns:
+        dict: DB name -> DBImage
+    """
+    wanted = {name.replace(' ', '').upper() for name in names} if names else None
+    images: Dict[str, DBImage] = {}
+    try:
+        program = parse_file(file_path)
+        for block in program:
+            if block.kind == 'DB' and (wanted is None or block.name in wanted):
+                images[block.name] = db_image(block, program)
+        missing = (wanted or set()) - set(images)
+        if missing:
+            logger.warning(f"Data blocks not found in {file_path}: {', '.join(sorted(missing))}")
+    except Exception as e:
+        logger.error(f"Error loading data blocks from {file_path}: {e}")
+    return images
@@ -0,0 +1,1627 @@
+#!/usr/bin/env python3
+"""
+STL Interpreter
+===============
+
+Description: Offline execution of parsed STL blocks against a flat process image
+Purpose: Replay recorded I/O through OB1/OB35 and regression-test logic without hardware
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- Bit logic with S7 RLO, /FC and OR semantics: A/AN/O/ON/X/XN,
+  A(/AN(/O(/ON(/X(/XN( ... ), =, S/R, FP/FN, NOT/SET/CLR/SAVE
+- Four accumulators (S7-400): L/T, INT/DINT/REAL arithmetic, comparisons,
+  word logic, shifts and rotates, conversions
+- Jumps JU/JC/JCN/JNB/JCB/JNBI/JBI/JZ/JN/JP/JM/JPZ/JMZ/JL/LOOP, BE/BEC/BEU
+- OPN DB/DI (direct and memory-indirect), AR1/AR2 register-indirect addressing
+- CALL/UC/CC of FCs and FBs: parameters copied in and out, instance DBs opened
+- S5 timers (SD/SE/SP/SS/SF) on simulated time, counters (CU/CD/S/R)
+- One bytearray holds I, Q, M, every DB and the L stack; each block is
+  decoded once into (handler, constant operands) tuples with absolute
+  addresses already folded in
+- Throughput is bound by Python dispatch, one handler call per executed
+  instruction (about 0.3-0.5 us). STL_Program.txt executes about 7k
+  instructions per OB1 scan, which gives 200-300 scans/s (2-3x real time at
+  10 ms); thousands of scans/s need programs under about 1k instructions
+  per scan. compiler.py roughly doubles the rate.
+- Unsupported instructions and calls to SFCs/SFBs are counted; models for
+  system functions can be registered as hooks
+"""
+
+import csv
+import math
+import re
+import struct
+import time
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .dbimage import db_image
+from .iomap import IOMap
+from .layout import (Layout, bcd_decode, bcd_encode, db_layout, instance_layout,
+                     parameter_layout, parameter_variables, parse_constant, s5time_ms, temp_layout)
+from .nodes import Address, Block, CallInfo, Instruction, Program
+from .parser import LABEL_OPS, normalize_operand
+
+logger = logging.getLogger(__name__)
+
+# Operand reference spaces: (space, offset or area, bit or register, displacement, width)
+ABS, DB, DI, LOC, IND = range(5)
+WIDTH_SIZE = {'X': 1, 'B': 1, 'W': 2, 'D': 4}
+AREA_CODES = {1: 'I', 2: 'Q', 3: 'M', 4: 'DB', 5: 'DI', 6: 'L', 7: 'V'}
+AREA_POINTER = {'I': 0x81, 'Q': 0x82, 'M': 0x83, 'DB': 0x84, 'DI': 0x85, 'L': 0x86, 'V': 0x87}
+PROCESS_AREAS = {'I': 'I', 'PI': 'I', 'Q': 'Q', 'PQ': 'Q', 'M': 'M'}
+
+L_STACK_SIZE = 65536
+DEFAULT_DB_SIZE = 1024  # DBs opened at runtime that the program does not define
+MIN_PROCESS_IMAGE = 128
+MAX_CALL_DEPTH = 24
+MAX_FAULTS = 100
+WATCHDOG_BACK_JUMPS = 100000  # Backward jumps per OB before the cycle is aborted (OB80 on the CPU)
+RETURN = 1 << 30
+OB_START_INFO = 20
+
+INDIRECT_RE = re.compile(r'^(?P<area>PI|PQ|DB|DI|I|Q|M|L)?(?P<width>[XBWD]?)'
+                         r'\[AR(?P<reg>[12]),P#(?P<byte>\d+)\.(?P<bit>[0-7])\]$')
+MEMORY_INDIRECT_RE = re.compile(r'^(?P<area>DB|DI)\[(?P<pointer>[^\]]+)\]$')
+SYMBOL_RE = re.compile(r'^#(?P<path>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)(?:\[(?P<index>[^\]]+)\])?$')
+POINTER_RE = re.compile(r'^P#(?:DB(?P<db>\d+)\.)?(?:(?P<area>I|Q|M|DBX|DIX|L|V)\s*)?'
+                        r'(?P<byte>\d+)\.(?P<bit>[0-7])$')
+
+STATUS_BITS = frozenset(('OV', 'OS', 'BR', 'UO', '==0', '<>0', '>0', '<0', '>=0', '<=0'))
+LOGIC_OPS = {'A': (0, 0), 'AN': (0, 1), 'O': (1, 0), 'ON': (1, 1), 'X': (2, 0), 'XN': (2, 1)}
+NEST_OPS = {'A(': (0, 0), 'AN(': (0, 1), 'O(': (1, 0), 'ON(': (1, 1), 'X(': (2, 0), 'XN(': (2, 1)}
+TIMER_OPS = ('SD', 'SE', 'SP', 'SS', 'SF')
+SPECIAL_LOADS = ('DBNO', 'DBLG', 'DINO', 'DILG', 'STW')
+
+_DWORD = struct.Struct('>I')
+_REAL = struct.Struct('>f')
+
+def _s16(value: int) -> int:
+    value &= 0xFFFF
+    return value - 0x10000 if value & 0x8000 else value
+
+def _s32(value: int) -> int:
+    value &= 0xFFFFFFFF
+    return value - 0x100000000 if value & 0x80000000 else value
+
+def _real(value: int) -> float:
+    return _REAL.unpack(_DWORD.pack(value & 0xFFFFFFFF))[0]
+
+def _real_bits(value: float) -> int:
+    try:
+        return _DWORD.unpack(_REAL.pack(value))[0]
+    except (OverflowError, struct.error):
+        return 0x7F800000 if value > 0 else 0xFF800000
+
+def _trunc_div(a: int, b: int) -> Tuple[int, int]:
+    """S7 division: quotient rounded toward zero, remainder with the dividend's sign"""
+    quotient = abs(a) // abs(b)
+    if (a < 0) != (b < 0):
+        quotient = -quotient
+    return quotient, a - quotient * b
+
+COMPARE = {'==': lambda a, b: a == b, '<>': lambda a, b: a != b, '>': lambda a, b: a > b,
+           '<': lambda a, b: a < b, '>=': lambda a, b: a >= b, '<=': lambda a, b: a <= b}
+ARITHMETIC = {
+    '+I': (lambda a, b: a + b, 'I'), '-I': (lambda a, b: a - b, 'I'), '*I': (lambda a, b: a * b, 'D'),
+    '+D': (lambda a, b: a + b, 'D'), '-D': (lambda a, b: a - b, 'D'), '*D': (lambda a, b: a * b, 'D'),
+    '/D': (lambda a, b: _trunc_div(a, b)[0] if b else 0, 'D'),
+    'MOD': (lambda a, b: _trunc_div(a, b)[1] if b else 0, 'D'),
+}
+REAL_ARITHMETIC = {'+R': lambda a, b: a + b, '-R': lambda a, b: a - b, '*R': lambda a, b: a * b,
+                   '/R': lambda a, b: a / b if b else math.copysign(math.inf, a)}
+WORD_LOGIC = {'AW': (lambda a, b: a & b, 0xFFFF), 'OW': (lambda a, b: a | b, 0xFFFF),
+              'XOW': (lambda a, b: a ^ b, 0xFFFF), 'AD': (lambda a, b: a & b, 0xFFFFFFFF),
+              'OD': (lambda a, b: a | b, 0xFFFFFFFF), 'XOD': (lambda a, b: a ^ b, 0xFFFFFFFF)}
+CONDITION_JUMPS = {'JZ': lambda cc: cc == 0, 'JN': lambda cc: cc != 0, 'JP': lambda cc: cc > 0,
+                   'JM': lambda cc: cc < 0, 'JPZ': lambda cc: cc >= 0, 'JMZ': lambda cc: cc <= 0,
+                   'JO': lambda cc: False, 'JOS': lambda cc: False, 'JUO': lambda cc: False}
+
+class WatchdogError(RuntimeError):
+    """Raised when an OB exceeds the backward-jump budget (endless loop)"""
+
+class DecodedBlock:
+    """
+    Decoded block data structure
+
+    code: One (handler, operands...) tuple per instruction
+    frame_size: L stack bytes used by the block (TEMP plus copied FC parameters)
+    """
+    __slots__ = ('name', 'kind', 'code', 'frame_size', 'param_base', 'locals', 'params', 'statics',
+                 'scopes', 'unsupported')
+
+    def __init__(self, block: Block):
+        self.name = block.name
+        self.kind = block.kind
+        self.code: List[tuple] = []
+        self.frame_size = 0
+        self.param_base = 0
+        self.locals = temp_layout(block)
+        self.params = parameter_layout(block) if block.kind == 'FC' else Layout()
+        self.statics = instance_layout(block) if block.kind == 'FB' else Layout()
+        self.scopes: List[Tuple[Layout, int, int]] = []
+        self.unsupported: Counter = Counter()
+
+class CallPlan(NamedTuple):
+    """
+    Resolved call data structure
+
+    inputs: (callee offset, bit, width, caller ref or None, constant) copied before the call
+    outputs: (callee offset, bit, width, caller ref) copied back after the call
+    """
+    target: str
+    block: Optional[DecodedBlock]
+    instance: int  # Instance DB number (-1 for FCs)
+    inputs: Tuple
+    outputs: Tuple
+
+@dataclass
+class SimulationResult:
+    """Simulation run result data structure"""
+    scans: int = 0
+    elapsed_s: float = 0.0
+    scans_per_s: float = 0.0
+    output_changes: List[Tuple[int, str, int]] = field(default_factory=list)  # (scan, address, value)
+    faults: int = 0
+    unsupported: Dict[str, int] = field(default_factory=dict)
+    external_calls: Dict[str, int] = field(default_factory=dict)
+
+def load_recording(file_path: str) -> Dict[int, List[Tuple[str, int]]]:
+    """
+    Load recorded input changes
+
+    CSV with a 'scan,signal,value' header; signal is an address ('I 0.1')
+    or a plc_io.txt device tag ('-KA1').
+
+    Args:
+        file_path: Recording file
+
+    Returns:
+        dict: Scan number -> [(signal, value), ...]
+    """
+    recording: Dict[int, List[Tuple[str, int]]] = {}
+    try:
+        with open(file_path, 'r', newline='') as f:
+            for row in csv.DictReader(f):
+                value = parse_constant(row['value'])
+                recording.setdefault(int(row['scan']), []).append((row['signal'].strip(), value or 0))
+    except Exception as e:
+        logger.error(f"Error loading recording {file_path}: {e}")
+    return recording
+
+class STLInterpreter:
+    """
+    STL Interpreter Class
+
+    Executes OBs of a parsed program scan by scan on simulated time
+    """
+
+    def __init__(self, program: Program, io_map: Optional[IOMap] = None, scan_time_ms: float = 10.0,
+                 cyclic: Optional[Dict[str, float]] = None):
+        """
+        Initialize interpreter
+
+        Args:
+            program: Parsed program (OBs, FCs, FBs, DBs)
+            io_map: plc_io.txt points, used for tag lookup and output naming
+            scan_time_ms: Simulated OB1 cycle time (timers advance by this per scan)
+            cyclic: Cyclic interrupt OBs and their period in ms ({'OB35': 100.0})
+        """
+        self.program = program
+        self.io_map = io_map or IOMap()
+        self.scan_time_ms = scan_time_ms
+        self.cyclic = {name: period for name, period in (cyclic or {}).items() if program.get(name) is not None}
+        self.logger = logging.getLogger(__name__)
+
+        self.image = bytearray()
+        self.regions: Dict[str, Tuple[int, int]] = {}  # 'I', 'Q', 'M', 'L', 'DB10' -> (base, size)
+        self.decoded: Dict[str, DecodedBlock] = {}
+        self.system_functions: Dict[str, Callable[['STLInterpreter', CallInfo], None]] = {}
+        self.timers: List[List[Any]] = []
+        self.counters: List[List[int]] = []
+        self.faults: List[str] = []
+        self.fault_count = 0
+        self.unsupported: Counter = Counter()
+        self.external_calls: Counter = Counter()
+        self.now_ms = 0.0
+        self.scan_count = 0
+        self.started = False
+        self._next_due: Dict[str, float] = {}
+
+        self._allocate()
+        self._init_data_blocks()
+        self._reset_registers()
+
+    # ------------------------------------------------------------------
+    # Memory image
+    # ------------------------------------------------------------------
+
+    def _add_region(self, name: str, size: int) -> Tuple[int, int]:
+        size = max(2, size + (size & 1))
+        region = (len(self.image), size)
+        self.image.extend(bytes(size))
+        self.regions[name] = region
+        return region
+
+    def _allocate(self):
+        """Size every area from the program's absolute accesses and DB declarations"""
+        highest: Dict[str, int] = {'I': MIN_PROCESS_IMAGE, 'Q': MIN_PROCESS_IMAGE, 'M': 256}
+        timers = counters = 0
+
+        def note(address: Optional[Address]):
+            nonlocal timers, counters
+            if address is None:
+                return
+            if address.area == 'T':
+                timers = max(timers, address.byte + 1)
+            elif address.area == 'C':
+                counters = max(counters, address.byte + 1)
+            else:
+                area = PROCESS_AREAS.get(address.area)
+                if address.area == 'DB' and address.db >= 0:
+                    area = f"DB{address.db}"
+                if area is not None:
+                    highest[area] = max(highest.get(area, 0), address.byte + max(1, address.size))
+
+        for block in self.program:
+            for _, instruction in block.instructions():
+                note(instruction.address)
+                if instruction.call is not None:
+                    for _, _, address in instruction.call.params:
+                        note(address)
+                    if instruction.call.instance.startswith('DB'):
+                        highest.setdefault(instruction.call.instance, 0)
+        for address in self.io_map.points:
+            note(normalize_operand(address)[1])
+
+        for area in ('I', 'Q', 'M'):
+            self._add_region(area, highest.pop(area))
+        for block in self.program:
+            if block.kind == 'DB':
+                layout = db_layout(block, self.program)
+                self._add_region(block.name, max(layout.size, highest.pop(block.name, 0)))
+        for name, size in sorted(highest.items()):
+            # Instance/global DBs referenced but not part of the source
+            fb = self._instance_fb(name)
+            self._add_region(name, max(size, instance_layout(fb).size if fb is not None else 0))
+        self._add_region('L', L_STACK_SIZE)
+        self.timers = [[None, -1, 0, 0, 0, 0] for _ in range(max(timers, 1))]
+        self.counters = [[0, 0, 0, 0] for _ in range(max(counters, 1))]
+
+    def _instance_fb(self, db_name: str) -> Optional[Block]:
+        """Get FB of an instance DB from its declaration or from a CALL FBn, DBm"""
+        block = self.program.get(db_name)
+        if block is not None and block.instance_of:
+            return self.program.get(block.instance_of)
+        for caller in self.program:
+            for _, instruction in caller.instructions():
+                if instruction.call is not None and instruction.call.instance == db_name:
+                    return self.program.get(instruction.call.target)
+        return None
+
+    def _db_region(self, number: int) -> Tuple[int, int]:
+        region = self.regions.get(f"DB{number}")
+        if region is None:
+            region = self._add_region(f"DB{number}", DEFAULT_DB_SIZE)
+            self.logger.debug(f"DB{number} not in program, allocated {DEFAULT_DB_SIZE} bytes")
+        return region
+
+    def _init_data_blocks(self):
+        """Write declared initial values, then the actual values of BEGIN sections"""
+        for block in self.program:
+            if block.kind != 'DB':
+                continue
+            base, size = self.regions[block.name]
+            data = db_image(block, self.program).data[:size]
+            self.image[base:base + len(data)] = data
+
+    def _fault(self, message: str):
+        self.fault_count += 1
+        if len(self.faults) < MAX_FAULTS:
+            self.faults.append(f"scan {self.scan_count}: {message}")
+            self.logger.debug(message)
+
+    def _locate(self, ref: tuple) -> Optional[Tuple[int, int]]:
+        """Get absolute (byte offset, bit) of a reference in the current register context"""
+        space = ref[0]
+        if space == ABS:
+            return ref[1], ref[2]
+        if space == LOC:
+            return self.lbase + ref[1], ref[2]
+        size = WIDTH_SIZE.get(ref[4], 1)
+        if space == DB:
+            if ref[1] + size > self.db_size:
+                self._fault(f"DB{self.db_no} access at {ref[1]} beyond length {self.db_size}")
+                return None
+            return self.db_base + ref[1], ref[2]
+        if space == DI:
+            if ref[1] + size > self.di_size:
+                self._fault(f"DI{self.di_no} access at {ref[1]} beyond length {self.di_size}")
+                return None
+            return self.di_base + ref[1], ref[2]
+
+        # Register indirect: pointer = AR + displacement (bit address)
+        register = self.ar1 if ref[2] == 1 else self.ar2
+        area = ref[1] or AREA_CODES.get((register >> 24) & 7)
+        pointer = (register & 0x7FFFF) + ref[3]
+        byte, bit = pointer >> 3, pointer & 7
+        if area == 'DB':
+            base, limit = self.db_base, self.db_size
+        elif area == 'DI':
+            base, limit = self.di_base, self.di_size
+        elif area == 'L':
+            base, limit = self.lbase, self.regions['L'][0] + self.regions['L'][1] - self.lbase
+        elif area == 'V':
+            base, limit = self.vbase, self.lbase - self.vbase
+        elif area in PROCESS_AREAS:
+            base, limit = self.regions[PROCESS_AREAS[area]]
+        else:
+            self._fault(f"Indirect access with area-less pointer {register:#010x}")
+            return None
+        if byte + size > limit:
+            self._fault(f"Indirect {area} access at {byte}.{bit} beyond length {limit}")
+            return None
+        return base + byte, bit
+
+    def _read(self, ref: tuple) -> int:
+        location = self._locate(ref)
+        if location is None:
+            return 0
+        offset, bit = location
+        width = ref[4]
+        image = self.image
+        if width == 'X':
+            return (image[offset] >> bit) & 1
+        if width == 'B':
+            return image[offset]
+        if width == 'W':
+            return (image[offset] << 8) | image[offset + 1]
+        return _DWORD.unpack_from(image, offset)[0]
+
+    def _write(self, ref: tuple, value: int):
+        location = self._locate(ref)
+        if location is None:
+            return
+        self._store(location[0], location[1], ref[4], value)
+
+    def _store(self, offset: int, bit: int, width: str, value: int):
+        image = self.image
+        if width == 'X':
+            if value:
+                image[offset] |= 1 << bit
+            else:
+                image[offset] &= 0xFF ^ (1 << bit)
+        elif width == 'B':
+            image[offset] = value & 0xFF
+        elif width == 'W':
+            image[offset] = (value >> 8) & 0xFF
+            image[offset + 1] = value & 0xFF
+        elif width == 'P':
+            # POINTER parameter: DB number word followed by the area pointer
+            image[offset:offset + 6] = (value & 0xFFFFFFFFFFFF).to_bytes(6, 'big')
+        else:
+            _DWORD.pack_into(image, offset, value & 0xFFFFFFFF)
+
+    def _fetch(self, offset: int, bit: int, width: str) -> int:
+        image = self.image
+        if width == 'X':
+            return (image[offset] >> bit) & 1
+        if width == 'B':
+            return image[offset]
+        if width == 'W':
+            return (image[offset] << 8) | image[offset + 1]
+        return _DWORD.unpack_from(image, offset)[0]
+
+    def _absolute(self, signal: str) -> Optional[tuple]:
+        """Resolve a tag or absolute address to an ABS reference"""
+        text = self.io_map.resolve(signal)
+        if text is None:
+            return None
+        ref = self._reference(None, text, normalize_operand(text)[1])
+        return ref if ref is not None and ref[0] == ABS else None
+
+    def read(self, signal: str) -> Optional[int]:
+        """
+        Read a value from the image
+
+        Args:
+            signal: Absolute address ('Q 32.0', 'DB10.DBW 100', 'MW 20') or I/O tag ('-KM1')
+
+        Returns:
+            int: Unsigned value, or None if the address is not absolute
+        """
+        ref = self._absolute(signal)
+        return None if ref is None else self._read(ref)
+
+    def write(self, signal: str, value: int) -> bool:
+        """
+        Write a value into the image (inputs before a scan, markers, DB values)
+
+        Args:
+            signal: Absolute address or I/O tag
+            value: Value (truthiness for bits)
+
+        Returns:
+            bool: True if the address was resolved
+        """
+        ref = self._absolute(signal)
+        if ref is None:
+            self.logger.warning(f"Cannot resolve signal {signal}")
+            return False
+        self._write(ref, int(value))
+        return True
+
+    def outputs(self) -> Dict[str, int]:
+        """Get state of every output bit in the I/O map"""
+        return {point.address: self.read(point.address) for point in self.io_map.outputs()}
+
+    def register_system_function(self, name: str, function: Callable[['STLInterpreter', CallInfo], None]):
+        """
+        Register a model for an SFC/SFB or missing block
+
+        Args:
+            name: Call target ('BLKMOV', 'SFC20', 'RD_SINFO')
+            function: Called with (interpreter, call info) in the caller's context
+        """
+        self.system_functions[name] = function
+
+    # ------------------------------------------------------------------
+    # Decoding
+    # ------------------------------------------------------------------
+
+    def _reference(self, ctx: Optional[DecodedBlock], operand: str, address: Optional[Address]) -> Optional[tuple]:
+        """Resolve an operand to (space, offset/area, bit/register, displacement, width)"""
+        if address is not None:
+            width = address.width or 'X'
+            bit = max(address.bit, 0)
+            area = address.area
+            if area in PROCESS_AREAS:
+                return (ABS, self.regions[PROCESS_AREAS[area]][0] + address.byte, bit, 0, width)
+            if area == 'DB' and address.db >= 0:
+                base, size = self._db_region(address.db)
+                if address.byte + WIDTH_SIZE.get(width, 1) > size:
+                    return None
+                return (ABS, base + address.byte, bit, 0, width)
+            if area == 'DB':
+                return (DB, address.byte, bit, 0, width)
+            if area == 'DI':
+                return (DI, address.byte, bit, 0, width)
+            if area == 'L':
+                return (LOC, address.byte, bit, 0, width)
+            return None
+        if operand.startswith('#'):
+            return self._symbol(ctx, operand) if ctx is not None else None
+        match = INDIRECT_RE.match(operand)
+        if match:
+            area = match.group('area')
+            area = PROCESS_AREAS.get(area, area) if area else None
+            width = match.group('width') or 'X'
+            displacement = (int(match.group('byte')) << 3) | int(match.group('bit'))
+            return (IND, area, int(match.group('reg')), displacement, width)
+        return None
+
+    def _symbol(self, ctx: DecodedBlock, operand: str) -> Optional[tuple]:
+        match = SYMBOL_RE.match(operand)
+        if not match:
+            return None
+        for layout, space, base in ctx.scopes:
+            item = layout.get(match.group('path'))
+            if item is not None:
+                break
+        else:
+            return None
+        if match.group('index'):
+            try:
+                location = item.element_address(int(index) for index in match.group('index').split(','))
+            except ValueError:
+                return None
+            if location is None:
+                return None
+            offset, bit, width = location
+        else:
+            offset, bit, width = item.offset, item.bit, item.width
+        if not width:
+            return None
+        return (space, base + offset, max(bit, 0), 0, width)
+
+    def _pointer(self, ctx: DecodedBlock, operand: str) -> Optional[int]:
+        """Get the pointer value of 'P#12.0', 'P#M 10.0' or 'P##TEMP4'"""
+        if operand.startswith('P##'):
+            ref = self._symbol(ctx, operand[2:]) if ctx is not None else None
+            if ref is None:
+                # STRUCT/ARRAY: the pointer targets its first byte
+                for layout, space, base in ctx.scopes if ctx is not None else ():
+                    item = layout.get(operand[3:])
+                    if item is not None:
+                        ref = (space, base + item.offset, 0, 0, 'B')
+                        break
+            if ref is None or ref[0] not in (LOC, DI):
+                return None
+            area = AREA_POINTER['L' if ref[0] == LOC else 'DI']
+            return (area << 24) | (ref[1] << 3) | ref[2]
+        match = POINTER_RE.match(operand.upper())
+        if not match:
+            return None
+        area = {'DBX': 'DB', 'DIX': 'DI'}.get(match.group('area'), match.group('area'))
+        value = (int(match.group('byte')) << 3) | int(match.group('bit'))
+        return value | (AREA_POINTER[area] << 24 if area else 0)
+
+    def decode(self, name: str) -> Optional[DecodedBlock]:
+        """
+        Get decoded form of a block (decoded on first use)
+
+        Args:
+            name: Block name
+
+        Returns:
+            DecodedBlock: Decoded block, None if not a code block of the program
+        """
+        ctx = self.decoded.get(name)
+        if ctx is not None:
+            return ctx
+        block = self.program.get(name)
+        if block is None or not block.is_code:
+            return None
+        ctx = DecodedBlock(block)
+        self.decoded[name] = ctx
+        instructions = [instruction for _, instruction in block.instructions()]
+
+        local_size = ctx.locals.size
+        for instruction in instructions:
+            if instruction.address is not None and instruction.address.area == 'L':
+                local_size = max(local_size, instruction.address.byte + max(1, instruction.address.size))
+        if block.kind == 'OB':
+            local_size = max(local_size, OB_START_INFO)
+        ctx.param_base = local_size + (local_size & 1)
+        ctx.frame_size = ctx.param_base + ctx.params.size + (ctx.params.size & 1)
+        if block.kind == 'FB':
+            ctx.scopes = [(ctx.statics, DI, 0), (ctx.locals, LOC, 0)]
+        else:
+            ctx.scopes = [(ctx.locals, LOC, 0), (ctx.params, LOC, ctx.param_base)]
+
+        labels: Dict[str, int] = {}
+        for position, instruction in enumerate(instructions):
+            if instruction.label and instruction.label not in labels:
+                labels[instruction.label] = position
+        ctx.code = [self._decode(ctx, instruction, position, labels) for position, instruction in
+                    enumerate(instructions)]
+        return ctx
+
+    def _unsupported_entry(self, ctx: DecodedBlock, instruction: Instruction) -> tuple:
+        key = f"{instruction.op} {instruction.operand}".strip() if instruction.op == 'SCL' else instruction.op
+        ctx.unsupported[instruction.op] += 1
+        return (self._unsupported, instruction.op, key)
+
+    def _decode(self, ctx: DecodedBlock, instruction: Instruction, position: int, labels: Dict[str, int]) -> tuple:
+        """Decode one instruction to its handler tuple"""
+        op = instruction.op
+        operand = instruction.operand
+        address = instruction.address
+        unsupported = lambda: self._unsupported_entry(ctx, instruction)
+
+        if op in LOGIC_OPS:
+            kind, negate = LOGIC_OPS[op]
+            if not operand:
+                return (self._or_bare,) if op == 'O' else unsupported()
+            if operand in STATUS_BITS:
+                return (self._logic_status, kind, operand, negate)
+            if address is not None and address.area == 'T':
+                return (self._logic_timer, kind, address.byte, negate)
+            if address is not None and address.area == 'C':
+                return (self._logic_counter, kind, address.byte, negate)
+            ref = self._reference(ctx, operand, address)
+            if ref is None or ref[4] != 'X':
+                return unsupported()
+            if ref[0] == ABS and kind == 0:
+                return (self._and_abs, ref[1], ref[2], negate)
+            if ref[0] == ABS and kind == 1:
+                return (self._or_abs, ref[1], ref[2], negate)
+            return (self._logic_ref, kind, ref, negate)
+        if op in NEST_OPS:
+            kind, negate = NEST_OPS[op]
+            return (self._nest, kind, negate)
+        if op == ')':
+            return (self._unnest,)
+        if op in ('=', 'S', 'R'):
+            if address is not None and address.area == 'T':
+                return (self._timer_reset, address.byte) if op == 'R' else unsupported()
+            if address is not None and address.area == 'C':
+                return (self._counter_set, address.byte) if op == 'S' else (self._counter_reset, address.byte)
+            ref = self._reference(ctx, operand, address)
+            if ref is None or ref[4] != 'X':
+                return unsupported()
+            mode = {'=': 0, 'S': 1, 'R': 2}[op]
+            if ref[0] == ABS:
+                return (self._assign_abs, ref[1], 1 << ref[2], 0xFF ^ (1 << ref[2]), mode)
+            return (self._assign_ref, ref, mode)
+        if op in ('FP', 'FN'):
+            ref = self._reference(ctx, operand, address)
+            if ref is None or ref[4] != 'X':
+                return unsupported()
+            return (self._edge, ref, op == 'FP')
+        if op in ('SET', 'CLR'):
+            return (self._set_rlo, 1 if op == 'SET' else 0)
+        if op == 'NOT':
+            return (self._not,)
+        if op == 'SAVE':
+            return (self._save,)
+
+        if op == 'L':
+            return self._decode_load(ctx, instruction, unsupported)
+        if op == 'LC':
+            if address is not None and address.area == 'T':
+                return (self._load_timer, address.byte, True)
+            if address is not None and address.area == 'C':
+                return (self._load_counter, address.byte, True)
+            return unsupported()
+        if op == 'T':
+            if operand == 'STW':
+                return (self._nop,)
+            ref = self._reference(ctx, operand, address)
+            if ref is None or ref[4] == 'X':
+                return unsupported()
+            if ref[0] == ABS:
+                return ({'B': self._transfer_b_abs, 'W': self._transfer_w_abs, 'D': self._transfer_d_abs}[ref[4]],
+                        ref[1])
+            return (self._transfer_ref, ref)
+
+        if op in TIMER_OPS:
+            if address is None or address.area != 'T':
+                return unsupported()
+            return (self._timer_start, address.byte, op)
+        if op == 'FR':
+            return (self._nop,)
+        if op in ('CU', 'CD'):
+            if address is None or address.area != 'C':
+                return unsupported()
+            return (self._count, address.byte, 1 if op == 'CU' else -1)
+
+        if op in ARITHMETIC:
+            function, width = ARITHMETIC[op]
+            return (self._arithmetic, function, op.endswith('I'), width == 'D' and op != '*I')
+        if op == '/I':
+            return (self._divide_int,)
+        if op in REAL_ARITHMETIC:
+            return (self._arithmetic_real, REAL_ARITHMETIC[op])
+        if op == '+':
+            value = parse_constant(operand)
+            if value is None:
+                return unsupported()
+            return (self._add_constant, value, operand.upper().startswith('L#'))
+        if op in ('INC', 'DEC'):
+            value = parse_constant(operand or '1') or 0
+            return (self._increment, value if op == 'INC' else -value)
+        if len(op) >= 2 and op[-1] in 'IDR' and op[:-1] in COMPARE:
+            return (self._compare, COMPARE[op[:-1]], op[-1])
+        if op in WORD_LOGIC:
+            function, mask = WORD_LOGIC[op]
+            constant = parse_constant(operand) if operand else None
+            if operand and constant is None:
+                return unsupported()
+            return (self._word_logic, function, mask, constant)
+        if op in ('SLW', 'SRW', 'SLD', 'SRD', 'SSI', 'SSD', 'RLD', 'RRD'):
+            count = parse_constant(operand) if operand else None
+            return (self._shift, op, count)
+        if op in ('ITD', 'ITB', 'BTI', 'BTD', 'DTB', 'DTR', 'INVI', 'INVD', 'NEGI', 'NEGD', 'CAW', 'CAD',
+                  'TRUNC', 'RND', 'RND+', 'RND-', 'ABS', 'NEGR', 'SQR', 'SQRT'):
+            return (self._convert, op)
+        if op in ('TAK', 'PUSH', 'POP', 'ENT', 'LEAVE'):
+            return (self._accumulators, op)
+
+        if op in ('LAR1', 'LAR2'):
+            register = int(op[-1])
+            if not operand:
+                return (self._load_ar, register, None, None)
+            if operand in ('AR1', 'AR2'):
+                return (self._load_ar, register, None, int(operand[-1]))
+            pointer = self._pointer(ctx, operand)
+            if pointer is not None:
+                return (self._load_ar, register, pointer, None)
+            ref = self._reference(ctx, operand, address)
+            if ref is None or ref[4] != 'D':
+                return unsupported()
+            return (self._load_ar_ref, register, ref)
+        if op in ('TAR1', 'TAR2'):
+            register = int(op[-1])
+            if not operand:
+                return (self._transfer_ar, register)
+            ref = self._reference(ctx, operand, address)
+            if ref is None or ref[4] != 'D':
+                return unsupported()
+            return (self._transfer_ar_ref, register, ref)
+        if op in ('+AR1', '+AR2'):
+            pointer = self._pointer(ctx, operand) if operand else None
+            if operand and pointer is None:
+                return unsupported()
+            return (self._add_ar, int(op[-1]), pointer)
+        if op == 'CAR':
+            return (self._swap_ar,)
+
+        if op == 'OPN':
+            text = operand.replace(' ', '')
+            match = re.match(r'^(DB|DI)(\d+)$', text)
+            if match:
+                number = int(match.group(2))
+                self._db_region(number)
+                return (self._open, match.group(1), number, None)
+            match = MEMORY_INDIRECT_RE.match(text)
+            if match:
+                ref = self._reference(ctx, match.group('pointer'), normalize_operand(match.group('pointer'))[1])
+                if ref is not None and ref[4] == 'W':
+                    return (self._open, match.group('area'), None, ref)
+            if text.startswith('#'):
+                ref = self._symbol(ctx, text)
+                if ref is not None and ref[4] == 'W':
+                    return (self._open, 'DB', None, ref)
+            return unsupported()
+
+        if op in LABEL_OPS:
+            target = labels.get(operand)
+            if target is None:
+                return unsupported()
+            if op == 'JU':
+                return (self._jump, target)
+            if op in ('JC', 'JCN', 'JNB', 'JCB', 'JBI', 'JNBI'):
+                return (self._jump_rlo, target, op)
+            if op == 'LOOP':
+                return (self._loop, target)
+            if op == 'JL':
+                return (self._jump_list, target, max(0, target - position - 1))
+            if op in CONDITION_JUMPS:
+                return (self._jump_condition, target, CONDITION_JUMPS[op])
+            return unsupported()
+        if op in ('BE', 'BEU'):
+            return (self._return,)
+        if op == 'BEC':
+            return (self._return_conditional,)
+        if op in ('NOP', 'BLD'):
+            return (self._nop,)
+        if op in ('CALL', 'UC', 'CC') and instruction.call is not None:
+            return (self._call, instruction.call, ctx, [None], op == 'CC')
+        return unsupported()
+
+    def _decode_load(self, ctx: DecodedBlock, instruction: Instruction, unsupported: Callable[[], tuple]) -> tuple:
+        operand = instruction.operand
+        address = instruction.address
+        if address is not None and address.area == 'T':
+            return (self._load_timer, address.byte, False)
+        if address is not None and address.area == 'C':
+            return (self._load_counter, address.byte, False)
+        if operand in SPECIAL_LOADS:
+            return (self._load_special, operand)
+        ref = self._reference(ctx, operand, address)
+        if ref is not None and ref[4] != 'X':
+            if ref[0] == ABS:
+                return ({'B': self._load_b_abs, 'W': self._load_w_abs, 'D': self._load_d_abs}[ref[4]], ref[1])
+            return (self._load_ref, ref)
+        if ref is not None:
+            return unsupported()
+        value = self._pointer(ctx, operand) if operand.upper().startswith('P#') else parse_constant(operand)
+        if value is None:
+            return unsupported()
+        return (self._load_constant, value)
+
+    # ------------------------------------------------------------------
+    # Handlers: each takes (instruction tuple, position) and returns the next position
+    # ------------------------------------------------------------------
+
+    def _unsupported(self, ins, pc):
+        self.unsupported[ins[2]] += 1
+        return pc + 1
+
+    def _nop(self, ins, pc):
+        return pc + 1
+
+    def _logic(self, kind: int, value: int):
+        if not self.fc:
+            self.term = value
+            self.fc = 1
+        elif kind == 0:
+            self.term &= value
+        elif kind == 1:
+            self.orb |= self.term
+            self.term = value
+        else:
+            self.term = (self.orb | self.term) ^ value
+            self.orb = 0
+
+    def _and_abs(self, ins, pc):
+        value = ((self.image[ins[1]] >> ins[2]) & 1) ^ ins[3]
+        if self.fc:
+            self.term &= value
+        else:
+            self.term = value
+            self.fc = 1
+        return pc + 1
+
+    def _or_abs(self, ins, pc):
+        value = ((self.image[ins[1]] >> ins[2]) & 1) ^ ins[3]
+        if self.fc:
+            self.orb |= self.term
+        else:
+            self.fc = 1
+        self.term = value
+        return pc + 1
+
+    def _logic_ref(self, ins, pc):
+        ref = ins[2]
+        if ref[0] == LOC:
+            value = ((self.image[self.lbase + ref[1]] >> ref[2]) & 1) ^ ins[3]
+        else:
+            value = self._read(ref) ^ ins[3]
+        if not self.fc:
+            self.term = value
+            self.fc = 1
+        elif ins[1] == 0:
+            self.term &= value
+        else:
+            self._logic(ins[1], value)
+        return pc + 1
+
+    def _logic_timer(self, ins, pc):
+        self._logic(ins[1], self._timer_output(ins[2]) ^ ins[3])
+        return pc + 1
+
+    def _logic_counter(self, ins, pc):
+        self._logic(ins[1], (1 if self.counters[ins[2]][0] else 0) ^ ins[3])
+        return pc + 1
+
+    def _logic_status(self, ins, pc):
+        name = ins[2]
+        cc = self.cc
+        if name == 'BR':
+            value = self.br
+        elif name in ('OV', 'OS', 'UO'):
+            value = 0
+        else:
+            value = 1 if COMPARE[name[:-1]](cc, 0) else 0
+        self._logic(ins[1], value ^ ins[3])
+        return pc + 1
+
+    def _or_bare(self, ins, pc):
+        self.orb |= self.term
+        self.fc = 0
+        return pc + 1
+
+    def _nest(self, ins, pc):
+        self.nesting.append((ins[1], ins[2], self.orb, self.term, self.fc))
+        self.orb = self.term = self.fc = 0
+        return pc + 1
+
+    def _unnest(self, ins, pc):
+        if not self.nesting:
+            self._fault("')' without open bracket")
+            return pc + 1
+        kind, negate, orb, term, fc = self.nesting.pop()
+        value = (self.orb | self.term) ^ negate
+        self.orb, self.term, self.fc = orb, term, fc
+        self._logic(kind, value)
+        return pc + 1
+
+    def _assign_abs(self, ins, pc):
+        rlo = self.orb | self.term
+        mode = ins[4]
+        if mode == 0:
+            if rlo:
+                self.image[ins[1]] |= ins[2]
+            else:
+                self.image[ins[1]] &= ins[3]
+        elif rlo:
+            if mode == 1:
+                self.image[ins[1]] |= ins[2]
+            else:
+                self.image[ins[1]] &= ins[3]
+        self.term = rlo
+        self.orb = self.fc = 0
+        return pc + 1
+
+    def _assign_ref(self, ins, pc):
+        rlo = self.orb | self.term
+        mode = ins[2]
+        if mode == 0 or rlo:
+            value = rlo if mode == 0 else 2 - mode
+            ref = ins[1]
+            if ref[0] == LOC:
+                offset = self.lbase + ref[1]
+                if value:
+                    self.image[offset] |= 1 << ref[2]
+                else:
+                    self.image[offset] &= 0xFF ^ (1 << ref[2])
+            else:
+                self._write(ref, value)
+        self.term = rlo
+        self.orb = self.fc = 0
+        return pc + 1
+
+    def _edge(self, ins, pc):
+        rlo = self.orb | self.term
+        memory = self._read(ins[1])
+        self._write(ins[1], rlo)
+        self.term = (1 if rlo and not memory else 0) if ins[2] else (1 if memory and not rlo else 0)
+        self.orb = 0
+        self.fc = 1
+        return pc + 1
+
+    def _set_rlo(self, ins, pc):
+        self.term = ins[1]
+        self.orb = self.fc = 0
+        return pc + 1
+
+    def _not(self, ins, pc):
+        self.term = 1 - (self.orb | self.term)
+        self.orb = 0
+        return pc + 1
+
+    def _save(self, ins, pc):
+        self.br = self.orb | self.term
+        return pc + 1
+
+    def _load_constant(self, ins, pc):
+        self.a2 = self.a1
+        self.a1 = ins[1]
+        return pc + 1
+
+    def _load_b_abs(self, ins, pc):
+        self.a2 = self.a1
+        self.a1 = self.image[ins[1]]
+        return pc + 1
+
+    def _load_w_abs(self, ins, pc):
+        offset = ins[1]
+        image = self.image
+        self.a2 = self.a1
+        self.a1 = (image[offset] << 8) | image[offset + 1]
+        return pc + 1
+
+    def _load_d_abs(self, ins, pc):
+        self.a2 = self.a1
+        self.a1 = _DWORD.unpack_from(self.image, ins[1])[0]
+        return pc + 1
+
+    def _load_ref(self, ins, pc):
+        self.a2 = self.a1
+        ref = ins[1]
+        if ref[0] == LOC:
+            self.a1 = self._fetch(self.lbase + ref[1], 0, ref[4])
+        else:
+            self.a1 = self._read(ref)
+        return pc + 1
+
+    def _load_special(self, ins, pc):
+        self.a2 = self.a1
+        self.a1 = {'DBNO': self.db_no, 'DBLG': self.db_size, 'DINO': self.di_no,
+                   'DILG': self.di_size}.get(ins[1], 0)
+        return pc + 1
+
+    def _transfer_b_abs(self, ins, pc):
+        self.image[ins[1]] = self.a1 & 0xFF
+        return pc + 1
+
+    def _transfer_w_abs(self, ins, pc):
+        offset = ins[1]
+        image = self.image
+        image[offset] = (self.a1 >> 8) & 0xFF
+        image[offset + 1] = self.a1 & 0xFF
+        return pc + 1
+
+    def _transfer_d_abs(self, ins, pc):
+        _DWORD.pack_into(self.image, ins[1], self.a1)
+        return pc + 1
+
+    def _transfer_ref(self, ins, pc):
+        ref = ins[1]
+        if ref[0] == LOC:
+            self._store(self.lbase + ref[1], 0, ref[4], self.a1)
+        else:
+            self._write(ref, self.a1)
+        return pc + 1
+
+    def _pop_accumulators(self):
+        # S7-400: arithmetic moves ACCU3 to ACCU2 and ACCU4 to ACCU3
+        self.a2 = self.a3
+        self.a3 = self.a4
+
+    def _arithmetic(self, ins, pc):
+        function, integer, double = ins[1], ins[2], ins[3]
+        if integer:
+            result = function(_s16(self.a2), _s16(self.a1))
+            if double:
+                self.a1 = result & 0xFFFFFFFF
+            else:
+                self.a1 = (self.a1 & 0xFFFF0000) | (result & 0xFFFF)
+                result = _s16(result)
+        else:
+            result = _s32(function(_s32(self.a2), _s32(self.a1)))
+            self.a1 = result & 0xFFFFFFFF
+        self.cc = (result > 0) - (result < 0)
+        self._pop_accumulators()
+        return pc + 1
+
+    def _divide_int(self, ins, pc):
+        divisor = _s16(self.a1)
+        if divisor:
+            quotient, remainder = _trunc_div(_s16(self.a2), divisor)
+            self.a1 = ((remainder & 0xFFFF) << 16) | (quotient & 0xFFFF)
+            self.cc = (quotient > 0) - (quotient < 0)
+        self._pop_accumulators()
+        return pc + 1
+
+    def _arithmetic_real(self, ins, pc):
+        result = ins[1](_real(self.a2), _real(self.a1))
+        self.a1 = _real_bits(result)
+        self.cc = (result > 0) - (result < 0)
+        self._pop_accumulators()
+        return pc + 1
+
+    def _add_constant(self, ins, pc):
+        if ins[2]:
+            self.a1 = (self.a1 + ins[1]) & 0xFFFFFFFF
+            result = _s32(self.a1)
+        else:
+            result = _s16(self.a1 + ins[1])
+            self.a1 = (self.a1 & 0xFFFF0000) | (result & 0xFFFF)
+        self.cc = (result > 0) - (result < 0)
+        return pc + 1
+
+    def _increment(self, ins, pc):
+        self.a1 = (self.a1 & 0xFFFFFF00) | ((self.a1 + ins[1]) & 0xFF)
+        return pc + 1
+
+    def _compare(self, ins, pc):
+        kind = ins[2]
+        if kind == 'I':
+            a, b = _s16(self.a2), _s16(self.a1)
+        elif kind == 'D':
+            a, b = _s32(self.a2), _s32(self.a1)
+        else:
+            a, b = _real(self.a2), _real(self.a1)
+        self.cc = (a > b) - (a < b)
+        self._logic(0, 1 if ins[1](a, b) else 0)
+        return pc + 1
+
+    def _word_logic(self, ins, pc):
+        function, mask, constant = ins[1], ins[2], ins[3]
+        other = self.a2 if constant is None else constant
+        result = function(self.a1, other) & mask
+        self.a1 = (self.a1 & (0xFFFFFFFF ^ mask)) | result
+        self.cc = 1 if result else 0
+        return pc + 1
+
+    def _shift(self, ins, pc):
+        op = ins[1]
+        count = ins[2] if ins[2] is not None else self.a2 & 0xFF
+        a1 = self.a1
+        if op == 'SLW':
+            low = ((a1 & 0xFFFF) << count) & 0xFFFF if count < 16 else 0
+            self.a1 = (a1 & 0xFFFF0000) | low
+        elif op == 'SRW':
+            self.a1 = (a1 & 0xFFFF0000) | ((a1 & 0xFFFF) >> count if count < 16 else 0)
+        elif op == 'SSI':
+            self.a1 = (a1 & 0xFFFF0000) | ((_s16(a1) >> min(count, 15)) & 0xFFFF)
+        elif op == 'SLD':
+            self.a1 = (a1 << count) & 0xFFFFFFFF if count < 32 else 0
+        elif op == 'SRD':
+            self.a1 = a1 >> count if count < 32 else 0
+        elif op == 'SSD':
+            self.a1 = (_s32(a1) >> min(count, 31)) & 0xFFFFFFFF
+        else:
+            count %= 32
+            if op == 'RRD':
+                count = (32 - count) % 32
+            self.a1 = ((a1 << count) | (a1 >> (32 - count))) & 0xFFFFFFFF if count else a1
+        self.cc = 1 if self.a1 else 0
+        return pc + 1
+
+    def _convert(self, ins, pc):
+        op = ins[1]
+        a1 = self.a1
+        if op == 'ITD':
+            self.a1 = _s16(a1) & 0xFFFFFFFF
+        elif op == 'ITB':
+            value = _s16(a1)
+            self.a1 = (a1 & 0xFFFF0000) | (0xF000 if value < 0 else 0) | bcd_encode(min(abs(value), 999))
+        elif op == 'BTI':
+            value = bcd_decode(a1 & 0xFFF)
+            self.a1 = (a1 & 0xFFFF0000) | ((-value if a1 & 0x8000 else value) & 0xFFFF)
+        elif op == 'BTD':
+            value = bcd_decode(a1 & 0x0FFFFFFF, 7)
+            self.a1 = (-value if a1 & 0x80000000 else value) & 0xFFFFFFFF
+        elif op == 'DTB':
+            value = _s32(a1)
+            self.a1 = (0xF0000000 if value < 0 else 0) | bcd_encode(min(abs(value), 9999999))
+        elif op == 'DTR':
+            self.a1 = _real_bits(float(_s32(a1)))
+        elif op == 'INVI':
+            self.a1 = a1 ^ 0xFFFF
+        elif op == 'INVD':
+            self.a1 = a1 ^ 0xFFFFFFFF
+        elif op == 'NEGI':
+            self.a1 = (a1 & 0xFFFF0000) | (-_s16(a1) & 0xFFFF)
+        elif op == 'NEGD':
+            self.a1 = -_s32(a1) & 0xFFFFFFFF
+        elif op == 'CAW':
+            self.a1 = (a1 & 0xFFFF0000) | ((a1 & 0xFF) << 8) | ((a1 >> 8) & 0xFF)
+        elif op == 'CAD':
+            self.a1 = int.from_bytes(a1.to_bytes(4, 'big'), 'little')
+        else:
+            value = _real(a1)
+            if op in ('ABS', 'NEGR', 'SQR', 'SQRT'):
+                value = {'ABS': abs(value), 'NEGR': -value, 'SQR': value * value,
+                         'SQRT': math.sqrt(value) if value >= 0 else math.nan}[op]
+                self.a1 = _real_bits(value)
+            elif math.isfinite(value):
+                rounded = {'TRUNC': math.trunc, 'RND': round, 'RND+': math.ceil, 'RND-': math.floor}[op](value)
+                self.a1 = int(rounded) & 0xFFFFFFFF
+        return pc + 1
+
+    def _accumulators(self, ins, pc):
+        op = ins[1]
+        if op == 'TAK':
+            self.a1, self.a2 = self.a2, self.a1
+        elif op == 'PUSH':
+            self.a4, self.a3, self.a2 = self.a3, self.a2, self.a1
+        elif op == 'POP':
+            self.a1, self.a2, self.a3 = self.a2, self.a3, self.a4
+        elif op == 'ENT':
+            self.a4, self.a3 = self.a3, self.a2
+        else:
+            self.a2, self.a3 = self.a3, self.a4
+        return pc + 1
+
+    def _load_ar(self, ins, pc):
+        register, pointer, source = ins[1], ins[2], ins[3]
+        if pointer is None:
+            pointer = self.a1 if source is None else (self.ar1 if source == 1 else self.ar2)
+        if register == 1:
+            self.ar1 = pointer
+        else:
+            self.ar2 = pointer
+        return pc + 1
+
+    def _load_ar_ref(self, ins, pc):
+        value = self._read(ins[2])
+        if ins[1] == 1:
+            self.ar1 = value
+        else:
+            self.ar2 = value
+        return pc + 1
+
+    def _transfer_ar(self, ins, pc):
+        self.a2 = self.a1
+        self.a1 = self.ar1 if ins[1] == 1 else self.ar2
+        return pc + 1
+
+    def _transfer_ar_ref(self, ins, pc):
+        self._write(ins[2], self.ar1 if ins[1] == 1 else self.ar2)
+        return pc + 1
+
+    def _add_ar(self, ins, pc):
+        delta = _s16(self.a1) if ins[2] is None else ins[2] & 0x7FFFF
+        register = self.ar1 if ins[1] == 1 else self.ar2
+        value = (register & 0xFFF80000) | (((register & 0x7FFFF) + delta) & 0x7FFFF)
+        if ins[1] == 1:
+            self.ar1 = value
+        else:
+            self.ar2 = value
+        return pc + 1
+
+    def _swap_ar(self, ins, pc):
+        self.ar1, self.ar2 = self.ar2, self.ar1
+        return pc + 1
+
+    def _open(self, ins, pc):
+        number = ins[2] if ins[3] is None else self._read(ins[3])
+        base, size = self._db_region(number)
+        if ins[1] == 'DB':
+            self.db_no, self.db_base, self.db_size = number, base, size
+        else:
+            self.di_no, self.di_base, self.di_size = number, base, size
+        return pc + 1
+
+    def _backward(self):
+        self.back_jumps += 1
+        if self.back_jumps > WATCHDOG_BACK_JUMPS:
+            raise WatchdogError(f"cycle watchdog: more than {WATCHDOG_BACK_JUMPS} backward jumps")
+
+    def _jump(self, ins, pc):
+        if ins[1] <= pc:
+            self._backward()
+        return ins[1]
+
+    def _jump_rlo(self, ins, pc):
+        rlo = self.orb | self.term
+        op = ins[2]
+        if op in ('JBI', 'JNBI'):
+            taken = self.br if op == 'JBI' else not self.br
+        else:
+            taken = rlo if op in ('JC', 'JCB') else not rlo
+            if op in ('JNB', 'JCB'):
+                self.br = rlo
+            self.term = 1
+            self.orb = self.fc = 0
+        if not taken:
+            return pc + 1
+        if ins[1] <= pc:
+            self._backward()
+        return ins[1]
+
+    def _jump_condition(self, ins, pc):
+        if not ins[2](self.cc):
+            return pc + 1
+        if ins[1] <= pc:
+            self._backward()
+        return ins[1]
+
+    def _loop(self, ins, pc):
+        low = ((self.a1 & 0xFFFF) - 1) & 0xFFFF
+        self.a1 = (self.a1 & 0xFFFF0000) | low
+        if not low:
+            return pc + 1
+        self._backward()
+        return ins[1]
+
+    def _jump_list(self, ins, pc):
+        index = self.a1 & 0xFF
+        return pc + 1 + index if index < ins[2] else ins[1]
+
+    def _return(self, ins, pc):
+        return RETURN
+
+    def _return_conditional(self, ins, pc):
+        if self.orb | self.term:
+            return RETURN
+        self.term = 1
+        self.orb = self.fc = 0
+        return pc + 1
+
+    # Timers and counters ------------------------------------------------
+
+    def _timer_output(self, number: int) -> int:
+        timer = self.timers[number]
+        kind, start, preset, rlo, latched = timer[0], timer[1], timer[2], timer[3], timer[4]
+        if kind is None:
+            return 0
+        running = start >= 0
+        elapsed = self.now_ms - start
+        if kind == 'SD':
+            return 1 if rlo and running and elapsed >= preset else 0
+        if kind == 'SS':
+            if running and elapsed >= preset:
+                timer[4] = 1
+            return timer[4]
+        if kind == 'SE':
+            return 1 if running and elapsed < preset else 0
+        if kind == 'SP':
+            return 1 if rlo and running and elapsed < preset else 0
+        return 1 if rlo or (running and elapsed < preset) else 0
+
+    def _timer_start(self, ins, pc):
+        timer = self.timers[ins[1]]
+        kind = ins[2]
+        rlo = self.orb | self.term
+        rising = rlo and not timer[3]
+        falling = not rlo and timer[3]
+        timer[0] = kind
+        if kind == 'SF':
+            if rising:
+                timer[1] = -1
+            elif falling:
+                timer[1] = self.now_ms
+                timer[2] = s5time_ms(self.a1 & 0xFFFF)
+                timer[5] = self.a1 & 0xFFFF
+        elif rising:
+            timer[1] = self.now_ms
+            timer[2] = s5time_ms(self.a1 & 0xFFFF)
+            timer[4] = 0
+            timer[5] = self.a1 & 0xFFFF
+        elif falling and kind in ('SD', 'SP'):
+            timer[1] = -1
+        timer[3] = rlo
+        self.orb = self.fc = 0
+        return pc + 1
+
+    def _timer_reset(self, ins, pc):
+        if self.orb | self.term:
+            timer = self.timers[ins[1]]
+            timer[1] = -1
+            timer[4] = 0
+        self.orb = self.fc = 0
+        return pc + 1
+
+    def _load_timer(self, ins, pc):
+        timer = self.timers[ins[1]]
+        remaining = 0
+        if timer[0] is not None and timer[1] >= 0:
+            remaining = max(0, timer[2] - (self.now_ms - timer[1]))
+        base_index = (timer[5] >> 12) & 3
+        value = min(999, int(remaining // (10, 100, 1000, 10000)[base_index]))
+        self.a2 = self.a1
+        self.a1 = (base_index << 12) | bcd_encode(value) if ins[2] else value
+        return pc + 1
+
+    def _count(self, ins, pc):
+        counter = self.counters[ins[1]]
+        rlo = self.orb | self.term
+        slot = 1 if ins[2] > 0 else 2
+        if rlo and not counter[slot]:
+            counter[0] = max(0, min(999, counter[0] + ins[2]))
+        counter[slot] = rlo
+        self.orb = self.fc = 0
+        return pc + 1
+
+    def _counter_set(self, ins, pc):
+        counter = self.counters[ins[1]]
+        rlo = self.orb | self.term
+        if rlo and not counter[3]:
+            counter[0] = bcd_decode(self.a1 & 0xFFF)
+        counter[3] = rlo
+        self.orb = self.fc = 0
+        return pc + 1
+
+    def _counter_reset(self, ins, pc):
+        if self.orb | self.term:
+            self.counters[ins[1]][0] = 0
+        self.orb = self.fc = 0
+        return pc + 1
+
+    def _load_counter(self, ins, pc):
+        value = self.counters[ins[1]][0]
+        self.a2 = self.a1
+        self.a1 = bcd_encode(value) if ins[2] else value
+        return pc + 1
+
+    # Calls ----------------------------------------------------------------
+
+    def _plan(self, call: CallInfo, caller: DecodedBlock) -> CallPlan:
+        """Resolve callee, instance DB and parameter copies of a call"""
+        callee = self.decode(call.target)
+        if callee is None or (callee.kind == 'FB' and not call.instance.startswith('DB')):
+            return CallPlan(call.target, None, -1, (), ())
+        instance = -1
+        if callee.kind == 'FB':
+            instance = int(call.instance[2:])
+            self._db_region(instance)
+            layout, base = callee.statics, 0
+        else:
+            layout, base = callee.params, callee.param_base
+        if callee.kind == 'FB':
+            sections = {variable.name: variable.section for variable in self.program.get(call.target).variables}
+        else:
+            sections = {variable.name: variable.section
+                        for variable in parameter_variables(self.program.get(call.target))}
+        inputs, outputs = [], []
+        for name, operand, address in call.params:
+            item = layout.get(name)
+            if item is not None and item.type == 'POINTER':
+                argument = self._pointer_argument(caller, operand, address)
+                if argument is not None:
+                    inputs.append((base + item.offset, 0, 'P', None, argument))
+                    continue
+            if item is None or not item.width:
+                self.logger.debug(f"{caller.name}: parameter {call.target}.{name} not copied")
+                continue
+            offset, bit, width = base + item.offset, max(item.bit, 0), item.width
+            ref = self._reference(caller, operand, address)
+            constant = None
+            if ref is None:
+                constant = self._pointer(caller, operand) if operand.upper().startswith('P#') \
+                    else parse_constant(operand)
+                if constant is None:
+                    self.logger.debug(f"{caller.name}: argument {operand} of {call.target}.{name} not resolved")
+                    continue
+            section = sections.get(name, '')
+            if section in ('VAR_INPUT', 'VAR_IN_OUT'):
+                inputs.append((offset, bit, width, ref, constant))
+            if section in ('VAR_OUTPUT', 'VAR_IN_OUT') and ref is not None:
+                outputs.append((offset, bit, width, ref))
+        return CallPlan(call.target, callee, instance, tuple(inputs), tuple(outputs))
+
+    def _pointer_argument(self, caller: DecodedBlock, operand: str,
+                          address: Optional[Address]) -> Optional[Tuple[int, int]]:
+        """Get (DB number, area pointer) for a complex argument; DB -1 means the caller's DI"""
+        if address is None and not operand.startswith('P#'):
+            ref = self._symbol(caller, operand)
+            if ref is None:
+                for layout, space, base in caller.scopes:
+                    item = layout.get(operand[1:])
+                    if item is not None:
+                        ref = (space, base + item.offset, 0, 0, 'B')
+                        break
+            if ref is None or ref[0] not in (LOC, DI):
+                return None
+            # Caller locals are the callee's V area; statics live in the caller's instance DB
+            if ref[0] == LOC:
+                return 0, (AREA_POINTER['V'] << 24) | (ref[1] << 3) | ref[2]
+            return -1, (AREA_POINTER['DB'] << 24) | (ref[1] << 3) | ref[2]
+        if address is not None:
+            if address.area == 'DB' and address.db >= 0:
+                db, area = address.db, 'DB'
+            elif address.area in PROCESS_AREAS:
+                db, area = 0, PROCESS_AREAS[address.area]
+            else:
+                return None
+            return db, (AREA_POINTER[area] << 24) | (address.byte << 3) | max(address.bit, 0)
+        match = POINTER_RE.match(operand.upper().split(' BYTE ')[0].split(' WORD ')[0].strip())
+        if match is None:
+            return None
+        area = {'DBX': 'DB', 'DIX': 'DI'}.get(match.group('area'), match.group('area'))
+        if area is None:
+            return None
+        db = int(match.group('db')) if match.group('db') else 0
+        return db, (AREA_POINTER[area] << 24) | (int(match.group('byte')) << 3) | int(match.group('bit'))
+
+    def _call(self, ins, pc):
+        if ins[4] and not (self.orb | self.term):
+            self.term = 1
+            self.orb = self.fc = 0
+            return pc + 1
+        plan = ins[3][0]
+        if plan is None:
+            plan = ins[3][0] = self._plan(ins[1], ins[2])
+        if plan.block is None:
+            hook = self.system_functions.get(plan.target)
+            if hook is not None:
+                hook(self, ins[1])
+            self.external_calls[plan.target] += 1
+        else:
+            self._invoke(plan, ins[2].frame_size)
+        self.term = 1
+        self.orb = self.fc = 0
+        return pc + 1
+
+    def _invoke(self, plan: CallPlan, caller_frame: int):
+        callee = plan.block
+        if self.depth >= MAX_CALL_DEPTH:
+            self._fault(f"Call depth exceeded calling {plan.target}")
+            return
+        new_base = self.lbase + caller_frame
+        l_base, l_size = self.regions['L']
+        if new_base + callee.frame_size > l_base + l_size:
+            self._fault(f"L stack overflow calling {plan.target}")
+            return
+        values = []
+        for _, _, width, ref, constant in plan.inputs:
+            if ref is not None:
+                values.append(self._read(ref))
+            elif width == 'P':
+                db, pointer = constant
+                values.append(((self.di_no if db < 0 else db) << 32) | pointer)
+            else:
+                values.append(constant)
+        saved = (self.lbase, self.vbase, self.db_no, self.db_base, self.db_size,
+                 self.di_no, self.di_base, self.di_size, self.ar2, self.nesting)
+        self.vbase, self.lbase = self.lbase, new_base
+        self.nesting = []
+        if plan.instance >= 0:
+            self.di_base, self.di_size = self.regions[f"DB{plan.instance}"]
+            self.di_no = plan.instance
+            self.ar2 = AREA_POINTER['DI'] << 24
+            base = self.di_base
+        else:
+            base = new_base
+        for (offset, bit, width, _, _), value in zip(plan.inputs, values):
+            self._store(base + offset, bit, width, value)
+        self.depth += 1
+        try:
+            self._execute(callee)
+        finally:
+            self.depth -= 1
+        results = [self._fetch(base + offset, bit, width) for offset, bit, width, _ in plan.outputs]
+        (self.lbase, self.vbase, self.db_no, self.db_base, self.db_size,
+         self.di_no, self.di_base, self.di_size, self.ar2, self.nesting) = saved
+        for (_, _, _, ref), value in zip(plan.outputs, results):
+            self._write(ref, value)
+
+    def _execute(self, ctx: DecodedBlock):
+        code = ctx.code
+        count = len(code)
+        pc = 0
+        while pc < count:
+            ins = code[pc]
+            pc = ins[0](ins, pc)
+
+    # ------------------------------------------------------------------
+    # Scan cycle
+    # ------------------------------------------------------------------
+
+    def _reset_registers(self):
+        self.a1 = self.a2 = self.a3 = self.a4 = 0
+        self.ar1 = self.ar2 = 0
+        self.orb = self.term = self.fc = self.br = self.cc = 0
+        self.nesting: List[tuple] = []
+        self.db_no = self.db_base = self.db_size = 0
+        self.di_no = self.di_base = self.di_size = 0
+        self.lbase = self.vbase = self.regions['L'][0]
+        self.depth = 0
+        self.back_jumps = 0
+
+    def run_ob(self, name: str) -> bool:
+        """
+        Execute one organization block
+
+        Args:
+            name: OB name ('OB1', 'OB35', 'OB100')
+
+        Returns:
+            bool: True if the OB ran to completion
+        """
+        ctx = self.decode(name)
+        if ctx is None:
+            return False
+        self._reset_registers()
+        try:
+            self._execute(ctx)
+            return True
+        except (WatchdogError, IndexError, ValueError, OverflowError, struct.error, ZeroDivisionError) as e:
+            self._fault(f"{name} aborted: {type(e).__name__}: {e}")
+            return False
+
+    def startup(self):
+        """Run the warm restart OB (OB100) once"""
+        self.run_ob('OB100')
+        self.started = True
+        self._next_due = {name: self.now_ms + period for name, period in self.cyclic.items()}
+
+    def scan(self):
+        """Run one OB1 cycle (cyclic interrupts that fell due run first)"""
+        self.now_ms += self.scan_time_ms
+        for name, period in self.cyclic.items():
+            while self._next_due.get(name, 0.0) <= self.now_ms:
+                self.run_ob(name)
+                self._next_due[name] = self._next_due.get(name, 0.0) + period
+        self.run_ob('OB1')
+        self.scan_count += 1
+
+    def run(self, scans: int, recording: Optional[Dict[int, List[Tuple[str, int]]]] = None) -> SimulationResult:
+        """
+        Run scan cycles, applying recorded inputs and tracing outputs
+
+        Args:
+            scans: Number of OB1 cycles
+            recording: Scan number (0-based, relative to this run) -> [(signal, value)]
+
+        Returns:
+            SimulationResult: Throughput, output changes, faults and coverage counters
+        """
+        if not self.started:
+            self.startup()
+        recording = recording or {}
+        q_base, q_size = self.regions['Q']
+        previous = bytes(self.image[q_base:q_base + q_size])
+        result = SimulationResult()
+        started = time.perf_counter()
+        for scan in range(scans):
+            for signal, value in recording.get(scan, ()):
+                self.write(signal, value)
+            self.scan()
+            current = bytes(self.image[q_base:q_base + q_size])
+            if current != previous:
+                for offset, (old, new) in enumerate(zip(previous, current)):
+                    changed = old ^ new
+                    for bit in range(8):
+                        if changed & (1 << bit):
+                            result.output_changes.append((scan, f"Q{offset}.{bit}", (new >> bit) & 1))
+                previous = current
+        result.elapsed_s = time.perf_counter() - started
+        result.scans = scans
+        result.scans_per_s = scans / result.elapsed_s if result.elapsed_s > 0 else 0.0
+        result.faults = self.fault_count
+        result.unsupported = dict(self.unsupported)
+        result.external_calls = dict(self.external_calls)
+        return result
+
+    def coverage(self) -> Dict[str, Dict[str, int]]:
+        """
+        Decode every code block and report unsupported instructions
+
+        Returns:
+            dict: Block name -> {opcode: count} (blocks without gaps omitted)
+        """
+        for block in self.program:
+            if block.is_code:
+                self.decode(block.name)
+        return {name: dict(ctx.unsupported) for name, ctx in self.decoded.items() if ctx.unsupported}
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+PLC I/O Map
+===========
+
+Description: Reader for the plc_io.txt I/O list (I/Q bit, device tag, description)
+Purpose: Name process image bits the way the electrical drawings do (-KA1, -KM20 ...)
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- 'I 0.1: -KA1 - Emergency-stop Signal' lines parsed, other text ignored
+- Lookup by canonical address ('I0.1') or device tag ('-KA1')
+- Spare channels kept with an empty tag
+"""
+
+import re
+import logging
+from typing import Dict, NamedTuple, Optional
+
+from .parser import normalize_operand
+
+logger = logging.getLogger(__name__)
+
+IO_LINE_RE = re.compile(r'^\s*(?P<area>[IQ])\s*(?P<byte>\d+)\.(?P<bit>[0-7])\s*:\s*(?P<text>.*)$')
+TAG_RE = re.compile(r'^(?P<tag>-[A-Za-z0-9./]+)\s*-\s*(?P<description>.*)$')
+
+class IOPoint(NamedTuple):
+    """
+    I/O point data structure
+
+    address: Canonical bit address ('I0.1', 'Q32.0')
+    tag: Device tag from the drawings ('-KA1', '' for spare or untagged channels)
+    description: Description text
+    """
+    address: str
+    tag: str
+    description: str
+
+    @property
+    def is_input(self) -> bool:
+        return self.address.startswith('I')
+
+    @property
+    def label(self) -> str:
+        """Short display label ('I0.1 -KA1')"""
+        return f"{self.address} {self.tag}".strip()
+
+class IOMap:
+    """
+    I/O Map Class
+
+    Address and tag index over the points of plc_io.txt
+    """
+
+    def __init__(self):
+        self.points: Dict[str, IOPoint] = {}
+        self.by_tag: Dict[str, IOPoint] = {}
+
+    def add(self, point: IOPoint):
+        self.points[point.address] = point
+        if point.tag:
+            self.by_tag.setdefault(point.tag.upper(), point)
+
+    def resolve(self, signal: str) -> Optional[str]:
+        """
+        Get canonical address of a signal
+
+        Args:
+            signal: Device tag ('-KA1') or address ('I 0.1', 'QW32')
+
+        Returns:
+            str: Canonical address, or None if not an I/O address or known tag
+        """
+        point = self.by_tag.get(signal.strip().upper())
+        if point is not None:
+            return point.address
+        text, address = normalize_operand(signal)
+        if address is None:
+            return None
+        return text
+
+    def get(self, address: str) -> Optional[IOPoint]:
+        return self.points.get(address)
+
+    def inputs(self):
+        return [point for point in self.points.values() if point.is_input]
+
+    def outputs(self):
+        return [point for point in self.points.values() if not point.is_input]
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def __iter__(self):
+        return iter(self.points.values())
+
+def load_io_map(file_path: str = "plc_io.txt") -> IOMap:
+    """
+    Load I/O list
+
+    Args:
+        file_path: Path to plc_io.txt
+
+    Returns:
+        IOMap: Parsed points (empty if the file is missing)
+    """
+    io_map = IOMap()
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                match = IO_LINE_RE.match(line)
+                if not match:
+                    continue
+                address = f"{match.group('area')}{match.group('byte')}.{match.group('bit')}"
+                text = match.group('text').strip()
+                tagged = TAG_RE.match(text)
+                if tagged:
+                    io_map.add(IOPoint(address, tagged.group('tag'), tagged.group('description').strip()))
+                else:
+                    io_map.add(IOPoint(address, "", text))
+        logger.debug(f"Loaded {len(io_map)} I/O points from {file_path}")
+    except FileNotFoundError:
+        logger.warning(f"I/O list {file_path} not found")
+    except Exception as e:
+        logger.error(f"Error loading I/O list {file_path}: {e}")
+    return io_map
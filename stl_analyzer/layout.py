@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+S7 Data Layout
+==============
+
+Description: Byte/bit offsets of declared variables (DBs, instance DBs, TEMP)
+Purpose: Map symbolic operands (#STAT12, #TEMP4.TEMP8) and DB initial values to memory
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- S7-300/400 packing rules: BOOLs packed into bytes, BYTE/CHAR byte
+  aligned, everything else (and STRUCT/ARRAY start and end) word aligned
+- STRUCT members (dotted names), ARRAY element offsets, STRING[n]
+- Instance DB layout (IN, OUT, IN_OUT, STAT) of an FB
+- Constant parsing/encoding for initial values and L/+ operands
+"""
+
+import re
+import struct
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .nodes import Block, Program, Variable
+
+logger = logging.getLogger(__name__)
+
+TYPE_SIZES: Dict[str, int] = {
+    'BOOL': 0, 'BYTE': 1, 'CHAR': 1,
+    'WORD': 2, 'INT': 2, 'S5TIME': 2, 'DATE': 2, 'BLOCK_DB': 2, 'BLOCK_FB': 2, 'BLOCK_FC': 2,
+    'TIMER': 2, 'COUNTER': 2,
+    'DWORD': 4, 'DINT': 4, 'REAL': 4, 'TIME': 4, 'TIME_OF_DAY': 4, 'TOD': 4,
+    'DATE_AND_TIME': 8, 'DT': 8, 'POINTER': 6, 'ANY': 10
+}
+WIDTHS = {0: 'X', 1: 'B', 2: 'W', 4: 'D'}
+
+# Instance DB section order, independent of declaration order
+INSTANCE_SECTIONS = ('VAR_INPUT', 'VAR_OUTPUT', 'VAR_IN_OUT', 'VAR')
+# Complex IN_OUT parameters are passed as a 6-byte pointer
+POINTER_PASSED = ('STRUCT', 'ARRAY', 'STRING', 'DATE_AND_TIME', 'DT')
+
+ARRAY_RE = re.compile(r'^ARRAY\s*\[(?P<dims>[^\]]+)\]\s*OF\s+(?P<element>.+)$', re.IGNORECASE)
+STRING_RE = re.compile(r'^STRING\s*\[\s*(\d+)\s*\]$', re.IGNORECASE)
+BOUND_RE = re.compile(r'^\s*(-?\d+)\s*\.\.\s*(-?\d+)\s*$')
+S5TIME_RE = re.compile(r'^S5T#(?:(\d+)H_?)?(?:(\d+)M(?!S)_?)?(?:(\d+)S_?)?(?:(\d+)MS)?$', re.IGNORECASE)
+TIME_RE = re.compile(r'^T(?:IME)?#(-)?(?:(\d+)D_?)?(?:(\d+)H_?)?(?:(\d+)M(?!S)_?)?(?:(\d+)S_?)?(?:(\d+)MS)?$',
+                     re.IGNORECASE)
+REAL_RE = re.compile(r'^[-+]?\d+\.\d*(?:[eE][-+]?\d+)?$|^[-+]?\d+[eE][-+]?\d+$')
+
+class Field(NamedTuple):
+    """
+    Field layout data structure
+
+    name: Dotted member path
+    type: Declared type text
+    offset: Byte offset
+    bit: Bit number for BOOL (-1 otherwise)
+    size: Size in bytes (0 for a single BOOL)
+    element: Element type for arrays ('' otherwise)
+    bounds: ((lower, upper), ...) per array dimension
+    """
+    name: str
+    type: str
+    offset: int
+    bit: int = -1
+    size: int = 0
+    element: str = ""
+    bounds: Tuple[Tuple[int, int], ...] = ()
+
+    @property
+    def width(self) -> str:
+        """Operand width ('X', 'B', 'W', 'D', or '' for complex types)"""
+        if self.element:
+            return ''
+        return WIDTHS.get(TYPE_SIZES.get(self.type.upper(), -1), '')
+
+    def element_address(self, indexes: Iterable[int]) -> Optional[Tuple[int, int, str]]:
+        """
+        Get address of an array element
+
+        Args:
+            indexes: One index per dimension
+
+        Returns:
+            (byte offset, bit or -1, width) or None if out of bounds
+        """
+        indexes = list(indexes)
+        if not self.element or len(indexes) != len(self.bounds):
+            return None
+        linear = 0
+        for index, (lower, upper) in zip(indexes, self.bounds):
+            if not lower <= index <= upper:
+                return None
+            linear = linear * (upper - lower + 1) + (index - lower)
+        element_size = TYPE_SIZES.get(self.element.upper(), -1)
+        if element_size == 0:
+            return self.offset + linear // 8, linear % 8, 'X'
+        if element_size < 0:
+            return None
+        return self.offset + linear * element_size, -1, WIDTHS.get(element_size, '')
+
+class Layout:
+    """
+    Layout Class
+
+    Field offsets of one declaration list
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Field] = {}
+        self.size = 0
+        self.complete = True  # False if an unknown type (UDT, SFB instance) made later offsets guesses
+
+    def get(self, name: str) -> Optional[Field]:
+        return self.fields.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.fields
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+def _array_info(type_text: str) -> Optional[Tuple[Tuple[Tuple[int, int], ...], str]]:
+    """Split 'ARRAY [1 .. 50 ] OF WORD' into bounds and element type"""
+    match = ARRAY_RE.match(type_text)
+    if not match:
+        return None
+    bounds = []
+    for dimension in match.group('dims').split(','):
+        bound = BOUND_RE.match(dimension)
+        if not bound:
+            return None
+        bounds.append((int(bound.group(1)), int(bound.group(2))))
+    return tuple(bounds), match.group('element').strip().upper()
+
+def compute_layout(variables: Iterable[Variable], pointer_sections: Tuple[str, ...] = ()) -> Layout:
+    """
+    Compute offsets of a declaration list
+
+    Args:
+        variables: Declarations in memory order (dotted STRUCT members follow their STRUCT)
+        pointer_sections: Sections whose complex types are passed as 6-byte
+                          POINTERs (IN_OUT of FBs, every FC parameter)
+
+    Returns:
+        Layout: Field offsets and total size
+    """
+    layout = Layout()
+    position = [0, 0]  # byte, bit
+    structs: List[Tuple[str, int]] = []  # Open STRUCT (prefix, start offset)
+
+    def align_byte():
+        if position[1]:
+            position[0] += 1
+            position[1] = 0
+
+    def align_word():
+        align_byte()
+        if position[0] % 2:
+            position[0] += 1
+
+    def close_struct():
+        prefix, start = structs.pop()
+        align_word()
+        name = prefix[:-1]
+        layout.fields[name] = layout.fields[name]._replace(size=position[0] - start)
+
+    for variable in variables:
+        while structs and not variable.name.startswith(structs[-1][0]):
+            close_struct()
+        type_text = variable.type.strip()
+        upper = type_text.upper()
+        if variable.section in pointer_sections and upper.startswith(POINTER_PASSED):
+            upper = type_text = 'POINTER'
+
+        if upper == 'STRUCT':
+            align_word()
+            layout.fields[variable.name] = Field(variable.name, type_text, position[0])
+            structs.append((variable.name + '.', position[0]))
+            continue
+        if upper == 'BOOL':
+            layout.fields[variable.name] = Field(variable.name, type_text, position[0], position[1])
+            position[1] += 1
+            if position[1] == 8:
+                position[0] += 1
+                position[1] = 0
+            continue
+
+        array = _array_info(type_text)
+        string = STRING_RE.match(type_text)
+        if array is not None:
+            bounds, element = array
+            count = 1
+            for lower, upper_bound in bounds:
+                count *= max(0, upper_bound - lower + 1)
+            element_size = TYPE_SIZES.get(element, -1)
+            if element_size < 0:
+                layout.complete = False
+                logger.debug(f"Unknown array element type {element} of {variable.name}")
+                element_size = 0
+                count = 0
+            align_word()
+            size = (count + 7) // 8 if element_size == 0 else count * element_size
+            layout.fields[variable.name] = Field(variable.name, type_text, position[0], -1, size, element, bounds)
+            position[0] += size
+            align_word()
+        elif string is not None:
+            align_word()
+            size = int(string.group(1)) + 2
+            layout.fields[variable.name] = Field(variable.name, type_text, position[0], -1, size)
+            position[0] += size
+        else:
+            size = TYPE_SIZES.get(upper, -1)
+            if size < 0:
+                # UDT or multi-instance of an SFB: size unknown without its declaration
+                layout.complete = False
+                logger.debug(f"Unknown type {type_text} of {variable.name}, size assumed 0")
+                size = 0
+            if size == 1:
+                align_byte()
+            else:
+                align_word()
+            layout.fields[variable.name] = Field(variable.name, type_text, position[0], -1, size)
+            position[0] += size
+    while structs:
+        close_struct()
+    align_byte()
+    layout.size = position[0]
+    return layout
+
+def temp_layout(block: Block) -> Layout:
+    """Layout of a block's VAR_TEMP area (L stack)"""
+    return compute_layout(variable for variable in block.variables if variable.section == 'VAR_TEMP')
+
+def instance_layout(block: Block) -> Layout:
+    """Layout of an FB's instance data (IN, OUT, IN_OUT, STAT in this order)"""
+    ordered = [variable for section in INSTANCE_SECTIONS
+               for variable in block.variables if variable.section == section]
+    return compute_layout(ordered, pointer_sections=('VAR_IN_OUT',))
+
+def parameter_variables(block: Block) -> List[Variable]:
+    """Get an FC's parameters (IN, OUT, IN_OUT, then RET_VAL of a typed FUNCTION)"""
+    ordered = [variable for section in INSTANCE_SECTIONS[:3]
+               for variable in block.variables if variable.section == section]
+    if block.return_type and block.return_type.upper() != 'VOID':
+        ordered.append(Variable('VAR_OUTPUT', 'RET_VAL', block.return_type))
+    return ordered
+
+def parameter_layout(block: Block) -> Layout:
+    """Layout of an FC's parameters as copied into the callee frame (complex types as POINTER)"""
+    return compute_layout(parameter_variables(block), pointer_sections=INSTANCE_SECTIONS[:3])
+
+def db_layout(block: Block, program: Optional[Program] = None) -> Layout:
+    """
+    Layout of a data block
+
+    Args:
+        block: DATA_BLOCK
+        program: Program used to resolve the FB of an instance DB
+
+    Returns:
+        Layout: Field offsets (empty if an instance DB's FB is missing)
+    """
+    if block.instance_of:
+        fb = program.get(block.instance_of) if program is not None else None
+        if fb is None:
+            layout = Layout()
+            layout.complete = False
+            return layout
+        return instance_layout(fb)
+    return compute_layout(variable for variable in block.variables if variable.section == 'STRUCT')
+
+def bcd_encode(value: int) -> int:
+    """Encode a non-negative integer as BCD"""
+    result, shift = 0, 0
+    while value:
+        result |= (value % 10) << shift
+        value //= 10
+        shift += 4
+    return result
+
+def bcd_decode(value: int, digits: int = 3) -> int:
+    """Decode BCD digits (sign nibble above the digits is ignored)"""
+    result = 0
+    for index in range(digits - 1, -1, -1):
+        result = result * 10 + min((value >> (4 * index)) & 0xF, 9)
+    return result
+
+def s5time_word(milliseconds: int) -> int:
+    """Encode a duration as S5TIME (time base in bits 12-13, 3 BCD digits)"""
+    for base_index, base_ms in enumerate((10, 100, 1000, 10000)):
+        value = milliseconds // base_ms
+        if value <= 999:
+            return (base_index << 12) | bcd_encode(value)
+    return (3 << 12) | bcd_encode(999)
+
+def s5time_ms(word: int) -> int:
+    """Decode an S5TIME word to milliseconds"""
+    value = (word & 0xF) + ((word >> 4) & 0xF) * 10 + ((word >> 8) & 0xF) * 100
+    return value * (10, 100, 1000, 10000)[(word >> 12) & 3]
+
+def parse_constant(text: str) -> Optional[int]:
+    """
+    Parse an STL constant to its 32-bit accumulator value
+
+    Args:
+        text: Constant ('5', 'L#-2', 'W#16#8082', 'DW#16#FF', '2#0101', 'S5T#2S',
+              'T#1S', 'C#5', 'P#32.0', 'TRUE', 'B#(1, 2)', '1.5e+000', "'AB'")
+
+    Returns:
+        int: Unsigned 32-bit value, or None if not a constant
+    """
+    text = text.strip()
+    upper = text.upper()
+    try:
+        if upper in ('TRUE', 'FALSE'):
+            return 1 if upper == 'TRUE' else 0
+        if re.match(r'^[-+]?\d+$', text):
+            return int(text) & 0xFFFFFFFF
+        if upper.startswith('L#'):
+            return int(text[2:]) & 0xFFFFFFFF
+        for prefix in ('DW#16#', 'W#16#', 'B#16#', '16#'):
+            if upper.startswith(prefix):
+                return int(text[len(prefix):], 16) & 0xFFFFFFFF
+        for prefix in ('2#', 'DW#2#', 'W#2#', 'B#2#'):
+            if upper.startswith(prefix):
+                return int(text[len(prefix):].replace('_', ''), 2) & 0xFFFFFFFF
+        if upper.startswith('B#('):
+            values = [int(part) & 0xFF for part in text[3:].rstrip(')').split(',')]
+            result = 0
+            for value in values:
+                result = (result << 8) | value
+            return result
+        if upper.startswith('C#'):
+            return bcd_encode(int(text[2:]))
+        if upper.startswith('S5T'):
+            match = S5TIME_RE.match(upper.replace('S5TIME#', 'S5T#'))
+            if match:
+                hours, minutes, seconds, millis = (int(group or 0) for group in match.groups())
+                return s5time_word(((hours * 60 + minutes) * 60 + seconds) * 1000 + millis)
+            return None
+        if upper.startswith(('T#', 'TIME#')):
+            match = TIME_RE.match(upper)
+            if match:
+                sign = -1 if match.group(1) else 1
+                days, hours, minutes, seconds, millis = (int(group or 0) for group in match.groups()[1:])
+                total = ((((days * 24 + hours) * 60 + minutes) * 60 + seconds) * 1000 + millis) * sign
+                return total & 0xFFFFFFFF
+            return None
+        if upper.startswith('P#') and re.match(r'^P#\d+\.[0-7]$', upper):
+            byte, bit = upper[2:].split('.')
+            return (int(byte) << 3) | int(bit)
+        if REAL_RE.match(text):
+            return struct.unpack('>I', struct.pack('>f', float(text)))[0]
+        if len(text) >= 3 and text[0] == "'" and text[-1] == "'":
+            result = 0
+            for char in text[1:-1][:4]:
+                result = (result << 8) | (ord(char) & 0xFF)
+            return result
+    except ValueError:
+        return None
+    return None
+
+def encode_initial(field: Field, text: str, element: bool = False) -> Optional[bytes]:
+    """
+    Encode an initial value for a field
+
+    Args:
+        field: Target field
+        text: Value text
+        element: Encode as the field's array element type
+
+    Returns:
+        bytes: Big-endian value (b'\\x00'/b'\\x01' for BOOL), None if not encodable
+    """
+    type_name = (field.element if element else field.type).upper()
+    size = TYPE_SIZES.get(type_name, -1)
+    if type_name == 'DATE_AND_TIME' or size < 0 or size > 4:
+        return None
+    value = parse_constant(text)
+    if value is None:
+        return None
+    if size == 0:
+        return b'\x01' if value else b'\x00'
+    return (value & ((1 << (8 * size)) - 1)).to_bytes(size, 'big')
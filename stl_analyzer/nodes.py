@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+STL AST Nodes
+=============
+
+Description: Compact AST for Siemens S7 STL/AWL sources
+Purpose: Block-level representation shared by all stl_analyzer passes
+Version: 1.0
+Date: 17/07/2025
+
+Instructions, addresses and declarations are NamedTuples; opcode and
+operand strings are interned by the parser so repeated operands share
+one string object.
+"""
+
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+class Address(NamedTuple):
+    """
+    Memory address data structure
+
+    area: 'I', 'Q', 'M', 'L', 'DB', 'DI', 'PI', 'PQ', 'T' or 'C'
+    width: 'X' (bit), 'B', 'W', 'D' or '' for timers/counters
+    byte: Byte offset (timer/counter number for T/C)
+    bit: Bit number, -1 when not a bit address
+    db: DB number for fully qualified DBn.DBx addresses, -1 when the
+        address is relative to the opened DB/DI
+    """
+    area: str
+    width: str
+    byte: int
+    bit: int = -1
+    db: int = -1
+
+    def __str__(self) -> str:
+        prefix = f"DB{self.db}." if self.db >= 0 else ""
+        if self.area in ('DB', 'DI'):
+            text = f"{prefix}{self.area}{self.width}{self.byte}"
+        elif self.width == 'X':
+            text = f"{self.area}{self.byte}"
+        else:
+            text = f"{self.area}{self.width}{self.byte}"
+        if self.bit >= 0:
+            text += f".{self.bit}"
+        return text
+
+    @property
+    def size(self) -> int:
+        """Size in bytes (0 for bits, timers and counters)"""
+        return {'B': 1, 'W': 2, 'D': 4}.get(self.width, 0)
+
+class CallInfo(NamedTuple):
+    """
+    CALL/UC/CC target data structure
+
+    kind: 'FC', 'FB', 'SFC', 'SFB' or 'SYMBOL' (quoted symbolic name)
+    target: Block name ('FC50', 'FB5') or symbol without quotes ('BLKMOV')
+    instance: Instance DB name for FB calls ('DB20'), '' otherwise
+    params: ((parameter, operand, Address or None), ...); parameter is ''
+            for positional UC/CC parameters
+    """
+    kind: str
+    target: str
+    instance: str = ""
+    params: Tuple[Tuple[str, str, Optional[Address]], ...] = ()
+
+class Instruction(NamedTuple):
+    """
+    STL instruction data structure
+
+    op: Opcode ('A', 'L', 'JNB', 'CALL', 'A(', ')', ...)
+    operand: Normalized operand text ('' if none)
+    address: Parsed memory address, None for constants, labels, locals
+    line: Source line number (1-based)
+    label: Jump label defined on this instruction ('' if none)
+    call: Call target for CALL/UC/CC, None otherwise
+    """
+    op: str
+    operand: str = ""
+    address: Optional[Address] = None
+    line: int = 0
+    label: str = ""
+    call: Optional[CallInfo] = None
+
+class Variable(NamedTuple):
+    """
+    Declaration data structure
+
+    section: 'VAR_INPUT', 'VAR_OUTPUT', 'VAR_IN_OUT', 'VAR_TEMP', 'VAR'
+             (static) or 'STRUCT' (data block)
+    name: Dotted member path ('STAT10.STAT11')
+    type: Declared type text ('BOOL', 'ARRAY [1 .. 50 ] OF WORD', 'STRUCT')
+    initial: Initial value text ('' if none)
+    """
+    section: str
+    name: str
+    type: str
+    initial: str = ""
+
+class Network:
+    """
+    Network data structure
+    """
+    __slots__ = ('index', 'title', 'line', 'instructions')
+
+    def __init__(self, index: int, title: str = "", line: int = 0):
+        self.index = index  # 1-based network number within the block
+        self.title = title
+        self.line = line
+        self.instructions: List[Instruction] = []
+
+    def __repr__(self) -> str:
+        return f"Network({self.index}, {len(self.instructions)} instructions)"
+
+class Block:
+    """
+    Program block data structure
+
+    kind: 'OB', 'FC', 'FB', 'DB', 'SFC', 'SFB' or 'UDT'
+    name: Canonical name ('OB1', 'FC50', 'DB100')
+    """
+    __slots__ = ('kind', 'number', 'name', 'symbol', 'title', 'return_type', 'attributes',
+                 'instance_of', 'variables', 'networks', 'assignments',
+                 'source_file', 'start_line', 'end_line', 'content_hash')
+
+    def __init__(self, kind: str, number: int, name: str, symbol: str = ""):
+        self.kind = kind
+        self.number = number
+        self.name = name
+        self.symbol = symbol  # Quoted symbolic name without quotes, if any
+        self.title = ""
+        self.return_type = ""  # FUNCTION return type ('VOID', 'TIME')
+        self.attributes: Dict[str, Any] = {}  # VERSION, AUTHOR, FAMILY, NAME, flags
+        self.instance_of = ""  # Instance DBs: owning FB name
+        self.variables: List[Variable] = []
+        self.networks: List[Network] = []
+        self.assignments: List[Tuple[str, str, int]] = []  # DB BEGIN section: (lhs, value, line)
+        self.source_file = ""
+        self.start_line = 0
+        self.end_line = 0
+        self.content_hash = ""  # Digest of the block's statements (whitespace/comments ignored)
+
+    @property
+    def is_code(self) -> bool:
+        return self.kind in ('OB', 'FC', 'FB', 'SFC', 'SFB')
+
+    def instructions(self):
+        """
+        Iterate all instructions of the block
+
+        Yields:
+            tuple: (network, instruction)
+        """
+        for network in self.networks:
+            for instruction in network.instructions:
+                yield network, instruction
+
+    def instruction_count(self) -> int:
+        return sum(len(network.instructions) for network in self.networks)
+
+    def __repr__(self) -> str:
+        return (f"Block({self.name}, {len(self.networks)} networks, "
+                f"lines {self.start_line}-{self.end_line})")
+
+class Program:
+    """
+    Parsed program data structure
+
+    Blocks in source order plus lookup by canonical name
+    """
+
+    def __init__(self, blocks: Optional[List[Block]] = None):
+        self.blocks: List[Block] = []
+        self.by_name: Dict[str, Block] = {}
+        for block in blocks or []:
+            self.add(block)
+
+    def add(self, block: Block):
+        """Add block (a later block with the same name replaces the earlier one)"""
+        if block.name in self.by_name:
+            previous = self.by_name[block.name]
+            self.blocks[self.blocks.index(previous)] = block
+        else:
+            self.blocks.append(block)
+        self.by_name[block.name] = block
+
+    def remove(self, name: str) -> Optional[Block]:
+        """Remove block by name"""
+        block = self.by_name.pop(name, None)
+        if block is not None:
+            self.blocks.remove(block)
+        return block
+
+    def get(self, name: str) -> Optional[Block]:
+        return self.by_name.get(name.replace(' ', '').upper())
+
+    def __iter__(self):
+        return iter(self.blocks)
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def statistics(self) -> Dict[str, int]:
+        """
+        Get program statistics
+
+        Returns:
+            dict: Block, network and instruction counts
+        """
+        kinds: Dict[str, int] = {}
+        for block in self.blocks:
+            kinds[block.kind] = kinds.get(block.kind, 0) + 1
+        return {
+            'blocks': len(self.blocks),
+            'networks': sum(len(block.networks) for block in self.blocks),
+            'instructions': sum(block.instruction_count() for block in self.blocks),
+            **{f"{kind}_blocks": count for kind, count in sorted(kinds.items())}
+        }
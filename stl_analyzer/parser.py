@@ -0,0 +1,651 @@
+#!/usr/bin/env python3
+"""
+STL/AWL Parser
+==============
+
+Description: Streaming tokenizer and parser for Siemens S7 STL/AWL sources
+Purpose: Turn STL_Program.txt and the .awl packages into a block-level AST
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- Single pass over the source lines, one block held in memory at a time
+- Handles the ';'-terminated STEP 7 export (several statements per line,
+  NETWORK/END_* keywords mid-line) and the line-based .awl style with
+  '//' comments
+- VAR sections, DB STRUCT declarations and BEGIN assignments
+- Networks, labels, instructions, CALL parameter lists
+- Operand normalization to canonical addresses ('M 12.0' -> 'M12.0',
+  'DB10.DBW  100' -> 'DB10.DBW100') with interned strings
+- SCL statements (IF/CASE/:=) in the integration packages are kept as
+  opaque 'SCL' instructions
+"""
+
+import re
+import sys
+import hashlib
+import logging
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .nodes import Address, Block, CallInfo, Instruction, Network, Program, Variable
+
+logger = logging.getLogger(__name__)
+
+_intern = sys.intern
+
+# Block header: FUNCTION FC 8 / FUNCTION FC300 / DATA_BLOCK "DB100_CoordinateExchange"
+HEADER_RE = re.compile(
+    r'^(FUNCTION_BLOCK|FUNCTION|ORGANIZATION_BLOCK|DATA_BLOCK|TYPE)\s+'
+    r'(?:"([^"]+)"|([A-Z]+)\s*(\d+))(.*)$'
+)
+HEADER_KEYWORDS = ('FUNCTION', 'ORGANIZATION_BLOCK', 'DATA_BLOCK', 'TYPE ')
+
+BLOCK_KINDS = {
+    'FUNCTION': 'FC',
+    'FUNCTION_BLOCK': 'FB',
+    'ORGANIZATION_BLOCK': 'OB',
+    'DATA_BLOCK': 'DB',
+    'TYPE': 'UDT'
+}
+
+BLOCK_END_KEYWORDS = frozenset((
+    'END_FUNCTION', 'END_FUNCTION_BLOCK', 'END_ORGANIZATION_BLOCK', 'END_DATA_BLOCK', 'END_TYPE'
+))
+
+VAR_SECTIONS = frozenset(('VAR_INPUT', 'VAR_OUTPUT', 'VAR_IN_OUT', 'VAR_TEMP', 'VAR'))
+
+SCL_KEYWORDS = frozenset((
+    'IF', 'ELSIF', 'ELSE', 'END_IF', 'CASE', 'OF', 'END_CASE', 'FOR', 'END_FOR',
+    'WHILE', 'END_WHILE', 'REPEAT', 'UNTIL', 'END_REPEAT', 'RETURN', 'EXIT'
+))
+
+# Jump instructions take a label operand
+LABEL_OPS = frozenset((
+    'JU', 'JC', 'JCN', 'JCB', 'JNB', 'JBI', 'JNBI', 'JO', 'JOS', 'JZ', 'JN', 'JP',
+    'JM', 'JPZ', 'JMZ', 'JUO', 'JL', 'LOOP'
+))
+
+# Instructions whose operand is a block reference
+BLOCK_OPS = frozenset(('OPN', 'CALL', 'UC', 'CC'))
+
+ADDRESS_RE = re.compile(
+    r'^(?:DB(?P<db>\d+)\.)?(?P<area>PI|PQ|DB|DI|I|Q|M|L|T|C)(?P<width>[XBWD]?)'
+    r'(?P<byte>\d+)(?:\.(?P<bit>[0-7]))?$'
+)
+BLOCK_REF_RE = re.compile(r'^(FC|FB|SFC|SFB|DB|DI)\s*(\d+)$')
+LABEL_RE = re.compile(r'^([A-Za-z_][A-Za-z0-9_]*)\s*:(?!=)\s*(.*)$')
+DECL_RE = re.compile(r'^("?[A-Za-z_][\w.]*"?)\s*:(?!=)\s*(.*)$')
+ATTRIBUTE_RE = re.compile(r"(\w+)\s*:\s*('[^']*'|\S+)|(\w+)")
+
+class _OperandTable:
+    """
+    Operand normalization cache
+
+    Each distinct raw operand text is normalized once; the STL export
+    repeats the same few thousand operands across 26k lines.
+    """
+
+    def __init__(self):
+        self.cache: Dict[str, Tuple[str, Optional[Address]]] = {}
+
+    def normalize(self, raw: str) -> Tuple[str, Optional[Address]]:
+        """
+        Normalize operand text
+
+        Args:
+            raw: Operand text as written ('M	12.0', 'DB10.DBW  100', '#IN0')
+
+        Returns:
+            tuple: (canonical interned text, Address or None)
+        """
+        cached = self.cache.get(raw)
+        if cached is not None:
+            return cached
+
+        compact = ''.join(raw.split())
+        address = None
+        match = ADDRESS_RE.match(compact)
+        if match:
+            area, width = match.group('area'), match.group('width')
+            bit = int(match.group('bit')) if match.group('bit') is not None else -1
+            db = int(match.group('db')) if match.group('db') is not None else -1
+            if bit >= 0 and not width:
+                width = 'X'
+            if area in ('DB', 'DI') and not width:
+                # 'DB 5' is a block reference, not a data address
+                address = None
+            elif area in ('T', 'C') and (width or bit >= 0):
+                address = None
+            else:
+                address = Address(area, width, int(match.group('byte')), bit, db)
+        if address is not None:
+            text = str(address)
+        elif compact.startswith('#') or '[' in compact:
+            text = compact
+        else:
+            text = ' '.join(raw.split())
+
+        result = (_intern(text), address)
+        self.cache[raw] = result
+        return result
+
+_shared_operands = _OperandTable()
+
+def normalize_operand(text: str) -> Tuple[str, Optional[Address]]:
+    """
+    Normalize operand text the same way the parser does
+
+    Args:
+        text: Operand as a user would type it ('DB10.DBW 100', 'M 12.0')
+
+    Returns:
+        tuple: (canonical text, Address or None)
+    """
+    return _shared_operands.normalize(text.strip())
+
+def _split_top_level(text: str, separator: str = ',') -> List[str]:
+    """Split on separator outside of brackets/parentheses/quotes"""
+    parts, depth, quoted, start = [], 0, False, 0
+    for index, char in enumerate(text):
+        if char in "'\"":
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+def _call_complete(text: str) -> bool:
+    """Check whether a CALL/UC parameter list '( ... )' or '{ ... }' is closed"""
+    return text.count('(') + text.count('{') <= text.count(')') + text.count('}')
+
+def _block_reference(text: str) -> Tuple[str, str]:
+    """
+    Normalize a block reference
+
+    Args:
+        text: 'FC    50', 'FB 5', 'FC300', '"BLKMOV"'
+
+    Returns:
+        tuple: (kind, canonical name) - kind 'SYMBOL' for quoted names
+    """
+    text = text.strip()
+    if text.startswith('"'):
+        return 'SYMBOL', _intern(text.strip('"'))
+    match = BLOCK_REF_RE.match(text)
+    if match:
+        return match.group(1), _intern(f"{match.group(1)}{match.group(2)}")
+    return 'SYMBOL', _intern(''.join(text.split()))
+
+class STLParser:
+    """
+    STL/AWL Parser Class
+
+    Streaming parser yielding one Block at a time
+    """
+
+    def __init__(self, source_file: str = ""):
+        """
+        Initialize parser
+
+        Args:
+            source_file: Source file name recorded on each block
+        """
+        self.source_file = source_file
+        self.operands = _OperandTable()
+        self.snippet_count = 0
+        self._reset()
+
+    def _reset(self):
+        """Clear per-block state"""
+        self.block: Optional[Block] = None
+        self.state = 'NONE'  # HEADER, DECL, BODY
+        self.section = ''
+        self.struct_path: List[str] = []
+        self.network: Optional[Network] = None
+        self.pending_label = ''
+        self.pending_call: Optional[List] = None  # [text, line, label]
+        self.digest = None  # Content hash of the open block's statements
+
+    # ------------------------------------------------------------------
+    # Block lifecycle
+    # ------------------------------------------------------------------
+
+    def _start_block(self, match, line_number: int):
+        """Open a block from a header match"""
+        keyword, symbol, prefix, number, rest = match.groups()
+        kind = BLOCK_KINDS[keyword]
+        if symbol is not None:
+            # Symbolic name, infer number from a leading DB100/FC300 style prefix
+            inferred = re.match(r'^([A-Z]+)(\d+)', symbol)
+            number = int(inferred.group(2)) if inferred else -1
+            name = f"{inferred.group(1)}{number}" if inferred else symbol
+        else:
+            number = int(number)
+            kind = prefix if keyword != 'TYPE' else 'UDT'
+            name = f"{prefix}{number}"
+        block = Block(kind, number, _intern(name), symbol or "")
+        block.source_file = self.source_file
+        block.start_line = line_number
+        self.block = block
+        self.state = 'HEADER'
+        self.digest = hashlib.blake2b(match.group(0).encode('utf-8'), digest_size=16)
+        self._parse_attributes(rest, first_line=True)
+
+    def _end_block(self, line_number: int) -> Block:
+        """Close the open block and return it"""
+        block = self.block
+        if self.pending_call is not None:
+            self._finish_call()
+        if block.kind != 'DB':
+            self._flush_label(line_number)
+        block.end_line = line_number
+        block.content_hash = self.digest.hexdigest()
+        self._reset()
+        return block
+
+    def _start_snippet(self, line_number: int):
+        """Open a pseudo block for statements found outside any block"""
+        self.snippet_count += 1
+        block = Block('SNIPPET', self.snippet_count, _intern(f"SNIPPET{self.snippet_count}"))
+        block.source_file = self.source_file
+        block.start_line = line_number
+        self.block = block
+        self.state = 'BODY'
+        self.digest = hashlib.blake2b(digest_size=16)
+
+    def _parse_attributes(self, text: str, first_line: bool = False):
+        """Parse header attributes (VERSION : 0.1, AUTHOR : x, flags)"""
+        text = text.strip()
+        if first_line and text.startswith(':') and self.block.kind in ('FC', 'SFC'):
+            parts = text[1:].split(None, 1)
+            if parts:
+                self.block.return_type = _intern(parts[0])
+                text = parts[1] if len(parts) > 1 else ''
+        if text.startswith('TITLE'):
+            self.block.title = text[5:].lstrip(' =').strip().strip("'")
+            return
+        for key, value, flag in ATTRIBUTE_RE.findall(text):
+            if key:
+                self.block.attributes[key] = value.strip("'")
+            elif flag:
+                self.block.attributes[flag] = True
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def _network(self, line_number: int) -> Network:
+        """Get current network, opening an implicit one for label-free sources"""
+        if self.network is None:
+            self.network = Network(len(self.block.networks) + 1, line=line_number)
+            self.block.networks.append(self.network)
+        return self.network
+
+    def _declaration(self, text: str):
+        """Handle one VAR/STRUCT declaration segment"""
+        match = DECL_RE.match(text)
+        if not match:
+            return
+        name, declared = match.groups()
+        initial = ''
+        if ':=' in declared:
+            declared, initial = declared.split(':=', 1)
+            initial = initial.strip()
+        declared = ' '.join(declared.split())
+        path = '.'.join(self.struct_path + [name.strip('"')])
+        self.block.variables.append(Variable(self.section, _intern(path), _intern(declared), initial))
+        if declared.endswith('STRUCT'):
+            self.struct_path.append(name.strip('"'))
+
+    def _assignment(self, text: str, line_number: int):
+        """Handle one DB BEGIN-section assignment"""
+        if ':=' not in text:
+            return
+        target, value = text.split(':=', 1)
+        self.block.assignments.append((_intern(''.join(target.split())), value.strip(), line_number))
+
+    def _statement(self, text: str, line_number: int):
+        """Handle one code statement (label already peeled)"""
+        label, self.pending_label = self.pending_label, ''
+        parts = text.split(None, 1)
+        op = parts[0].upper()
+        rest = parts[1].strip() if len(parts) > 1 else ''
+
+        # 'A(' written as 'A (' or with the parenthesis glued to the next token
+        if rest.startswith('(') and op in ('A', 'AN', 'O', 'ON', 'X', 'XN') and len(rest) == 1:
+            op, rest = op + '(', ''
+
+        if op in ('CALL', 'UC', 'CC'):
+            self.pending_call = [text, line_number, label]
+            if _call_complete(text):
+                self._finish_call()
+            return
+
+        if ':=' in text or op in SCL_KEYWORDS or op.startswith('#'):
+            instruction = Instruction('SCL', _intern(' '.join(text.split())), None, line_number, label)
+        elif op in LABEL_OPS:
+            instruction = Instruction(_intern(op), _intern(rest), None, line_number, label)
+        elif op == 'OPN':
+            kind, name = _block_reference(rest)
+            instruction = Instruction('OPN', name, None, line_number, label)
+        elif rest:
+            operand, address = self.operands.normalize(rest)
+            instruction = Instruction(_intern(op), operand, address, line_number, label)
+        else:
+            instruction = Instruction(_intern(op), '', None, line_number, label)
+        self._network(line_number).instructions.append(instruction)
+
+    def _finish_call(self):
+        """Build the CALL instruction from the accumulated text"""
+        text, line_number, label = self.pending_call
+        self.pending_call = None
+        op, rest = text.split(None, 1) if ' ' in text.strip() else (text, '')
+        op = op.upper()
+
+        # CALL FC 8 ( name := operand, ... ) or UC SFC 65097 { positional, ... }
+        params_text = ''
+        opening = min((rest.find(char) for char in '({' if char in rest), default=-1)
+        if opening >= 0:
+            head, params_text = rest[:opening], rest[opening + 1:]
+            closing = params_text.rfind(')' if rest[opening] == '(' else '}')
+            params_text = params_text[:closing] if closing >= 0 else params_text
+        else:
+            head = rest
+
+        instance = ''
+        targets = _split_top_level(head)
+        kind, target = _block_reference(targets[0]) if targets else ('SYMBOL', '')
+        if len(targets) > 1:
+            instance = _block_reference(targets[1])[1]
+
+        params = []
+        for param in _split_top_level(params_text):
+            name, value = param.split(':=', 1) if ':=' in param else ('', param)
+            operand, address = self.operands.normalize(value.strip())
+            params.append((_intern(name.strip()), operand, address))
+
+        call = CallInfo(kind, target, instance, tuple(params))
+        self._network(line_number).instructions.append(
+            Instruction(_intern(op), target, None, line_number, label, call))
+
+    # ------------------------------------------------------------------
+    # Line processing
+    # ------------------------------------------------------------------
+
+    def feed(self, raw_line: str, line_number: int) -> List[Block]:
+        """
+        Feed one source line
+
+        Args:
+            raw_line: Source line
+            line_number: 1-based line number
+
+        Returns:
+            List of blocks completed by this line (usually empty)
+        """
+        completed = []
+        comment = raw_line.find('//')
+        text = (raw_line[:comment] if comment >= 0 else raw_line).strip()
+        if not text:
+            return completed
+
+        if text.startswith(HEADER_KEYWORDS):
+            match = HEADER_RE.match(text)
+            if match:
+                if self.block is not None:
+                    logger.debug(f"{self.block.name} not terminated before line {line_number}")
+                    completed.append(self._end_block(line_number - 1))
+                self._start_block(match, line_number)
+                return completed
+
+        if self.block is None:
+            self._start_snippet(line_number)
+        self.digest.update(text.encode('utf-8'))
+        self.digest.update(b'\n')
+
+        if self.state == 'HEADER' and self._header_line(text, line_number):
+            return completed
+
+        position = 0
+        length = len(text)
+        while position < length:
+            end = text.find(';', position)
+            if end < 0:
+                end = length
+            segment = text[position:end]
+            position = end + 1
+
+            if self.pending_call is not None:
+                self.pending_call[0] += ' ' + segment
+                call_text = self.pending_call[0]
+                if _call_complete(call_text):
+                    self._finish_call()
+                elif end == length:
+                    break
+                continue
+
+            result = self._segment(segment, line_number, text, end - len(segment))
+            if result == 'TITLE':
+                break
+            if result == 'END':
+                completed.append(self._end_block(line_number))
+                # Anything after END_* on the same line starts outside a block
+                rest = text[position:].strip()
+                if rest:
+                    completed.extend(self.feed(rest, line_number))
+                break
+        return completed
+
+    def _header_line(self, text: str, line_number: int) -> bool:
+        """
+        Handle a line while still in the block header
+
+        Returns:
+            bool: True if the line was consumed as header
+        """
+        first = text.split(None, 1)[0].rstrip(';')
+        if first in VAR_SECTIONS or first in ('STRUCT', 'BEGIN', 'NETWORK') or first in BLOCK_END_KEYWORDS:
+            return False
+        if self.block.kind == 'DB':
+            instance = re.match(r'^(FB|SFB)\s*(\d+)\s*(.*)$', text) or re.match(r'^"([^"]+)"()\s*(.*)$', text)
+            if instance:
+                self.block.instance_of = _intern(f"{instance.group(1)}{instance.group(2)}")
+                rest = instance.group(3)
+                if rest:
+                    self.state = 'DECL'
+                    self.feed(rest, line_number)
+                return True
+        if text.startswith('TITLE') or ':' in text or text.isupper():
+            self._parse_attributes(text)
+            return True
+        return False
+
+    def _segment(self, segment: str, line_number: int, line: str, offset: int) -> str:
+        """
+        Handle one ';'-delimited segment
+
+        Keywords (BEGIN, NETWORK, END_VAR, ...) are peeled from the front
+        one at a time; the remainder is a declaration, assignment or
+        statement depending on state.
+
+        Returns:
+            str: 'TITLE' if the rest of the line was consumed, 'END' at
+                 block end, '' otherwise
+        """
+        text = segment.strip()
+        while text:
+            parts = text.split(None, 1)
+            word = parts[0]
+            rest = parts[1] if len(parts) > 1 else ''
+
+            if word in BLOCK_END_KEYWORDS:
+                return 'END'
+            if word == 'BEGIN':
+                self.state = 'BODY'
+                text = rest
+                continue
+            if word == 'NETWORK':
+                self._flush_label(line_number)
+                self.network = Network(len(self.block.networks) + 1, line=line_number)
+                self.block.networks.append(self.network)
+                self.state = 'BODY'
+                text = rest
+                continue
+            if word.startswith('TITLE') and (word == 'TITLE' and rest.startswith('=') or word.startswith('TITLE=')):
+                title = line[line.find('TITLE', offset) + 5:].lstrip(' =').strip().strip("'")
+                if self.network is not None and self.state == 'BODY':
+                    self.network.title = title
+                else:
+                    self.block.title = title
+                return 'TITLE'
+            if word in VAR_SECTIONS:
+                self.state = 'DECL'
+                self.section = word
+                self.struct_path = []
+                text = rest
+                continue
+            if word == 'END_VAR':
+                self.section = ''
+                text = rest
+                continue
+            if word == 'STRUCT' and self.state in ('HEADER', 'DECL'):
+                self.state = 'DECL'
+                self.section = 'STRUCT'
+                text = rest
+                continue
+            if word == 'END_STRUCT':
+                if self.struct_path:
+                    self.struct_path.pop()
+                text = rest
+                continue
+            break
+
+        if not text:
+            return ''
+        if self.state == 'DECL':
+            self._declaration(text)
+        elif self.state == 'BODY':
+            if self.block.kind == 'DB':
+                self._assignment(text, line_number)
+            else:
+                self._code(text, line_number)
+        else:
+            self._parse_attributes(text)
+        return ''
+
+    def _code(self, text: str, line_number: int):
+        """Peel labels and handle the statement"""
+        if ':' in text:
+            match = LABEL_RE.match(text)
+            while match and ':=' not in text[:match.end(1) + 3]:
+                self._flush_label(line_number)
+                self.pending_label = _intern(match.group(1))
+                text = match.group(2)
+                if not text:
+                    return
+                match = LABEL_RE.match(text) if ':' in text else None
+        self._statement(text, line_number)
+
+    def _flush_label(self, line_number: int):
+        """Emit a label without a statement as NOP 0 so jumps resolve"""
+        if self.pending_label:
+            label, self.pending_label = self.pending_label, ''
+            self._network(line_number).instructions.append(Instruction('NOP', '0', None, line_number, label))
+
+    def close(self, line_number: int) -> List[Block]:
+        """
+        Finish parsing
+
+        Args:
+            line_number: Last line number of the source
+
+        Returns:
+            List containing the unterminated open block, if any
+        """
+        if self.block is None:
+            return []
+        block = self.block
+        if block.kind == 'SNIPPET' and not block.networks:
+            self._reset()
+            return []
+        return [self._end_block(line_number)]
+
+    def parse_lines(self, lines: Iterable[str], first_line: int = 1) -> Iterator[Block]:
+        """
+        Parse a run of source lines
+
+        Args:
+            lines: Source lines
+            first_line: Line number of the first line
+
+        Yields:
+            Block: Completed blocks (empty snippets are dropped)
+        """
+        line_number = first_line - 1
+        for line_number, line in enumerate(lines, first_line):
+            for block in self.feed(line, line_number):
+                if block.kind == 'SNIPPET' and not block.networks:
+                    continue
+                yield block
+        for block in self.close(line_number):
+            yield block
+
+def iter_blocks(lines: Iterable[str], source_file: str = "") -> Iterator[Block]:
+    """
+    Parse STL/AWL source lines into blocks
+
+    Args:
+        lines: Iterable of source lines (e.g. an open file)
+        source_file: Source name recorded on each block
+
+    Yields:
+        Block: Each block as soon as its END_* keyword is reached
+    """
+    return STLParser(source_file).parse_lines(lines)
+
+def iter_file_blocks(file_path: str, encoding: str = 'latin-1') -> Iterator[Block]:
+    """
+    Parse a source file lazily
+
+    Args:
+        file_path: STL/AWL file path
+        encoding: File encoding (STEP 7 exports are Windows-1252/latin-1)
+
+    Yields:
+        Block: Parsed blocks in source order
+    """
+    with open(file_path, 'r', encoding=encoding, errors='replace') as f:
+        yield from iter_blocks(f, file_path)
+
+def parse_file(file_path: str, encoding: str = 'latin-1') -> Program:
+    """
+    Parse a source file into a Program
+
+    Args:
+        file_path: STL/AWL file path
+        encoding: File encoding
+
+    Returns:
+        Program: Parsed program
+    """
+    return Program(list(iter_file_blocks(file_path, encoding)))
+
+def parse_text(text: str, source_file: str = "<text>") -> Program:
+    """
+    Parse source text into a Program
+
+    Args:
+        text: STL/AWL source
+        source_file: Source name recorded on each block
+
+    Returns:
+        Program: Parsed program
+    """
+    return Program(list(iter_blocks(text.splitlines(), source_file)))
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+STL Project Analyzer
+====================
+
+Description: Parallel analysis of many STL/AWL exports into one project database
+Purpose: Query symbols and cross-references across every plant program at once
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- Files parsed and indexed in a process pool (one task per file)
+- Unchanged files (same content digest) skipped on re-runs
+- Merged SQLite project database: files, blocks, references, calls
+- Progress bar with files done and throughput in lines per second
+"""
+
+import glob
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from .callgraph import CallGraph
+from .parser import iter_blocks, normalize_operand
+from .xref import CrossReference, block_interface
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATTERNS = ('*.awl', '*.AWL', '*.stl', '*.STL')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    digest TEXT NOT NULL,
+    lines INTEGER NOT NULL,
+    analyzed_at TEXT NOT NULL,
+    error TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    title TEXT NOT NULL,
+    start_line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL,
+    networks INTEGER NOT NULL,
+    instructions INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    interface TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    operand TEXT NOT NULL,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    block TEXT NOT NULL,
+    network INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    op TEXT NOT NULL,
+    access TEXT NOT NULL,
+    param TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS calls (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    caller TEXT NOT NULL,
+    callee TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS refs_operand ON refs(operand);
+CREATE INDEX IF NOT EXISTS blocks_name ON blocks(name);
+CREATE INDEX IF NOT EXISTS calls_callee ON calls(callee);
+"""
+
+@dataclass
+class FileAnalysis:
+    """Per-file analysis result shipped back from a worker process"""
+    path: str
+    digest: str
+    lines: int = 0
+    elapsed_s: float = 0.0
+    blocks: List[Tuple] = field(default_factory=list)  # Rows for the blocks table (without file_id)
+    references: List[Tuple] = field(default_factory=list)  # Rows for the refs table (without file_id)
+    calls: List[Tuple[str, str, int]] = field(default_factory=list)
+    error: str = ""
+
+def source_digest(data: bytes) -> str:
+    """Get content digest of raw file bytes"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def analyze_file(path: str, known_digest: str = "") -> FileAnalysis:
+    """
+    Parse and index one file (runs in a worker process)
+
+    Args:
+        path: Source file
+        known_digest: Digest already in the database; the file is not
+                      parsed again when it matches
+
+    Returns:
+        FileAnalysis: Rows for the project database
+    """
+    started = time.perf_counter()
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        return FileAnalysis(path, "", error=str(e))
+
+    result = FileAnalysis(path, source_digest(data), lines=data.count(b'\n') + 1)
+    if result.digest == known_digest:
+        result.elapsed_s = time.perf_counter() - started
+        return result
+    try:
+        blocks = list(iter_blocks(data.decode('latin-1').splitlines(), path))
+        xref = CrossReference.build(blocks)
+        graph = CallGraph.build(blocks)
+        result.blocks = [
+            (block.name, block.kind, block.symbol, block.title, block.start_line, block.end_line,
+             len(block.networks), block.instruction_count(), block.content_hash,
+             ','.join(f"{name}:{section}" for name, section in block_interface(block).items()))
+            for block in blocks
+        ]
+        result.references = [
+            (operand, r.block, r.network, r.line, r.op, r.access, r.param)
+            for operand, bucket in xref.references.items() for r in bucket
+        ]
+        result.calls = [(caller, callee, count) for caller in graph.edges
+                        for callee, count in graph.callees(caller).items()]
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.elapsed_s = time.perf_counter() - started
+    return result
+
+def discover_sources(paths: Iterable[str], patterns: Iterable[str] = DEFAULT_PATTERNS) -> List[str]:
+    """
+    Expand directories to source files
+
+    Args:
+        paths: Files and/or directories
+        patterns: Glob patterns used inside directories (recursive)
+
+    Returns:
+        Sorted list of unique file paths
+    """
+    found = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for pattern in patterns:
+                found.update(glob.glob(os.path.join(path, '**', pattern), recursive=True))
+        elif os.path.isfile(path):
+            found.add(path)
+        else:
+            found.update(p for p in glob.glob(path) if os.path.isfile(p))
+    return sorted(os.path.abspath(p) for p in found)
+
+class ProjectDatabase:
+    """
+    Project Database Class
+
+    SQLite store of files, blocks, references and calls across many sources
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        """
+        Open (or create) project database
+
+        Args:
+            db_path: SQLite file path
+        """
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def known_digests(self) -> Dict[str, str]:
+        """Get path -> digest of analyzed files"""
+        return dict(self.connection.execute("SELECT path, digest FROM files WHERE error = ''"))
+
+    def store(self, analysis: FileAnalysis):
+        """
+        Replace one file's rows
+
+        Args:
+            analysis: Worker result
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM files WHERE path = ?", (analysis.path,))
+            cursor = self.connection.execute(
+                "INSERT INTO files (path, digest, lines, analyzed_at, error) VALUES (?, ?, ?, ?, ?)",
+                (analysis.path, analysis.digest, analysis.lines, time.strftime("%Y-%m-%d %H:%M:%S"), analysis.error))
+            file_id = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((file_id,) + row for row in analysis.blocks))
+            self.connection.executemany(
+                "INSERT INTO refs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((row[0], file_id) + row[1:] for row in analysis.references))
+            self.connection.executemany(
+                "INSERT INTO calls VALUES (?, ?, ?, ?)",
+                ((file_id,) + row for row in analysis.calls))
+
+    def remove_missing(self, paths: Iterable[str]) -> int:
+        """
+        Drop files that are no longer part of the project
+
+        Args:
+            paths: Current project files
+
+        Returns:
+            int: Number of files removed
+        """
+        current = set(paths)
+        stale = [path for path in self.known_digests() if path not in current]
+        with self.connection:
+            self.connection.executemany("DELETE FROM files WHERE path = ?", ((path,) for path in stale))
+        return len(stale)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def lookup(self, operand: str, access: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get references of an operand across all files
+
+        Args:
+            operand: Address in any spacing ('DB10.DBW 100')
+            access: Optional filter 'R' (readers) or 'W' (writers)
+
+        Returns:
+            List of reference dictionaries
+        """
+        key = normalize_operand(operand)[0]
+        query = ("SELECT files.path, refs.block, refs.network, refs.line, refs.op, refs.access, refs.param "
+                 "FROM refs JOIN files ON files.id = refs.file_id WHERE refs.operand = ?")
+        if access == 'W':
+            query += " AND refs.access != 'R'"
+        elif access == 'R':
+            query += " AND refs.access != 'W'"
+        query += " ORDER BY files.path, refs.line"
+        columns = ('file', 'block', 'network', 'line', 'op', 'access', 'param')
+        return [dict(zip(columns, row)) for row in self.connection.execute(query, (key,))]
+
+    def find_block(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Get every definition of a block across files
+
+        Args:
+            name: Block name ('FC50')
+
+        Returns:
+            List of block dictionaries
+        """
+        cursor = self.connection.execute(
+            "SELECT files.path, blocks.* FROM blocks JOIN files ON files.id = blocks.file_id "
+            "WHERE blocks.name = ? ORDER BY files.path", (name.replace(' ', '').upper(),))
+        columns = [description[0] for description in cursor.description]
+        columns[0] = 'file'
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def callers(self, name: str) -> List[Dict[str, Any]]:
+        """Get callers of a block across files"""
+        cursor = self.connection.execute(
+            "SELECT files.path, calls.caller, calls.count FROM calls JOIN files ON files.id = calls.file_id "
+            "WHERE calls.callee = ? ORDER BY files.path, calls.caller", (name.replace(' ', '').upper(),))
+        return [{'file': path, 'caller': caller, 'count': count} for path, caller, count in cursor]
+
+    def statistics(self) -> Dict[str, int]:
+        """
+        Get database statistics
+
+        Returns:
+            dict: Row counts
+        """
+        counts = {}
+        for table in ('files', 'blocks', 'refs', 'calls'):
+            counts[table] = self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        counts['lines'] = self.connection.execute("SELECT COALESCE(SUM(lines), 0) FROM files").fetchone()[0]
+        counts['operands'] = self.connection.execute("SELECT COUNT(DISTINCT operand) FROM refs").fetchone()[0]
+        counts['errors'] = self.connection.execute("SELECT COUNT(*) FROM files WHERE error != ''").fetchone()[0]
+        return counts
+
+class ProgressBar:
+    """Single-line progress bar with line throughput (stderr)"""
+
+    def __init__(self, total: int, width: int = 30, stream=None):
+        self.total = total
+        self.width = width
+        self.stream = stream or sys.stderr
+        self.started = time.perf_counter()
+        self.done = 0
+        self.lines = 0
+
+    def update(self, lines: int):
+        self.done += 1
+        self.lines += lines
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        filled = int(self.width * self.done / self.total) if self.total else self.width
+        self.stream.write(f"\r[{'#' * filled}{'.' * (self.width - filled)}] {self.done}/{self.total} files "
+                          f"{self.lines:,} lines {self.lines / elapsed:,.0f} lines/s")
+        self.stream.flush()
+
+    def close(self):
+        self.stream.write("\n")
+        self.stream.flush()
+
+class ProjectAnalyzer:
+    """
+    Project Analyzer Class
+
+    Fans files out to a process pool and merges results into a ProjectDatabase
+    """
+
+    def __init__(self, database: ProjectDatabase, workers: Optional[int] = None):
+        """
+        Initialize project analyzer
+
+        Args:
+            database: Target project database
+            workers: Worker processes (None = CPU count, 1 = in-process)
+        """
+        self.database = database
+        self.workers = workers or os.cpu_count() or 1
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, paths: List[str], progress: bool = True, force: bool = False) -> Dict[str, Any]:
+        """
+        Analyze files and merge them into the database
+
+        Args:
+            paths: Source files
+            progress: Show progress bar on stderr
+            force: Re-analyze files even if their digest is unchanged
+
+        Returns:
+            dict: Run summary (files, analyzed, skipped, lines, lines_per_s, errors)
+        """
+        started = time.perf_counter()
+        known = {} if force else self.database.known_digests()
+        bar = ProgressBar(len(paths)) if progress and paths else None
+        summary = {'files': len(paths), 'analyzed': 0, 'skipped': 0, 'lines': 0, 'errors': []}
+
+        def collect(analysis: FileAnalysis):
+            summary['lines'] += analysis.lines
+            if analysis.error:
+                summary['errors'].append(f"{analysis.path}: {analysis.error}")
+            if analysis.blocks or analysis.error or analysis.digest != known.get(analysis.path):
+                summary['analyzed'] += 1
+                self.database.store(analysis)
+            else:
+                summary['skipped'] += 1
+            if bar:
+                bar.update(analysis.lines)
+
+        if self.workers == 1 or len(paths) <= 1:
+            for path in paths:
+                collect(analyze_file(path, known.get(path, "")))
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = [pool.submit(analyze_file, path, known.get(path, "")) for path in paths]
+                for future in as_completed(futures):
+                    collect(future.result())
+        if bar:
+            bar.close()
+
+        summary['removed'] = self.database.remove_missing(paths)
+        elapsed = time.perf_counter() - started
+        summary['elapsed_s'] = elapsed
+        summary['lines_per_s'] = summary['lines'] / elapsed if elapsed > 0 else 0.0
+        for error in summary['errors']:
+            self.logger.warning(f"Analysis failed for {error}")
+        return summary
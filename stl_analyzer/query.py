@@ -0,0 +1,704 @@
+#!/usr/bin/env python3
+"""
+STL Dataflow Query Engine
+=========================
+
+Description: Transitive dataflow queries over the parsed program
+Purpose: Answer "which outputs does I 0.1 influence?" interactively instead of tracing by hand
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- One dataflow graph for the whole program: every write is a node
+  linking the operands its value depends on (RLO, ACCU1/ACCU2 and the
+  conditions of jumps taken before it in the network) to the written
+  operand; block-local variables (#TEMP, #STAT, L/DI addresses) get
+  their own nodes so values flowing through temporaries are followed
+- Calls are summarized per callee (which actual inputs reach which
+  actual outputs and globals), so a block called from many places does
+  not connect unrelated call sites
+- Byte/bit aliasing: a write to M 12.0 reaches readers of MB 12, MW 11 ...
+- Graph stored as CSR adjacency arrays (array('i')) in both directions;
+  queries are breadth-first traversals with a bytearray visited set
+- Queries: influenced / influencing (with area filter), networks between
+  two operands, shortest path, dead markers (written but never read)
+
+Limitations:
+- Registers start empty in every network; loops (backward jumps)
+  do not feed their end state back to the loop head
+- Indirect accesses (DBW [AR1,P#0.0], MW [#ptr]) are not resolved
+- FB statics are shared by all instances of the FB
+"""
+
+import shlex
+import time
+import logging
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .callgraph import CallGraph
+from .nodes import Address, Block, Program
+from .parser import normalize_operand
+from .xref import (GLOBAL_AREAS, READ, SYSTEM_INTERFACES, WRITE, WRITE_OPS, _address_sort_key, _pointer_addresses,
+                   block_interface, block_references)
+
+logger = logging.getLogger(__name__)
+
+# Node kinds
+OPERAND = 0  # Global operand ('M12.0', 'DB10.DBW4')
+LOCAL = 1  # Block-local variable ('FC50:#TEMP8', 'FC52:LW200')
+NETWORK = 2  # Network or call summary node ('FC50 NW3')
+
+IN_SECTIONS = frozenset(('VAR_INPUT', 'VAR_IN_OUT'))
+OUT_SECTIONS = frozenset(('VAR_OUTPUT', 'VAR_IN_OUT'))
+LOCAL_AREAS = frozenset(('L', 'DI'))
+STATUS_BITS = frozenset(('OV', 'OS', 'BR', 'UO', '==0', '<>0', '>0', '<0', '>=0', '<=0'))
+LOGIC_OPS = frozenset(('A', 'AN', 'O', 'ON', 'X', 'XN'))
+NEST_OPS = frozenset(('A(', 'AN(', 'O(', 'ON(', 'X(', 'XN('))
+COMPARE_OPS = frozenset(f"{relation}{kind}" for relation in ('==', '<>', '>', '<', '>=', '<=') for kind in 'IDR')
+# Ops combining ACCU2 (or their operand) into ACCU1
+ACCU_OPS = frozenset(('+I', '-I', '*I', '/I', '+D', '-D', '*D', '/D', 'MOD', '+R', '-R', '*R', '/R',
+                      'AW', 'OW', 'XOW', 'AD', 'OD', 'XOD'))
+TIMER_OPS = frozenset(('SD', 'SE', 'SP', 'SS', 'SF'))
+RLO_JUMPS = frozenset(('JC', 'JCN', 'JCB', 'JNB', 'JBI', 'JNBI'))
+JUMP_OPS = RLO_JUMPS | frozenset(('JU', 'JL', 'LOOP', 'JZ', 'JN', 'JP', 'JM', 'JPZ', 'JMZ', 'JUO', 'JO', 'JOS'))
+
+QUERY_HELP = [
+    "influenced OPERAND [AREA]   operands downstream of OPERAND ('influenced \"I 0.1\" Q')",
+    "influencing OPERAND [AREA]  operands upstream of OPERAND ('influencing \"Q 4.0\" I')",
+    "between SOURCE TARGET       networks on any path from SOURCE to TARGET",
+    "path SOURCE TARGET          shortest dataflow chain from SOURCE to TARGET",
+    "dead [bits]                 markers written but never read",
+    "stats                       graph size",
+]
+
+Edge = Tuple[str, str]
+Summary = Dict[Tuple[str, str], Set[Tuple[str, str]]]  # Entry ('P', param)/('G', key) -> exits
+
+def _local_key(block: str, operand: str) -> str:
+    """Block-local node name: '#Recipe.Speed[2]' -> 'FC50:#RECIPE'"""
+    name = operand.split('.', 1)[0].split('[', 1)[0]
+    return f"{block}:{name.upper()}"
+
+def _node_kind(name: str) -> int:
+    if ' NW' in name:
+        return NETWORK
+    return LOCAL if ':' in name else OPERAND
+
+def _display(name: str) -> str:
+    """Strip the call summary suffix ('FC50 NW3|FC8:OUT2@120' -> 'FC50 NW3')"""
+    return name.split('|', 1)[0]
+
+def _network_sort_key(label: str):
+    block, _, network = label.partition(' NW')
+    kind = block.rstrip('0123456789')
+    return (kind, int(block[len(kind):] or 0), int(network or 0))
+
+def parse_operand(text: str) -> Tuple[str, Optional[Address]]:
+    """
+    Normalize a user-typed operand ('i 0.1', 'MW 10', 'DB10.DBX 2.0')
+
+    Args:
+        text: Operand text
+
+    Returns:
+        tuple: (canonical key, Address or None)
+    """
+    text = text.strip()
+    return normalize_operand(text if text.startswith('#') else text.upper())
+
+class _BlockGraph:
+    """Dataflow edges of one code block plus its parameter interface"""
+
+    def __init__(self, block: Block, interface: Dict[str, str]):
+        self.block = block
+        self.interface = interface  # PARAM -> VAR section (upper-case names)
+        self.edges: List[Edge] = []
+
+    def summary(self) -> Summary:
+        """Which entries (input params, globals read) reach which exits (output params, globals written)"""
+        prefix = f"{self.block.name}:#"
+        forward: Dict[str, List[str]] = {}
+        for source, target in self.edges:
+            forward.setdefault(source, []).append(target)
+        exits: List[Tuple[str, str]] = []
+        masks: Dict[str, int] = {}  # Node -> bit set of exits reachable from it
+        for source, target in self.edges:
+            for node in (source, target):
+                if node not in masks:
+                    masks[node] = 0
+            if masks[target]:
+                continue
+            if target.startswith(prefix):
+                if self.interface.get(target[len(prefix):]) not in OUT_SECTIONS:
+                    continue
+                exits.append(('P', target[len(prefix):]))
+            elif _node_kind(target) == OPERAND:
+                exits.append(('G', target))
+            else:
+                continue
+            masks[target] = 1 << (len(exits) - 1)
+        own = dict(masks)
+
+        # Tarjan emits strongly connected components after everything they
+        # reach, so one pass over the components in emission order suffices
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+        for root in masks:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(forward.get(root, ())))]
+            while work:
+                node, successors = work[-1]
+                for target in successors:
+                    if target not in index:
+                        index[target] = low[target] = len(index)
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(forward.get(target, ()))))
+                        break
+                    if target in on_stack:
+                        low[node] = min(low[node], index[target])
+                else:
+                    work.pop()
+                    if work:
+                        low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        mask = 0
+                        for member in component:
+                            mask |= masks[member]
+                            for target in forward.get(member, ()):
+                                mask |= masks[target]
+                        for member in component:
+                            masks[member] = mask
+
+        result: Summary = {}
+        for node, mask in masks.items():
+            if node.startswith(prefix):
+                if self.interface.get(node[len(prefix):]) not in IN_SECTIONS:
+                    continue
+                entry = ('P', node[len(prefix):])
+            elif _node_kind(node) == OPERAND:
+                entry = ('G', node)
+            else:
+                continue
+            mask &= ~own[node]
+            if mask:
+                result[entry] = {exits[bit] for bit in range(len(exits)) if mask >> bit & 1}
+        return result
+
+class QueryEngine:
+    """
+    Query Engine Class
+
+    Whole-program dataflow graph in CSR form with traversal queries
+    """
+
+    def __init__(self, program: Program):
+        """
+        Build the dataflow graph
+
+        Args:
+            program: Parsed program
+        """
+        started = time.perf_counter()
+        self.program = program
+        self.interfaces: Dict[str, Dict[str, str]] = {
+            name: {param.upper(): section for param, section in params.items()}
+            for name, params in SYSTEM_INTERFACES.items()}
+        for block in program:
+            if block.is_code:
+                interface = {param.upper(): section for param, section in block_interface(block).items()}
+                if block.return_type and block.return_type.upper() != 'VOID':
+                    interface['RET_VAL'] = 'VAR_OUTPUT'
+                self.interfaces[block.name] = interface
+        self.readers: Dict[str, int] = {}  # Global operand -> read count
+        self.writers: Dict[str, int] = {}
+        self.summaries: Dict[str, Summary] = {}
+        edges: List[Edge] = []
+        for name in self._bottom_up():
+            graph = self._block_graph(program.get(name))
+            self.summaries[name] = graph.summary()
+            edges.extend(graph.edges)
+        self._build(edges)
+        self.build_ms = (time.perf_counter() - started) * 1000.0
+        logger.info(f"Dataflow graph: {len(self.names)} nodes, {len(self.forward_targets)} edges "
+                    f"in {self.build_ms:.0f} ms")
+
+    @classmethod
+    def from_source(cls, source_path: str, persist: bool = True) -> 'QueryEngine':
+        """
+        Build from a source file through the incremental analysis cache
+
+        Args:
+            source_path: STL/AWL source file
+            persist: Keep the per-block cache on disk
+
+        Returns:
+            QueryEngine: Engine for the current source
+        """
+        from .cache import IncrementalAnalyzer
+        return cls(IncrementalAnalyzer(source_path, persist=persist).analyze().program)
+
+    # ------------------------------------------------------------------
+    # Graph construction
+    # ------------------------------------------------------------------
+
+    def _bottom_up(self) -> List[str]:
+        """Code blocks with callees before callers (cycles broken arbitrarily)"""
+        graph = CallGraph.build(block for block in self.program if block.is_code)
+        order: List[str] = []
+        done: Set[str] = set()
+        for root in [block.name for block in self.program if block.is_code]:
+            if root in done:
+                continue
+            done.add(root)
+            stack = [(root, iter(graph.edges.get(root, {})))]
+            while stack:
+                node, callees = stack[-1]
+                for callee in callees:
+                    if callee not in done and callee in graph.kinds:
+                        done.add(callee)
+                        stack.append((callee, iter(graph.edges.get(callee, {}))))
+                        break
+                else:
+                    stack.pop()
+                    order.append(node)
+        return order
+
+    def _actual_keys(self, block: str, operand: str, address: Optional[Address]) -> List[str]:
+        """Graph nodes of a call's actual parameter (none for constants)"""
+        if operand.startswith('#'):
+            return [_local_key(block, operand)]
+        if address is None:
+            return [str(target) for target in _pointer_addresses(operand) if target.area in GLOBAL_AREAS]
+        if address.area in LOCAL_AREAS:
+            return [f"{block}:{address}"]
+        if address.area in GLOBAL_AREAS and (address.area != 'DB' or address.db >= 0):
+            return [str(address)]
+        return []
+
+    def _block_graph(self, block: Block) -> _BlockGraph:
+        """
+        Dataflow edges of one block
+
+        Registers are tracked per network as the set of operands their
+        value depends on: the RLO (bit logic, compares), ACCU1/ACCU2
+        (loads, arithmetic) and a control set that collects the
+        conditions of every jump taken so far. Each write becomes one
+        node: dependencies -> 'FC50 NW3|line' -> written operand.
+        """
+        name = block.name
+        graph = _BlockGraph(block, self.interfaces.get(name, {}))
+        edges = graph.edges
+        readers, writers = self.readers, self.writers
+
+        # Global operands per line (relative DB accesses resolved through OPN, like the xref)
+        globals_by_line: Dict[int, str] = {}
+        for key, reference in block_references(block)[0]:
+            if reference.param:
+                continue
+            globals_by_line[reference.line] = key
+            if reference.access != WRITE:
+                readers[key] = readers.get(key, 0) + 1
+            if reference.access != READ:
+                writers[key] = writers.get(key, 0) + 1
+
+        for network in block.networks:
+            label = f"{name} NW{network.index}"
+            rlo: Set[str] = set()
+            accu1: Set[str] = set()
+            accu2: Set[str] = set()
+            control: Set[str] = set()
+            first = True  # Next bit check starts a new logic chain
+            pending: Dict[str, Tuple[Set[str], Set[str], Set[str]]] = {}  # Label -> registers at forward jumps
+            for instruction in network.instructions:
+                op, operand, line = instruction.op, instruction.operand, instruction.line
+                if instruction.label in pending:
+                    saved = pending.pop(instruction.label)
+                    rlo, accu1, accu2 = rlo | saved[0], accu1 | saved[1], accu2 | saved[2]
+                if instruction.call is not None:
+                    self._call_edges(graph, label, line, instruction.call)
+                    accu1, accu2, first = set(), set(), True
+                    continue
+                if operand.startswith('#'):
+                    key = _local_key(name, operand)
+                elif instruction.address is not None and instruction.address.area in LOCAL_AREAS:
+                    key = f"{name}:{instruction.address}"
+                else:
+                    key = globals_by_line.get(line)
+
+                if op in LOGIC_OPS or op in NEST_OPS:
+                    sources = {key} if key else (accu1 | accu2 if operand in STATUS_BITS else set())
+                    rlo = sources if first else rlo | sources
+                    first = False
+                elif op in COMPARE_OPS:
+                    rlo = accu1 | accu2 if first else rlo | accu1 | accu2
+                    first = False
+                elif op in ('FP', 'FN'):
+                    if key:
+                        rlo = rlo | {key}
+                        self._write(edges, label, line, rlo | control, key)
+                elif op in WRITE_OPS:
+                    if key and op not in ('TAR1', 'TAR2'):
+                        if op == 'T':
+                            value = accu1
+                        elif op in TIMER_OPS or (op == 'S' and key[:1] == 'C'):
+                            value = rlo | accu1  # Time value / counter preset come from ACCU1
+                        else:
+                            value = rlo
+                        self._write(edges, label, line, value | control, key)
+                    first = first or op in ('=', 'S', 'R')
+                elif op in ('L', 'LC'):
+                    accu1, accu2 = ({key} if key else set()), accu1
+                elif op in ACCU_OPS:
+                    accu1 = accu1 | accu2 | ({key} if key else set())
+                elif op == 'TAK':
+                    accu1, accu2 = accu2, accu1
+                elif op == 'PUSH':
+                    accu2 = accu1
+                elif op == 'POP':
+                    accu1 = accu2
+                elif op in ('SET', 'CLR'):
+                    rlo, first = set(), True
+                elif op in JUMP_OPS:
+                    condition = rlo if op in RLO_JUMPS else accu1 | accu2 if op != 'JU' else set()
+                    control = control | condition
+                    if operand:
+                        saved = pending.get(operand)
+                        pending[operand] = (rlo, accu1, accu2) if saved is None else (
+                            saved[0] | rlo, saved[1] | accu1, saved[2] | accu2)
+                    if op in RLO_JUMPS:
+                        first = True
+                elif op == 'BEC':
+                    control = control | rlo
+                    first = True
+        return graph
+
+    @staticmethod
+    def _write(edges: List[Edge], label: str, line: int, sources: Set[str], target: str):
+        node = f"{label}|{line}"
+        edges.extend((source, node) for source in sources)
+        edges.append((node, target))
+
+    def _call_edges(self, graph: _BlockGraph, label: str, line: int, call):
+        """Edges of one call site from the callee summary (or all inputs -> all outputs)"""
+        name = graph.block.name
+        edges = graph.edges
+        interface = self.interfaces.get(call.target, {})
+        inputs: Dict[str, List[str]] = {}
+        outputs: Dict[str, List[str]] = {}
+        for param, operand, address in call.params:
+            keys = self._actual_keys(name, operand, address)
+            section = interface.get(param.upper())
+            if section is None or section in IN_SECTIONS:
+                inputs.setdefault(param.upper(), []).extend(keys)
+            if section is None or section in OUT_SECTIONS:
+                outputs.setdefault(param.upper(), []).extend(keys)
+            for key in keys:
+                if _node_kind(key) == OPERAND:
+                    if section is None or section in IN_SECTIONS:
+                        self.readers[key] = self.readers.get(key, 0) + 1
+                    if section is None or section in OUT_SECTIONS:
+                        self.writers[key] = self.writers.get(key, 0) + 1
+
+        summary = self.summaries.get(call.target)
+        if summary is None:
+            # External, unknown or recursive callee: every input may reach every output
+            node = f"{label}|{call.target}@{line}"
+            edges.extend((key, node) for keys in inputs.values() for key in keys)
+            edges.extend((node, key) for keys in outputs.values() for key in keys)
+            return
+        exits: Dict[Tuple[str, str], Set[Tuple[str, str]]] = {}
+        for entry, reached in summary.items():
+            for exit_ in reached:
+                exits.setdefault(exit_, set()).add(entry)
+        for (kind, exit_name), entries in exits.items():
+            targets = outputs.get(exit_name, []) if kind == 'P' else [exit_name]
+            if not targets:
+                continue
+            sources = []
+            for entry_kind, entry_name in entries:
+                sources.extend(inputs.get(entry_name, []) if entry_kind == 'P' else [entry_name])
+            if not sources:
+                continue
+            node = f"{label}|{call.target}:{exit_name}@{line}"
+            edges.extend((source, node) for source in sources)
+            edges.extend((node, target) for target in targets)
+
+    def _build(self, edges: List[Edge]):
+        """Intern node names, add alias edges and pack both directions into CSR arrays"""
+        ids: Dict[str, int] = {}
+        names: List[str] = []
+
+        def node_id(name: str) -> int:
+            index = ids.get(name)
+            if index is None:
+                index = ids[name] = len(names)
+                names.append(name)
+            return index
+
+        # Byte index of global operands for aliasing (bits of different positions do not alias)
+        by_byte: Dict[Tuple[str, int, int], List[Tuple[str, Address]]] = {}
+        for source, target in edges:
+            for key in (source, target):
+                if key not in ids:
+                    node_id(key)
+                    address = normalize_operand(key)[1] if _node_kind(key) == OPERAND else None
+                    if address is not None and address.area not in ('T', 'C'):
+                        for byte in range(address.byte, address.byte + max(address.size, 1)):
+                            by_byte.setdefault((address.area, address.db, byte), []).append((key, address))
+        self.aliases: Dict[str, Set[str]] = {}
+        for members in by_byte.values():
+            for key, address in members:
+                for other, other_address in members:
+                    if other == key or (address.width == 'X' and other_address.width == 'X'):
+                        continue
+                    self.aliases.setdefault(key, set()).add(other)
+
+        sources, targets = array('i'), array('i')
+        for source, target in edges:
+            sources.append(ids[source])
+            targets.append(ids[target])
+            # A write is seen by every overlapping operand (M 12.0 -> MB 12)
+            if _node_kind(target) == OPERAND:
+                for alias in self.aliases.get(target, ()):
+                    sources.append(ids[source])
+                    targets.append(ids[alias])
+        self.ids = ids
+        self.names = names
+        self.kinds = bytes(_node_kind(name) for name in names)
+        self.forward_offsets, self.forward_targets = self._csr(sources, targets, len(names))
+        self.reverse_offsets, self.reverse_targets = self._csr(targets, sources, len(names))
+
+    @staticmethod
+    def _csr(sources: array, targets: array, count: int) -> Tuple[array, array]:
+        """Pack an edge list into offsets/targets arrays (duplicates removed)"""
+        pairs = sorted(set(zip(sources, targets)))
+        offsets = array('i', [0]) * (count + 1)
+        packed = array('i', [0]) * len(pairs)
+        for position, (source, target) in enumerate(pairs):
+            offsets[source + 1] += 1
+            packed[position] = target
+        for index in range(count):
+            offsets[index + 1] += offsets[index]
+        return offsets, packed
+
+    # ------------------------------------------------------------------
+    # Traversal
+    # ------------------------------------------------------------------
+
+    def _start_nodes(self, operand: str) -> List[int]:
+        key, _ = parse_operand(operand)
+        keys = [key] + sorted(self.aliases.get(key, ()))
+        return [self.ids[name] for name in keys if name in self.ids]
+
+    def _reach(self, starts: Iterable[int], reverse: bool = False) -> bytearray:
+        """Breadth-first closure; returns the visited flags"""
+        offsets, targets = ((self.reverse_offsets, self.reverse_targets) if reverse
+                            else (self.forward_offsets, self.forward_targets))
+        visited = bytearray(len(self.names))
+        queue = deque()
+        for start in starts:
+            if not visited[start]:
+                visited[start] = 1
+                queue.append(start)
+        while queue:
+            node = queue.popleft()
+            for position in range(offsets[node], offsets[node + 1]):
+                target = targets[position]
+                if not visited[target]:
+                    visited[target] = 1
+                    queue.append(target)
+        return visited
+
+    def _operands(self, visited: bytearray, exclude: Iterable[int], area: Optional[str]) -> List[str]:
+        areas = None
+        if area:
+            area = area.upper()
+            areas = {area, 'P' + area} if area in ('I', 'Q') else {area}
+        excluded = set(exclude)
+        found = []
+        for index, name in enumerate(self.names):
+            if visited[index] and self.kinds[index] == OPERAND and index not in excluded:
+                if areas is None or normalize_operand(name)[1].area in areas:
+                    found.append(name)
+        return sorted(found, key=_address_sort_key)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def influenced(self, operand: str, area: Optional[str] = None) -> List[str]:
+        """
+        Get global operands a value can flow to
+
+        Args:
+            operand: Source operand ('I 0.1')
+            area: Optional area filter ('Q' also matches PQ)
+
+        Returns:
+            Sorted canonical operands (empty if the operand is not referenced)
+        """
+        starts = self._start_nodes(operand)
+        return self._operands(self._reach(starts), starts, area)
+
+    def influencing(self, operand: str, area: Optional[str] = None) -> List[str]:
+        """
+        Get global operands that can flow into an operand
+
+        Args:
+            operand: Target operand ('Q 4.0')
+            area: Optional area filter ('I' also matches PI)
+
+        Returns:
+            Sorted canonical operands
+        """
+        starts = self._start_nodes(operand)
+        return self._operands(self._reach(starts, reverse=True), starts, area)
+
+    def networks_between(self, source: str, target: str) -> List[str]:
+        """
+        Get networks lying on some dataflow path from source to target
+
+        Args:
+            source: Source operand ('M 10.0')
+            target: Target operand ('M 20.0')
+
+        Returns:
+            Sorted network labels ('FC50 NW3'); call sites appear as the calling network
+        """
+        downstream = self._reach(self._start_nodes(source))
+        upstream = self._reach(self._start_nodes(target), reverse=True)
+        labels = {_display(self.names[index]) for index in range(len(self.names))
+                  if downstream[index] and upstream[index] and self.kinds[index] == NETWORK}
+        return sorted(labels, key=_network_sort_key)
+
+    def path(self, source: str, target: str) -> List[str]:
+        """
+        Get one shortest dataflow chain
+
+        Args:
+            source: Source operand
+            target: Target operand
+
+        Returns:
+            Node labels from source to target (empty if unreachable)
+        """
+        goals = set(self._start_nodes(target))
+        parents: Dict[int, int] = {}
+        queue = deque()
+        for start in self._start_nodes(source):
+            parents[start] = -1
+            queue.append(start)
+        offsets, targets = self.forward_offsets, self.forward_targets
+        while queue:
+            node = queue.popleft()
+            if node in goals:
+                chain = []
+                while node >= 0:
+                    chain.append(_display(self.names[node]))
+                    node = parents[node]
+                return chain[::-1]
+            for position in range(offsets[node], offsets[node + 1]):
+                following = targets[position]
+                if following not in parents:
+                    parents[following] = node
+                    queue.append(following)
+        return []
+
+    def dead_markers(self, bits_only: bool = False) -> List[str]:
+        """
+        Get markers that are written but never read
+
+        A marker counts as read if it or any operand sharing its bytes
+        (MB/MW/MD over the bit) is read anywhere, including as a call input.
+
+        Args:
+            bits_only: Only report M x.y bits
+
+        Returns:
+            Sorted canonical operands
+        """
+        dead = []
+        for key in self.writers:
+            address = normalize_operand(key)[1]
+            if address is None or address.area != 'M' or (bits_only and address.width != 'X'):
+                continue
+            if key in self.readers or any(alias in self.readers for alias in self.aliases.get(key, ())):
+                continue
+            dead.append(key)
+        return sorted(dead, key=_address_sort_key)
+
+    def statistics(self) -> Dict[str, int]:
+        """
+        Get graph statistics
+
+        Returns:
+            dict: Node/edge counts and build time
+        """
+        return {
+            'nodes': len(self.names),
+            'operands': self.kinds.count(OPERAND),
+            'locals': self.kinds.count(LOCAL),
+            'networks': self.kinds.count(NETWORK),
+            'edges': len(self.forward_targets),
+            'summaries': len(self.summaries),
+            'build_ms': round(self.build_ms)
+        }
+
+    def execute(self, text: str) -> List[str]:
+        """
+        Run one textual query (see QUERY_HELP)
+
+        Args:
+            text: Query line ('influenced "I 0.1" Q')
+
+        Returns:
+            Output lines
+        """
+        try:
+            words = shlex.split(text)
+        except ValueError as e:
+            return [f"Cannot parse query: {e}"]
+        if not words:
+            return []
+        command, arguments = words[0].lower(), words[1:]
+        started = time.perf_counter()
+        if command in ('influenced', 'influencing') and 1 <= len(arguments) <= 2:
+            operand = arguments[0]
+            if parse_operand(operand)[0] not in self.ids:
+                return [f"{operand}: not referenced by the program"]
+            found = getattr(self, command)(operand, arguments[1] if len(arguments) > 1 else None)
+            lines = [f"{parse_operand(operand)[0]} {command}: {len(found)} operands"]
+            lines.extend(f"  {key}" for key in found)
+        elif command == 'between' and len(arguments) == 2:
+            found = self.networks_between(*arguments)
+            lines = [f"{len(found)} networks between {arguments[0]} and {arguments[1]}"]
+            lines.extend(f"  {label}" for label in found)
+        elif command == 'path' and len(arguments) == 2:
+            chain = self.path(*arguments)
+            lines = [' -> '.join(chain) if chain else f"No dataflow path from {arguments[0]} to {arguments[1]}"]
+        elif command == 'dead' and len(arguments) <= 1:
+            found = self.dead_markers(bits_only=bool(arguments) and arguments[0].lower() == 'bits')
+            lines = [f"{len(found)} markers written but never read"]
+            lines.extend(f"  {key} (written {self.writers[key]}x)" for key in found)
+        elif command == 'stats' and not arguments:
+            lines = [f"{key:12s} {value}" for key, value in self.statistics().items()]
+        else:
+            return ["Queries:"] + [f"  {line}" for line in QUERY_HELP]
+        lines.append(f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+        return lines
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Signal-Flow Report Generator
+============================
+
+Description: Renders the signal-flow document from the cached cross-reference index
+Purpose: Replace the hand-maintained main_signal_flow*.txt files with a generated report
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- Per-OB call trees with the process inputs read and outputs written
+  below each OB (device tags from plc_io.txt)
+- Marker (M) producers and consumers per block/network, grouped by
+  16-byte ranges
+- I/O usage per plc_io.txt point, plus unused and undocumented channels
+- Incremental: program/xref come from the per-block analysis cache and
+  every section is keyed by the content hashes of the blocks it depends
+  on; only sections with a changed key are re-rendered
+"""
+
+import hashlib
+import os
+import pickle
+import time
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .cache import AnalysisResult, IncrementalAnalyzer
+from .iomap import IOMap, load_io_map
+from .parser import normalize_operand
+from .xref import READ, WRITE, Reference
+
+logger = logging.getLogger(__name__)
+
+REPORT_VERSION = 1
+RULE = '=' * 79
+MARKER_GROUP = 16  # Marker bytes per section
+IO_AREAS = {'I': 'I', 'PI': 'I', 'Q': 'Q', 'PQ': 'Q'}
+
+def _banner(title: str) -> List[str]:
+    return [RULE, title.center(79).rstrip(), RULE, ""]
+
+def _site(reference: Reference) -> str:
+    return f"{reference.block} NW{reference.network} {reference.op}"
+
+def _sites(references: Iterable[Reference]) -> str:
+    seen = []
+    for reference in references:
+        text = _site(reference)
+        if text not in seen:
+            seen.append(text)
+    return ', '.join(seen)
+
+class SignalFlowReport:
+    """
+    Signal-Flow Report Class
+
+    Keeps the analysis cache and the rendered sections of one source
+    and brings the report up to date on each render() call
+    """
+
+    def __init__(self, source_path: str, io_path: str = "plc_io.txt", output_path: Optional[str] = None,
+                 cycle_times: Optional[Dict[str, float]] = None, persist: bool = True):
+        """
+        Initialize report generator
+
+        Args:
+            source_path: STL/AWL source file
+            io_path: plc_io.txt I/O list
+            output_path: Report file (default <source>.signal_flow.txt)
+            cycle_times: OB cycle budgets in ms shown in the OB titles ({'OB1': 10})
+            persist: Keep the analysis and section caches on disk
+        """
+        self.source_path = source_path
+        self.io_path = io_path
+        self.output_path = output_path or os.path.splitext(source_path)[0] + '.signal_flow.txt'
+        self.section_cache_path = self.output_path + '.sections'
+        self.cycle_times = cycle_times or {}
+        self.persist = persist
+        self.analyzer = IncrementalAnalyzer(source_path, persist=persist)
+        self.sections: Dict[str, Tuple[str, List[str]]] = {}  # Section id -> (key, lines)
+        self.io_map = IOMap()
+        self.io_digest = ""
+        self.logger = logging.getLogger(__name__)
+        if persist:
+            self._load_sections()
+
+    def _load_sections(self):
+        try:
+            with open(self.section_cache_path, 'rb') as f:
+                data = pickle.load(f)
+            if data.get('version') == REPORT_VERSION:
+                self.sections = data['sections']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable section cache {self.section_cache_path}: {e}")
+
+    def _save_sections(self):
+        try:
+            temp_path = self.section_cache_path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                pickle.dump({'version': REPORT_VERSION, 'sections': self.sections}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.section_cache_path)
+        except Exception as e:
+            self.logger.error(f"Error saving section cache: {e}")
+
+    def _load_io(self):
+        """Reload plc_io.txt when it changed"""
+        try:
+            with open(self.io_path, 'rb') as f:
+                digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        except FileNotFoundError:
+            digest = ""
+        if digest != self.io_digest:
+            self.io_map = load_io_map(self.io_path) if digest else IOMap()
+            self.io_digest = digest
+
+    # ------------------------------------------------------------------
+    # Index views
+    # ------------------------------------------------------------------
+
+    def _index(self, result: AnalysisResult):
+        """Split references by area: I/O per canonical bit/word, markers per byte group, block -> I/O"""
+        self.io_refs: Dict[str, List[Reference]] = {}
+        self.marker_groups: Dict[int, List[str]] = {}
+        self.block_io: Dict[str, Dict[str, Set[str]]] = {}
+        for key, references in result.xref.references.items():
+            address = normalize_operand(key)[1]
+            if address is None:
+                continue
+            if address.area in IO_AREAS:
+                self.io_refs[key] = references
+                for reference in references:
+                    self.block_io.setdefault(reference.block, {}).setdefault(key, set()).add(reference.access)
+            elif address.area == 'M':
+                self.marker_groups.setdefault(address.byte // MARKER_GROUP, []).append(key)
+
+    def _key(self, blocks: Iterable[str], *extra: str) -> str:
+        """Section key from the content hashes of the blocks it depends on"""
+        digest = hashlib.blake2b(digest_size=16)
+        by_name = self.program.by_name
+        for name in sorted(set(blocks)):
+            block = by_name.get(name)
+            digest.update(f"{name}:{block.content_hash if block is not None else '-'};".encode('utf-8'))
+        for text in extra:
+            digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _label(self, key: str) -> str:
+        point = self.io_map.get(key)
+        return f"{key} {point.tag}".rstrip() if point is not None else key
+
+    # ------------------------------------------------------------------
+    # Sections
+    # ------------------------------------------------------------------
+
+    def _ob_section(self, ob: str, reachable: Set[str]) -> List[str]:
+        graph = self.callgraph
+        cycle = self.cycle_times.get(ob)
+        lines = _banner(f"{ob} CALL TREE" + (f" (cycle {cycle:g} ms)" if cycle else ""))
+        lines.append(ob)
+
+        def walk(node: str, prefix: str, path: Set[str]):
+            callees = list(graph.edges.get(node, {}).items())
+            for position, (callee, sites) in enumerate(callees):
+                last = position == len(callees) - 1
+                networks = ', '.join(f"NW{network}" for network in sorted({site.network for site in sites}))
+                instances = sorted({site.instance for site in sites if site.instance})
+                notes = [networks]
+                if instances:
+                    notes.append(', '.join(instances))
+                if callee not in graph.kinds:
+                    notes.append("external")
+                if callee in path:
+                    notes.append("cycle")
+                lines.append(f"{prefix}+- {callee} ({'; '.join(notes)})")
+                if callee not in path:
+                    walk(callee, prefix + ("   " if last else "|  "), path | {callee})
+
+        walk(ob, "", {ob})
+        inputs: Dict[str, Set[str]] = {}
+        outputs: Dict[str, Set[str]] = {}
+        for name in sorted(reachable):
+            for key, accesses in self.block_io.get(name, {}).items():
+                if any(access != WRITE for access in accesses):
+                    inputs.setdefault(key, set()).add(name)
+                if any(access != READ for access in accesses):
+                    outputs.setdefault(key, set()).add(name)
+        for title, signals in (("Inputs read", inputs), ("Outputs written", outputs)):
+            lines.append("")
+            lines.append(f"{title} ({len(signals)}):")
+            for key in sorted(signals, key=lambda text: self._sort_key(text)):
+                lines.append(f"  {self._label(key):<16} {', '.join(sorted(signals[key]))}")
+        lines.append("")
+        return lines
+
+    @staticmethod
+    def _sort_key(key: str):
+        address = normalize_operand(key)[1]
+        if address is None:
+            return ('~', 0, 0, key)
+        return (IO_AREAS.get(address.area, address.area), address.byte, address.bit, key)
+
+    def _marker_section(self, group: int, keys: List[str]) -> List[str]:
+        first = group * MARKER_GROUP
+        lines = _banner(f"MARKERS M{first}.0 - M{first + MARKER_GROUP - 1}.7")
+        for key in sorted(keys, key=self._sort_key):
+            references = self.xref.references[key]
+            producers = [reference for reference in references if reference.access != READ]
+            consumers = [reference for reference in references if reference.access != WRITE]
+            lines.append(key + ("" if producers else "   (never written)") + ("" if consumers else "   (never read)"))
+            if producers:
+                lines.append(f"  <- {_sites(producers)}")
+            if consumers:
+                lines.append(f"  -> {_sites(consumers)}")
+        lines.append("")
+        return lines
+
+    def _io_section(self, area: str, keys: List[str]) -> List[str]:
+        lines = _banner("PROCESS INPUTS" if area == 'I' else "PROCESS OUTPUTS")
+        for key in keys:
+            point = self.io_map.get(key)
+            references = self.io_refs.get(key, [])
+            title = f"{key:<8} {point.tag:<8} {point.description}" if point is not None else f"{key:<8} (not in I/O list)"
+            lines.append(title.rstrip())
+            if not references:
+                lines.append("  (not used by the program)")
+                continue
+            writers = [reference for reference in references if reference.access != READ]
+            readers = [reference for reference in references if reference.access != WRITE]
+            if writers:
+                lines.append(f"  <- {_sites(writers)}")
+            if readers:
+                lines.append(f"  -> {_sites(readers)}")
+        lines.append("")
+        return lines
+
+    def _header(self, result: AnalysisResult) -> List[str]:
+        stats = result.xref.statistics()
+        lines = [f"# SIGNAL FLOW - {os.path.basename(self.source_path)}",
+                 "# Generated from the cross-reference index; do not edit by hand",
+                 "",
+                 f"Blocks: {len(result.program)}   Operands: {len(result.xref.references)}   "
+                 f"References: {stats.get('references', 0)}   I/O points: {len(self.io_map)}",
+                 f"Organization blocks: {', '.join(self.obs)}",
+                 ""]
+        return lines
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def render(self) -> Dict[str, object]:
+        """
+        Bring the report up to date and write it
+
+        Returns:
+            dict: sections, rendered, reused, elapsed_ms, output
+        """
+        started = time.perf_counter()
+        result = self.analyzer.analyze()
+        self._load_io()
+        self.program, self.xref, self.callgraph = result.program, result.xref, result.callgraph
+        self._index(result)
+        self.obs = sorted((block.name for block in result.program if block.kind == 'OB'),
+                          key=lambda name: int(name[2:]) if name[2:].isdigit() else 0)
+
+        plan: List[Tuple[str, str, object]] = []
+        for ob in self.obs:
+            reachable = self.callgraph.reachable(ob) | {ob}
+            plan.append((f"OB:{ob}", self._key(reachable, str(self.cycle_times.get(ob)), self.io_digest),
+                         lambda ob=ob, reachable=reachable: self._ob_section(ob, reachable)))
+        for area in ('I', 'Q'):
+            keys = {point.address for point in self.io_map if point.address.startswith(area)}
+            keys.update(key for key in self.io_refs
+                        if IO_AREAS.get(normalize_operand(key)[1].area) == area)
+            keys = sorted(keys, key=self._sort_key)
+            blocks = {reference.block for key in keys for reference in self.io_refs.get(key, [])}
+            plan.append((f"IO:{area}", self._key(blocks, self.io_digest, *keys),
+                         lambda area=area, keys=keys: self._io_section(area, keys)))
+        for group in sorted(self.marker_groups):
+            keys = self.marker_groups[group]
+            blocks = {reference.block for key in keys for reference in self.xref.references[key]}
+            plan.append((f"M:{group}", self._key(blocks, *sorted(keys)),
+                         lambda group=group, keys=keys: self._marker_section(group, keys)))
+
+        rendered = []
+        sections: Dict[str, Tuple[str, List[str]]] = {}
+        for section_id, key, build in plan:
+            cached = self.sections.get(section_id)
+            if cached is not None and cached[0] == key:
+                sections[section_id] = cached
+            else:
+                sections[section_id] = (key, build())
+                rendered.append(section_id)
+        self.sections = sections
+
+        text = self._header(result)
+        for _, lines in sections.values():
+            text.extend(lines)
+        try:
+            with open(self.output_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(text) + '\n')
+        except Exception as e:
+            self.logger.error(f"Error writing report {self.output_path}: {e}")
+        if self.persist and rendered:
+            self._save_sections()
+
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        self.logger.debug(f"Signal flow: {len(rendered)}/{len(plan)} sections rendered in {elapsed_ms:.1f} ms")
+        return {'sections': len(plan), 'rendered': rendered, 'reused': len(plan) - len(rendered),
+                'changed_blocks': result.parsed, 'elapsed_ms': elapsed_ms, 'output': self.output_path}
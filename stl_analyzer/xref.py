@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+"""
+STL Cross-Reference Index
+=========================
+
+Description: Read/write cross-reference table for every global operand
+Purpose: Answer "who writes DB10.DBW 100?" without grepping STL_Program.txt
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- Indexes I, Q, M, PI, PQ, T, C and DB operands across all blocks/networks
+- Access classification per opcode (=, S, R, T write; A, O, L read;
+  FP/FN read and write)
+- CALL actual parameters classified from the callee's VAR_INPUT/VAR_OUTPUT
+- Relative DBX/DBW accesses resolved through the last opened DB
+- ANY pointers (P#DB10.DBX 82.0 WORD 3) expanded to the covered elements
+- O(1) lookup by canonical address, byte-overlap queries
+- Compact binary persistence (columnar arrays, zlib) keyed by source digest
+"""
+
+import json
+import hashlib
+import os
+import re
+import struct
+import time
+import zlib
+import logging
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .nodes import Address, Block
+from .parser import iter_file_blocks, normalize_operand
+
+logger = logging.getLogger(__name__)
+
+# Access kinds
+READ = 'R'
+WRITE = 'W'
+READ_WRITE = 'RW'
+PARAMETER = 'P'  # Actual parameter of a call whose direction is not known yet
+
+GLOBAL_AREAS = frozenset(('I', 'Q', 'M', 'PI', 'PQ', 'T', 'C', 'DB'))
+
+WRITE_OPS = frozenset(('=', 'S', 'R', 'T', 'SD', 'SE', 'SP', 'SS', 'SF', 'FR', 'CU', 'CD', 'TAR1', 'TAR2'))
+READ_WRITE_OPS = frozenset(('FP', 'FN'))
+
+# Parameter directions of system functions called by symbol
+SYSTEM_INTERFACES = {
+    'BLKMOV': {'SRCBLK': 'VAR_INPUT', 'DSTBLK': 'VAR_OUTPUT', 'RET_VAL': 'VAR_OUTPUT'},
+    'FILL': {'BVAL': 'VAR_INPUT', 'BLK': 'VAR_OUTPUT', 'RET_VAL': 'VAR_OUTPUT'}
+}
+
+SECTION_ACCESS = {'VAR_INPUT': READ, 'VAR_OUTPUT': WRITE, 'VAR_IN_OUT': READ_WRITE}
+
+ANY_POINTER_RE = re.compile(
+    r'^P#(?:DB(\d+)\.)?(DB|DI|I|Q|M)X?\s*(\d+)\.(\d)\s+(BOOL|BYTE|CHAR|WORD|INT|DWORD|DINT|REAL|TIME)\s+(\d+)$'
+)
+ANY_WIDTHS = {'BOOL': 'X', 'BYTE': 'B', 'CHAR': 'B', 'WORD': 'W', 'INT': 'W',
+              'DWORD': 'D', 'DINT': 'D', 'REAL': 'D', 'TIME': 'D'}
+MAX_POINTER_ELEMENTS = 256
+
+MAGIC = b'STLX'
+FORMAT_VERSION = 1
+
+class Reference(NamedTuple):
+    """
+    Operand reference data structure
+
+    block: Block name ('FC50')
+    network: 1-based network number
+    line: Source line
+    op: Opcode ('=', 'A', 'T', 'CALL')
+    access: 'R', 'W', 'RW' or 'P'
+    param: 'FC300.Enable' for call parameters, '' otherwise
+    """
+    block: str
+    network: int
+    line: int
+    op: str
+    access: str
+    param: str = ""
+
+def _pointer_addresses(text: str) -> List[Address]:
+    """Expand an ANY pointer constant to the addresses it covers"""
+    match = ANY_POINTER_RE.match(' '.join(text.split()))
+    if not match:
+        return []
+    db, area, byte, bit, data_type, count = match.groups()
+    db = int(db) if db is not None else -1
+    byte, bit, count = int(byte), int(bit), min(int(count), MAX_POINTER_ELEMENTS)
+    width = ANY_WIDTHS[data_type]
+    if width == 'X':
+        bits = [byte * 8 + bit + index for index in range(count)]
+        return [Address(area, 'X', position // 8, position % 8, db) for position in bits]
+    size = {'B': 1, 'W': 2, 'D': 4}[width]
+    return [Address(area, width, byte + index * size, -1, db) for index in range(count)]
+
+def block_interface(block: Block) -> Dict[str, str]:
+    """
+    Get block parameter interface
+
+    Args:
+        block: Parsed block
+
+    Returns:
+        dict: Parameter name -> VAR section
+    """
+    return {var.name: var.section for var in block.variables
+            if var.section in SECTION_ACCESS and '.' not in var.name}
+
+def block_references(block: Block) -> Tuple[List[Tuple[str, Reference]], int]:
+    """
+    Collect global operand references of one block
+
+    Args:
+        block: Parsed block
+
+    Returns:
+        tuple: ([(address key, Reference), ...], unresolved indirect access count)
+    """
+    entries: List[Tuple[str, Reference]] = []
+    indirect = 0
+    if not block.is_code and block.kind != 'SNIPPET':
+        return entries, indirect
+
+    name = block.name
+    open_db = -1
+    for network, instruction in block.instructions():
+        op = instruction.op
+        call = instruction.call
+        if call is not None:
+            open_db = -1  # DB register is undefined after a call
+            for param, operand, address in call.params:
+                param_name = f"{call.target}.{param}" if param else call.target
+                addresses = [address] if address is not None else _pointer_addresses(operand)
+                for target in addresses:
+                    if target.area in GLOBAL_AREAS and (target.area != 'DB' or target.db >= 0):
+                        entries.append((str(target), Reference(
+                            name, network.index, instruction.line, op, PARAMETER, param_name)))
+            continue
+
+        if op == 'OPN':
+            operand = instruction.operand
+            open_db = int(operand[2:]) if operand.startswith('DB') and operand[2:].isdigit() else -1
+            continue
+
+        address = instruction.address
+        if address is None:
+            if '[' in instruction.operand and not instruction.operand.startswith('#'):
+                indirect += 1
+            continue
+        if address.area == 'DB':
+            if address.db >= 0:
+                open_db = address.db
+            elif open_db >= 0:
+                address = address._replace(db=open_db)
+            else:
+                indirect += 1
+                continue
+        elif address.area not in GLOBAL_AREAS:
+            continue
+
+        if op in WRITE_OPS:
+            access = WRITE
+        elif op in READ_WRITE_OPS:
+            access = READ_WRITE
+        else:
+            access = READ
+        entries.append((str(address), Reference(name, network.index, instruction.line, op, access)))
+    return entries, indirect
+
+class CrossReference:
+    """
+    Cross-Reference Index Class
+
+    Maps canonical operand text to the list of references in source order
+    """
+
+    def __init__(self):
+        """Initialize empty index"""
+        self.references: Dict[str, List[Reference]] = {}
+        self.interfaces: Dict[str, Dict[str, str]] = {name: dict(params) for name, params in SYSTEM_INTERFACES.items()}
+        self.indirect: Dict[str, int] = {}  # Block -> unresolved indirect accesses
+        self.blocks: List[str] = []
+        self.source_digest = ""
+        self._byte_index: Optional[Dict[Tuple[str, int, int], Set[str]]] = None
+
+    @classmethod
+    def build(cls, blocks: Iterable[Block]) -> 'CrossReference':
+        """
+        Build index from parsed blocks
+
+        Args:
+            blocks: Program or any iterable of blocks (e.g. iter_file_blocks)
+
+        Returns:
+            CrossReference: Finalized index
+        """
+        index = cls()
+        for block in blocks:
+            index.add_block(block)
+        index.finalize()
+        return index
+
+    @classmethod
+    def build_from_file(cls, file_path: str) -> 'CrossReference':
+        """
+        Build index by streaming a source file
+
+        Args:
+            file_path: STL/AWL source file
+
+        Returns:
+            CrossReference: Finalized index with source digest set
+        """
+        index = cls.build(iter_file_blocks(file_path))
+        index.source_digest = file_digest(file_path)
+        return index
+
+    def add_block(self, block: Block):
+        """
+        Index one block (call finalize() after the last block)
+
+        Args:
+            block: Parsed block
+        """
+        entries, indirect = block_references(block)
+        self.add_fragment(block.name, entries, indirect, block_interface(block))
+
+    def add_fragment(self, name: str, entries: List[Tuple[str, Reference]], indirect: int = 0,
+                     interface: Optional[Dict[str, str]] = None) -> Set[str]:
+        """
+        Merge a block's precomputed references
+
+        Args:
+            name: Block name
+            entries: (address key, Reference) pairs from block_references()
+            indirect: Unresolved indirect access count
+            interface: Block parameter interface from block_interface()
+
+        Returns:
+            set: Address keys touched
+        """
+        self.blocks.append(name)
+        if interface:
+            self.interfaces[name] = interface
+        if indirect:
+            self.indirect[name] = indirect
+        references = self.references
+        touched = set()
+        for key, reference in entries:
+            touched.add(key)
+            bucket = references.get(key)
+            if bucket is None:
+                references[key] = [reference]
+            else:
+                bucket.append(reference)
+        self._byte_index = None
+        return touched
+
+    def remove_block(self, name: str, keys: Optional[Iterable[str]] = None) -> Set[str]:
+        """
+        Drop a block's references
+
+        Args:
+            name: Block name
+            keys: Address keys the block referenced (all keys are scanned if None)
+
+        Returns:
+            set: Address keys touched
+        """
+        if name in self.blocks:
+            self.blocks.remove(name)
+        self.indirect.pop(name, None)
+        if name not in SYSTEM_INTERFACES:
+            self.interfaces.pop(name, None)
+        touched = set()
+        for key in list(self.references if keys is None else keys):
+            bucket = self.references.get(key)
+            if not bucket:
+                continue
+            kept = [reference for reference in bucket if reference.block != name]
+            if len(kept) != len(bucket):
+                touched.add(key)
+                if kept:
+                    self.references[key] = kept
+                else:
+                    del self.references[key]
+        self._byte_index = None
+        return touched
+
+    def finalize(self, keys: Optional[Iterable[str]] = None):
+        """
+        Resolve call parameter directions from the collected interfaces
+
+        Args:
+            keys: Only resolve these address keys (all if None)
+        """
+        for key in (self.references if keys is None else keys):
+            bucket = self.references.get(key)
+            if not bucket:
+                continue
+            for position, reference in enumerate(bucket):
+                if reference.access == PARAMETER:
+                    callee, _, param = reference.param.partition('.')
+                    section = self.interfaces.get(callee, {}).get(param)
+                    if section in SECTION_ACCESS:
+                        bucket[position] = reference._replace(access=SECTION_ACCESS[section])
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def lookup(self, operand: str) -> List[Reference]:
+        """
+        Get all references of an operand
+
+        Args:
+            operand: Address in any spacing ('DB10.DBW 100', 'M 12.0')
+
+        Returns:
+            List of references (empty if never referenced)
+        """
+        key, _ = normalize_operand(operand)
+        return self.references.get(key, [])
+
+    def writers(self, operand: str) -> List[Reference]:
+        """Get references that write the operand (including unknown-direction parameters)"""
+        return [r for r in self.lookup(operand) if r.access != READ]
+
+    def readers(self, operand: str) -> List[Reference]:
+        """Get references that read the operand (including unknown-direction parameters)"""
+        return [r for r in self.lookup(operand) if r.access != WRITE]
+
+    def addresses(self, area: Optional[str] = None) -> List[str]:
+        """
+        List indexed operands
+
+        Args:
+            area: Optional area filter ('M', 'DB', 'I', ...)
+
+        Returns:
+            Sorted list of canonical operands
+        """
+        keys = self.references.keys()
+        if area is not None:
+            keys = [key for key in keys if normalize_operand(key)[1].area == area]
+        return sorted(keys, key=_address_sort_key)
+
+    def overlapping(self, operand: str) -> Dict[str, List[Reference]]:
+        """
+        Get references of every operand sharing a byte with the given one
+
+        'M 12.0' also finds 'MB 12', 'MW 11', 'MD 10' ...
+
+        Args:
+            operand: Address in any spacing
+
+        Returns:
+            dict: Canonical operand -> references
+        """
+        _, address = normalize_operand(operand)
+        if address is None:
+            return {}
+        if self._byte_index is None:
+            self._build_byte_index()
+        keys: Set[str] = set()
+        for byte in range(address.byte, address.byte + max(address.size, 1)):
+            keys.update(self._byte_index.get((address.area, address.db, byte), ()))
+        bit_filter = address.bit if address.width == 'X' else -1
+        result = {}
+        for key in sorted(keys, key=_address_sort_key):
+            other = normalize_operand(key)[1]
+            if bit_filter >= 0 and other.width == 'X' and other.bit != bit_filter:
+                continue
+            result[key] = self.references[key]
+        return result
+
+    def _build_byte_index(self):
+        """Map (area, db, byte) -> operands touching that byte"""
+        index: Dict[Tuple[str, int, int], Set[str]] = {}
+        for key in self.references:
+            address = normalize_operand(key)[1]
+            if address is None or address.area in ('T', 'C'):
+                continue
+            for byte in range(address.byte, address.byte + max(address.size, 1)):
+                index.setdefault((address.area, address.db, byte), set()).add(key)
+        self._byte_index = index
+
+    def statistics(self) -> Dict[str, int]:
+        """
+        Get index statistics
+
+        Returns:
+            dict: Operand and reference counts
+        """
+        areas: Dict[str, int] = {}
+        for key in self.references:
+            area = normalize_operand(key)[1].area
+            areas[area] = areas.get(area, 0) + 1
+        return {
+            'blocks': len(self.blocks),
+            'operands': len(self.references),
+            'references': sum(len(bucket) for bucket in self.references.values()),
+            'indirect_accesses': sum(self.indirect.values()),
+            **{f"{area}_operands": count for area, count in sorted(areas.items())}
+        }
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, file_path: str) -> bool:
+        """
+        Save index in compact binary form
+
+        Layout: magic, version, JSON metadata length, JSON metadata,
+        zlib-compressed payload of a string table followed by
+        one int32 column per Reference field.
+
+        Args:
+            file_path: Output file path
+
+        Returns:
+            bool: True if successful
+        """
+        try:
+            strings: Dict[str, int] = {}
+
+            def string_id(text: str) -> int:
+                if text not in strings:
+                    strings[text] = len(strings)
+                return strings[text]
+
+            columns = [array('i') for _ in range(7)]
+            for key, bucket in self.references.items():
+                key_id = string_id(key)
+                for reference in bucket:
+                    values = (key_id, string_id(reference.block), reference.network, reference.line,
+                              string_id(reference.op), string_id(reference.access), string_id(reference.param))
+                    for column, value in zip(columns, values):
+                        column.append(value)
+
+            table = '\n'.join(strings).encode('utf-8')
+            payload = struct.pack('<II', len(table), len(columns[0])) + table
+            payload += b''.join(column.tobytes() for column in columns)
+
+            meta = json.dumps({
+                'source_digest': self.source_digest,
+                'created_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+                'blocks': self.blocks,
+                'interfaces': self.interfaces,
+                'indirect': self.indirect
+            }).encode('utf-8')
+
+            with open(file_path, 'wb') as f:
+                f.write(MAGIC + struct.pack('<HI', FORMAT_VERSION, len(meta)))
+                f.write(meta)
+                f.write(zlib.compress(payload, 6))
+            logger.info(f"Saved cross-reference index ({len(columns[0])} references) to {file_path}")
+            return True
+        except Exception as e:
+            logger.error(f"Error saving cross-reference index: {e}")
+            return False
+
+    @classmethod
+    def load(cls, file_path: str) -> Optional['CrossReference']:
+        """
+        Load index saved with save()
+
+        Args:
+            file_path: Index file path
+
+        Returns:
+            CrossReference or None if the file is missing or incompatible
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                header = f.read(10)
+                if len(header) != 10 or header[:4] != MAGIC:
+                    return None
+                version, meta_length = struct.unpack('<HI', header[4:])
+                if version != FORMAT_VERSION:
+                    return None
+                meta = json.loads(f.read(meta_length).decode('utf-8'))
+                payload = zlib.decompress(f.read())
+
+            table_length, count = struct.unpack_from('<II', payload)
+            offset = 8 + table_length
+            strings = payload[8:offset].decode('utf-8').split('\n')
+            columns = []
+            for _ in range(7):
+                column = array('i')
+                column.frombytes(payload[offset:offset + count * column.itemsize])
+                offset += count * column.itemsize
+                columns.append(column)
+
+            index = cls()
+            index.source_digest = meta.get('source_digest', "")
+            index.blocks = meta.get('blocks', [])
+            index.interfaces.update(meta.get('interfaces', {}))
+            index.indirect = meta.get('indirect', {})
+            references = index.references
+            for key_id, block, network, line, op, access, param in zip(*columns):
+                reference = Reference(strings[block], network, line, strings[op], strings[access], strings[param])
+                key = strings[key_id]
+                bucket = references.get(key)
+                if bucket is None:
+                    references[key] = [reference]
+                else:
+                    bucket.append(reference)
+            return index
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error loading cross-reference index: {e}")
+            return None
+
+def _address_sort_key(key: str):
+    """Sort operands by area, DB, byte, bit"""
+    address = normalize_operand(key)[1]
+    if address is None:
+        return ('~', 0, 0, 0, key)
+    return (address.area, address.db, address.byte, address.bit, key)
+
+def file_digest(file_path: str) -> str:
+    """
+    Get content digest of a source file
+
+    Args:
+        file_path: File path
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_or_build(source_path: str, index_path: Optional[str] = None) -> CrossReference:
+    """
+    Load the persisted index for a source, rebuilding it when the source changed
+
+    Args:
+        source_path: STL/AWL source file
+        index_path: Index file (defaults to <source>.xref)
+
+    Returns:
+        CrossReference: Index matching the current source
+    """
+    index_path = index_path or source_path + '.xref'
+    digest = file_digest(source_path)
+    if os.path.exists(index_path):
+        index = CrossReference.load(index_path)
+        if index is not None and index.source_digest == digest:
+            return index
+        logger.info(f"Cross-reference index {index_path} is stale, rebuilding")
+    index = CrossReference.build_from_file(source_path)
+    index.save(index_path)
+    return index
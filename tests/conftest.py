@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test Fixtures
+=============
+
+Description: Shared pytest fixtures for the laptop code and the STL analyzer
+Purpose: Run the laptop code against the in-process PLC simulator
+Version: 1.0
+Date: 17/07/2025
+
+Features:
+- laptop_code (flat imports) and the repository root on sys.path
+- Scanning PLCSimulator connected to a PLCClient through LoopbackClient
+- Working directory in tmp_path, the managers write their JSON files there
+"""
+
+import sys
+import threading
+import logging
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LAPTOP_CODE = REPO_ROOT / "pc_plc_robot_communication" / "laptop_code"
+PLC_CODE = REPO_ROOT / "pc_plc_robot_communication" / "plc_code"
+STL_PROGRAM = REPO_ROOT / "STL_Program.txt"
+
+for path in (REPO_ROOT, LAPTOP_CODE):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from plc_simulator import PLCSimulator, SimulatorConfig, LoopbackClient  # noqa: E402
+from plc_client import PLCClient  # noqa: E402
+from coordinate_manager import CoordinateManager  # noqa: E402
+
+logging.disable(logging.WARNING)
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run the test in tmp_path (coordinate_sets.json, validation_config.json)"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+@pytest.fixture
+def simulator():
+    """Extended PLC simulator scanning in a background thread"""
+    sim = PLCSimulator(SimulatorConfig.extended())
+    sim.running = True
+    thread = threading.Thread(target=sim._scan_loop, daemon=True)
+    thread.start()
+    yield sim
+    sim.running = False
+    thread.join(timeout=1.0)
+
+@pytest.fixture
+def plc(simulator):
+    """PLC client connected to the simulator"""
+    client = PLCClient("127.0.0.1")
+    client.client = LoopbackClient(simulator)
+    client.connected = True
+    yield client
+    client.positions.stop()
+
+@pytest.fixture
+def manager(plc, workdir):
+    """Coordinate manager with an empty store in tmp_path"""
+    return CoordinateManager(plc)
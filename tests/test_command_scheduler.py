@@ -0,0 +1,59 @@
+"""Tests for command_scheduler: priority order and safety preemption"""
+
+import threading
+
+import pytest
+
+from command_scheduler import CommandScheduler, PRIORITY_CONTROL, PRIORITY_NORMAL
+
+@pytest.fixture
+def scheduler(plc):
+    scheduler = CommandScheduler(plc, safety_wait_timeout=5.0)
+    scheduler.start()
+    yield scheduler
+    scheduler.stop()
+
+def test_higher_priority_runs_first_fifo_within_level(scheduler):
+    release = threading.Event()
+    order = []
+    blocker = scheduler.submit(release.wait, 5.0, name="blocker")
+    futures = [
+        scheduler.submit(order.append, "normal-1", priority=PRIORITY_NORMAL),
+        scheduler.submit(order.append, "normal-2", priority=PRIORITY_NORMAL),
+        scheduler.submit(order.append, "control", priority=PRIORITY_CONTROL),
+    ]
+    release.set()
+
+    assert blocker.result(timeout=5.0) is True
+    for future in futures:
+        future.result(timeout=5.0)
+    assert order == ["control", "normal-1", "normal-2"]
+
+def test_emergency_stop_preempts_running_and_cancels_queued(scheduler, plc):
+    started = threading.Event()
+
+    def running_wait():
+        # Stands in for wait_for_completion(): returns once cancelled
+        started.set()
+        return plc.cancel_event.wait(5.0)
+
+    running = scheduler.submit(running_wait, name="execute")
+    assert started.wait(5.0)
+    queued = scheduler.submit(lambda: "ran", name="queued")
+
+    stop = scheduler.emergency_stop()
+
+    assert running.result(timeout=5.0) is True
+    assert queued.cancelled()
+    success, message = stop.result(timeout=10.0)
+    assert success, message
+    stats = scheduler.get_statistics()
+    assert stats['preempted'] == 1
+    assert stats['cancelled'] == 1
+    assert stats['safety_latency_ms_last'] > 0.0
+
+def test_submit_rejected_when_stopped(plc):
+    scheduler = CommandScheduler(plc)
+    future = scheduler.submit(lambda: None)
+    with pytest.raises(RuntimeError):
+        future.result(timeout=1.0)
@@ -0,0 +1,76 @@
+"""Tests for coordinate_manager: CSV export/import round trip and row errors"""
+
+import csv
+
+import pytest
+
+from coordinate_manager import Coordinate, CoordinateManager, CoordinateSet
+
+SETS = [
+    CoordinateSet(1, 1, [Coordinate(100, 200, 300, 0, 0, 9000, 1, 80),
+                         Coordinate(-150, 250, 50, 100, -200, 0, 0, 20)], description="pick #1"),
+    CoordinateSet(1, 4, [Coordinate(0, 0, 0)]),
+    CoordinateSet(2, 10, [Coordinate(2000, -2000, 1000, -18000, 18000, 0, 1, 100)] * 3,
+                  description="place, area 2"),
+]
+
+def snapshot(manager):
+    return {(s.area, s.set_number): ([tuple(vars(c).values()) for c in s.coordinates], s.description)
+            for s in manager.list_coordinate_sets()}
+
+@pytest.fixture
+def filled(manager):
+    for coord_set in SETS:
+        assert manager.add_coordinate_set(coord_set)
+    return manager
+
+@pytest.mark.parametrize("chunk_size", [1000, 1])
+def test_export_import_round_trip(filled, plc, workdir, chunk_size):
+    path = workdir / "export.csv"
+    assert filled.export_coordinates_to_file(str(path))
+    (workdir / "coordinate_sets.json").unlink()
+
+    imported = CoordinateManager(plc)
+    assert not imported.list_coordinate_sets()
+    result = imported.import_coordinates_streaming(str(path), chunk_size=chunk_size)
+
+    assert result.success, result.get_summary()
+    assert (result.rows_read, result.rows_imported, result.sets_imported) == (6, 6, 3)
+    assert not result.errors
+    assert snapshot(imported) == snapshot(filled)
+    # Saved once at the end of the import
+    assert snapshot(CoordinateManager(plc)) == snapshot(filled)
+
+def test_export_area_filter(filled, workdir):
+    path = workdir / "area2.csv"
+    assert filled.export_coordinates_to_file(str(path), area=2)
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [(row['area'], row['set_number']) for row in rows] == [('2', '10')] * 3
+
+def test_import_reports_row_errors(manager, workdir):
+    path = workdir / "mixed.csv"
+    path.write_text("area,set_number,x,y,z,speed\n"
+                    "1,2,10,20,30,50\n"
+                    "1,2,abc,20,30,50\n"
+                    "1,3,10,20,5000,50\n"
+                    "1,2,40,50,60,5\n"
+                    "1,2,70,80,90,100\n")
+
+    result = manager.import_coordinates_streaming(str(path))
+
+    assert result.success
+    assert (result.rows_read, result.rows_imported, result.sets_imported) == (5, 2, 1)
+    assert [line for line, _ in result.errors] == [3, 4, 5]
+    assert [(c.x, c.y, c.z) for c in manager.get_coordinate_set(1, 2).coordinates] == [(10, 20, 30), (70, 80, 90)]
+    assert manager.get_coordinate_set(1, 3) is None
+
+def test_import_empty_file_fails(manager, workdir):
+    path = workdir / "empty.csv"
+    path.write_text("area,set_number,x,y,z\n")
+
+    result = manager.import_coordinates_streaming(str(path))
+
+    assert not result.success
+    assert result.get_summary() == "Import failed: no rows in file"
+    assert not manager.import_coordinates_from_file(str(workdir / "missing.csv"))
@@ -0,0 +1,56 @@
+"""Tests for position_service: snapshot reuse and coalesced DB101 reads"""
+
+import threading
+import time
+
+def test_concurrent_requests_share_one_read(plc, monkeypatch):
+    positions = plc.positions
+    read_db101 = plc.read_db101
+    entered = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_read():
+        calls.append(1)
+        entered.set()
+        release.wait(5.0)
+        return read_db101()
+
+    monkeypatch.setattr(plc, 'read_db101', slow_read)
+    results = []
+    first = threading.Thread(target=lambda: results.append(positions.get_position(max_age=0.0)))
+    first.start()
+    assert entered.wait(5.0)
+    waiters = [threading.Thread(target=lambda: results.append(positions.get_position(max_age=0.0)))
+               for _ in range(4)]
+    for thread in waiters:
+        thread.start()
+    # Waiters are counted as coalesced before they block on the running read
+    deadline = time.monotonic() + 5.0
+    while positions.get_statistics()['coalesced'] < len(waiters) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in [first] + waiters:
+        thread.join(5.0)
+
+    assert len(calls) == 1
+    assert len(results) == 5 and all(result is not None for result in results)
+    assert len({(r['x'], r['y'], r['z']) for r in results}) == 1
+    stats = positions.get_statistics()
+    assert stats['reads'] == 1
+    assert stats['coalesced'] == 4
+
+def test_fresh_snapshot_served_from_memory(plc):
+    positions = plc.positions
+    assert positions.get_position(max_age=0.0) is not None
+    pose = positions.get_position(max_age=60.0)
+
+    assert pose is not None and pose['age_s'] < 60.0
+    stats = positions.get_statistics()
+    assert stats['reads'] == 1
+    assert stats['memory_hits'] == 1
+
+def test_client_reads_refresh_snapshot(plc):
+    assert plc.read_db101() is not None
+    assert plc.positions.get_feedback(max_age=60.0) is not None
+    assert plc.positions.get_statistics()['reads'] == 0
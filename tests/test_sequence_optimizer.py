@@ -0,0 +1,51 @@
+"""Tests for sequence_optimizer: 2-opt ordering within segment constraints"""
+
+from coordinate_manager import Coordinate, CoordinateSet
+from sequence_optimizer import SequenceOptimizer
+
+def add_sets(manager, area, xs, gripper=0):
+    for set_number, x in xs.items():
+        assert manager.add_coordinate_set(
+            CoordinateSet(area, set_number, [Coordinate(x, 0, 100, gripper=gripper)]))
+
+def test_line_is_visited_in_order(manager):
+    add_sets(manager, 1, {1: 0, 2: 400, 3: 100, 4: 300, 5: 200})
+    optimizer = SequenceOptimizer(manager, metric="distance")
+
+    result = optimizer.optimize([(1, 1), (1, 2), (1, 3), (1, 4), (1, 5)])
+
+    assert result.success
+    assert result.optimized == [(1, 1), (1, 3), (1, 5), (1, 4), (1, 2)]
+    assert result.distance_original == 1000
+    assert result.distance_optimized == 400
+    assert result.predicted_saving > 0
+
+def test_two_opt_removes_crossing(manager):
+    optimizer = SequenceOptimizer(manager, metric="distance")
+    # Square corners; route 0-2-1-3 crosses itself (cost 500), the best open route costs 300
+    points = [(0, 0), (0, 100), (100, 100), (100, 0)]
+    matrix = [[abs(a[0] - b[0]) + abs(a[1] - b[1]) for b in points] for a in points]
+
+    route = optimizer._two_opt([0, 2, 1, 3], matrix, lambda j: 0.0)
+
+    assert sorted(route) == [0, 1, 2, 3]
+    assert optimizer._cost(route, matrix, lambda j: 0.0) == 300
+
+def test_sets_stay_within_area_and_gripper_segments(manager):
+    add_sets(manager, 1, {1: 0, 2: 300, 3: 100}, gripper=1)
+    add_sets(manager, 1, {4: 200, 5: 50}, gripper=0)
+    add_sets(manager, 2, {1: 500, 2: 400})
+    optimizer = SequenceOptimizer(manager, metric="distance")
+    sequence = [(1, 1), (1, 2), (1, 3), (1, 4), (1, 5), (2, 1), (2, 2)]
+
+    result = optimizer.optimize(sequence)
+
+    assert result.optimized[:3] == [(1, 1), (1, 3), (1, 2)]
+    assert set(result.optimized[3:5]) == {(1, 4), (1, 5)}
+    assert result.optimized[5:] == [(2, 2), (2, 1)]
+    assert result.distance_optimized <= result.distance_original
+
+def test_unknown_set_is_an_error(manager):
+    result = SequenceOptimizer(manager).optimize([(1, 9)])
+    assert not result.success
+    assert result.optimized == [(1, 9)]
@@ -0,0 +1,102 @@
+"""Tests for stl_analyzer: parser, cross-reference and interpreter on the shipped sources"""
+
+import pytest
+
+from stl_analyzer import (CompiledInterpreter, CrossReference, Program, STLInterpreter,
+                          iter_file_blocks, load_io_map, parse_file, parse_text)
+
+from conftest import PLC_CODE, REPO_ROOT, STL_PROGRAM
+
+SMALL_PROGRAM = """FUNCTION FC1 : VOID
+BEGIN
+NETWORK
+TITLE =
+      A     I      0.0
+      AN    I      0.1
+      =     Q      4.0
+END_FUNCTION
+ORGANIZATION_BLOCK OB1
+VAR_TEMP
+  T1 : BYTE ;
+END_VAR
+BEGIN
+NETWORK
+TITLE =
+      CALL FC     1
+END_ORGANIZATION_BLOCK
+"""
+
+@pytest.fixture(scope="module")
+def program():
+    return parse_file(str(STL_PROGRAM))
+
+@pytest.fixture(scope="module")
+def plc_code():
+    program = Program()
+    for path in sorted(PLC_CODE.glob("*.awl")):
+        for block in iter_file_blocks(str(path)):
+            program.add(block)
+    return program
+
+def test_parse_program_blocks(program):
+    for name in ('OB1', 'OB35', 'OB100', 'FC50', 'FB450', 'DB10'):
+        assert program.get(name) is not None, name
+    ob1 = program.get('OB1')
+    assert ob1.kind == 'OB' and ob1.instruction_count() > 0
+    calls = {instruction.call.target for _, instruction in ob1.instructions()
+             if instruction.call and instruction.call.kind in ('FC', 'FB')}
+    assert {'FC50', 'FC60', 'FC102'} <= calls
+    assert all(program.get(target) is not None for target in calls)
+
+def test_parse_text_addresses():
+    fc1 = parse_text(SMALL_PROGRAM).get('FC1')
+    ops = [(i.op, i.operand, i.address.area, i.address.byte, i.address.bit) for _, i in fc1.instructions()]
+    assert ops == [('A', 'I0.0', 'I', 0, 0), ('AN', 'I0.1', 'I', 0, 1), ('=', 'Q4.0', 'Q', 4, 0)]
+
+def test_parse_plc_code(plc_code):
+    for name in ('DB100', 'DB101', 'DB102', 'FC300', 'FC301', 'FC302', 'FC303', 'OB100'):
+        assert plc_code.get(name) is not None, name
+    names = [variable.name for variable in plc_code.get('DB102').variables]
+    assert 'Area1_Set1_X' in names
+
+def test_xref_writers_and_readers(program):
+    xref = CrossReference.build(program.blocks)
+    outputs = xref.addresses('Q')
+    assert outputs
+    assert any(xref.writers(address) for address in outputs)
+    for address in outputs[:20]:
+        for reference in xref.writers(address):
+            assert reference.access == 'W'
+            assert program.get(reference.block) is not None
+
+def test_xref_save_load_round_trip(plc_code, tmp_path):
+    xref = CrossReference.build(plc_code.blocks)
+    path = tmp_path / "plc_code.xref"
+    assert xref.save(str(path))
+
+    loaded = CrossReference.load(str(path))
+
+    assert loaded is not None
+    assert loaded.statistics() == xref.statistics()
+    for address in xref.addresses():
+        assert loaded.lookup(address) == xref.lookup(address)
+
+def test_interpreter_small_program():
+    interpreter = STLInterpreter(parse_text(SMALL_PROGRAM))
+    interpreter.write('I 0.0', 1)
+    interpreter.scan()
+    assert interpreter.read('Q 4.0') == 1
+    interpreter.write('I 0.1', 1)
+    interpreter.scan()
+    assert interpreter.read('Q 4.0') == 0
+
+def test_interpreter_and_compiled_agree(program):
+    io_map = load_io_map(str(REPO_ROOT / "plc_io.txt"))
+    reference = STLInterpreter(program, io_map).run(50)
+    compiled = CompiledInterpreter(program, io_map, cache_dir=None)
+    compiled.compile_all()
+    result = compiled.run(50)
+
+    assert reference.scans == 50 and reference.faults == 0
+    assert reference.output_changes
+    assert result.output_changes == reference.output_changes